@@ -2,15 +2,31 @@ from manim import *
 import tempfile
 import os
 import sys
-import subprocess
-import py_compile
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.execution import run_render
+from core.llm_clients import get_chat_model
+from core.tracing import span, current_span
+from .render_cache import render_cache
+from .code_validation import validate_manim_code, format_issues
+from .manim_lint import lint_and_fix_manim_code
+from .render_workers import render_worker_pool, RenderWorkerError, MANIM_RENDER_BACKEND
+from .fake_render import fake_renderer
+from .section_render import render_sections, MANIM_SECTION_RENDERING
 
 # Load environment variables
 load_dotenv()
 
+# Manim quality flags; part of the render cache key
+TRIAL_RENDER_QUALITY = '-ql'
+# Pass-marker key for a dry run, which only executes construct() and proves less than a -ql render
+DRY_RUN_PASS_KEY = 'dry_run'
+FINAL_RENDER_QUALITY = '-qm'
+
+# How create_animation_from_code checks code before the final render
+RENDER_MODES = ('trial', 'dry_run', 'single_pass')
+MANIM_RENDER_MODE = (os.getenv("MANIM_RENDER_MODE") or 'trial').lower()
+
 # LLM client using LangChain with Google Generative AI
 class LLMClient:
     def __init__(self):
@@ -21,14 +37,7 @@ class LLMClient:
                 raise ValueError("GOOGLE_GENERATIVE_AI_API_KEY not found in environment variables")
 
             # Initialize the Google Generative AI model
-            self.llm = ChatGoogleGenerativeAI(
-                google_api_key=google_api_key,
-                model="gemini-2.0-flash",
-                temperature=0.7,
-                max_tokens=None,
-                timeout=None,
-                max_retries=2
-            )
+            self.llm = get_chat_model("code_repair", google_api_key, temperature=0.7)
             
         except Exception as e:
             print(f"Warning: Failed to initialize LLM client: {e}")
@@ -157,10 +166,16 @@ CRITICAL: Avoid ALL LaTeX elements (MathTex, Tex). Use only Text objects.
 
 llm_client = LLMClient()
 
+def repair_manim_code(manim_code, error_message, reason, attempt):
+    """Have the LLM fix `manim_code`, traced as one repair; `reason` is the check that failed."""
+    with span("manim.repair", **{"manim.repair_reason": reason, "manim.attempt": attempt}):
+        return llm_client.fix_manim_code(manim_code, error_message)
+
 def validate_and_fix_manim_code(manim_code, max_attempts=5):
     """
-    Validates Manim code through compilation and fixes errors using LLM feedback,
-    specifically removing LaTeX elements that cause runtime errors.
+    Validates Manim code through in-memory compilation and static Manim checks and
+    fixes errors using LLM feedback, specifically removing LaTeX elements that cause
+    runtime errors.
     
     Args:
         manim_code: Generated Manim code string
@@ -178,81 +193,121 @@ def validate_and_fix_manim_code(manim_code, max_attempts=5):
     error_history = []
     
     while attempt < max_attempts:
-        # Create temporary Python file for validation
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-            temp_file.write(current_code)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Attempt compilation
-            py_compile.compile(temp_file_path, doraise=True)
-            
-            # If successful, clean up and return
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        with span("manim.validate", **{"manim.attempt": attempt + 1}) as validate_span:
+            # Auto-fix predictable Manim API mistakes before spending an LLM round on them
+            current_code, lint_report = lint_and_fix_manim_code(current_code)
+
+            # Compile and statically check the code in memory
+            issues = validate_manim_code(current_code) + lint_report["remaining"]
+            validate_span.set_attributes(**{"manim.issues": len(issues), "manim.valid": not issues})
+        if not issues:
             return current_code, True, error_history
-            
-        except py_compile.PyCompileError as e:
-            # Capture compilation error
-            error_info = {
-                'attempt': attempt + 1,
-                'error': str(e),
-                'code_snapshot': current_code[:500] + "..." if len(current_code) > 500 else current_code
-            }
-            error_history.append(error_info)
-            
-            print(f"Attempt {attempt + 1} failed compilation: {e}")
-            
-            # Send to LLM for fixing
-            print("Attempting to fix code with LLM...")
-            current_code = llm_client.fix_manim_code(current_code, str(e))
-            attempt += 1
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        
+        error_message = format_issues(issues)
+        error_info = {
+            'attempt': attempt + 1,
+            'error': error_message,
+            'issues': [issue.to_dict() for issue in issues],
+            'code_snapshot': current_code[:500] + "..." if len(current_code) > 500 else current_code
+        }
+        error_history.append(error_info)
+        
+        print(f"Attempt {attempt + 1} failed validation:\n{error_message}")
+        
+        # Send to LLM for fixing
+        print("Attempting to fix code with LLM...")
+        current_code = repair_manim_code(current_code, error_message, "validation", attempt + 1)
+        attempt += 1
     
     # If all attempts failed
     print(f"Failed to validate and fix code after {max_attempts} attempts.")
     return current_code, False, error_history
 
-def trial_render_manim(temp_file_path, scene_class_name, output_dir="trial_media"):
+def render_manim_file(temp_file_path, scene_class_name, quality, output_dir, dry_run=False):
+    """
+    Render a scene from a Manim source file on the configured render backend.
+
+    Uses the warm worker pool unless MANIM_RENDER_BACKEND is 'cli' (or 'fake',
+    a simulated render for load tests), and falls back to the manim CLI if a
+    worker process crashes.
+
+    Args:
+        temp_file_path (str): Path to Python file with Manim code
+        scene_class_name (str): Name of the scene class to render
+        quality (str): Manim quality flag, e.g. '-qm'
+        output_dir (str): Manim media directory for the output
+        dry_run (bool): Run construct() without writing any frames or video
+
+    Returns:
+        tuple: (success_status, error_message, video_path)
+    """
+    if MANIM_RENDER_BACKEND == 'fake':
+        return fake_renderer.render(temp_file_path, scene_class_name, quality, output_dir, dry_run=dry_run)
+
+    if MANIM_RENDER_BACKEND == 'workers':
+        print(f"Rendering {scene_class_name} ({quality}{', dry run' if dry_run else ''}) on render worker pool")
+        try:
+            return render_worker_pool.render(temp_file_path, scene_class_name, quality, output_dir, dry_run=dry_run)
+        except RenderWorkerError as e:
+            print(f"{e}; falling back to manim CLI")
+
+    cmd = [
+        'manim',
+        temp_file_path,
+        scene_class_name,
+        quality,
+        '--disable_caching',
+        f'--media_dir={output_dir}'
+    ]
+    if dry_run:
+        cmd.append('--dry_run')
+
+    print(f"Running render: {' '.join(cmd)}")
+    result = run_render(cmd)
+
+    if result.returncode == 0:
+        video_path = find_generated_video(output_dir, scene_class_name, os.path.basename(temp_file_path).replace('.py', ''))
+        return True, None, video_path
+
+    error_message = f"Return Code: {result.returncode}\nStdout: {result.stdout}\nStderr: {result.stderr}"
+    return False, error_message, None
+
+def trial_render_manim(temp_file_path, scene_class_name, output_dir="trial_media", dry_run=False):
     """
     Perform a trial render of Manim code to check for rendering errors
     
     Args:
         temp_file_path (str): Path to temporary Python file with Manim code
         scene_class_name (str): Name of the scene class to render
-        output_dir (str): Directory for trial render output
+        output_dir (str): Parent directory for the trial's own output directory
+        dry_run (bool): Execute the scene without writing frames (catches runtime errors only)
         
     Returns:
         tuple: (success_status, error_message)
     """
+    with span("manim.trial_render", **{"manim.scene": scene_class_name, "manim.quality": TRIAL_RENDER_QUALITY,
+                                        "manim.dry_run": dry_run, "manim.backend": MANIM_RENDER_BACKEND}) as render_span:
+        success, error_message = _trial_render(temp_file_path, scene_class_name, output_dir, dry_run)
+        render_span.set_attribute("manim.success", success)
+        if not success:
+            render_span.record_error("trial render failed")
+        return success, error_message
+
+def _trial_render(temp_file_path, scene_class_name, output_dir, dry_run):
+    trial_dir = None
     try:
-        # Ensure trial output directory exists
+        # Each trial renders into its own directory so concurrent jobs never clean up each other's output
         os.makedirs(output_dir, exist_ok=True)
+        trial_dir = tempfile.mkdtemp(prefix="trial_", dir=output_dir)
         
-        # Trial render command with low quality for speed
-        cmd = [
-            'manim', 
-            temp_file_path,
-            scene_class_name,
-            '-ql',  # low quality for trial
-            '--disable_caching',
-            f'--media_dir={output_dir}'
-        ]
-        
-        print(f"Running trial render: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        # Trial render with low quality for speed
+        success, render_error, _ = render_manim_file(temp_file_path, scene_class_name, TRIAL_RENDER_QUALITY, trial_dir, dry_run=dry_run)
         
-        if result.returncode == 0:
+        if success:
             print("Trial render successful!")
-            # Clean up trial animations after successful render
-            cleanup_trial_animations(output_dir)
             return True, None
         else:
-            error_message = f"Trial render failed:\nReturn Code: {result.returncode}\nStdout: {result.stdout}\nStderr: {result.stderr}"
+            error_message = f"Trial render failed:\n{render_error}"
             print(f"Trial render failed: {error_message}")
             return False, error_message
             
@@ -260,13 +315,17 @@ def trial_render_manim(temp_file_path, scene_class_name, output_dir="trial_media
         error_message = f"Trial render exception: {str(e)}"
         print(error_message)
         return False, error_message
+    finally:
+        # The trial video is never used; the error text above is all a failed trial needs
+        if trial_dir:
+            cleanup_trial_animations(trial_dir)
 
 def cleanup_trial_animations(trial_output_dir):
     """
-    Clean up trial animation files and directories after successful trial render
+    Clean up the output directory of a single trial render
     
     Args:
-        trial_output_dir (str): Directory containing trial render output
+        trial_output_dir (str): Directory containing the trial's render output
     """
     try:
         if os.path.exists(trial_output_dir):
@@ -276,15 +335,99 @@ def cleanup_trial_animations(trial_output_dir):
     except Exception as e:
         print(f"Warning: Failed to clean up trial animations from {trial_output_dir}: {e}")
 
-def create_animation_from_code(manim_code, output_dir="media/videos", max_render_attempts=3):
+def final_render_manim(manim_code, scene_class_name, output_dir="media/videos"):
+    """
+    Render Manim code at final quality and move the video into the render cache.
+
+    Args:
+        manim_code (str): Complete Manim Python code
+        scene_class_name (str): Name of the scene class to render
+        output_dir (str): Directory to save the rendered video
+
+    Returns:
+        tuple: (video_path, error_message); error_message is None unless the render itself failed
+    """
+    with span("manim.final_render", **{"manim.scene": scene_class_name, "manim.quality": FINAL_RENDER_QUALITY,
+                                        "manim.backend": MANIM_RENDER_BACKEND}) as render_span:
+        video_path, error_message = _final_render(manim_code, scene_class_name, output_dir)
+        render_span.set_attribute("manim.success", video_path is not None)
+        if video_path is None:
+            render_span.record_error(error_message.splitlines()[0] if error_message else "no video produced")
+        return video_path, error_message
+
+def _final_render(manim_code, scene_class_name, output_dir):
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
+        temp_file.write(manim_code)
+        temp_file_path = temp_file.name
+    
+    try:
+        # Ensure output directory exists
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Run final Manim rendering with medium quality, split across workers when enabled
+        render_result = None
+        if MANIM_SECTION_RENDERING and MANIM_RENDER_BACKEND == 'workers':
+            try:
+                render_result = render_sections(temp_file_path, scene_class_name, FINAL_RENDER_QUALITY, output_dir)
+            except RenderWorkerError as e:
+                print(f"{e}; rendering scene in one piece")
+        if render_result is None:
+            render_result = render_manim_file(temp_file_path, scene_class_name, FINAL_RENDER_QUALITY, output_dir)
+        success, render_error, video_path = render_result
+        
+        if success:
+            if video_path:
+                video_path = render_cache.store(manim_code, FINAL_RENDER_QUALITY, scene_class_name, video_path)
+                print(f"Animation created successfully: {video_path}")
+                return video_path, None
+            else:
+                print(f"Final rendering succeeded but the video file was not found in {output_dir} for scene {scene_class_name}.")
+                return None, None
+        else:
+            print(f"Final rendering failed.")
+            print(render_error)
+            
+            # Log the code that failed final rendering
+            print("\n" + "="*60)
+            print("🚨 FINAL MANIM RENDERING FAILED")
+            print("="*60)
+            print("Code that failed final rendering:")
+            print("─" * 40)
+            lines = manim_code.split('\n')
+            for i, line in enumerate(lines, 1):
+                print(f"{i:3}: {line}")
+            print("─" * 40)
+            print("="*60)
+            return None, f"Final render failed:\n{render_error}"
+            
+    except Exception as e:
+        print(f"An unexpected error occurred during final animation creation: {e}")
+        print("Code at time of exception:")
+        print(manim_code)
+        return None, None
+    finally:
+        # Clean up temporary file
+        if os.path.exists(temp_file_path):
+            try:
+                os.unlink(temp_file_path)
+            except OSError as e:
+                print(f"Error deleting temporary file {temp_file_path}: {e}")
+
+def create_animation_from_code(manim_code, output_dir="media/videos", max_render_attempts=3, render_mode=None):
     """
     Enhanced animation creator with pre-validation and trial rendering.
     Create animation from generated Manim code.
     
+    Render modes:
+        trial: low quality trial render, LLM repair on failure, then the final render
+        dry_run: like trial, but the pre-check runs construct() without writing frames
+        single_pass: render at final quality directly, LLM repair and re-render on failure
+    
     Args:
         manim_code (str): Complete Manim Python code
         output_dir (str): Directory to save the rendered video
         max_render_attempts (int): Maximum attempts for render fixes
+        render_mode (str, optional): One of RENDER_MODES, defaults to MANIM_RENDER_MODE
         
     Returns:
         str: Path to the generated video file, or None if failed
@@ -293,6 +436,11 @@ def create_animation_from_code(manim_code, output_dir="media/videos", max_render
         print("No Manim code provided")
         return None
 
+    render_mode = render_mode or MANIM_RENDER_MODE
+    if render_mode not in RENDER_MODES:
+        print(f"Unknown render mode '{render_mode}', using 'trial'")
+        render_mode = 'trial'
+
     # Pre-validate the code
     validated_code, is_valid, error_log = validate_and_fix_manim_code(manim_code)
     
@@ -309,11 +457,47 @@ def create_animation_from_code(manim_code, output_dir="media/videos", max_render
         print("Could not find scene class in the validated code.")
         return None
     
-    # Trial rendering loop
     render_attempt = 0
     current_code = validated_code
-    
+
+    if render_mode == 'single_pass':
+        # The final render doubles as the check; repair only when it fails
+        while render_attempt < max_render_attempts:
+            cached_video = render_cache.lookup(current_code, FINAL_RENDER_QUALITY, scene_class_name)
+            if cached_video:
+                print(f"Reusing cached render: {cached_video}")
+                current_span().add_event("render_cache_hit", scene=scene_class_name)
+                return cached_video
+
+            video_path, render_error = final_render_manim(current_code, scene_class_name, output_dir)
+            if video_path or render_error is None:
+                return video_path
+
+            render_attempt += 1
+            if render_attempt < max_render_attempts:
+                print("Attempting to fix rendering errors with LLM...")
+                current_code = repair_manim_code(current_code, render_error, "final_render", render_attempt)
+
+        print(f"Failed to fix rendering errors after {max_render_attempts} attempts.")
+        return None
+
+    # Trial rendering loop
     while render_attempt < max_render_attempts:
+        # Identical code (after normalization) renders to an identical video
+        cached_video = render_cache.lookup(current_code, FINAL_RENDER_QUALITY, scene_class_name)
+        if cached_video:
+            print(f"Reusing cached render: {cached_video}")
+            current_span().add_event("render_cache_hit", scene=scene_class_name)
+            return cached_video
+
+        # A passed trial render also covers a dry run, but not the other way round
+        if render_cache.has_passed(current_code, TRIAL_RENDER_QUALITY, scene_class_name) or (
+            render_mode == 'dry_run' and render_cache.has_passed(current_code, DRY_RUN_PASS_KEY, scene_class_name)
+        ):
+            print("Code already passed a trial render, proceeding with final render...")
+            current_span().add_event("trial_render_cache_hit", scene=scene_class_name)
+            break
+
         # Create temporary file with current code
         with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
             temp_file.write(current_code)
@@ -321,9 +505,11 @@ def create_animation_from_code(manim_code, output_dir="media/videos", max_render
         
         try:
             # Perform trial render
-            trial_success, trial_error = trial_render_manim(temp_file_path, scene_class_name)
+            trial_success, trial_error = trial_render_manim(temp_file_path, scene_class_name, dry_run=(render_mode == 'dry_run'))
             
             if trial_success:
+                pass_key = DRY_RUN_PASS_KEY if render_mode == 'dry_run' else TRIAL_RENDER_QUALITY
+                render_cache.mark_passed(current_code, pass_key, scene_class_name)
                 print("Trial render successful! Proceeding with final render...")
                 break
             else:
@@ -332,7 +518,7 @@ def create_animation_from_code(manim_code, output_dir="media/videos", max_render
                 if render_attempt < max_render_attempts - 1:
                     print("Attempting to fix rendering errors with LLM...")
                     # Send to LLM for fixing rendering issues
-                    current_code = llm_client.fix_manim_code(current_code, trial_error)
+                    current_code = repair_manim_code(current_code, trial_error, "trial_render", render_attempt + 1)
                     render_attempt += 1
                 else:
                     print(f"Failed to fix rendering errors after {max_render_attempts} attempts.")
@@ -345,69 +531,8 @@ def create_animation_from_code(manim_code, output_dir="media/videos", max_render
     
     # If we reach here, trial render was successful
     # Proceed with final rendering using validated and render-tested code
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-        temp_file.write(current_code)
-        temp_file_path = temp_file.name
-    
-    try:
-        # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Run final Manim rendering
-        cmd = [
-            'manim', 
-            temp_file_path,
-            scene_class_name,
-            '-qm',  # medium quality for final render
-            '--disable_caching',
-            f'--media_dir={output_dir}' 
-        ]
-        
-        print(f"Running final render: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        
-        if result.returncode == 0:
-            # Find the generated video
-            video_path = find_generated_video(output_dir, scene_class_name, os.path.basename(temp_file_path).replace('.py',''))
-            if video_path:
-                print(f"Animation created successfully: {video_path}")
-                return video_path
-            else:
-                print(f"Final rendering succeeded but the video file was not found in {output_dir} for scene {scene_class_name}.")
-                print(f"Manim stdout: {result.stdout}")
-                print(f"Manim stderr: {result.stderr}")
-                return None        
-        else:
-            print(f"Final rendering failed unexpectedly after successful trial render.")
-            print(f"Return Code: {result.returncode}")
-            print(f"Stdout: {result.stdout}")
-            print(f"Stderr: {result.stderr}")
-            
-            # Log the code that failed final rendering
-            print("\n" + "="*60)
-            print("🚨 FINAL MANIM RENDERING FAILED AFTER SUCCESSFUL TRIAL")
-            print("="*60)
-            print("Code that failed final rendering:")
-            print("─" * 40)
-            lines = current_code.split('\n')
-            for i, line in enumerate(lines, 1):
-                print(f"{i:3}: {line}")
-            print("─" * 40)
-            print("="*60)
-            return None
-            
-    except Exception as e:
-        print(f"An unexpected error occurred during final animation creation: {e}")
-        print("Code at time of exception:")
-        print(current_code)
-        return None
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except OSError as e:
-                print(f"Error deleting temporary file {temp_file_path}: {e}")
+    video_path, _ = final_render_manim(current_code, scene_class_name, output_dir)
+    return video_path
 
 def extract_scene_class_name(manim_code):
     """
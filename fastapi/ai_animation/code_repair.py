@@ -0,0 +1,350 @@
+import re
+import ast
+import logging
+import textwrap
+
+logger = logging.getLogger(__name__)
+
+# Bracket pairs tracked by the line scanner
+OPENERS = {"(": ")", "[": "]", "{": "}"}
+CLOSERS = {")": "(", "]": "[", "}": "{"}
+
+# Upper bound on targeted fixes at reported syntax-error locations
+MAX_TARGETED_FIXES = 10
+
+# Patterns are compiled once and applied in a single pass over the lines
+_STRING_OR_COMMENT_RE = re.compile(r'"(?:\\.|[^"\\])*"?|\'(?:\\.|[^\'\\])*\'?|#.*')
+_ORPHAN_KEYWORD_RE = re.compile(r'^\s*(?:font_size|color)\s*=')
+_CONTINUATION_RE = re.compile(r'^\s*\.(?:shift|scale|rotate|set_color|move_to|next_to|to_edge|to_corner|arrange)\(')
+_STRING_COMMA_METHOD_RE = re.compile(r'"\s*,\s*\.(shift|scale|rotate|set_color)\(')
+_CALL_COMMA_METHOD_RE = re.compile(r'\)\s*,\s*\.(shift|scale|rotate|set_color)\(')
+_DOUBLE_COMMA_RE = re.compile(r',(?:\s*,)+')
+_NEVER_CLOSED_RE = re.compile(r"'([(\[{])' was never closed")
+_MISMATCHED_CLOSER_RE = re.compile(r"closing parenthesis '([)\]}])' does not match opening parenthesis '([(\[{])'")
+_IMAGE_EXTENSIONS_RE = re.compile(r'\.(?:png|jpe?g|gif|ico)\b', re.IGNORECASE)
+_IMAGE_IMPORT_RE = re.compile(r'\b(?:PIL|Image|cv2|opencv)\b')
+_INVALID_SCENE_METHOD_RE = re.compile(r'self\.(?:set_color_scheme|set_theme|configure_camera)\b')
+
+# Offsets used to spread Text objects that have no explicit position
+TEXT_POSITIONS = ['UP*1', 'DOWN*1', 'LEFT*2', 'RIGHT*2', 'UP*2', 'DOWN*2']
+
+
+def _indent(line):
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _scan_brackets(line, stack):
+    """Update the open-bracket stack with one line, ignoring strings and comments."""
+    code = _STRING_OR_COMMENT_RE.sub("", line)
+    for char in code:
+        if char in OPENERS:
+            stack.append(char)
+        elif char in CLOSERS and stack and stack[-1] == CLOSERS[char]:
+            stack.pop()
+    return stack
+
+
+def _is_code(line):
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith("#")
+
+
+def _next_code_line(lines, start):
+    for index in range(start, len(lines)):
+        if _is_code(lines[index]):
+            return lines[index]
+    return None
+
+
+def _starts_new_statement(line, indent):
+    """True if `line` begins a new statement rather than continuing an open call."""
+    if line is None:
+        return True
+    stripped = line.lstrip()
+    if len(_indent(line)) > len(indent) or not (stripped[0].isalpha() or stripped[0] == "_"):
+        return False
+    return _unmatched_closers(line) == 0
+
+
+def _unmatched_closers(line):
+    code = _STRING_OR_COMMENT_RE.sub("", line)
+    depth = unmatched = 0
+    for char in code:
+        if char in OPENERS:
+            depth += 1
+        elif char in CLOSERS:
+            if depth:
+                depth -= 1
+            else:
+                unmatched += 1
+    return unmatched
+
+
+def _balance(line):
+    code = _STRING_OR_COMMENT_RE.sub("", line)
+    return sum(code.count(c) for c in OPENERS) - sum(code.count(c) for c in CLOSERS)
+
+
+def _parse_error(code):
+    try:
+        ast.parse(code)
+        return None
+    except SyntaxError as e:
+        return e
+
+
+def _line_pass(code, fixes):
+    """Apply every pattern fix in one pass over the lines, tracking bracket depth."""
+    lines = code.split("\n")
+    fixed_lines = []
+    stack = []
+
+    for index, line in enumerate(lines):
+        if not _is_code(line):
+            fixed_lines.append(line)
+            continue
+
+        if not stack:
+            if _CONTINUATION_RE.match(line) and any(_is_code(l) for l in fixed_lines):
+                # A method chain split onto its own line: join it to the statement it belongs to
+                target = max(i for i, l in enumerate(fixed_lines) if _is_code(l))
+                fixed_lines[target] = fixed_lines[target].rstrip() + line.strip()
+                fixes.append(f"line {index + 1}: joined dangling method call")
+                _scan_brackets(line, stack)
+                continue
+            if _ORPHAN_KEYWORD_RE.match(line):
+                fixes.append(f"line {index + 1}: removed orphaned keyword argument")
+                continue
+
+        statement_start = not stack
+        fixed = _STRING_COMMA_METHOD_RE.sub(r'").\1(', line)
+        fixed = _CALL_COMMA_METHOD_RE.sub(r').\1(', fixed)
+        fixed = _DOUBLE_COMMA_RE.sub(',', fixed)
+        if fixed != line:
+            fixes.append(f"line {index + 1}: fixed comma before method call")
+
+        _scan_brackets(fixed, stack)
+        if stack and statement_start and _starts_new_statement(_next_code_line(lines, index + 1), _indent(line)):
+            # The statement opened brackets that the next statement clearly does not continue
+            closers = "".join(OPENERS[opener] for opener in reversed(stack))
+            fixed = fixed.rstrip() + closers
+            fixes.append(f"line {index + 1}: added missing '{closers}'")
+            stack.clear()
+
+        fixed_lines.append(fixed)
+
+    return "\n".join(fixed_lines)
+
+
+def _fix_at_error(lines, error, fixes):
+    """
+    Apply one targeted fix at the location of a syntax error.
+
+    Returns:
+        bool: True if the lines were changed
+    """
+    if not error.lineno:
+        return False
+    index = min(error.lineno, len(lines)) - 1
+    line = lines[index]
+    message = error.msg.lower()
+
+    if "expected an indented block" in message:
+        at_end = error.lineno > len(lines)
+        header = next((i for i in range(index if at_end else index - 1, -1, -1)
+                       if _is_code(lines[i]) and lines[i].rstrip().endswith(":")), None)
+        if header is None:
+            return False
+        header_indent = _indent(lines[header])
+        stripped = line.lstrip()
+        if (at_end or not _is_code(line) or len(_indent(line)) < len(header_indent)
+                or stripped.startswith(("def ", "class ", "@"))):
+            # The block lost its only statements (e.g. removed lines)
+            lines.insert(header + 1, header_indent + "    pass")
+            fixes.append(f"line {header + 1}: added 'pass' to empty block")
+        else:
+            # The block's body lost its indentation
+            lines[index] = header_indent + "    " + stripped
+            fixes.append(f"line {index + 1}: indented block body")
+        return True
+
+    if "unexpected indent" in message or "unindent does not match" in message:
+        previous = next((lines[i] for i in range(index - 1, -1, -1) if _is_code(lines[i])), "")
+        indent = _indent(previous)
+        if previous.rstrip().endswith(":"):
+            indent += "    "
+        lines[index] = indent + line.lstrip()
+        fixes.append(f"line {index + 1}: re-indented")
+        return lines[index] != line
+
+    match = _NEVER_CLOSED_RE.search(error.msg)
+    if match:
+        stack = _scan_brackets(line, [])
+        closers = "".join(OPENERS[opener] for opener in reversed(stack)) or OPENERS[match.group(1)]
+        lines[index] = line.rstrip() + closers
+        fixes.append(f"line {index + 1}: added missing '{closers}'")
+        return True
+
+    match = _MISMATCHED_CLOSER_RE.search(error.msg)
+    offset = (error.offset or 0) - 1
+    if match and 0 <= offset < len(line) and line[offset] == match.group(1):
+        lines[index] = line[:offset] + OPENERS[match.group(2)] + line[offset + 1:]
+        fixes.append(f"line {index + 1}: fixed mismatched bracket")
+        return True
+
+    if "unmatched" in message and 0 <= offset < len(line) and line[offset] in CLOSERS:
+        lines[index] = line[:offset] + line[offset + 1:]
+        fixes.append(f"line {index + 1}: removed unmatched '{line[offset]}'")
+        return True
+
+    if "unterminated string" in message and 0 <= offset < len(line) and line[offset] in "\"'":
+        body = line.rstrip()
+        tail = len(body) - len(body.rstrip("),"))
+        lines[index] = body[:len(body) - tail] + line[offset] + body[len(body) - tail:]
+        fixes.append(f"line {index + 1}: closed unterminated string")
+        return True
+
+    if ",." in line:
+        lines[index] = line.replace(",.", ".")
+        fixes.append(f"line {index + 1}: fixed comma-dot pattern")
+        return True
+
+    stack = _scan_brackets(line, [])
+    if stack:
+        lines[index] = line.rstrip() + "".join(OPENERS[opener] for opener in reversed(stack))
+        fixes.append(f"line {index + 1}: closed open brackets")
+        return True
+
+    return False
+
+
+def fix_syntax_error(code, syntax_error, fixes=None):
+    """
+    Apply targeted fixes starting at a reported syntax error until the code parses.
+
+    Args:
+        code (str): Code with a syntax error
+        syntax_error (SyntaxError): Error raised when parsing the code
+        fixes (list, optional): Receives a description of each applied fix
+
+    Returns:
+        str: Fixed code, or the code prefixed with an error comment if it still does not parse
+    """
+    fixes = fixes if fixes is not None else []
+    lines = code.split("\n")
+    error = syntax_error
+
+    for _ in range(MAX_TARGETED_FIXES):
+        if not _fix_at_error(lines, error, fixes):
+            break
+        error = _parse_error("\n".join(lines))
+        if error is None:
+            return "\n".join(lines)
+
+    logger.warning(f"Could not repair syntax error at line {error.lineno}: {error.msg}")
+    return "# SYNTAX ERROR DETECTED: {}\n# LINE {}: {}\n\n".format(
+        syntax_error.msg, syntax_error.lineno, (syntax_error.text or "").strip()
+    ) + code
+
+
+def repair_syntax(code, fixes=None):
+    """
+    Repair common LLM syntax mistakes in Python code.
+
+    Code that already parses is returned untouched after a single ast.parse.
+    Otherwise all pattern fixes run in one pass over the lines, then targeted
+    fixes are applied at each remaining error location.
+
+    Args:
+        code (str): Generated code
+        fixes (list, optional): Receives a description of each applied fix
+
+    Returns:
+        str: Repaired code
+    """
+    if not code or _parse_error(code) is None:
+        return code
+
+    fixes = fixes if fixes is not None else []
+    code = _line_pass(code, fixes)
+    error = _parse_error(code)
+    if error is not None:
+        code = fix_syntax_error(code, error, fixes)
+
+    if fixes:
+        logger.info(f"Applied {len(fixes)} syntax fix(es)")
+    return code
+
+
+def _manim_line_fixes(code):
+    """Rewrite lines that use unsupported Manim features (images, invented scene methods)."""
+    fixed_lines = []
+    text_positions_used = set()
+
+    for line in code.split("\n"):
+        indent = _indent(line)
+        stripped = line.strip()
+
+        if 'self.set_background' in line:
+            fixed_lines.append(f"{indent}# REMOVED: {stripped} (set_background method doesn't exist in Manim)")
+            fixed_lines.append(f"{indent}# Background color is set with self.camera.background_color")
+            continue
+
+        if 'ImageMobject' in line or 'Image.open' in line:
+            fixed_lines.append(f"{indent}# REMOVED: {stripped} (ImageMobject not supported)")
+            if '=' in line and 'ImageMobject' in line:
+                var_name = line.split('=')[0].strip()
+                fixed_lines.append(f"{indent}{var_name} = Text('Visual representation of concept', font_size=24).shift(DOWN*1)")
+            continue
+
+        if _IMAGE_EXTENSIONS_RE.search(line):
+            fixed_lines.append(f"{indent}# REMOVED: {stripped} (Image file reference not supported)")
+            continue
+
+        if _INVALID_SCENE_METHOD_RE.search(line):
+            fixed_lines.append(f"{indent}# REMOVED: {stripped} (Invalid Manim method)")
+            continue
+
+        if stripped.startswith(('import ', 'from ')) and _IMAGE_IMPORT_RE.search(line) and stripped != 'from manim import *':
+            fixed_lines.append(f"{indent}# REMOVED: {stripped} (Image library import not needed)")
+            continue
+
+        # Position Text objects created without shift/move_to, but only on complete statements
+        if ('Text(' in line and '=' in line and 'shift(' not in line and 'move_to(' not in line
+                and _balance(line) == 0 and not stripped.endswith(',')):
+            lowered = line.lower()
+            if 'subtitle' in lowered:
+                line = line.rstrip() + '.shift(UP*1.5)'
+            elif 'title' in lowered:
+                line = line.rstrip() + '.shift(UP*3)'
+            else:
+                for position in TEXT_POSITIONS:
+                    if position not in text_positions_used:
+                        line = line.rstrip() + f'.shift({position})'
+                        text_positions_used.add(position)
+                        break
+
+        fixed_lines.append(line)
+
+    return "\n".join(fixed_lines)
+
+
+def repair_manim_code(code, fixes=None):
+    """
+    Repair generated Manim code: drop unsupported features, then fix syntax.
+
+    Shared by the Manim code generators in place of their per-class regex cascades.
+
+    Args:
+        code (str): Generated Manim code
+        fixes (list, optional): Receives a description of each applied syntax fix
+
+    Returns:
+        str: Repaired Manim code
+    """
+    code = _manim_line_fixes(textwrap.dedent(code))
+    code = repair_syntax(code, fixes)
+
+    if 'from manim import *' not in code:
+        code = 'from manim import *\n\n' + code
+    return code
@@ -0,0 +1,140 @@
+import ast
+import builtins
+import logging
+from dataclasses import dataclass, asdict
+
+logger = logging.getLogger(__name__)
+
+# LaTeX-backed mobjects; rendering them needs a LaTeX toolchain the servers do not have
+# (DecimalNumber, Integer and Variable draw their digits with SingleStringMathTex)
+LATEX_MOBJECTS = {
+    "MathTex", "Tex", "SingleStringMathTex", "MathTable", "Matrix", "IntegerMatrix",
+    "DecimalMatrix", "MobjectMatrix", "BulletedList", "Title", "TexTemplate",
+    "DecimalNumber", "Integer", "Variable",
+}
+
+try:
+    import manim
+    MANIM_NAMES = set(dir(manim))
+except ImportError:
+    # Unknown-name checks are skipped when manim is not importable
+    MANIM_NAMES = None
+
+
+@dataclass
+class ValidationIssue:
+    """A problem found in generated Manim code, located by line and column"""
+    line: int
+    column: int
+    message: str
+    kind: str = "syntax"
+    severity: str = "error"
+
+    def __str__(self):
+        return f"line {self.line}, column {self.column}: {self.message} [{self.kind}]"
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _defined_names(tree):
+    """Every name bound anywhere in the module (over-approximates scoping on purpose)."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif isinstance(node, ast.MatchAs) and node.name:
+            names.add(node.name)
+    return names
+
+
+def _check_scene(tree):
+    issues = []
+    scene_classes = [
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef)
+        and any(isinstance(base, (ast.Name, ast.Attribute)) and "Scene" in ast.unparse(base) for base in node.bases)
+    ]
+    if not scene_classes:
+        issues.append(ValidationIssue(1, 0, "No Scene subclass found", kind="manim"))
+        return issues
+
+    for scene in scene_classes:
+        has_construct = any(
+            isinstance(item, ast.FunctionDef) and item.name == "construct" for item in scene.body
+        )
+        if not has_construct:
+            issues.append(ValidationIssue(
+                scene.lineno, scene.col_offset, f"Scene class '{scene.name}' has no construct() method", kind="manim"
+            ))
+    return issues
+
+
+def _check_names(tree):
+    issues = []
+    star_modules = {
+        node.module for node in tree.body
+        if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+    }
+    star_imports_manim = "manim" in star_modules
+    defined = _defined_names(tree) | set(dir(builtins))
+    if star_imports_manim and MANIM_NAMES is not None:
+        defined |= MANIM_NAMES
+    # Without every star import resolved we cannot tell what is defined
+    names_unresolved = bool(star_modules - {"manim"}) or (star_imports_manim and MANIM_NAMES is None)
+
+    reported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in LATEX_MOBJECTS:
+            issues.append(ValidationIssue(
+                node.lineno, node.col_offset, f"{node.func.id} requires LaTeX; use Text instead", kind="latex"
+            ))
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if node.id in defined or node.id in reported or names_unresolved:
+                continue
+            reported.add(node.id)
+            issues.append(ValidationIssue(
+                node.lineno, node.col_offset, f"Unknown name '{node.id}' (not defined in the code or exported by manim)",
+                kind="manim"
+            ))
+    return issues
+
+
+def validate_manim_code(manim_code):
+    """
+    Validate Manim code in memory: compile it, then run Manim-specific static checks.
+
+    Args:
+        manim_code (str): Manim Python code
+
+    Returns:
+        list: ValidationIssue objects; empty when the code is valid
+    """
+    try:
+        tree = ast.parse(manim_code, filename="<manim_code>")
+        # compile() also catches errors ast.parse lets through, e.g. 'return' outside a function
+        compile(tree, "<manim_code>", "exec")
+    except SyntaxError as e:
+        return [ValidationIssue(e.lineno or 1, (e.offset or 1) - 1, e.msg)]
+    except ValueError as e:
+        # Null bytes and similar source-level problems
+        return [ValidationIssue(1, 0, str(e))]
+
+    issues = _check_scene(tree) + _check_names(tree)
+    return sorted(issues, key=lambda issue: (issue.line, issue.column))
+
+
+def format_issues(issues):
+    """Render issues as the error message handed to the LLM fixer."""
+    return "\n".join(str(issue) for issue in issues)
@@ -0,0 +1,110 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from langchain.chains.conversation.memory import ConversationBufferWindowMemory
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Rough characters-per-token ratio for Gemini; good enough to compare prompt sizes without an API call
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate the token count of `text` locally."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+class ConversationSessions:
+    """
+    Conversation memory per client session.
+
+    Requests without a session ID get a fresh memory, so their prompts never
+    carry another user's history. Requests with a session ID share a windowed
+    memory that is evicted after `ttl_seconds` of inactivity or when more than
+    `max_sessions` sessions are held (least recently used first).
+    """
+
+    def __init__(self, name, window, max_sessions=256, ttl_seconds=3600):
+        self.name = name
+        self.window = window
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "session_requests": 0, "prompt_tokens": 0, "history_tokens": 0, "evictions": 0}
+
+    def _new_memory(self):
+        return ConversationBufferWindowMemory(k=self.window, memory_key="chat_history", return_messages=True)
+
+    def memory_for(self, session_id=None):
+        """Return the memory for `session_id`, or a fresh one for stateless requests."""
+        if not session_id:
+            return self._new_memory()
+
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._sessions.pop(session_id, None)
+            memory = entry[0] if entry else self._new_memory()
+            self._sessions[session_id] = (memory, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._stats["evictions"] += 1
+            return memory
+
+    def _evict_expired(self, now):
+        """Drop sessions idle longer than the TTL (lock must be held)."""
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self._stats["evictions"] += 1
+
+    def log_prompt(self, memory, human_input, session_id=None):
+        """Log the estimated input tokens of a call: the new prompt plus the history it carries."""
+        history = memory.load_memory_variables({}).get("chat_history", [])
+        history_tokens = sum(estimate_tokens(str(message.content)) for message in history)
+        prompt_tokens = estimate_tokens(human_input)
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["session_requests"] += bool(session_id)
+            self._stats["prompt_tokens"] += prompt_tokens
+            self._stats["history_tokens"] += history_tokens
+
+        scope = f"session {session_id}" if session_id else "stateless"
+        logger.info(
+            f"{self.name} input ≈ {prompt_tokens + history_tokens} tokens "
+            f"(prompt {prompt_tokens} + history {history_tokens} from {len(history)} message(s), {scope})"
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "window": self.window,
+            }
+
+
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS") or 256)
+CONVERSATION_SESSION_TTL_SECONDS = float(os.getenv("CONVERSATION_SESSION_TTL_SECONDS") or 3600)
+
+
+def create_sessions(name, window):
+    """Build a ConversationSessions configured from the environment."""
+    return ConversationSessions(
+        name,
+        window,
+        max_sessions=CONVERSATION_MAX_SESSIONS,
+        ttl_seconds=CONVERSATION_SESSION_TTL_SECONDS,
+    )
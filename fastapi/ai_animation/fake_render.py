@@ -0,0 +1,100 @@
+import os
+import time
+import random
+import logging
+import threading
+from dotenv import load_dotenv
+from core.execution import render_slot
+from core.chat_backends import LatencyModel
+
+logger = logging.getLogger(__name__)
+
+load_dotenv('.env')
+
+# Simulated final-quality render time for MANIM_RENDER_BACKEND=fake (a LatencyModel spec, seconds)
+MANIM_FAKE_RENDER_LATENCY = os.getenv("MANIM_FAKE_RENDER_LATENCY") or "lognormal:20,0.4"
+
+# Share of the final-quality render time taken at each quality, and by a dry run
+QUALITY_SPEED = {'-ql': 0.25, '-qm': 1.0, '-qh': 2.5, '-qp': 4.0, '-qk': 8.0}
+DRY_RUN_SPEED = 0.1
+
+# Output subdirectory Manim uses for each quality flag
+QUALITY_DIRS = {'-ql': '480p15', '-qm': '720p30', '-qh': '1080p60', '-qp': '1440p60', '-qk': '2160p60'}
+
+
+class FakeRenderer:
+    """
+    Stand-in for the Manim renderer, for load tests without Manim's CPU cost.
+
+    A render holds a render slot for a sampled duration, fails the way Manim
+    would if the code does not compile or lacks the scene class, and writes a
+    placeholder video where the manim CLI would have put the real one, so the
+    render cache and /media URLs behave as in production.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.renders = 0
+        self.failures = 0
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    def render(self, file_path, scene_class_name, quality, media_dir, dry_run=False):
+        """
+        Simulate `manim <file> <scene> <quality> --media_dir=<dir>`.
+
+        Returns:
+            tuple: (success_status, error_message, video_path)
+        """
+        with open(file_path, "r") as f:
+            manim_code = f.read()
+
+        with self._lock:
+            seconds = self.latency.sample(self._rng) * (DRY_RUN_SPEED if dry_run else QUALITY_SPEED.get(quality, 1.0))
+
+        with render_slot():
+            error = self._check(manim_code, file_path, scene_class_name)
+            if error is None:
+                time.sleep(seconds)
+
+        with self._lock:
+            self.renders += 1
+            self.failures += error is not None
+        if error is not None:
+            return False, error, None
+        if dry_run:
+            return True, None, None
+
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        video_dir = os.path.join(media_dir, "videos", stem, QUALITY_DIRS.get(quality, "720p30"))
+        os.makedirs(video_dir, exist_ok=True)
+        video_path = os.path.join(video_dir, f"{scene_class_name}.mp4")
+        with open(video_path, "wb") as f:
+            f.write(f"fake render of {scene_class_name} ({seconds:.2f}s)\n".encode("utf-8"))
+        return True, None, video_path
+
+    @staticmethod
+    def _check(manim_code, file_path, scene_class_name):
+        try:
+            compile(manim_code, file_path, "exec")
+        except SyntaxError as e:
+            return f"Return Code: 1\nStdout: \nStderr: SyntaxError: {e}"
+        if f"class {scene_class_name}(" not in manim_code:
+            return f"Return Code: 1\nStdout: \nStderr: {scene_class_name} is not in the script"
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {"renders": self.renders, "failures": self.failures, "latency": str(self.latency)}
+
+
+def _create_fake_renderer() -> FakeRenderer:
+    try:
+        latency = LatencyModel.parse(MANIM_FAKE_RENDER_LATENCY)
+    except ValueError as e:
+        logger.warning(f"Invalid MANIM_FAKE_RENDER_LATENCY, using the default: {str(e)}")
+        latency = LatencyModel("lognormal", (20.0, 0.4))
+    return FakeRenderer(latency)
+
+
+fake_renderer = _create_fake_renderer()
@@ -0,0 +1,238 @@
+import os
+import time
+import uuid
+import shutil
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .script_generator import script_generator
+from .main_code_generator import manim_generator
+from .animation_creator import create_animation_from_code
+from core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Progress and human-readable description for each pipeline stage
+JOB_STAGES = {
+    "queued": (0, "Waiting for an available render worker..."),
+    "starting": (5, "Initializing animation generation..."),
+    "analysis": (20, "Analyzing prompt and creating educational breakdown..."),
+    "code_generation": (50, "Generating Manim animation code..."),
+    "rendering": (80, "Rendering video animation..."),
+    "complete": (100, "Animation generated successfully!"),
+    "error": (-1, "An error occurred during processing"),
+}
+
+FINISHED_STATUSES = ("complete", "error")
+
+
+class JobQueueFullError(Exception):
+    """Raised when the animation job queue cannot accept more work."""
+
+
+def video_url_from_path(video_path, media_dir="media"):
+    """
+    Convert a rendered video path into a URL served from the /media mount.
+
+    Args:
+        video_path (str): Path to the rendered video file
+        media_dir (str): Directory mounted at /media
+
+    Returns:
+        str: URL of the video relative to the API root
+    """
+    media_dir = Path(media_dir)
+    # Render-cache hits come back relative to the working directory
+    video_path_obj = Path(video_path).absolute()
+
+    try:
+        relative_path = video_path_obj.relative_to(media_dir.absolute())
+        return f"/media/{relative_path}"
+    except ValueError:
+        # If video is not in media directory, copy it there
+        filename = video_path_obj.name
+        new_path = media_dir / "videos" / filename
+        new_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(video_path, new_path)
+        return f"/media/videos/{filename}"
+
+
+class AnimationJobManager:
+    """
+    Runs the script -> code -> render pipeline on a bounded pool of worker
+    threads and keeps track of each job's stage, progress and result.
+    """
+
+    def __init__(self, max_workers=2, max_pending=20, retention_seconds=3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="animation-job"
+        )
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, prompt: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a new animation job.
+
+        Args:
+            prompt (str): User's animation prompt
+            session_id (str): Optional client session whose conversation history the LLM stages carry over
+
+        Returns:
+            dict: Snapshot of the newly created job
+
+        Raises:
+            JobQueueFullError: If too many jobs are already queued or running
+        """
+        with self._lock:
+            self._prune_finished_jobs()
+
+            active = sum(1 for job in self._jobs.values() if job["status"] not in FINISHED_STATUSES)
+            if active >= self.max_pending:
+                raise JobQueueFullError(
+                    f"Animation queue is full ({active} jobs pending). Please retry later."
+                )
+
+            job_id = uuid.uuid4().hex[:12]
+            progress, description = JOB_STAGES["queued"]
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "stage": "queued",
+                "progress": progress,
+                "stage_description": description,
+                "prompt": prompt,
+                "session_id": session_id,
+                "video_url": None,
+                "analysis": None,
+                "code": None,
+                "error": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+            }
+            # The job's spans belong to the request that submitted it
+            self._futures[job_id] = self._executor.submit(contextvars.copy_context().run, self._run, job_id)
+            logger.info(f"Queued animation job {job_id} ({active + 1} active)")
+            return dict(self._jobs[job_id])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Wait without blocking the event loop until the job has finished."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue statistics for health and status endpoints."""
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queued": statuses.count("queued"),
+            "in_progress": statuses.count("in_progress"),
+            "complete": statuses.count("complete"),
+            "error": statuses.count("error"),
+        }
+
+    def _prune_finished_jobs(self):
+        """Forget finished jobs older than the retention window (lock must be held)."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in FINISHED_STATUSES and (job["finished_at"] or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _set_stage(self, job_id: str, stage: str, **fields):
+        progress, description = JOB_STAGES[stage]
+        status = stage if stage in FINISHED_STATUSES else "in_progress"
+        self._update(
+            job_id,
+            status=status,
+            stage=stage,
+            progress=progress,
+            stage_description=description,
+            **fields
+        )
+
+    def _fail(self, job_id: str, error: str, job_span=None):
+        logger.error(f"Animation job {job_id} failed: {error}")
+        if job_span is not None:
+            job_span.record_error(error)
+        self._set_stage(job_id, "error", error=error, finished_at=time.time())
+
+    def _run(self, job_id: str):
+        """Execute the full animation pipeline for a queued job."""
+        job = self.get(job_id)
+        prompt, session_id = job["prompt"], job["session_id"]
+        self._set_stage(job_id, "starting", started_at=time.time())
+
+        with span("animation.job", **{"job.id": job_id, "job.queued_seconds": round(time.time() - job["created_at"], 3)}) as job_span:
+            try:
+                if script_generator is None:
+                    return self._fail(job_id, "Script generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY.", job_span)
+                if manim_generator is None:
+                    return self._fail(job_id, "Manim generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY.", job_span)
+
+                # Step 1: Educational breakdown
+                self._set_stage(job_id, "analysis")
+                with span("animation.analysis"):
+                    video_plan = script_generator.generate_complete_video_plan(prompt, session_id)
+                if not video_plan:
+                    return self._fail(job_id, "Failed to generate educational breakdown", job_span)
+                self._update(job_id, analysis=video_plan.get("educational_breakdown"))
+
+                # Step 2: Code generation
+                self._set_stage(job_id, "code_generation")
+                with span("animation.code_generation"):
+                    manim_code = manim_generator.generate_3b1b_manim_code(video_plan, session_id)
+                if not manim_code:
+                    return self._fail(job_id, "Failed to generate Manim code", job_span)
+                self._update(job_id, code=manim_code)
+
+                # Step 3: Video rendering
+                self._set_stage(job_id, "rendering")
+                with span("animation.rendering"):
+                    video_path = create_animation_from_code(manim_code)
+                if not video_path:
+                    return self._fail(job_id, "Failed to render video", job_span)
+
+                video_url = video_url_from_path(video_path)
+                self._set_stage(job_id, "complete", video_url=video_url, finished_at=time.time())
+                logger.info(f"Animation job {job_id} complete: {video_url}")
+
+            except Exception as e:
+                self._fail(job_id, str(e), job_span)
+
+
+job_manager = AnimationJobManager(
+    max_workers=int(os.getenv("ANIMATION_JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("ANIMATION_JOB_MAX_PENDING", "20")),
+    retention_seconds=int(os.getenv("ANIMATION_JOB_RETENTION_SECONDS", "3600")),
+)
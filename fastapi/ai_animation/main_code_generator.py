@@ -3,12 +3,16 @@ import re
 import json
 import logging
 from dotenv import load_dotenv
-import textwrap  
 from langchain.chains import ConversationChain
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, MessagesPlaceholder
 from langchain_core.messages import SystemMessage
-from langchain.chains.conversation.memory import ConversationBufferWindowMemory
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.context_cache import context_cache, with_cached_content
+from core.llm_clients import get_chat_model
+from .code_repair import repair_manim_code, repair_syntax, fix_syntax_error
+from .conversation import create_sessions
+from .manim_examples import EXAMPLES_GALLERY_HEADER, INSPIRATION_GUIDANCE, format_example
+from .manim_instructions import MANIM_SYSTEM_INSTRUCTION, MANIM_GENERATION_RULES, MANIM_OUTPUT_TEMPLATE, MANIM_CACHED_INSTRUCTION
+from .prompt_budget import PromptAssembler, example_index, plan_query, MANIM_PROMPT_TOKEN_BUDGET, MANIM_PROMPT_MAX_EXAMPLES
 
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -16,32 +20,24 @@ logging.getLogger('comtypes').setLevel(logging.WARNING)
 
 load_dotenv('.env')
 
+# Length limit for a step's narration and visual plan when the prompt has to be compacted
+COMPACT_STEP_FIELD_CHARS = 300
+
 class ManIMCodeGenerator:
+    MODEL_NAME = "gemini-2.0-flash"
+
     def __init__(self, google_api_key):
         self.google_api_key = google_api_key
-        self.memory = ConversationBufferWindowMemory(k=3, memory_key="chat_history", return_messages=True)
-        self.google_chat = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=self.google_api_key,
-            temperature=0.7,
-            max_tokens=None,
-            timeout=None,
-            max_retries=2
-        )
-        
-        # Enhanced Manim code generation prompt
-        self.manim_prompt = self._create_manim_generation_prompt()
-        
-        # Manim conversation chain
-        self.manim_conversation = ConversationChain(
-            llm=self.google_chat,
-            prompt=self.manim_prompt,
-            verbose=True,
-            memory=self.memory,
-            input_key="human_input",
-        )
+        # Code generation history is per request unless the client supplies a session ID
+        self.sessions = create_sessions("Manim code generation", window=3)
+        self.google_chat = get_chat_model("manim_code", self.google_api_key, self.MODEL_NAME, temperature=0.7)
 
-    def generate_3b1b_manim_code(self, video_plan):
+
+    def conversation_stats(self):
+        """Return session counts and estimated input tokens for code generation."""
+        return self.sessions.stats()
+
+    def generate_3b1b_manim_code(self, video_plan, session_id=None):
         """
         Generate comprehensive, dynamic Manim code following 3Blue1Brown style.
         
@@ -53,6 +49,7 @@ class ManIMCodeGenerator:
         
         Args:
             video_plan (dict): Complete video plan from script generator
+            session_id (str): Optional client session whose code generation history is carried over
             
         Returns:
             str: Complete Manim Python code ready for execution
@@ -75,11 +72,18 @@ class ManIMCodeGenerator:
             # Display video plan details in terminal
             self._display_video_plan(video_plan)
             
-            # Build comprehensive prompt for Manim code generation
-            manim_prompt = self._build_advanced_manim_prompt(video_plan)
+            memory = self.sessions.memory_for(session_id)
             
-            print("🔄 Processing with AI...")
-            response = self.manim_conversation.predict(human_input=manim_prompt)
+            # The static instructions are sent by cached content handle when context caching is on
+            instruction = context_cache.instruction("manim_generation", self.MODEL_NAME, MANIM_CACHED_INSTRUCTION)
+            try:
+                response = self._predict_manim_code(video_plan, memory, session_id, instruction)
+            except Exception as e:
+                if instruction.handle is None:
+                    raise
+                print("⚠️ Cached instruction call failed, retrying with inline instructions: {}".format(e))
+                context_cache.invalidate(instruction)
+                response = self._predict_manim_code(video_plan, memory, session_id, None)
             
             # Extract and validate Manim code
             manim_code = self._extract_manim_code(response)
@@ -104,12 +108,52 @@ class ManIMCodeGenerator:
             print("❌ Error in Manim code generation: {}".format(e))
             raise
 
-    def _build_advanced_manim_prompt(self, video_plan):
+    def _predict_manim_code(self, video_plan, memory, session_id, instruction):
+        """
+        Run the code generation conversation for one request.
+        
+        Args:
+            video_plan (dict): Complete video plan from script generator
+            memory (ConversationBufferWindowMemory): Conversation memory for this request
+            session_id (str): Optional client session, for the prompt size log
+            instruction (CachedInstruction): Cached static instructions, or None to send them inline
+            
+        Returns:
+            str: Raw model response
+        """
+        instructions_cached = instruction is not None and instruction.handle is not None
+        
+        # Build comprehensive prompt for Manim code generation
+        manim_prompt = self._build_advanced_manim_prompt(video_plan, instructions_cached)
+        self.sessions.log_prompt(memory, manim_prompt, session_id)
+        
+        if instructions_cached:
+            llm = with_cached_content(self.google_chat, instruction)
+            prompt = self._create_manim_generation_prompt(instruction.inline_text)
+        else:
+            llm = self.google_chat
+            prompt = self._create_manim_generation_prompt(MANIM_SYSTEM_INSTRUCTION)
+        
+        # Manim conversation chain
+        manim_conversation = ConversationChain(
+            llm=llm,
+            prompt=prompt,
+            verbose=True,
+            memory=memory,
+            input_key="human_input",
+        )
+        
+        print("🔄 Processing with AI...")
+        return manim_conversation.predict(human_input=manim_prompt)
+
+    def _build_advanced_manim_prompt(self, video_plan, instructions_cached=False):
         """
         Build a comprehensive prompt for advanced Manim code generation.
         
         Args:
             video_plan (dict): Complete video plan with educational breakdown
+            instructions_cached (bool): Leave out the static requirements and output
+                template because the model already holds them as cached content
             
         Returns:
             str: Detailed prompt for Manim code generation
@@ -121,766 +165,40 @@ class ManIMCodeGenerator:
         steps = educational_breakdown.get("educational_steps", [])
         duration = educational_breakdown.get("metadata", {}).get("estimated_total_duration", 180)
         
-        prompt_parts = ["""
+        plan_summary = """
 ADVANCED MANIM CODE GENERATION REQUEST
 
 VIDEO PLAN TO IMPLEMENT:
 Title: {title}
 Duration: {duration} seconds
-Educational Steps: {steps_count}""".format(title=title, duration=duration, steps_count=len(steps)) + """
-
-REQUIREMENTS FOR MANIM CODE:
-🎯 EDUCATIONAL FLOW:
-- Convert each educational step into a distinct scene method
-- Maintain pedagogical progression from the video plan
-- Use dynamic positioning and smooth transitions
-- Create engaging visual storytelling
-
-🎨 ANIMATION STYLE (3Blue1Brown Inspired):
-- Rich visual elements with proper spacing
-- Dynamic camera movements when appropriate
-- Smooth object transformations and reveals
-- Color-coded elements for better understanding
-- Mathematical notation rendered clearly
-- No overlapping text or crowded scenes
-
-🏗️ CODE STRUCTURE REQUIREMENTS:
-- Main scene class inheriting from Scene
-- Separate methods for each educational step
-- construct() method orchestrating the flow
-- Proper imports and dependencies
-- Clean, well-documented code
-- Modular design for easy modification
-
-🎬 ANIMATION TECHNIQUES:
-- Use Write(), FadeIn(), Transform(), Create() appropriately
-- Implement proper timing with self.wait()
-- Position elements using UP, DOWN, LEFT, RIGHT vectors
-- Scale and rotate objects for visual interest
-- Use color schemes that enhance understanding
-- Clear scene transitions between steps
-
-📊 VISUAL ELEMENTS TO INCLUDE:
-- Title animations with engaging reveals
-- No 16:9 aspect ratio images or ImageMobject
-- No 16:9 aspect ration text or TextMobject
-- Step-by-step concept introductions
-- Mathematical equations and formulas
-- Diagrams and geometric shapes (using built-in Manim objects)
-- Text labels and annotations
-- Real-world example descriptions (text-based, NO ImageMobject)
-- Summary and key takeaway displays
-
-⚠️ CRITICAL CONSTRAINTS:
-- DO NOT use ImageMobject or any image file references
-- Use only text, shapes, and built-in Manim objects
-- Create visual diagrams using Circle, Rectangle, Line, etc.
-- Represent real-world examples with text descriptions and geometric visualizations
-- Focus on mathematical notation, graphs, and animated text elements
-
-⚡ DYNAMIC FEATURES & SCENE MANAGEMENT:
-- Objects that move and transform with smooth transitions
-- Reveal animations for key concepts (Write, FadeIn, Transform)
-- Highlighting and emphasis effects (Indicate, Flash, Wiggle)
-- Clear scene transitions - remove old content before adding new
-- Use self.clear() or FadeOut() to clean scenes between steps
-- Dynamic positioning - move objects to different locations
-- Interactive-style demonstrations with step-by-step reveals
-- Progressive complexity building with animated transformations
-- Avoid static layouts - everything should move and change
-- No overlapping text - use proper spacing and timing
-- Create visual flow with object movements and morphing
-
-🎯 MANDATORY POSITIONING RULES:
-- NEVER place text in the same position (0,0) or ORIGIN
-- Use UP, DOWN, LEFT, RIGHT with multipliers (2*UP, 3*LEFT, etc.)
-- Position titles at 3*UP, subtitles at 2*UP, content at ORIGIN to DOWN
-- Move previous content OFF-SCREEN before adding new content
-- Use .shift(LEFT*4) or .shift(RIGHT*4) to move objects sideways
-- Scale objects (.scale(0.8)) to fit more content without overlap
-- Always animate movements: self.play(obj.animate.shift(UP*2))
-
-📺 16:9 ASPECT RATIO OPTIMIZATION:
-- Standard Manim resolution is 1920x1080 (16:9)
-- Horizontal safe zone: X positions from -7 to +7 units
-- Vertical safe zone: Y positions from -4 to +4 units
-- NEVER position text beyond X=±6 or Y=±3.5 to prevent cutoff
-- Use .scale() to fit longer text instead of extending beyond screen bounds
-- Position titles between Y=2.5 to Y=3.5 for optimal visibility
-- Place main content between Y=-0.5 to Y=2 for best readability
-- Use LEFT=-5, RIGHT=5 for wide layouts, LEFT=-3, RIGHT=3 for compact layouts
-- Test positioning: title.shift(UP*3) should never go beyond screen top
-- For wide equations, use font_size reduction instead of horizontal overflow
-
-🚫 TEXT OVERLAP PREVENTION SYSTEM:
-- MANDATORY: Track used positions and avoid conflicts
-- Create position grid system: UP*3, UP*2, UP*1, ORIGIN, DOWN*1, DOWN*2, DOWN*3
-- Horizontal slots: LEFT*4, LEFT*2, ORIGIN, RIGHT*2, RIGHT*4  
-- NEVER place two Text objects at same coordinates simultaneously
-- Use .next_to() for automatic positioning relative to other objects
-- Implement z-layering with .set_z_index() when objects must overlap
-- Clear screen completely between major sections: self.play(FadeOut(*self.mobjects))
-- Move existing objects before adding new ones: old_text.animate.shift(UP*1)
-- Use VGroup() to manage multiple related text elements as single unit
-- Stagger positioning: first text at UP*2, second at ORIGIN, third at DOWN*2
-
-🎭 DYNAMIC VISUAL EXPLANATION REQUIREMENTS:
-- EVERY concept must have animated visual representation
-- Transform abstract ideas into moving geometric shapes
-- Use morphing animations: circle.animate.transform(square)
-- Implement step-by-step reveals with Write(), FadeIn(), Create()
-- Show mathematical relationships through connecting arrows and lines
-- Use color changes to highlight transformations: obj.animate.set_color(YELLOW)
-- Create animated comparisons: split screen with before/after animations
-- Build complexity progressively: start simple, add details with each step
-- Use Indicate(), Flash(), Wiggle() to emphasize key moments
-- Implement object journeys: move elements across screen to show relationships
-- Create visual metaphors using basic shapes and their transformations
-- Use growth animations: GrowFromCenter(), DrawBorderThenFill()
-- Show cause-and-effect through animated sequences
-- Implement visual proofs through animated geometric demonstrations
-
-🎬 REQUIRED ANIMATION PATTERNS:
-- Start each section by clearing: self.play(FadeOut(*self.mobjects))
-- Introduce titles with Write() animation
-- Move titles up: self.play(title.animate.shift(UP*2))
-- Add content below with different Y positions
-- Use Transform() to change content, not create new overlapping text
-- End sections with content moving off-screen or fading out
-
-🎬 ADVANCED DYNAMIC ANIMATION REQUIREMENTS:
-- NO STATIC SCENES: Everything must move, transform, or animate
-- Use continuous motion: objects entering, moving, transforming, exiting
-- Implement smooth transitions between all visual elements
-- Create visual flow: guide viewer's eye with moving objects
-- Use multiple simultaneous animations: self.play(obj1.animate.shift(), obj2.animate.scale())
-- Implement entrance animations: objects slide in from edges of screen
-- Use exit animations: objects fade out or slide away before new content
-- Create animated connections: lines/arrows that draw between related concepts
-- Implement progressive disclosure: reveal information piece by piece
-- Use animated highlighting: temporary color changes, scaling, rotation
-- Create visual rhythms: alternating fast and slow animations for pacing
-- Build anticipation: use small movements before major reveals
-- Implement visual callbacks: return to previous elements with animations
-
-💥 VISUAL EXPLANATION DYNAMICS:
-- Transform equations step-by-step with intermediate states visible
-- Use animated graphs that draw themselves progressively
-- Create moving diagrams that demonstrate concepts in action
-- Implement split-screen comparisons with synchronized animations
-- Use object multiplication: show one object becoming many
-- Create animated timelines: show progression of ideas over time
-- Use perspective shifts: rotate 2D diagrams to show 3D relationships
-- Implement animated analogies: transform familiar objects into mathematical concepts
-- Create visual stories: sequences of scenes that build understanding
-- Use animated emphasis: zoom, highlight, circle key elements temporarily
-- Implement interactive-style reveals: as if responding to questions
-- Create animated proofs: visual demonstrations that prove mathematical statements
-
-🎨 VISUAL VARIETY REQUIREMENTS:
-- Use different font sizes: font_size=48 for titles, 36 for subtitles, 24 for content
-- Use colors: BLUE for titles, WHITE for content, YELLOW for emphasis
-- Create diagrams with Circle(), Rectangle(), Line() objects
-- Position diagrams LEFT and text RIGHT, or vice versa
-- Use arrows (Arrow()) to connect related concepts
-- Create mathematical plots with axes when relevant
-
-🎨 ENHANCED VISUAL LAYOUT SYSTEM:
-- Implement 3-column layout: LEFT (-4 to -2), ORIGIN (-1 to 1), RIGHT (2 to 4)
-- Use 5-row system: TOP (Y=3), UPPER (Y=1.5), MIDDLE (Y=0), LOWER (Y=-1.5), BOTTOM (Y=-3)
-- Create visual zones: Title zone (Y=2.5 to 3.5), Content zone (Y=-2 to 2), Footer zone (Y=-3 to -2)
-- Use asymmetric layouts: 60% content area, 40% visual area for better balance
-- Implement dynamic layouts that change during animation
-- Create visual breathing room: minimum 0.5 unit spacing between text elements
-- Use strategic white space: don't fill every pixel, leave empty areas for visual rest
-- Scale elements responsively: larger diagrams get .scale(0.8), smaller text gets font_size=20
-- Create visual hierarchy through size, color, and position combinations
-- Use consistent margin system: 0.5 units from screen edges for all content
-
-🎯 POSITIONING COORDINATION SYSTEM:
-- Before placing any object, check what's already on screen
-- Use incremental positioning: if UP*2 is taken, use UP*2.5 or UP*1.5
-- Implement content zones: never place title text in diagram zone
-- Create movement corridors: paths for objects to enter/exit without collision
-- Use depth layering: background elements, main content, highlighting overlays
-- Implement position memory: track where each object has been placed
-- Use relative positioning: new_obj.next_to(existing_obj, direction=RIGHT, buff=0.5)
-- Create position validation: ensure no object extends beyond screen boundaries
-- Use smart scaling: automatically reduce font_size if text doesn't fit in allocated space
-- Implement collision detection: check for overlap before finalizing positions
-
-⚠️ CRITICAL MANIM POSITIONING CONSTANTS AND LAYOUT SYSTEM:
-- ORIGIN: Center point [0, 0, 0] - primary reference for all positioning
-- CARDINAL DIRECTIONS: UP, DOWN, LEFT, RIGHT (never use CENTER, MIDDLE, TOP, BOTTOM)
-- DIAGONAL CONSTANTS: UL, UR, DL, DR for corner positioning
-- STANDARD MULTIPLIERS: Use increments of 0.5 (UP*1.5, LEFT*2.5, etc.)
-- SAFE POSITIONING ZONES:
-  * TITLE_ZONE: Y=2.5 to Y=3.5, X=-5 to X=5 (main headings)
-  * SUBTITLE_ZONE: Y=1.5 to Y=2.4, X=-5 to X=5 (section headers)
-  * CONTENT_ZONE: Y=-1.5 to Y=1.4, X=-6 to X=6 (main content)
-  * FOOTER_ZONE: Y=-2.5 to Y=-1.6, X=-5 to X=5 (summaries, notes)
-  * MARGIN_BUFFER: 0.3 units minimum from zone boundaries
-- LAYOUT TEMPLATES:
-  * SINGLE_COLUMN: Content centered, X=-1 to X=1
-  * TWO_COLUMN: Left X=-4 to X=-1, Right X=1 to X=4
-  * THREE_COLUMN: Left X=-5 to X=-2, Center X=-1.5 to X=1.5, Right X=2 to X=5
-  * DIAGRAM_TEXT: Diagram LEFT (X=-4 to X=-1), Text RIGHT (X=1 to X=4)
-- MATHEMATICAL POSITIONING:
-  * EQUATION_CENTER: Y=0, X=0 for main equations
-  * EQUATION_TOP: Y=2, X=0 for title equations
-  * VARIABLE_ZONES: Distribute variables at Y=1, Y=0, Y=-1 with X spacing
-  * AXIS_PLACEMENT: Standard coordinate systems at ORIGIN with appropriate scaling
-- ANIMATION ANCHORS:
-  * ENTRY_POINTS: Objects start at screen edges (X=±8, Y=±5) before animating in
-  * EXIT_POINTS: Objects move to screen edges before FadeOut
-  * TRANSITION_HUBS: Temporary positions during complex movements
-- RESPONSIVE POSITIONING:
-  * AUTO_SCALE: If object width > 10 units, scale to fit: obj.scale(10/obj.get_width())
-  * OVERFLOW_HANDLING: Split long text into multiple lines rather than extend bounds
-  * DYNAMIC_SPACING: Adjust spacing based on number of objects in scene
-- POSITIONING VALIDATION:
-  * PRE_PLACEMENT_CHECK: Verify coordinates within safe zones before animation
-  * COLLISION_DETECTION: Check for overlap with existing objects
-  * BOUNDS_VERIFICATION: Ensure all objects remain within 16:9 aspect ratio limits
-
-⚠️ NEVER USE THESE (they don't exist in Manim):
-- CENTER (use ORIGIN instead)
-- MIDDLE (use ORIGIN instead)
-- TOP (use UP*3 instead)
-- BOTTOM (use DOWN*3 instead)
-
-📚 PROFESSIONAL MANIM EXAMPLES GALLERY:
-Study these high-quality examples for code patterns and techniques:
-
-Example 1: BraceAnnotation - Annotating geometric elements
-```python
-from manim import *
-
-class BraceAnnotation(Scene):
-    def construct(self):
-        dot = Dot([-2, -1, 0])
-        dot2 = Dot([2, 1, 0])
-        line = Line(dot.get_center(), dot2.get_center()).set_color(ORANGE)
-        b1 = Brace(line)
-        b1text = b1.get_text("Horizontal distance")
-        b2 = Brace(line, direction=line.copy().rotate(PI / 2).get_unit_vector())
-        b2text = b2.get_tex("x-x_1")
-        self.add(line, dot, dot2, b1, b2, b1text, b2text)
-```
-
-Example 2: VectorArrow - Coordinate system visualization
-```python
-from manim import *
-
-class VectorArrow(Scene):
-    def construct(self):
-        dot = Dot(ORIGIN)
-        arrow = Arrow(ORIGIN, [2, 2, 0], buff=0)
-        numberplane = NumberPlane()
-        origin_text = Text('(0, 0)').next_to(dot, DOWN)
-        tip_text = Text('(2, 2)').next_to(arrow.get_end(), RIGHT)
-        self.add(numberplane, dot, arrow, origin_text, tip_text)
-```
-
-Example 3: BooleanOperations - Interactive shape operations
-```python
-from manim import *
-
-class BooleanOperations(Scene):
-    def construct(self):
-        ellipse1 = Ellipse(
-            width=4.0, height=5.0, fill_opacity=0.5, color=BLUE, stroke_width=10
-        ).move_to(LEFT)
-        ellipse2 = ellipse1.copy().set_color(color=RED).move_to(RIGHT)
-        bool_ops_text = MarkupText("<u>Boolean Operation</u>").next_to(ellipse1, UP * 3)
-        ellipse_group = Group(bool_ops_text, ellipse1, ellipse2).move_to(LEFT * 3)
-        self.play(FadeIn(ellipse_group))
-
-        i = Intersection(ellipse1, ellipse2, color=GREEN, fill_opacity=0.5)
-        self.play(i.animate.scale(0.25).move_to(RIGHT * 5 + UP * 2.5))
-        intersection_text = Text("Intersection", font_size=23).next_to(i, UP)
-        self.play(FadeIn(intersection_text))
-
-        u = Union(ellipse1, ellipse2, color=ORANGE, fill_opacity=0.5)
-        union_text = Text("Union", font_size=23)
-        self.play(u.animate.scale(0.3).next_to(i, DOWN, buff=union_text.height * 3))
-        union_text.next_to(u, UP)
-        self.play(FadeIn(union_text))
-```
-
-Example 4: PointMovingOnShapes - Path animations and transformations
-```python
-from manim import *
-
-class PointMovingOnShapes(Scene):
-    def construct(self):
-        circle = Circle(radius=1, color=BLUE)
-        dot = Dot()
-        dot2 = dot.copy().shift(RIGHT)
-        self.add(dot)
-
-        line = Line([3, 0, 0], [5, 0, 0])
-        self.add(line)
-
-        self.play(GrowFromCenter(circle))
-        self.play(Transform(dot, dot2))
-        self.play(MoveAlongPath(dot, circle), run_time=2, rate_func=linear)
-        self.play(Rotating(dot, about_point=[2, 0, 0]), run_time=1.5)
-        self.wait()
-```
-
-Example 5: MovingAround - Object transformations with animate
-```python
-from manim import *
-
-class MovingAround(Scene):
-    def construct(self):
-        square = Square(color=BLUE, fill_opacity=1)
-
-        self.play(square.animate.shift(LEFT))
-        self.play(square.animate.set_fill(ORANGE))
-        self.play(square.animate.scale(0.3))
-        self.play(square.animate.rotate(0.4))
-```
-
-Example 6: MovingAngle - Dynamic angle measurement with updaters
-```python
-from manim import *
-
-class MovingAngle(Scene):
-    def construct(self):
-        rotation_center = LEFT
-
-        theta_tracker = ValueTracker(110)
-        line1 = Line(LEFT, RIGHT)
-        line_moving = Line(LEFT, RIGHT)
-        line_ref = line_moving.copy()
-        line_moving.rotate(
-            theta_tracker.get_value() * DEGREES, about_point=rotation_center
-        )
-        a = Angle(line1, line_moving, radius=0.5, other_angle=False)
-        tex = MathTex(r"\theta").move_to(
-            Angle(
-                line1, line_moving, radius=0.5 + 3 * SMALL_BUFF, other_angle=False
-            ).point_from_proportion(0.5)
-        )
-
-        self.add(line1, line_moving, a, tex)
-        self.wait()
-
-        line_moving.add_updater(
-            lambda x: x.become(line_ref.copy()).rotate(
-                theta_tracker.get_value() * DEGREES, about_point=rotation_center
-            )
-        )
-
-        a.add_updater(
-            lambda x: x.become(Angle(line1, line_moving, radius=0.5, other_angle=False))
-        )
-        tex.add_updater(
-            lambda x: x.move_to(
-                Angle(
-                    line1, line_moving, radius=0.5 + 3 * SMALL_BUFF, other_angle=False
-                ).point_from_proportion(0.5)
-            )
-        )
-
-        self.play(theta_tracker.animate.set_value(40))
-        self.play(theta_tracker.animate.increment_value(140))
-        self.play(tex.animate.set_color(RED), run_time=0.5)
-        self.play(theta_tracker.animate.set_value(350))
-```
-
-Example 7: MovingDots - Connected objects with updaters
-```python
-from manim import *
-
-class MovingDots(Scene):
-    def construct(self):
-        d1,d2=Dot(color=BLUE),Dot(color=GREEN)
-        dg=VGroup(d1,d2).arrange(RIGHT,buff=1)
-        l1=Line(d1.get_center(),d2.get_center()).set_color(RED)
-        x=ValueTracker(0)
-        y=ValueTracker(0)
-        d1.add_updater(lambda z: z.set_x(x.get_value()))
-        d2.add_updater(lambda z: z.set_y(y.get_value()))
-        l1.add_updater(lambda z: z.become(Line(d1.get_center(),d2.get_center())))
-        self.add(d1,d2,l1)
-        self.play(x.animate.set_value(5))
-        self.play(y.animate.set_value(4))
-        self.wait()
-```
-
-Example 8: MovingFrameBox - Highlighting mathematical expressions
-```python
-from manim import *
-
-class MovingFrameBox(Scene):
-    def construct(self):
-        self.play(Write(text))
-        framebox1 = SurroundingRectangle(text[1], buff = .1)
-        framebox2 = SurroundingRectangle(text[3], buff = .1)
-        self.play(Create(framebox1))
-        self.wait()
-        self.play(ReplacementTransform(framebox1,framebox2))
-        self.wait()
-```
-
-Example 9: SinAndCosFunctionPlot - Mathematical function plotting
-```python
-from manim import *
-
-class SinAndCosFunctionPlot(Scene):
-    def construct(self):
-        axes = Axes(
-            x_range=[-10, 10.3, 1],
-            y_range=[-1.5, 1.5, 1],
-            x_length=10,
-            axis_config={"color": GREEN},
-            x_axis_config={
-                "numbers_to_include": np.arange(-10, 10.01, 2),
-                "numbers_with_elongated_ticks": np.arange(-10, 10.01, 2),
-            },
-            tips=False,
-        )
-        axes_labels = axes.get_axis_labels()
-        sin_graph = axes.plot(lambda x: np.sin(x), color=BLUE)
-        cos_graph = axes.plot(lambda x: np.cos(x), color=RED)
-
-        sin_label = axes.get_graph_label(
-            sin_graph, "\\sin(x)", x_val=-10, direction=UP / 2
-        )
-        cos_label = axes.get_graph_label(cos_graph, label="\\cos(x)")
-
-        vert_line = axes.get_vertical_line(
-            axes.i2gp(TAU, cos_graph), color=YELLOW, line_func=Line
-        )
-        line_label = axes.get_graph_label(
-            cos_graph, r"x=2\pi", x_val=TAU, direction=UR, color=WHITE
-        )
-
-        plot = VGroup(axes, sin_graph, cos_graph, vert_line)
-        labels = VGroup(axes_labels, sin_label, cos_label, line_label)
-        self.add(plot, labels)
-```
-
-Example 10: ArgMinExample - Interactive optimization visualization
-```python
-from manim import *
-
-class ArgMinExample(Scene):
-    def construct(self):
-        ax = Axes(
-            x_range=[0, 10], y_range=[0, 100, 10], axis_config={"include_tip": False}
-        )
-        labels = ax.get_axis_labels(x_label="x", y_label="f(x)")
-
-        t = ValueTracker(0)
-
-        def func(x):
-            return 2 * (x - 5) ** 2
-        graph = ax.plot(func, color=MAROON)
-
-        initial_point = [ax.coords_to_point(t.get_value(), func(t.get_value()))]
-        dot = Dot(point=initial_point)
-
-        dot.add_updater(lambda x: x.move_to(ax.c2p(t.get_value(), func(t.get_value()))))
-        x_space = np.linspace(*ax.x_range[:2],200)
-        minimum_index = func(x_space).argmin()
-
-        self.add(ax, labels, graph, dot)
-        self.play(t.animate.set_value(x_space[minimum_index]))
-        self.wait()
-```
-
-Example 11: GraphAreaPlot - Area under curves and Riemann rectangles
-```python
-from manim import *
-
-class GraphAreaPlot(Scene):
-    def construct(self):
-        ax = Axes(
-            x_range=[0, 5],
-            y_range=[0, 6],
-            x_axis_config={"numbers_to_include": [2, 3]},
-            tips=False,
-        )
-
-        labels = ax.get_axis_labels()
-
-        curve_1 = ax.plot(lambda x: 4 * x - x ** 2, x_range=[0, 4], color=BLUE_C)
-        curve_2 = ax.plot(
-            lambda x: 0.8 * x ** 2 - 3 * x + 4,
-            x_range=[0, 4],
-            color=GREEN_B,
-        )
-
-        line_1 = ax.get_vertical_line(ax.input_to_graph_point(2, curve_1), color=YELLOW)
-        line_2 = ax.get_vertical_line(ax.i2gp(3, curve_1), color=YELLOW)
-
-        riemann_area = ax.get_riemann_rectangles(curve_1, x_range=[0.3, 0.6], dx=0.03, color=BLUE, fill_opacity=0.5)
-        area = ax.get_area(curve_2, [2, 3], bounded_graph=curve_1, color=GREY, opacity=0.5)
-
-        self.add(ax, labels, curve_1, curve_2, line_1, line_2, riemann_area, area)
-```
-
-Example 12: PolygonOnAxes - Dynamic polygon areas with value tracking
-```python
-from manim import *
-
-class PolygonOnAxes(Scene):
-    def get_rectangle_corners(self, bottom_left, top_right):
-        return [
-            (top_right[0], top_right[1]),
-            (bottom_left[0], top_right[1]),
-            (bottom_left[0], bottom_left[1]),
-            (top_right[0], bottom_left[1]),
-        ]
-
-    def construct(self):
-        ax = Axes(
-            x_range=[0, 10],
-            y_range=[0, 10],
-            x_length=6,
-            y_length=6,
-            axis_config={"include_tip": False},
-        )
-
-        t = ValueTracker(5)
-        k = 25
-
-        graph = ax.plot(
-            lambda x: k / x,
-            color=YELLOW_D,
-            x_range=[k / 10, 10.0, 0.01],
-            use_smoothing=False,
-        )
-
-        def get_rectangle():
-            polygon = Polygon(
-                *[
-                    ax.c2p(*i)
-                    for i in self.get_rectangle_corners(
-                        (0, 0), (t.get_value(), k / t.get_value())
-                    )
-                ]
-            )
-            polygon.stroke_width = 1
-            polygon.set_fill(BLUE, opacity=0.5)
-            polygon.set_stroke(YELLOW_B)
-            return polygon
-
-        polygon = always_redraw(get_rectangle)
-
-        dot = Dot()
-        dot.add_updater(lambda x: x.move_to(ax.c2p(t.get_value(), k / t.get_value())))
-        dot.set_z_index(10)
-
-        self.add(ax, graph, dot)
-        self.play(Create(polygon))
-        self.play(t.animate.set_value(10))
-        self.play(t.animate.set_value(k / 10))
-        self.play(t.animate.set_value(5))
-```
-
-Example 13: HeatDiagramPlot - Scientific data visualization
-```python
-from manim import *
-
-class HeatDiagramPlot(Scene):
-    def construct(self):
-        ax = Axes(
-            x_range=[0, 40, 5],
-            y_range=[-8, 32, 5],
-            x_length=9,
-            y_length=6,
-            x_axis_config={"numbers_to_include": np.arange(0, 40, 5)},
-            y_axis_config={"numbers_to_include": np.arange(-5, 34, 5)},
-            tips=False,
-        )
-        labels = ax.get_axis_labels(
-            x_label=Tex(r"$\Delta Q$"), y_label=Tex(r"T[$^\circ C$]")
+Educational Steps: {steps_count}""".format(title=title, duration=duration, steps_count=len(steps))
+        
+        # Add detailed information about each educational step; the compact
+        # form shortens the long free-text fields when the prompt is over budget
+        steps_text = "\n\nEDUCATIONAL STEPS TO IMPLEMENT:" + "".join(
+            self._format_prompt_step(i, step) for i, step in enumerate(steps, 1)
         )
-
-        x_vals = [0, 8, 38, 39]
-        y_vals = [20, 0, 0, -5]
-        graph = ax.plot_line_graph(x_values=x_vals, y_values=y_vals)
-
-        self.add(ax, labels, graph)
-```
-
-Example 14: FollowingGraphCamera - Advanced camera movements
-```python
-from manim import *
-
-class FollowingGraphCamera(MovingCameraScene):
-    def construct(self):
-        self.camera.frame.save_state()
-
-        # create the axes and the curve
-        ax = Axes(x_range=[-1, 10], y_range=[-1, 10])
-        graph = ax.plot(lambda x: np.sin(x), color=BLUE, x_range=[0, 3 * PI])
-
-        # create dots based on the graph
-        moving_dot = Dot(ax.i2gp(graph.t_min, graph), color=ORANGE)
-        dot_1 = Dot(ax.i2gp(graph.t_min, graph))
-        dot_2 = Dot(ax.i2gp(graph.t_max, graph))
-
-        self.add(ax, graph, dot_1, dot_2, moving_dot)
-        self.play(self.camera.frame.animate.scale(0.5).move_to(moving_dot))
-
-        def update_curve(mob):
-            mob.move_to(moving_dot.get_center())
-
-        self.camera.frame.add_updater(update_curve)
-        self.play(MoveAlongPath(moving_dot, graph, rate_func=linear))
-        self.camera.frame.remove_updater(update_curve)
-
-        self.play(Restore(self.camera.frame))
-```
-
-Example 15: ThreeDSurfacePlot - 3D mathematical surfaces
-```python
-from manim import *
-
-class ThreeDSurfacePlot(ThreeDScene):
-    def construct(self):
-        resolution_fa = 24
-        self.set_camera_orientation(phi=75 * DEGREES, theta=-30 * DEGREES)
-
-        def param_gauss(u, v):
-            x = u
-            y = v
-            sigma, mu = 0.4, [0.0, 0.0]
-            d = np.linalg.norm(np.array([x - mu[0], y - mu[1]]))
-            z = np.exp(-(d ** 2 / (2.0 * sigma ** 2)))
-            return np.array([x, y, z])
-
-        gauss_plane = Surface(
-            param_gauss,
-            resolution=(resolution_fa, resolution_fa),
-            v_range=[-2, +2],
-            u_range=[-2, +2]
+        compact_steps_text = "\n\nEDUCATIONAL STEPS TO IMPLEMENT:" + "".join(
+            self._format_prompt_step(i, step, max_chars=COMPACT_STEP_FIELD_CHARS) for i, step in enumerate(steps, 1)
         )
 
-        gauss_plane.scale(2, about_point=ORIGIN)
-        gauss_plane.set_style(fill_opacity=1,stroke_color=GREEN)
-        gauss_plane.set_fill_by_checkerboard(ORANGE, BLUE, opacity=0.5)
-        axes = ThreeDAxes()
-        self.add(axes,gauss_plane)
-```
-
-🎓 REAL MANIM ANIMATION INSPIRATION GUIDANCE:
-
-Study these examples to understand how REAL Manim animations are constructed:
-
-🔥 PROFESSIONAL ANIMATION PATTERNS:
-1. **Unit Circle to Sine Wave Connection (Example 16)**: Shows how mathematical concepts are visually connected through animated relationships. The moving dot creates the sine curve in real-time, demonstrating the fundamental connection between circular motion and trigonometric functions.
-
-2. **LaTeX Integration and Grid Transformations (Example 17)**: Demonstrates sophisticated text handling with LaTeX, smooth transitions between concepts, and advanced grid manipulations. Shows how to create engaging mathematical content with proper staging.
-
-3. **3D Scene Management (Example 18)**: Illustrates how to handle 3D scenes with camera controls, rotation effects, and depth perception. Essential for advanced mathematical visualizations.
-
-🎯 KEY PROFESSIONAL TECHNIQUES TO EMULATE:
-
-**Dynamic Curve Generation**: Like SineCurveUnitCircle, create curves that build over time using updaters and always_redraw(). This technique is perfect for showing how mathematical relationships develop.
-
-**Multi-Stage Scene Flow**: Like OpeningManim, structure animations in distinct phases with clear transitions. Use Transform() to evolve concepts and FadeOut() to clear space for new ideas.
-
-**Custom Updater Functions**: Implement sophisticated updater patterns that respond to changing values. Use lambda functions and class methods to create responsive animations.
-
-**Mathematical Storytelling**: Connect abstract concepts to visual representations. Show the "why" and "how" behind mathematical relationships through animated demonstrations.
-
-**Progressive Complexity Building**: Start with simple elements and gradually add complexity. Transform basic shapes into complex mathematical objects through smooth animations.
-
-**Real-Time Curve Drawing**: Use VGroup() and line additions to create curves that draw themselves. Perfect for showing function behavior and mathematical relationships.
-
-**Advanced Positioning Systems**: Use custom coordinate systems and relative positioning. Create your own reference points and build layouts around them.
-
-**Smooth Transition Management**: Master the art of clearing scenes and introducing new content without jarring jumps. Use fadeouts, transformations, and staged reveals.
-
-🎨 VISUAL STORYTELLING PRINCIPLES FROM EXAMPLES:
-
-**Cause and Effect Demonstration**: Show how one mathematical element affects another through connected animations. The unit circle example perfectly demonstrates this.
-
-**Progressive Disclosure**: Reveal mathematical complexity gradually. Don't overwhelm with too much information at once.
-
-**Visual Metaphor Integration**: Use familiar geometric shapes to represent abstract concepts, then transform them to show mathematical relationships.
-
-**Interactive-Style Responsiveness**: Create animations that feel like they're responding to an instructor's explanation. Use pauses, emphasis, and callbacks effectively.
-
-**Mathematical Proof Through Animation**: Use visual demonstrations to prove mathematical statements. Show rather than just tell.
-
-🎓 KEY PATTERNS FROM ALL EXAMPLES:
-- Use ValueTracker() for dynamic values that change over time
-- Implement .add_updater() for objects that need to update automatically  
-- Use always_redraw() for objects that need constant redrawing
-- Combine VGroup() to manage multiple related objects
-- Apply .animate for smooth transformations
-- Use proper positioning with .next_to(), .move_to(), .shift()
-- Create custom functions for complex mathematical visualizations
-- Use axes.plot() for mathematical functions and axes.get_area() for regions
-- Implement SurroundingRectangle() for highlighting elements
-- Use Text() for ALL text elements including mathematical expressions
-- Convert formulas to readable text (e.g., "x^2 + y^2 = r^2")
-- NO LaTeX, MathTex, or Tex objects allowed
-- Apply proper color schemes and opacity for visual clarity
-- Use .set_z_index() to control layering of objects
-- Master custom updater functions for real-time curve generation
-- Use multi-stage scene management with clear transitions
-- Implement progressive complexity building through transformations
-- Create mathematical storytelling through connected visual elements
-- Use 3D scene management for advanced visualizations
-- Apply non-linear transformations to demonstrate mathematical concepts
-- Implement real-time drawing techniques for dynamic mathematical relationships
-- Use LaTeX integration for professional mathematical notation
-- Create custom coordinate systems and positioning frameworks
-- Master smooth transition management between complex scenes
-
-💡 INSPIRATION FOR YOUR ANIMATIONS:
-Draw inspiration from these professional examples to create animations that:
-- Build mathematical intuition through visual connections
-- Use sophisticated animation techniques like real-time curve generation
-- Create smooth, professional transitions between concepts
-- Integrate multiple mathematical elements into cohesive visual stories
-- Use advanced positioning and layout systems for optimal presentation
-- Implement progressive complexity that guides understanding
-- Create memorable visual metaphors that reinforce learning
-- Use interactive-style pacing that feels responsive and engaging
-
-EDUCATIONAL STEPS TO IMPLEMENT:"""]
-        
-        # Add detailed information about each educational step
-        for i, step in enumerate(steps, 1):
-            step_title = step.get('step_title', 'Step {}'.format(i))
-            prompt_parts.append("""
-
-Step {step_num}: {step_title}
-- Duration: {duration} seconds
-- Key Concepts: {key_concepts}
-- Narration: {narration}
-- Visual Plan: {visual_plan}
-- Visual Elements: {visual_elements}
-- Equations: {equations}
-- Real-world Examples: {examples}""".format(
-                step_num=i,
-                step_title=step_title,
-                duration=step.get('duration_seconds', 30),
-                key_concepts=', '.join(step.get('key_concepts', [])),
-                narration=step.get('narration_script', ''),
-                visual_plan=step.get('animation_plan', ''),
-                visual_elements=step.get('visual_elements', {}),
-                equations=step.get('equations', []),
-                examples=step.get('real_world_examples', [])
-            ))
-
         # Create class name safely outside f-string
         class_name = title.replace(' ', '').replace(':', '').replace('(', '').replace(')', '').replace('-', '').replace("'", "").replace('"', '')
         if not class_name:
             class_name = "Educational"
         
         complexity = educational_breakdown.get('metadata', {}).get('difficulty_progression', 'intermediate')
-        prompt_parts.append("""
+        if instructions_cached:
+            # The requirements and the output template are part of the cached instruction
+            rules = plan_summary
+            requirements = """
+
+TOTAL DURATION: {duration} seconds
+TARGET COMPLEXITY: {complexity}
+SCENE CLASS: {class_name}Scene (follow the OUTPUT FORMAT from your instructions)""".format(duration=duration, complexity=complexity, class_name=class_name)
+        else:
+            rules = plan_summary + MANIM_GENERATION_RULES
+            requirements = """
 
 TOTAL DURATION: {duration} seconds
 TARGET COMPLEXITY: {complexity}
@@ -892,1012 +210,65 @@ Provide complete, executable Manim Python code following this structure:
 from manim import *
 
 class {class_name}Scene(Scene):
-    def construct(self):""".format(duration=duration, complexity=complexity, class_name=class_name) + """
-        # Main orchestration method - CLEAR between each step
-        self.intro_sequence()
-        self.clear_and_transition()
-        self.step_1_introduction()
-        self.clear_and_transition()
-        self.step_2_core_concepts()
-        self.clear_and_transition()
-        # ... more steps as needed
-        self.conclusion_summary()
-    
-    def clear_and_transition(self):
-        # Clean transition between sections
-        self.play(FadeOut(*self.mobjects))
-        self.wait(0.5)
-    
-    def intro_sequence(self):
-        # Engaging introduction with DYNAMIC positioning
-        title = Text("{{title}}", font_size=48, color=BLUE).shift(UP*3)
-        subtitle = Text("Educational Animation", font_size=32, color=WHITE).shift(UP*1.5)
-        
-        self.play(Write(title))
-        self.wait(0.5)
-        self.play(Write(subtitle))
-        self.wait(1)
-        
-        # Move content and add more
-        self.play(
-            title.animate.shift(LEFT*3).scale(0.7),
-            subtitle.animate.shift(RIGHT*3).scale(0.8)
-        )
-        
-        intro_text = Text("Let's explore this concept step by step", 
-                          font_size=24, color=YELLOW).shift(DOWN*1)
-        self.play(FadeIn(intro_text))
-        self.wait(2)
-        
-    def step_1_introduction(self):
-        # First educational step - NEW positions, no overlap
-        step_title = Text("Step 1: Foundation", font_size=40, color=BLUE).shift(UP*2.5)
-        self.play(Write(step_title))
-        
-        # Create diagram on LEFT, text on RIGHT
-        diagram = Circle(radius=1, color=WHITE).shift(LEFT*3)
-        explanation = Text("Key concept explanation\\nwith multiple lines", 
-                          font_size=20, color=WHITE).shift(RIGHT*2)
-        
-        self.play(Create(diagram), Write(explanation))
-        self.wait(1)
-        
-        # Transform and move
-        new_shape = Square(side_length=2, color=YELLOW).shift(LEFT*3)
-        self.play(Transform(diagram, new_shape))
-        
-        # Add connecting arrow
-        arrow = Arrow(LEFT*1, RIGHT*0.5, color=GREEN)
-        self.play(Create(arrow))
-        self.wait(2)
-        
-    # CONTINUE with similar patterns for each step...
-```
-
-CRITICAL REQUIREMENTS:
-Please do not use 'CYAN': NameError: name 'CYAN' is not defined
-1. Generate COMPLETE, EXECUTABLE code
-2. Include ALL necessary imports
-3. Follow proper Manim syntax and conventions
-4. Create visually appealing, educational animations
-5. Ensure smooth flow between all steps
-6. Use dynamic positioning - avoid static layouts
-7. Include proper documentation and comments
-8. Make the code modular and easy to understand
-9. Optimize for visual clarity and educational impact
-10. Follow the educational step progression exactly
-11. Must Contain all necessary imports and class definitions
-12. def construct() method must orchestrate the entire scene flow
-13. ⚠️ NEVER use ImageMobject or image file references ⚠️
-14. Use only built-in Manim objects (Text, MathTex, shapes, etc.)
-15. Create visual representations using geometric shapes and text
-16. Represent real-world examples with descriptive text and shape-based diagrams
-17. ANIMATE EVERYTHING - no static content allowed
-18. Use self.clear() or FadeOut(*self.mobjects) between major sections
-19. Move objects around the screen dynamically with .animate.shift()
-20. Transform objects instead of creating new ones in same position
-21. Use proper spacing - NEVER overlap text at same coordinates
-22. Implement smooth transitions between concepts
-23. Create engaging visual flow with object movements
-24. ONLY use valid Scene methods: self.add(), self.play(), self.wait(), self.clear(), self.remove()
-25. NEVER use self.set_background() or similar invalid methods
-26. ALWAYS position objects at different coordinates using UP*2, DOWN*1, LEFT*3, RIGHT*2
-27. Clear screen between sections: self.play(FadeOut(*self.mobjects))
-28. Use different font sizes to create hierarchy: 48 for titles, 36 for subtitles, 24 for content
-
-🎯 16:9 ASPECT RATIO CRITICAL REQUIREMENTS:
-29. NEVER position objects beyond X=±6.5 or Y=±3.8 (safe viewing area)
-30. Use responsive scaling: if text doesn't fit, reduce font_size, don't extend bounds
-31. Test all positions: title.shift(UP*3.5) should be maximum upward positioning
-32. Implement automatic bounds checking for all object placements
-33. Use .get_width() and .get_height() to verify objects fit within screen
-34. Scale down oversized objects: if obj.get_width() > 12, use obj.scale(12/obj.get_width())
-35. Use multi-line text for long content instead of tiny fonts or overflow
-36. Position wide equations at Y=0 (screen center) for maximum horizontal space
-37. Create responsive layouts that adapt to content size automatically
-
-🚫 OVERLAP PREVENTION CRITICAL REQUIREMENTS:
-38. MANDATORY position tracking: maintain mental map of used screen areas
-39. Use position validation: before placing object, verify area is clear
-40. Implement smart positioning: if preferred position occupied, find nearest free space
-41. Create position buffers: minimum 0.3 units between adjacent text objects
-42. Use staged clearing: remove specific objects before adding new ones in same area
-43. Implement position queuing: queue objects that will move to make space for new content
-44. Use relative positioning chains: obj2.next_to(obj1, RIGHT).shift(DOWN*0.5)
-45. Create temporary positioning: place objects off-screen, then animate to final position
-46. Use position debugging: add brief pauses to verify no overlaps before proceeding
-47. Implement content flow management: ensure logical movement paths don't cause collisions
-
-💫 DYNAMIC VISUAL EXPLANATION CRITICAL REQUIREMENTS:
-48. Every abstract concept MUST have concrete visual representation
-49. Use transformation chains: circle → square → triangle to show concept evolution
-50. Implement visual analogies: familiar objects that morph into mathematical concepts
-51. Create animated cause-and-effect demonstrations
-52. Use progressive complexity: start with simple shapes, add details through animation
-53. Implement interactive-style responses: animations that react to previous content
-54. Create visual proof sequences: step-by-step animated demonstrations
-55. Use multi-perspective views: show same concept from different visual angles
-56. Implement concept journeys: objects that travel across screen to demonstrate relationships
-57. Create animated timelines: show historical or logical progression of ideas
-
-⚠️ CRITICAL SYNTAX REQUIREMENTS ⚠️:
-- NEVER write Text("text",.shift() - comma before method is SYNTAX ERROR
-- ALWAYS write Text("text").shift() - proper method chaining
-- NEVER write Text("text").shift(UP*2 - missing closing parenthesis is SYNTAX ERROR  
-- ALWAYS write Text("text").shift(UP*2) - complete parentheses
-- NEVER split Text declarations across multiple lines
-- ALWAYS complete Text objects on single lines
-- NEVER create orphaned lines starting with font_size= or color=
-- ALWAYS use proper 4-space indentation for class methods
-
-⚠️ ERROR REPORTING AND DIAGNOSTIC INSTRUCTIONS:
-- OVERLAP DETECTION: If objects occupy same coordinates, report with format:
-  "ERROR [Scene_ID]: Text overlap detected - Object1 'title_text' and Object2 'subtitle_text' both at position [0, 2, 0]"
-- BOUNDS VIOLATION: If objects extend beyond safe viewing area, report:
-  "ERROR [Scene_ID]: Bounds violation - Object 'equation_text' extends to X=8.5 (safe limit: X=6.5)"
-- READABILITY ISSUES: If text is too small or overlaps with background, report:
-  "ERROR [Scene_ID]: Readability issue - Object 'detail_text' font_size=8 below minimum readable size (minimum: 16)"
-- MISALIGNMENT DETECTION: If related objects aren't properly aligned, report:
-  "ERROR [Scene_ID]: Alignment issue - Object 'arrow' start point [1, 2, 0] doesn't connect to Object 'circle' center [1.5, 2, 0]"
-- TIMING VIOLATIONS: If scene duration exceeds allocated time, report:
-  "ERROR [Scene_ID]: Timing overflow - Scene duration 8.5s exceeds allocated 6.0s"
-- ANIMATION CONFLICTS: If animations interfere with each other, report:
-  "ERROR [Scene_ID]: Animation conflict - Object 'text1' Transform() overlaps with Object 'text2' FadeIn() at timestamp 2.5s"
-- MISSING ELEMENTS: If required visual elements are absent, report:
-  "ERROR [Scene_ID]: Missing element - No visual representation found for concept 'quadratic formula' in mathematical explanation"
-- POSITIONING ERRORS: If objects use invalid coordinates, report:
-  "ERROR [Scene_ID]: Invalid position - Object 'title' positioned at [0, 5, 0] exceeds maximum Y=3.8 for 16:9 aspect ratio"
-- SCENE FLOW ISSUES: If logical progression is broken, report:
-  "ERROR [Scene_ID]: Flow violation - Concept 'derivatives' introduced before prerequisite 'functions' in step sequence"
-- DIAGNOSTIC FORMAT: All errors must include Scene_ID, Object_Label, Position_Coordinates, and Suggested_Fix
-- ERROR CATEGORIZATION: Classify as CRITICAL (renders fail), WARNING (suboptimal), or INFO (style suggestions)
-- BATCH REPORTING: Collect all errors before reporting to avoid fragmenting output
-- SOLUTION SUGGESTIONS: Each error report must include specific fix recommendation
-
-ANIMATION REQUIREMENTS:
-- Every text element should be animated (Write, FadeIn, etc.)
-- Use Transform() to morph objects between states
-- Implement smooth camera movements when appropriate
-- Clear previous content before introducing new concepts: self.play(FadeOut(*self.mobjects))
-- Position elements strategically using UP, DOWN, LEFT, RIGHT with multipliers
-- Use scale and rotation for visual interest: .scale(0.8), .rotate(PI/4)
-- Implement highlighting effects (Indicate, Flash, Wiggle)
-- Create progressive reveals for complex concepts
-- Use color changes to show relationships: .set_color(BLUE)
-- Implement step-by-step builds for equations and diagrams
-
-MANDATORY POSITIONING EXAMPLES:
-- Title: Text("Title", font_size=48).shift(UP*3)
-- Subtitle: Text("Subtitle", font_size=36).shift(UP*1.5)  
-- Content: Text("Content", font_size=24).shift(DOWN*1)
-- Left diagram: Circle().shift(LEFT*4)
-- Right text: Text("Explanation").shift(RIGHT*3)
-- Multiple items: use UP*2, ORIGIN, DOWN*2 for vertical spacing
-- NEVER put two Text objects in the same position
-- ALWAYS move or remove old content before adding new content
-
-📺 16:9 POSITIONING EXAMPLES (1920x1080 safe zones):
-- Maximum title position: Text("Title").shift(UP*3.5) ✅
-- Beyond safe zone: Text("Title").shift(UP*4.5) ❌ (will be cut off)
-- Wide content max: Text("Long equation").shift(LEFT*6) ✅  
-- Too wide: Text("Content").shift(LEFT*8) ❌ (extends beyond screen)
-- Vertical content distribution:
-  * Header zone: Y=3 to Y=2 (titles, section headers)
-  * Main zone: Y=1.5 to Y=-1.5 (primary content, diagrams) 
-  * Footer zone: Y=-2 to Y=-3.5 (conclusions, notes)
-- Horizontal content distribution:
-  * Left panel: X=-5 to X=-2 (diagrams, visual elements)
-  * Center panel: X=-1.5 to X=1.5 (main text, equations)
-  * Right panel: X=2 to X=5 (explanations, annotations)
-
-🚫 OVERLAP PREVENTION EXAMPLES:
-✅ CORRECT - Sequential positioning:
-```python
-title = Text("Title").shift(UP*3)
-self.play(Write(title))
-subtitle = Text("Subtitle").shift(UP*1.5)  # Different Y position
-self.play(Write(subtitle))
-```
-
-❌ WRONG - Same position overlap:
-```python
-title = Text("Title").shift(UP*2)
-subtitle = Text("Subtitle").shift(UP*2)  # OVERLAP! Same position
-```
-
-✅ CORRECT - Clear before new content:
-```python
-self.play(FadeOut(title))  # Remove old content first
-new_title = Text("New Title").shift(UP*3)
-self.play(Write(new_title))
-```
-
-✅ CORRECT - Smart relative positioning:
-```python
-title = Text("Main Topic").shift(UP*2.5)
-subtitle = Text("Subtopic").next_to(title, DOWN, buff=0.5)  # Auto-positioned
-diagram = Circle().next_to(subtitle, DOWN*2, buff=1.0)      # Safe spacing
-```
-
-✅ CORRECT - Multi-column layout:
-```python
-left_text = Text("Concept A").shift(LEFT*4 + UP*1)
-right_text = Text("Concept B").shift(RIGHT*4 + UP*1)     # Same Y, different X
-center_arrow = Arrow(LEFT*1.5, RIGHT*1.5).shift(UP*1)    # Connects them
-```
-
-✅ CORRECT - Responsive scaling:
-```python
-long_equation = Text("Very long mathematical equation here", font_size=20)
-if long_equation.get_width() > 10:  # Check if too wide
-    long_equation.scale(10 / long_equation.get_width())  # Scale to fit
-long_equation.shift(ORIGIN)  # Position in safe center area
-```
-
-💫 DYNAMIC VISUAL EXPLANATION EXAMPLES:
-✅ CORRECT - Concept morphing:
-```python
-# Start with simple shape
-circle = Circle(color=BLUE).shift(LEFT*3)
-self.play(Create(circle))
-
-# Transform to show relationship  
-square = Square(color=RED).shift(LEFT*3)
-self.play(Transform(circle, square))
-
-# Add animated explanation
-explanation = Text("Shapes can transform").shift(RIGHT*3)
-arrow = Arrow(LEFT*1, RIGHT*1.5, color=YELLOW)
-self.play(Write(explanation), Create(arrow))
-```
-
-✅ CORRECT - Progressive complexity:
-```python
-# Start simple
-basic_formula = Text("a + b", font_size=24).shift(UP*2)
-self.play(Write(basic_formula))
-
-# Add complexity with animation
-complex_formula = Text("a^2 + 2ab + b^2", font_size=24).shift(UP*2)
-self.play(Transform(basic_formula, complex_formula))
-
-# Show visual proof below
-visual_squares = VGroup(
-    Square().shift(LEFT*2 + DOWN*1),
-    Rectangle(width=2, height=1).shift(DOWN*1),
-    Square().shift(RIGHT*2 + DOWN*1)
-).set_color(GREEN)
-self.play(Create(visual_squares))
-```
-
-FORBIDDEN ELEMENTS:
-- ImageMobject (will cause file not found errors)
-- Any references to .png, .jpg, .jpeg, .gif files
-- External image assets
-- File loading operations
-- self.set_background() method (AttributeError - doesn't exist)
-- self.set_color_scheme() method (AttributeError - not valid)
-- self.set_theme() method (AttributeError - not valid)
-- self.configure_camera() method (AttributeError - not a Scene method)
-
-VALID SCENE METHODS TO USE:
-- self.add() - add objects to scene
-- self.play() - animate objects
-- self.wait() - pause between animations
-- self.clear() - clear all objects from scene
-- self.remove() - remove specific objects
-- self.camera - access camera properties (read-only)
-
-USE INSTEAD:
-- Text() for descriptions and labels
-- Text() for ALL text including mathematical expressions
-- Circle(), Rectangle(), Line() for diagrams
-- Color-coded shapes to represent concepts
-- Animated text reveals and transformations
-
-Generate the complete Manim code now. Ensure it's production-ready and follows all the requirements above.
-
-🎬 MANDATORY SCENE TIMING VALIDATION:
-- Each scene method must include timing documentation: # Duration: X.X seconds
-- Validate total scene time matches educational step allocation
-- Include timing checkpoints: self.wait() statements with duration comments
-- Implement progressive timing: faster for reviews, slower for new concepts
-- Add scene transition buffers: minimum 1-second pause between major sections
-- Use graduated complexity timing: simple=2s, moderate=4s, complex=6s per concept
-
-🎯 STEP-BY-STEP IMPLEMENTATION REQUIREMENTS:
-- Create sub-methods for each conceptual component
-- Use method naming convention: step_X_part_Y_description()
-- Implement concept scaffolding in method structure
-- Add cross-references between related sub-steps
-- Include understanding validation pauses between sub-steps
-- Create modular methods for easy modification and debugging
-
-💫 ANIMATION TECHNIQUE VALIDATION:
-- Must use minimum 5 different animation types per scene
-- Include at least 2 camera movements for scenes longer than 30 seconds
-- Implement object morphing for abstract concept demonstrations
-- Use layered animations: background, main content, emphasis overlays
-- Include rhythmic pacing: alternate fast/slow animation sequences
-- Apply consistent visual metaphors throughout educational progression
-
-🎯 STEP-BY-STEP ANIMATION ENHANCEMENT REQUIREMENTS 🎯:
-
-═══════════════════════════════════════════════════════════════
-📚 DETAILED STEP ANIMATIONS WITH INTUITIONS AND EXPLANATIONS:
-═══════════════════════════════════════════════════════════════
-
-For EACH educational step, you MUST include:
-
-1. 📝 CONCEPT INTRODUCTION:
-- Start with a clear title that explains what we're learning
-- Use Write() animation for the title with appropriate timing
-- Include a brief subtitle explaining the intuition behind the concept
-- Example: "Understanding Derivatives: The Rate of Change"
-
-2. 🔍 VISUAL INTUITION BUILDING:
-- Create concrete visual analogies before abstract concepts
-- Use familiar shapes and objects that transform into mathematical concepts
-- Implement step-by-step visual progression from simple to complex
-- Example: Show a moving car (rectangle) → speed visualization → derivative concept
-
-3. 💡 DETAILED EXPLANATIONS:
-- Break down complex concepts into 3-5 smaller sub-concepts
-- For each sub-concept, create a dedicated animation sequence
-- Use explanatory text that appears with Write() or FadeIn()
-- Include "why this matters" context for each step
-- Example: "Why do we need limits? Because we want to find exact rates of change!"
-
-4. 🎨 PROGRESSIVE VISUAL COMPLEXITY:
-- Level 1: Simple shapes and basic movements
-- Level 2: Add labels, equations, and relationships
-- Level 3: Show interactions and transformations
-- Level 4: Connect to real-world applications
-- Use Transform() to morph objects between complexity levels
-
-5. 🔄 INTERACTIVE-STYLE DEMONSTRATIONS:
-- Create "What if?" scenarios with animated responses
-- Show cause-and-effect relationships through animation
-- Use highlighting (Indicate(), Flash()) to draw attention
-- Implement before/after comparisons with side-by-side animations
-
-6. 📊 STEP-BY-STEP PROBLEM SOLVING:
-- Break mathematical problems into individual steps
-- Animate each step with detailed explanations
-- Show the "thinking process" with animated thought bubbles
-- Use color coding to track variables and operations
-- Example: Solving x² + 3x + 2 = 0 step by step with visual algebra
-
-7. 🎭 EMOTIONAL ENGAGEMENT TECHNIQUES:
-- Use surprise reveals: objects appearing unexpectedly
-- Create anticipation with slow build-ups before big reveals
-- Use humor through playful animations and unexpected transformations
-- Implement "aha moment" effects with Flash() and Wiggle()
-
-8. 🔗 CONNECTION BUILDING:
-- Show relationships between concepts with animated arrows
-- Create visual bridges between different mathematical topics
-- Use transformation chains to show concept evolution
-- Implement callback animations that reference previous concepts
-
-═══════════════════════════════════════════════════════════════
-🎬 MANDATORY ANIMATION PATTERNS FOR EACH STEP:
-═══════════════════════════════════════════════════════════════
-
-STEP INTRODUCTION PATTERN:
-```python
-def step_X_concept_name(self):
-    # Duration: 30-45 seconds
-    
-    # 1. Clear previous content
-    self.play(FadeOut(*self.mobjects))
-    self.wait(0.5)
-    
-    # 2. Introduce step title with context
-    step_title = Text("Step X: [Concept Name]", font_size=44, color=BLUE).shift(UP*3)
-    intuition = Text("Intuition: [Why this matters]", font_size=28, color=WHITE).shift(UP*2)
-    
-    self.play(Write(step_title))
-    self.wait(1)
-    self.play(Write(intuition))
-    self.wait(2)
-    
-    # 3. Create visual analogy
-    analogy_title = Text("Let's think of this like...", font_size=24, color=YELLOW).shift(UP*0.5)
-    analogy_visual = [create visual representation]
-    
-    self.play(Write(analogy_title))
-    self.play(Create(analogy_visual))
-    self.wait(2)
-    
-    # 4. MANDATORY: Text-based explanation after visual scene
-    self.provide_detailed_text_explanation()
-    
-    # 5. Transform to mathematical concept
-    math_concept = [mathematical representation]
-    explanation = Text("This is exactly like [mathematical concept]!", 
-                    font_size=22, color=GREEN).shift(DOWN*2)
-    
-    self.play(Transform(analogy_visual, math_concept))
-    self.play(Write(explanation))
-    self.wait(3)
-    
-    # 6. MANDATORY: Text explanation after mathematical transformation
-    self.explain_mathematical_connection()
-    
-    # 7. Detailed breakdown
-    self.breakdown_sub_concepts()
-    
-    # 8. Connect to bigger picture
-    self.connect_to_previous_concepts()
-    
-def provide_detailed_text_explanation(self):
-    # MANDATORY: Detailed text explanation after each visual scene
-    # Clear visual elements but keep title
-    self.play(FadeOut(*[obj for obj in self.mobjects[2:]]))  # Keep title and subtitle
-    
-    # Create comprehensive text explanation
-    explanation_title = Text("Let me explain what we just saw:", 
-                            font_size=26, color=YELLOW).shift(UP*1.5)
-    
-    explanations = [
-        "• First, we observed [specific visual element] which represents [concept]",
-        "• This shows us that [key insight from the visual]", 
-        "• The important thing to notice is [critical observation]",
-        "• This connects to our overall goal because [relevance]"
-    ]
-    
-    self.play(Write(explanation_title))
-    self.wait(1)
-    
-    explanation_group = VGroup()
-    for i, exp_text in enumerate(explanations):
-        exp = Text(exp_text, font_size=20, color=WHITE).shift(UP*(0.5-i*0.7))
-        explanation_group.add(exp)
-        self.play(Write(exp))
-        self.wait(1.5)
-    
-    # Pause for understanding
-    understanding_prompt = Text("Take a moment to think about this...", 
-                            font_size=18, color=ORANGE).shift(DOWN*2.5)
-    self.play(Write(understanding_prompt))
-    self.wait(3)
-    
-    # Clear explanations before next section
-    self.play(FadeOut(explanation_title, explanation_group, understanding_prompt))
-    self.wait(0.5)
-```
-
-SUB-CONCEPT BREAKDOWN PATTERN:
-```python
-def breakdown_sub_concepts(self):
-    # For each sub-concept within the main concept
-    
-    sub_concepts = [
-        "Sub-concept 1: [Specific detail]",
-        "Sub-concept 2: [Another detail]", 
-        "Sub-concept 3: [Final detail]"
-    ]
-    
-    for i, concept in enumerate(sub_concepts):
-        # Clear space for new concept
-        if i > 0:
-            self.play(FadeOut(*[obj for obj in self.mobjects if obj != main_visual]))
-        
-        # Introduce sub-concept
-        sub_title = Text(concept, font_size=28, color=ORANGE).shift(UP*1)
-        self.play(Write(sub_title))
-        
-        # Create specific visual for this sub-concept
-        sub_visual = [create_specific_visual_for_concept(i)]
-        self.play(Create(sub_visual))
-        self.wait(2)
-        
-        # MANDATORY: Detailed text explanation after visual
-        self.explain_sub_concept_visually(i, concept)
-        
-        # Show connection to main concept
-        self.play(Indicate(main_visual))
-        self.wait(1)
-        
-def explain_sub_concept_visually(self, concept_index, concept_name):
-    # MANDATORY: Text explanation after each sub-concept visual
-    
-    # Fade out visual but keep title
-    visual_objects = [obj for obj in self.mobjects if obj.get_color() != ORANGE]
-    self.play(FadeOut(*visual_objects[1:]))  # Keep main title
-    
-    # Create explanation framework
-    explanation_header = Text("Let's break this down:", 
-                            font_size=24, color=YELLOW).shift(UP*2)
-    self.play(Write(explanation_header))
-    
-    # Detailed explanations for this sub-concept
-    detailed_explanations = [
-        f"What we just saw: [Describe the visual representation]",
-        f"Why it matters: [Explain the significance]",
-        f"How it works: [Describe the mechanism or process]",
-        f"Connection to main concept: [Show the relationship]",
-        f"Real-world example: [Provide concrete application]"
-    ]
-    
-    explanation_group = VGroup()
-    for j, exp in enumerate(detailed_explanations):
-        exp_text = Text(exp, font_size=18, color=WHITE).shift(UP*(1-j*0.5))
-        explanation_group.add(exp_text)
-        self.play(Write(exp_text))
-        self.wait(1.2)
-    
-    # Key takeaway
-    key_takeaway = Text(f"Key insight: [Main learning point from this sub-concept]", 
-                    font_size=20, color=GREEN).shift(DOWN*2)
-    self.play(Write(key_takeaway))
-    self.play(Indicate(key_takeaway))
-    self.wait(2)
-    
-    # Thinking pause
-    think_prompt = Text("Think about how this connects to what we learned before...", 
-                    font_size=16, color=GRAY).shift(DOWN*2.8)
-    self.play(Write(think_prompt))
-    self.wait(3)
-    
-    # Clear all explanations
-    self.play(FadeOut(explanation_header, explanation_group, key_takeaway, think_prompt))
-    self.wait(0.5)
-```
+    def construct(self):""".format(duration=duration, complexity=complexity, class_name=class_name) + MANIM_OUTPUT_TEMPLATE
+        
+        # Only the gallery examples relevant to this plan, best match first
+        examples = example_index.search(plan_query(video_plan), MANIM_PROMPT_MAX_EXAMPLES)
+        
+        assembler = PromptAssembler(MANIM_PROMPT_TOKEN_BUDGET)
+        assembler.add("rules", rules)
+        for rank, example in enumerate(examples):
+            header = "\n\n" + EXAMPLES_GALLERY_HEADER if rank == 0 else ""
+            assembler.add(f"example:{example.name}", header + "\n\n" + format_example(example, rank + 1), priority=rank)
+        assembler.add("inspiration", "\n\n" + INSPIRATION_GUIDANCE, priority=len(examples))
+        assembler.add("steps", steps_text, compact=compact_steps_text)
+        assembler.add("requirements", requirements)
+        prompt, report = assembler.build()
+        
+        print("📏 Prompt ≈{} tokens (≈{} before budgeting, budget {}); examples: {}{}{}".format(
+            report["tokens"], report["full_tokens"], report["budget"],
+            ", ".join(example.name for example in examples) or "none",
+            "; compacted: " + ", ".join(report["compacted"]) if report["compacted"] else "",
+            "; dropped: " + ", ".join(report["dropped"]) if report["dropped"] else ""
+        ))
+        return prompt
 
-PROBLEM-SOLVING DEMONSTRATION PATTERN:
-```python
-def demonstrate_problem_solving(self):
-    # Show step-by-step problem solving with detailed explanations
-    
-    # Present the problem
-    problem = Text("Problem: [Specific problem statement]", 
-                font_size=32, color=BLUE).shift(UP*2.5)
-    self.play(Write(problem))
-    self.wait(2)
-    
-    # Show the approach
-    approach = Text("Approach: [Strategy we'll use]", 
-                font_size=24, color=YELLOW).shift(UP*1.5)
-    self.play(Write(approach))
-    self.wait(1)
-    
-    # Step-by-step solution
-    steps = [
-        ("Step 1: [First action]", "[Detailed explanation of why]"),
-        ("Step 2: [Second action]", "[Detailed explanation of why]"),
-        ("Step 3: [Final action]", "[Detailed explanation of why]")
-    ]
-    
-    solution_area = VGroup()
-    
-    for i, (step, explanation) in enumerate(steps):
-        # Show the step
-        step_text = Text(step, font_size=26, color=GREEN).shift(UP*(0.5-i*0.8))
-        self.play(Write(step_text))
-        solution_area.add(step_text)
-        
-        # Show visual representation of the step
-        step_visual = [create_visual_for_step(i)]
-        step_visual.shift(LEFT*3 + UP*(0.5-i*0.8))
-        self.play(Create(step_visual))
-        solution_area.add(step_visual)
-        self.wait(2)
+    def _format_prompt_step(self, step_num, step, max_chars=None):
+        """
+        Format one educational step for the code generation prompt.
         
-        # MANDATORY: Detailed text explanation after each step visual
-        self.explain_problem_solving_step(i, step, explanation, step_visual)
+        Args:
+            step_num (int): 1-based step number
+            step (dict): Educational step from the video plan
+            max_chars (int): Optional limit for the narration and visual plan fields
+            
+        Returns:
+            str: Step section of the prompt
+        """
+        def clip(text):
+            text = str(text)
+            return text if max_chars is None or len(text) <= max_chars else text[:max_chars].rstrip() + "..."
         
-        # Highlight the connection to previous steps
-        if i > 0:
-            self.play(Indicate(solution_area[i-1]))
-            self.wait(0.5)
-    
-    # Show final result
-    result = Text("Result: [Final answer with meaning]", 
-                font_size=28, color=PURPLE).shift(DOWN*2.5)
-    self.play(Write(result))
-    self.play(Flash(result))
-    self.wait(3)
-    
-    # MANDATORY: Final comprehensive explanation
-    self.provide_solution_summary()
-    
-def explain_problem_solving_step(self, step_number, step_description, reasoning, visual_element):
-    # MANDATORY: Comprehensive explanation after each problem-solving step
-    
-    # Clear screen but keep problem title
-    self.play(FadeOut(*[obj for obj in self.mobjects[1:]]))  # Keep problem statement
-    
-    # Create step explanation framework
-    step_header = Text(f"Let's understand {step_description}", 
-                    font_size=24, color=ORANGE).shift(UP*2.5)
-    self.play(Write(step_header))
-    
-    # Detailed breakdown of this step
-    step_explanations = [
-        f"What we did: [Specific action taken in this step]",
-        f"Why we did it: [Reasoning behind this approach]",
-        f"What it shows us: [What this step reveals]",
-        f"How it helps: [How this moves us toward the solution]",
-        f"What to watch for: [Common mistakes or key insights]"
-    ]
-    
-    explanation_group = VGroup()
-    for j, exp in enumerate(step_explanations):
-        exp_text = Text(exp, font_size=18, color=WHITE).shift(UP*(1.5-j*0.6))
-        explanation_group.add(exp_text)
-        self.play(Write(exp_text))
-        self.wait(1.5)
-    
-    # Mathematical insight
-    if step_number < 2:  # For first two steps
-        math_insight = Text("Mathematical insight: [Key mathematical principle used]", 
-                        font_size=20, color=BLUE).shift(DOWN*1.5)
-        self.play(Write(math_insight))
-        self.play(Indicate(math_insight))
-        self.wait(2)
-        explanation_group.add(math_insight)
-    
-    # Check understanding
-    understanding_check = Text("Does this make sense? Let's verify...", 
-                            font_size=18, color=YELLOW).shift(DOWN*2.5)
-    self.play(Write(understanding_check))
-    self.wait(2)
-    
-    # Clear explanations
-    self.play(FadeOut(step_header, explanation_group, understanding_check))
-    self.wait(0.5)
-    
-def provide_solution_summary(self):
-    # MANDATORY: Comprehensive summary after problem solving
-    
-    self.play(FadeOut(*self.mobjects))
-    
-    summary_title = Text("Solution Summary & Key Insights", 
-                        font_size=28, color=PURPLE).shift(UP*3)
-    self.play(Write(summary_title))
-    
-    summary_points = [
-        "🎯 What we solved: [Restate the problem clearly]",
-        "🔍 Our approach: [Summarize the method used]", 
-        "⚡ Key insights: [Main mathematical insights discovered]",
-        "🔗 Connections: [How this relates to other concepts]",
-        "💡 Why it matters: [Real-world significance]",
-        "🚀 Next steps: [What this enables us to do next]"
-    ]
-    
-    for i, point in enumerate(summary_points):
-        point_text = Text(point, font_size=20, color=WHITE).shift(UP*(2-i*0.5))
-        self.play(Write(point_text))
-        self.wait(1.5)
-    
-    # Final reflection
-    reflection = Text("Take a moment to reflect on what we've learned...", 
-                    font_size=18, color=ORANGE).shift(DOWN*2.5)
-    self.play(Write(reflection))
-    self.wait(4)
-```
+        return """
 
-VISUAL INTUITION BUILDING PATTERN:
-```python
-def build_visual_intuition(self, concept_name):
-    # Create layered understanding through visual progression
-    
-    # Layer 1: Everyday analogy
-    everyday_title = Text(f"Think of {concept_name} like...", 
-                        font_size=28, color=BLUE).shift(UP*2.5)
-    everyday_example = Text("[Relatable everyday example]", 
-                        font_size=24, color=WHITE).shift(UP*1.5)
-    
-    self.play(Write(everyday_title))
-    self.play(Write(everyday_example))
-    self.wait(2)
-    
-    # Create visual representation of everyday example
-    everyday_visual = [create_everyday_visual()]
-    self.play(Create(everyday_visual))
-    self.wait(2)
-    
-    # MANDATORY: Detailed explanation of everyday analogy
-    self.explain_everyday_analogy(concept_name, everyday_visual)
-    
-    # Layer 2: Mathematical parallel
-    parallel_title = Text("In mathematics, this becomes...", 
-                        font_size=24, color=YELLOW).shift(UP*0.5)
-    self.play(Write(parallel_title))
-    
-    # Transform everyday visual to mathematical representation
-    math_visual = [create_mathematical_visual()]
-    self.play(Transform(everyday_visual, math_visual))
-    self.wait(2)
-    
-    # MANDATORY: Detailed explanation of mathematical transformation
-    self.explain_mathematical_transformation(everyday_visual, math_visual)
-    
-    # Layer 3: Formal definition
-    formal_title = Text("Formally, we define this as:", 
-                    font_size=22, color=GREEN).shift(DOWN*0.5)
-    formal_def = MathTex(r"[Mathematical definition]", 
-                        font_size=32).shift(DOWN*1.5)
-    
-    self.play(Write(formal_title))
-    self.play(Write(formal_def))
-    self.wait(3)
-    
-    # MANDATORY: Detailed explanation of formal definition
-    self.explain_formal_definition(formal_def)
-    
-    # Layer 4: Why it matters
-    importance = Text("This concept is crucial for: [Applications]", 
-                    font_size=20, color=ORANGE).shift(DOWN*2.5)
-    self.play(Write(importance))
-    self.play(Indicate(importance))
-    self.wait(2)
-    
-    # MANDATORY: Comprehensive summary explanation
-    self.provide_intuition_summary(concept_name)
-    
-def explain_everyday_analogy(self, concept_name, visual_element):
-    # MANDATORY: Comprehensive explanation of the everyday analogy
-    
-    self.play(FadeOut(*[obj for obj in self.mobjects[2:]]))  # Keep title and example
-    
-    analogy_header = Text("Let's explore this analogy in detail:", 
-                        font_size=24, color=YELLOW).shift(UP*2)
-    self.play(Write(analogy_header))
-    
-    analogy_explanations = [
-        f"🔍 What we see: [Describe the visual elements clearly]",
-        f"🎯 Why this works: [Explain why this analogy is effective]",
-        f"🔗 Key similarities: [Draw parallels to the mathematical concept]",
-        f"⚠️ Where it breaks down: [Acknowledge limitations of the analogy]",
-        f"💭 What to remember: [Key takeaway from this comparison]"
-    ]
-    
-    for i, exp in enumerate(analogy_explanations):
-        exp_text = Text(exp, font_size=18, color=WHITE).shift(UP*(1-i*0.5))
-        self.play(Write(exp_text))
-        self.wait(1.8)
-    
-    reflection_prompt = Text("Think: How does this everyday example help you understand the concept?", 
-                        font_size=16, color=ORANGE).shift(DOWN*2.2)
-    self.play(Write(reflection_prompt))
-    self.wait(3)
-    
-    self.play(FadeOut(*self.mobjects[3:]))  # Clear explanations, keep base elements
-    
-def explain_mathematical_transformation(self, everyday_vis, math_vis):
-    # MANDATORY: Detailed explanation of the transformation process
-    
-    transform_header = Text("Now let's see the mathematical connection:", 
-                        font_size=24, color=BLUE).shift(UP*2.5)
-    self.play(Write(transform_header))
-    
-    transformation_steps = [
-        "📊 Visual mapping: [How everyday elements map to math elements]",
-        "🔄 The transformation: [What changed and what stayed the same]", 
-        "🧮 Mathematical meaning: [What the math representation tells us]",
-        "🎯 Why this matters: [How this helps solve problems]",
-        "🚀 What we can do now: [New capabilities this representation gives us]"
-    ]
-    
-    for i, step in enumerate(transformation_steps):
-        step_text = Text(step, font_size=18, color=WHITE).shift(UP*(1.5-i*0.5))
-        self.play(Write(step_text))
-        self.wait(2)
-    
-    key_insight = Text("🔑 Key insight: The math preserves the essential relationships!", 
-                    font_size=20, color=GREEN).shift(DOWN*1.8)
-    self.play(Write(key_insight))
-    self.play(Flash(key_insight))
-    self.wait(2)
-    
-    self.play(FadeOut(*self.mobjects[1:]))  # Clear all but original title
-    
-def explain_formal_definition(self, definition_element):
-    # MANDATORY: Detailed breakdown of the formal definition
-    
-    definition_header = Text("Let's decode this formal definition:", 
-                        font_size=24, color=PURPLE).shift(UP*2.5)
-    self.play(Write(definition_header))
-    
-    definition_breakdown = [
-        "📝 What each symbol means: [Break down mathematical notation]",
-        "🔍 The structure: [Explain the logical structure]",
-        "⚡ Why it's written this way: [Justify the formal approach]", 
-        "🎯 What it captures: [What aspects of the concept it formalizes]",
-        "🛠️ How to use it: [Practical application of the definition]"
-    ]
-    
-    for i, breakdown in enumerate(definition_breakdown):
-        breakdown_text = Text(breakdown, font_size=18, color=WHITE).shift(UP*(1.5-i*0.5))
-        self.play(Write(breakdown_text))
-        self.wait(2)
-    
-    practical_note = Text("💡 Remember: Formal definitions give us precision and power!", 
-                        font_size=19, color=ORANGE).shift(DOWN*2)
-    self.play(Write(practical_note))
-    self.wait(2)
-    
-    self.play(FadeOut(*self.mobjects[1:]))  # Clear explanations
-    
-def provide_intuition_summary(self, concept_name):
-    # MANDATORY: Comprehensive summary of the intuition-building process
-    
-    summary_header = Text(f"Summary: Understanding {concept_name}", 
-                        font_size=26, color=PURPLE).shift(UP*3)
-    self.play(Write(summary_header))
-    
-    journey_recap = [
-        "🚀 Our journey: From everyday analogy → visual → mathematical → formal",
-        "🎯 Core insight: [Main understanding gained]",
-        "🔗 Connections made: [How this links to other concepts]", 
-        "💪 New abilities: [What you can now do with this knowledge]",
-        "🎓 Next level: [What this prepares you for]"
-    ]
-    
-    for i, recap in enumerate(journey_recap):
-        recap_text = Text(recap, font_size=19, color=WHITE).shift(UP*(2-i*0.6))
-        self.play(Write(recap_text))
-        self.wait(2)
-    
-    final_reflection = Text("Take a moment to appreciate how far your understanding has grown!", 
-                        font_size=18, color=YELLOW).shift(DOWN*2.5)
-    self.play(Write(final_reflection))
-    self.wait(4)
-```
-
-═══════════════════════════════════════════════════════════════
-🎯 ENHANCED EXPLANATION REQUIREMENTS:
-═══════════════════════════════════════════════════════════════
-
-🔥 MANDATORY TEXT-BASED EXPLANATIONS AFTER EVERY VISUAL SCENE:
-
-CRITICAL REQUIREMENT: After EVERY visual animation or scene, you MUST include a comprehensive text-based explanation that:
-
-1. 📝 EXPLAINS WHAT JUST HAPPENED:
-- Describe exactly what the audience just saw visually
-- Break down each visual element and its meaning
-- Explain the sequence of animations and why they occurred
-- Use clear, descriptive language that reinforces the visual learning
-
-2. 🎯 CONNECTS TO THE LEARNING OBJECTIVE:
-- Explicitly state how the visual relates to the educational goal
-- Draw connections between the animation and the concept being taught
-- Explain why this particular visual representation was chosen
-- Show how the visual supports understanding of the abstract concept
-
-3. 🔍 PROVIDES DEEPER INSIGHT:
-- Offer additional context not shown in the visual
-- Explain underlying principles or mechanisms
-- Address potential questions that might arise from the visual
-- Provide mathematical or scientific reasoning behind what was shown
-
-4. 🔗 BUILDS CONNECTIONS:
-- Link to previously learned concepts
-- Preview how this connects to upcoming material
-- Show relationships between different parts of the subject
-- Create a narrative thread that ties concepts together
-
-5. ✅ CHECKS UNDERSTANDING:
-- Include reflection prompts: "Notice how...", "Think about...", "Consider..."
-- Pose implicit questions that guide thinking
-- Provide opportunities for mental processing
-- Use confirmation language: "This shows us that...", "We can see that..."
-
-TEXT EXPLANATION STRUCTURE FOR EVERY VISUAL SCENE:
-```python
-def explain_visual_scene(self, scene_description):
-    # Clear visual elements but maintain context
-    self.play(FadeOut(*[visual_objects]))
-    
-    # 1. Describe what was shown
-    description = Text("What we just saw: [Detailed description]", 
-                    font_size=22, color=YELLOW).shift(UP*2)
-    self.play(Write(description))
-    self.wait(2)
-    
-    # 2. Explain the meaning
-    meaning = Text("This represents: [Conceptual meaning]", 
-                font_size=20, color=WHITE).shift(UP*1)
-    self.play(Write(meaning))
-    self.wait(2)
-    
-    # 3. Connect to learning objective
-    connection = Text("This helps us understand: [Learning connection]", 
-                    font_size=20, color=GREEN).shift(ORIGIN)
-    self.play(Write(connection))
-    self.wait(2)
-    
-    # 4. Provide insight
-    insight = Text("Key insight: [Deeper understanding]", 
-                font_size=20, color=ORANGE).shift(DOWN*1)
-    self.play(Write(insight))
-    self.wait(2)
-    
-    # 5. Reflection prompt
-    reflection = Text("Think about: [Guided reflection question]", 
-                    font_size=18, color=BLUE).shift(DOWN*2)
-    self.play(Write(reflection))
-    self.wait(3)
-    
-    # Clear explanations before next section
-    self.play(FadeOut(description, meaning, connection, insight, reflection))
-    self.wait(0.5)
-```
-
-🎯 IMPLEMENTATION REQUIREMENTS:
-
-- EVERY visual scene must be followed by text explanation
-- Text explanations should be 15-30 seconds in duration
-- Use different font sizes for hierarchy: 24 for main points, 20 for details, 18 for prompts
-- Include emojis and visual markers to make text engaging
-- Provide adequate wait times for reading and processing
-- Clear text explanations before moving to next visual scene
-- Use color coding: YELLOW for descriptions, WHITE for explanations, GREEN for connections, ORANGE for insights, BLUE for reflections
-
-1. CONTEXT SETTING:
-- Always explain WHY we're learning this concept
-- Connect to previous knowledge: "Remember when we learned X? This builds on that..."
-- Show the big picture: "This is step Y of our journey toward understanding Z"
-
-2. MULTIPLE PERSPECTIVES:
-- Geometric interpretation (visual shapes and transformations)
-- Algebraic interpretation (equations and symbols)
-- Numerical interpretation (specific examples with numbers)
-- Practical interpretation (real-world applications)
-
-3. COMMON MISCONCEPTIONS:
-- Address typical student confusion points
-- Show incorrect approaches and why they fail
-- Demonstrate correct thinking process
-- Use visual corrections with before/after animations
-
-4. MEMORY AIDS:
-- Create visual mnemonics for key concepts
-- Use color coding consistently throughout
-- Implement repetition with variation
-- Build on familiar patterns and analogies
-
-5. INTERACTIVE ELEMENTS:
-- Pose questions to the audience with animated reveals
-- Show "What would happen if..." scenarios
-- Create suspense before revealing key insights
-- Use polling-style animations: "Raise your hand if you think..."
-
-═══════════════════════════════════════════════════════════════
-💫 VISUAL STORYTELLING REQUIREMENTS:
-═══════════════════════════════════════════════════════════════
-
-Each step must tell a complete story with:
-- Beginning: Set up the problem or concept
-- Middle: Explore the concept through multiple angles
-- End: Synthesize understanding and connect to bigger picture
-
-Use these animation techniques:
-- Zoom effects for emphasis: camera.animate.scale(1.5)
-- Rotation for perspective: obj.animate.rotate(PI/4)
-- Morphing for concept evolution: Transform(shape1, shape2)
-- Highlighting for attention: Indicate(), Flash(), Wiggle()
-- Movement for relationships: obj.animate.shift(direction)
-- Scaling for importance: obj.animate.scale(1.2)
-- Color changes for categorization: obj.animate.set_color(new_color)
-
-⚠️ FINAL VALIDATION CHECKLIST:
-- [ ] No overlapping text or visual elements
-- [ ] All positions within 16:9 safe viewing area
-- [ ] Scene timing matches educational step duration
-- [ ] Minimum 3-second hold time for complex concepts
-- [ ] Progressive complexity maintained throughout
-- [ ] Visual elements support and enhance text content
-- [ ] Error-free Manim syntax and proper imports
-- [ ] Consistent animation patterns and visual metaphors
-- [ ] Clear scene transitions with adequate buffering
-- [ ] Comprehensive step-by-step conceptual breakdown
-""")
-        
-        return ''.join(prompt_parts)
+Step {step_num}: {step_title}
+- Duration: {duration} seconds
+- Key Concepts: {key_concepts}
+- Narration: {narration}
+- Visual Plan: {visual_plan}
+- Visual Elements: {visual_elements}
+- Equations: {equations}
+- Real-world Examples: {examples}""".format(
+            step_num=step_num,
+            step_title=step.get('step_title', 'Step {}'.format(step_num)),
+            duration=step.get('duration_seconds', 30),
+            key_concepts=', '.join(step.get('key_concepts', [])),
+            narration=clip(step.get('narration_script', '')),
+            visual_plan=clip(step.get('animation_plan', '')),
+            visual_elements=step.get('visual_elements', {}),
+            equations=step.get('equations', []),
+            examples=step.get('real_world_examples', [])
+        )
 
     def _extract_manim_code(self, response):
         """
@@ -1955,10 +326,14 @@ Use these animation techniques:
         
         return None
 
-    def _create_manim_generation_prompt(self):
+    def _create_manim_generation_prompt(self, instructions):
         """
         Create the system prompt for Manim code generation.
         
+        Args:
+            instructions (str): Static instructions sent ahead of the request
+                ("" when the model holds them as cached content)
+        
         Returns:
             ChatPromptTemplate: Configured prompt template
         """
@@ -2560,37 +935,7 @@ Use these animation techniques:
 
         # Instead of using SystemMessage (not supported by Gemini), 
         # we'll include the system instructions in the human message template
-        human_message_template = """You are an expert Manim (Mathematical Animation Engine) code generator, 
-specializing in creating educational animations in the style of 3Blue1Brown.
-
-Your expertise includes:
-- Converting educational content into dynamic, visual animations
-- Creating smooth transitions and engaging reveals
-- Implementing proper mathematical notation and diagrams
-- Designing pedagogically effective visual sequences
-- Following Manim best practices and conventions
-- Generating clean, modular, and well-documented code
-
-RESPONSE FORMAT:
-Provide ONLY executable Python code with:
-1. Complete class definition inheriting from Scene
-2. Full construct method implementation
-3. All required imports at the top
-4. NO explanations, comments, or markdown formatting
-5. Code must be syntactically correct and run without errors
-
-CRITICAL RULES:
-1. NEVER use external files or images
-2. ALWAYS use .set_color() method for colors
-3. NEVER put color parameters in constructors
-4. ALWAYS prevent text overlap with proper positioning
-5. Use only basic Manim objects: Text, Circle, Square, Rectangle, Line, Arrow
-6. Use FadeIn, FadeOut, Write, Transform for animations
-7. Use UP, DOWN, LEFT, RIGHT for positioning
-8. Ensure all parentheses are balanced
-9. Use consistent 4-space indentation throughout
-
-Human Request: {human_input}"""
+        human_message_template = "{instructions}Human Request: {human_input}"
 
         human_message_prompt = HumanMessagePromptTemplate.from_template(human_message_template)
 
@@ -2598,7 +943,7 @@ Human Request: {human_input}"""
             MessagesPlaceholder(variable_name="chat_history"),
             human_message_prompt,
         ])
-        return prompt
+        return prompt.partial(instructions=instructions + "\n\n" if instructions else "")
 
     def _display_video_plan(self, video_plan):
         """
@@ -2733,129 +1078,12 @@ Human Request: {human_input}"""
         Returns:
             str: Fixed and validated Manim code
         """
-        # Normalize indentation to avoid unexpected indent errors
-        code = textwrap.dedent(code)
         print("🔧 Starting code validation and fixing...")
-        
-        # CRITICAL: Fix syntax errors FIRST before anything else
-        code = self._fix_syntax_errors(code)
-        print("✅ Syntax errors fixed")
-        
-        lines = code.split('\n')
-        fixed_lines = []
-        text_positions_used = set()
-        
-        for line in lines:
-            # Fix set_background method which doesn't exist in Manim
-            if 'self.set_background' in line:
-                # Comment out the problematic line and add explanation
-                fixed_lines.append("        # REMOVED: {} (set_background method doesn't exist in Manim)".format(line.strip()))
-                fixed_lines.append("        # Background color is set in Manim config or using Camera background_color")
-                fixed_lines.append("        # Scene backgrounds are handled automatically by Manim")
-                continue
-            
-            # Fix overlapping text positions - detect Text objects without positioning
-            if 'Text(' in line and '=' in line and 'shift(' not in line and 'move_to(' not in line:
-                # This is a Text object without explicit positioning - add positioning
-                if 'title' in line.lower():
-                    line = line.rstrip() + '.shift(UP*3)'
-                elif 'subtitle' in line.lower():
-                    line = line.rstrip() + '.shift(UP*1.5)'
-                elif 'step' in line.lower() and 'title' in line.lower():
-                    line = line.rstrip() + '.shift(UP*2)'
-                else:
-                    # Add random positioning to avoid overlap
-                    positions = ['UP*1', 'DOWN*1', 'LEFT*2', 'RIGHT*2', 'UP*2', 'DOWN*2']
-                    for pos in positions:
-                        if pos not in text_positions_used:
-                            line = line.rstrip() + '.shift({})'.format(pos)
-                            text_positions_used.add(pos)
-                            break
-            
-            # Check for missing scene clearing between methods
-            if 'def ' in line and 'construct' not in line and '__init__' not in line:
-                # This is a new method - ensure it starts with clearing if it's not the first method
-                method_name = line.strip()
-                fixed_lines.append(line)
-                # Add clearing instruction as comment
-                fixed_lines.append("        # Clear previous content to avoid overlap")
-                fixed_lines.append("        # self.play(FadeOut(*self.mobjects)) # Uncomment if needed")
-                continue
-            
-            # Skip lines with ImageMobject references
-            if 'ImageMobject' in line or 'Image.open' in line:
-                # Replace with a comment explaining what was removed
-                comment_line = line.strip()
-                fixed_lines.append("        # REMOVED: {} (ImageMobject not supported)".format(comment_line))
-                fixed_lines.append("        # Using text description instead:")
-                
-                # Extract variable name if possible
-                if '=' in line and 'ImageMobject' in line:
-                    var_name = line.split('=')[0].strip()
-                    # Replace with a text description with positioning
-                    fixed_lines.append("        {} = Text('Visual representation of concept', font_size=24).shift(DOWN*1)".format(var_name))
-                continue
-            
-            # Skip lines that reference image files
-            if any(ext in line.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.ico']):
-                # Comment out the problematic line
-                fixed_lines.append("        # REMOVED: {} (Image file reference not supported)".format(line.strip()))
-                continue
-            
-            # Fix other common Manim method errors
-            if any(method in line for method in ['self.set_color_scheme', 'self.set_theme', 'self.configure_camera']):
-                # Comment out invalid methods
-                fixed_lines.append("        # REMOVED: {} (Invalid Manim method)".format(line.strip()))
-                continue
-                
-            # Fix common import issues
-            if line.strip() == 'from manim import *':
-                fixed_lines.append(line)
-            elif 'import' in line and any(img_ref in line for img_ref in ['PIL', 'Image', 'cv2', 'opencv']):
-                # Comment out image-related imports
-                fixed_lines.append("        # REMOVED: {} (Image library import not needed)".format(line.strip()))
-                continue
-            else:
-                fixed_lines.append(line)
-        
-        # Join the fixed lines
-        fixed_code = '\n'.join(fixed_lines)
-        
-        # Apply syntax fixes AGAIN after other modifications
-        fixed_code = self._fix_syntax_errors(fixed_code)
-        print("✅ Applied syntax fixes again after other modifications")
-        
-        # Handle empty method bodies after removing invalid lines
-        # If a method becomes empty (only has pass or comments), add a pass statement
-        import re
-        
-        # Find method definitions and check if they're empty
-        method_pattern = r'(def\s+\w+\([^)]*\):\s*)((?:\s*#.*\n)*)\s*$'
-        def fix_empty_method(match):
-            method_def = match.group(1)
-            comments = match.group(2) if match.group(2) else ""
-            # If there are only comments or nothing after the method definition, add pass
-            if not comments.strip() or all(line.strip().startswith('#') or not line.strip() for line in comments.split('\n')):
-                return method_def + '\n' + comments + '        pass\n'
-            return match.group(0)
-        
-        fixed_code = re.sub(method_pattern, fix_empty_method, fixed_code, flags=re.MULTILINE)
-        
-        # Ensure we have proper imports
-        if 'from manim import *' not in fixed_code:
-            fixed_code = 'from manim import *\n\n' + fixed_code
-        
-        # Final syntax validation
-        try:
-            import ast
-            ast.parse(fixed_code)
-            print("✅ Final syntax validation passed")
-        except SyntaxError as e:
-            print("❌ Final syntax error detected: {}".format(e.msg))
-            print("   Problem line {}: {}".format(e.lineno, e.text))
-            # Try one more aggressive fix
-            fixed_code = self._emergency_syntax_fix(fixed_code, e)
-        
+        fixes = []
+        fixed_code = repair_manim_code(code, fixes)
+        for fix in fixes:
+            print("🔧 {}".format(fix))
+        print("✅ Code validation complete")
         return fixed_code
 
     def _fix_syntax_errors(self, code):
@@ -2868,170 +1096,7 @@ Human Request: {human_input}"""
         Returns:
             str: Code with syntax errors fixed
         """
-        if not code:
-            return code
-        
-        import re
-        import ast
-        
-        print("🔧 Starting comprehensive syntax error fixing...")
-        
-        # Step 1: Fix orphaned lines and incomplete Text declarations
-        lines = code.split('\n')
-        fixed_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith('#'):
-                fixed_lines.append(line)
-                i += 1
-                continue
-            
-            # Detect orphaned method calls (lines that start with parameters or method calls)
-            if stripped.startswith(('font_size=', 'color=', '.shift(', '.scale(', '.rotate(')):
-                print("🔧 Removing orphaned line {}: {}".format(i+1, stripped))
-                # Skip this line entirely as it's a broken continuation
-                i += 1
-                continue
-            
-            # Fix the main problematic pattern: Text("text",.shift(
-            if 'Text(' in line and '",' in line and any(method in line for method in ['.shift(', '.scale(', '.rotate(']):
-                # Pattern: Text("some text",.shift(UP*1) -> Text("some text").shift(UP*1)
-                original_line = line
-                # Fix comma before method calls
-                line = re.sub(r'Text\("([^"]*)",\s*\.(shift|scale|rotate|set_color)\(', r'Text("\1").\2(', line)
-                if line != original_line:
-                    print("🔧 Fixed Text+comma+method pattern: {}".format(line.strip()))
-            
-            # Fix pattern: Text("text"), .method( -> Text("text").method(
-            if 'Text(' in line and '"), .' in line:
-                original_line = line
-                line = re.sub(r'Text\("([^"]*)"\),\s*\.(shift|scale|rotate|set_color)\(', r'Text("\1").\2(', line)
-                if line != original_line:
-                    print("🔧 Fixed Text+closing+comma+method pattern: {}".format(line.strip()))
-            
-            # Fix incomplete Text declarations that may span multiple lines
-            if 'Text(' in line and not ')' in line and not line.strip().endswith(','):
-                # This might be an incomplete Text declaration - look ahead
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line.startswith(('font_size=', 'color=')) and ')' in next_line:
-                        # Combine the lines properly
-                        combined = line.rstrip() + ', ' + next_line
-                        # Ensure proper syntax
-                        if combined.count('(') == combined.count(')'):
-                            fixed_lines.append(combined)
-                            print("🔧 Combined incomplete Text declaration: {}".format(combined.strip()))
-                            i += 2  # Skip both lines
-                            continue
-            
-            # Handle missing closing parentheses
-            if 'Text(' in line and line.count('(') > line.count(')'):
-                missing_parens = line.count('(') - line.count(')')
-                original_line = line
-                line = line.rstrip() + ')' * missing_parens
-                if line != original_line:
-                    print("🔧 Added {} missing closing parenthesis(es): {}".format(missing_parens, line.strip()))
-            
-            fixed_lines.append(line)
-            i += 1
-        
-        # Rebuild the code
-        code = '\n'.join(fixed_lines)
-        
-        # Step 2: Apply regex-based fixes
-        print("🔧 Applying regex-based syntax fixes...")
-        
-        # Fix patterns in order of complexity
-        patterns_and_fixes = [
-            # Fix Text("text",.shift() patterns
-            (r'Text\("([^"]*)",\s*\.shift\(', r'Text("\1").shift('),
-            (r'Text\("([^"]*)",\s*\.scale\(', r'Text("\1").scale('),
-            (r'Text\("([^"]*)",\s*\.rotate\(', r'Text("\1").rotate('),
-            
-            # Fix trailing commas before method calls
-            (r'",\s*\.(shift|scale|rotate|set_color)\(', r'").\1('),
-            
-            # Fix double commas
-            (r',,+', ','),
-            
-            # Fix spaces around operators
-            (r'\s+\.', '.'),
-            
-            # Fix missing closing parentheses at end of lines
-            (r'Text\([^)]*$', lambda m: m.group(0) + ')'),
-        ]
-        
-        for pattern, replacement in patterns_and_fixes:
-            if callable(replacement):
-                code = re.sub(pattern, replacement, code)
-            else:
-                code = re.sub(pattern, replacement, code)
-        
-        # Step 3: Final syntax validation and targeted fixes
-        try:
-            ast.parse(code)
-            print("✅ Syntax validation passed")
-        except SyntaxError as e:
-            print("⚠️ Syntax error detected at line {}: {}".format(e.lineno, e.msg))
-            
-            if e.lineno and e.text:
-                lines = code.split('\n')
-                if 0 < e.lineno <= len(lines):
-                    problem_line_index = e.lineno - 1
-                    problem_line = lines[problem_line_index]
-                    
-                    print("   Problem line: {}".format(problem_line.strip()))
-                    
-                    # Apply targeted fixes based on error type
-                    if isinstance(e, IndentationError):
-                        if "unexpected indent" in e.msg.lower():
-                            # Remove unexpected indentation
-                            fixed_line = problem_line.lstrip()
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Removed unexpected indentation: {}".format(fixed_line.strip()))
-                        elif "expected an indented block" in e.msg.lower():
-                            # Add proper indentation
-                            fixed_line = "    " + problem_line
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Added expected indentation: {}".format(fixed_line.strip()))
-                    
-                    elif 'invalid syntax' in e.msg.lower():
-                        # Handle specific syntax issues
-                        if problem_line.count('(') > problem_line.count(')'):
-                            # Missing closing parentheses
-                            missing = problem_line.count('(') - problem_line.count(')')
-                            fixed_line = problem_line + ')' * missing
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Added {} missing closing parentheses".format(missing))
-                        
-                        elif ',.' in problem_line:
-                            # Fix comma-dot patterns
-                            fixed_line = problem_line.replace(',.', '.')
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Fixed comma-dot pattern: {}".format(fixed_line.strip()))
-                    
-                    # Rebuild and try again
-                    code = '\n'.join(lines)
-                    
-                    try:
-                        ast.parse(code)
-                        print("✅ Syntax error fixed successfully")
-                    except SyntaxError as e2:
-                        print("❌ Could not fix syntax error: {}".format(e2.msg))
-                        # Add error comment but keep the code
-                        error_comment = "# SYNTAX ERROR: {} at line {}\n".format(e.msg, e.lineno)
-                        code = error_comment + code
-            else:
-                print("❌ Syntax error without line information: {}".format(e.msg))
-                error_comment = "# SYNTAX ERROR: {}\n".format(e.msg)
-                code = error_comment + code
-        
-        return code
+        return repair_syntax(code)
 
     def _emergency_syntax_fix(self, code, syntax_error):
         """
@@ -3044,71 +1109,7 @@ Human Request: {human_input}"""
         Returns:
             str: Code with emergency fixes applied
         """
-        if not syntax_error.lineno or not syntax_error.text:
-            return code
-        
-        lines = code.split('\n')
-        if syntax_error.lineno > len(lines):
-            return code
-        
-        problem_line = lines[syntax_error.lineno - 1]
-        print("🚨 Emergency syntax fix for line {}: {}".format(syntax_error.lineno, problem_line.strip()))
-        
-        # Common emergency fixes
-        fixed_line = problem_line
-        
-        # Fix the specific pattern we keep seeing
-        if 'Text(' in problem_line and '",' in problem_line and '.shift(' in problem_line:
-            # Pattern: Text("text",.shift(UP*1) -> Text("text").shift(UP*1)
-            fixed_line = re.sub(r'Text\("([^"]*)",\s*\.shift\(([^)]*)\)', r'Text("\1").shift(\2)', problem_line)
-            print("🔧 Emergency fix applied: {}".format(fixed_line.strip()))
-        
-        # Fix missing closing parentheses
-        elif problem_line.count('(') > problem_line.count(')'):
-            missing = problem_line.count('(') - problem_line.count(')')
-            fixed_line = problem_line.rstrip() + ')' * missing
-            print("🔧 Emergency fix: added {} closing parentheses".format(missing))
-        
-        # Fix missing opening parentheses (rare)
-        elif problem_line.count(')') > problem_line.count('('):
-            # Find where to add opening parentheses (usually after =)
-            if '=' in problem_line and 'Text(' in problem_line:
-                parts = problem_line.split('=', 1)
-                if len(parts) == 2:
-                    fixed_line = parts[0] + '= Text(' + parts[1].lstrip().lstrip('Text(')
-                    print("🔧 Emergency fix: added opening parenthesis")
-        
-        # Fix malformed quotes
-        elif problem_line.count('"') % 2 == 1:
-            # Odd number of quotes - add one at the end of the string content
-            if 'Text(' in problem_line:
-                # Find the last quote and add a closing one
-                last_quote_pos = problem_line.rfind('"')
-                if last_quote_pos > 0 and last_quote_pos < len(problem_line) - 1:
-                    # Check if we need to add quote before comma or other punctuation
-                    next_char_pos = last_quote_pos + 1
-                    if next_char_pos < len(problem_line) and problem_line[next_char_pos] in ',.):':
-                        fixed_line = problem_line[:last_quote_pos + 1] + '"' + problem_line[next_char_pos:]
-                        print("🔧 Emergency fix: added missing quote")
-        
-        # Apply the fix if we made one
-        if fixed_line != problem_line:
-            lines[syntax_error.lineno - 1] = fixed_line
-            fixed_code = '\n'.join(lines)
-            
-            # Test if the fix worked
-            try:
-                import ast
-                ast.parse(fixed_code)
-                print("✅ Emergency fix successful!")
-                return fixed_code
-            except SyntaxError as e2:
-                print("❌ Emergency fix failed: {}".format(e2.msg))
-                # Return original code with a comment about the error
-                return "# SYNTAX ERROR DETECTED: {}\n# LINE {}: {}\n\n".format(syntax_error.msg, syntax_error.lineno, syntax_error.text) + code
-        
-        # If no fix was applied, return original with error comment
-        return "# SYNTAX ERROR DETECTED: {}\n# LINE {}: {}\n\n".format(syntax_error.msg, syntax_error.lineno, syntax_error.text) + code
+        return fix_syntax_error(code, syntax_error)
 
 # Initialize the Manim code generator
 GOOGLE_API_KEY = os.getenv('GOOGLE_GENERATIVE_AI_API_KEY')
@@ -0,0 +1,540 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class ManimExample:
+    """A reference scene offered to the code generator, with retrieval tags"""
+    name: str
+    description: str
+    tags: Tuple[str, ...]
+    code: str
+
+
+# Reference scenes from the Manim example gallery; the prompt includes only the ones relevant to a plan
+MANIM_EXAMPLES = [
+    ManimExample(
+        name="BraceAnnotation",
+        description="Annotating geometric elements",
+        tags=("geometry", "distance", "line", "segment", "annotation", "brace", "label", "measurement"),
+        code=r"""from manim import *
+
+class BraceAnnotation(Scene):
+    def construct(self):
+        dot = Dot([-2, -1, 0])
+        dot2 = Dot([2, 1, 0])
+        line = Line(dot.get_center(), dot2.get_center()).set_color(ORANGE)
+        b1 = Brace(line)
+        b1text = b1.get_text("Horizontal distance")
+        b2 = Brace(line, direction=line.copy().rotate(PI / 2).get_unit_vector())
+        b2text = b2.get_tex("x-x_1")
+        self.add(line, dot, dot2, b1, b2, b1text, b2text)""",
+    ),
+    ManimExample(
+        name="VectorArrow",
+        description="Coordinate system visualization",
+        tags=("vector", "arrow", "coordinate", "plane", "axes", "physics", "force", "velocity", "direction"),
+        code=r"""from manim import *
+
+class VectorArrow(Scene):
+    def construct(self):
+        dot = Dot(ORIGIN)
+        arrow = Arrow(ORIGIN, [2, 2, 0], buff=0)
+        numberplane = NumberPlane()
+        origin_text = Text('(0, 0)').next_to(dot, DOWN)
+        tip_text = Text('(2, 2)').next_to(arrow.get_end(), RIGHT)
+        self.add(numberplane, dot, arrow, origin_text, tip_text)""",
+    ),
+    ManimExample(
+        name="BooleanOperations",
+        description="Interactive shape operations",
+        tags=("sets", "union", "intersection", "difference", "logic", "venn", "diagram", "shapes", "ellipse"),
+        code=r"""from manim import *
+
+class BooleanOperations(Scene):
+    def construct(self):
+        ellipse1 = Ellipse(
+            width=4.0, height=5.0, fill_opacity=0.5, color=BLUE, stroke_width=10
+        ).move_to(LEFT)
+        ellipse2 = ellipse1.copy().set_color(color=RED).move_to(RIGHT)
+        bool_ops_text = MarkupText("<u>Boolean Operation</u>").next_to(ellipse1, UP * 3)
+        ellipse_group = Group(bool_ops_text, ellipse1, ellipse2).move_to(LEFT * 3)
+        self.play(FadeIn(ellipse_group))
+
+        i = Intersection(ellipse1, ellipse2, color=GREEN, fill_opacity=0.5)
+        self.play(i.animate.scale(0.25).move_to(RIGHT * 5 + UP * 2.5))
+        intersection_text = Text("Intersection", font_size=23).next_to(i, UP)
+        self.play(FadeIn(intersection_text))
+
+        u = Union(ellipse1, ellipse2, color=ORANGE, fill_opacity=0.5)
+        union_text = Text("Union", font_size=23)
+        self.play(u.animate.scale(0.3).next_to(i, DOWN, buff=union_text.height * 3))
+        union_text.next_to(u, UP)
+        self.play(FadeIn(union_text))""",
+    ),
+    ManimExample(
+        name="PointMovingOnShapes",
+        description="Path animations and transformations",
+        tags=("motion", "path", "circle", "rotation", "orbit", "trajectory", "dot", "moving", "circular"),
+        code=r"""from manim import *
+
+class PointMovingOnShapes(Scene):
+    def construct(self):
+        circle = Circle(radius=1, color=BLUE)
+        dot = Dot()
+        dot2 = dot.copy().shift(RIGHT)
+        self.add(dot)
+
+        line = Line([3, 0, 0], [5, 0, 0])
+        self.add(line)
+
+        self.play(GrowFromCenter(circle))
+        self.play(Transform(dot, dot2))
+        self.play(MoveAlongPath(dot, circle), run_time=2, rate_func=linear)
+        self.play(Rotating(dot, about_point=[2, 0, 0]), run_time=1.5)
+        self.wait()""",
+    ),
+    ManimExample(
+        name="MovingAround",
+        description="Object transformations with animate",
+        tags=("transform", "shift", "scale", "rotate", "animate", "square", "color", "movement"),
+        code=r"""from manim import *
+
+class MovingAround(Scene):
+    def construct(self):
+        square = Square(color=BLUE, fill_opacity=1)
+
+        self.play(square.animate.shift(LEFT))
+        self.play(square.animate.set_fill(ORANGE))
+        self.play(square.animate.scale(0.3))
+        self.play(square.animate.rotate(0.4))""",
+    ),
+    ManimExample(
+        name="MovingAngle",
+        description="Dynamic angle measurement with updaters",
+        tags=("angle", "trigonometry", "geometry", "rotation", "updater", "tracker", "theta", "lines"),
+        code=r"""from manim import *
+
+class MovingAngle(Scene):
+    def construct(self):
+        rotation_center = LEFT
+
+        theta_tracker = ValueTracker(110)
+        line1 = Line(LEFT, RIGHT)
+        line_moving = Line(LEFT, RIGHT)
+        line_ref = line_moving.copy()
+        line_moving.rotate(
+            theta_tracker.get_value() * DEGREES, about_point=rotation_center
+        )
+        a = Angle(line1, line_moving, radius=0.5, other_angle=False)
+        tex = MathTex(r"\theta").move_to(
+            Angle(
+                line1, line_moving, radius=0.5 + 3 * SMALL_BUFF, other_angle=False
+            ).point_from_proportion(0.5)
+        )
+
+        self.add(line1, line_moving, a, tex)
+        self.wait()
+
+        line_moving.add_updater(
+            lambda x: x.become(line_ref.copy()).rotate(
+                theta_tracker.get_value() * DEGREES, about_point=rotation_center
+            )
+        )
+
+        a.add_updater(
+            lambda x: x.become(Angle(line1, line_moving, radius=0.5, other_angle=False))
+        )
+        tex.add_updater(
+            lambda x: x.move_to(
+                Angle(
+                    line1, line_moving, radius=0.5 + 3 * SMALL_BUFF, other_angle=False
+                ).point_from_proportion(0.5)
+            )
+        )
+
+        self.play(theta_tracker.animate.set_value(40))
+        self.play(theta_tracker.animate.increment_value(140))
+        self.play(tex.animate.set_color(RED), run_time=0.5)
+        self.play(theta_tracker.animate.set_value(350))""",
+    ),
+    ManimExample(
+        name="MovingDots",
+        description="Connected objects with updaters",
+        tags=("updater", "connection", "dots", "line", "network", "graph", "tracker", "linked"),
+        code=r"""from manim import *
+
+class MovingDots(Scene):
+    def construct(self):
+        d1,d2=Dot(color=BLUE),Dot(color=GREEN)
+        dg=VGroup(d1,d2).arrange(RIGHT,buff=1)
+        l1=Line(d1.get_center(),d2.get_center()).set_color(RED)
+        x=ValueTracker(0)
+        y=ValueTracker(0)
+        d1.add_updater(lambda z: z.set_x(x.get_value()))
+        d2.add_updater(lambda z: z.set_y(y.get_value()))
+        l1.add_updater(lambda z: z.become(Line(d1.get_center(),d2.get_center())))
+        self.add(d1,d2,l1)
+        self.play(x.animate.set_value(5))
+        self.play(y.animate.set_value(4))
+        self.wait()""",
+    ),
+    ManimExample(
+        name="MovingFrameBox",
+        description="Highlighting mathematical expressions",
+        tags=("equation", "formula", "highlight", "derivative", "calculus", "algebra", "product", "rule", "box"),
+        code=r"""from manim import *
+
+class MovingFrameBox(Scene):
+    def construct(self):
+        self.play(Write(text))
+        framebox1 = SurroundingRectangle(text[1], buff = .1)
+        framebox2 = SurroundingRectangle(text[3], buff = .1)
+        self.play(Create(framebox1))
+        self.wait()
+        self.play(ReplacementTransform(framebox1,framebox2))
+        self.wait()""",
+    ),
+    ManimExample(
+        name="SinAndCosFunctionPlot",
+        description="Mathematical function plotting",
+        tags=("function", "plot", "graph", "sine", "cosine", "trigonometry", "wave", "periodic", "oscillation", "axes"),
+        code=r"""from manim import *
+
+class SinAndCosFunctionPlot(Scene):
+    def construct(self):
+        axes = Axes(
+            x_range=[-10, 10.3, 1],
+            y_range=[-1.5, 1.5, 1],
+            x_length=10,
+            axis_config={"color": GREEN},
+            x_axis_config={
+                "numbers_to_include": np.arange(-10, 10.01, 2),
+                "numbers_with_elongated_ticks": np.arange(-10, 10.01, 2),
+            },
+            tips=False,
+        )
+        axes_labels = axes.get_axis_labels()
+        sin_graph = axes.plot(lambda x: np.sin(x), color=BLUE)
+        cos_graph = axes.plot(lambda x: np.cos(x), color=RED)
+
+        sin_label = axes.get_graph_label(
+            sin_graph, "\\sin(x)", x_val=-10, direction=UP / 2
+        )
+        cos_label = axes.get_graph_label(cos_graph, label="\\cos(x)")
+
+        vert_line = axes.get_vertical_line(
+            axes.i2gp(TAU, cos_graph), color=YELLOW, line_func=Line
+        )
+        line_label = axes.get_graph_label(
+            cos_graph, r"x=2\pi", x_val=TAU, direction=UR, color=WHITE
+        )
+
+        plot = VGroup(axes, sin_graph, cos_graph, vert_line)
+        labels = VGroup(axes_labels, sin_label, cos_label, line_label)
+        self.add(plot, labels)""",
+    ),
+    ManimExample(
+        name="ArgMinExample",
+        description="Interactive optimization visualization",
+        tags=("optimization", "minimum", "maximum", "function", "graph", "calculus", "gradient", "descent", "parabola", "tracker"),
+        code=r"""from manim import *
+
+class ArgMinExample(Scene):
+    def construct(self):
+        ax = Axes(
+            x_range=[0, 10], y_range=[0, 100, 10], axis_config={"include_tip": False}
+        )
+        labels = ax.get_axis_labels(x_label="x", y_label="f(x)")
+
+        t = ValueTracker(0)
+
+        def func(x):
+            return 2 * (x - 5) ** 2
+        graph = ax.plot(func, color=MAROON)
+
+        initial_point = [ax.coords_to_point(t.get_value(), func(t.get_value()))]
+        dot = Dot(point=initial_point)
+
+        dot.add_updater(lambda x: x.move_to(ax.c2p(t.get_value(), func(t.get_value()))))
+        x_space = np.linspace(*ax.x_range[:2],200)
+        minimum_index = func(x_space).argmin()
+
+        self.add(ax, labels, graph, dot)
+        self.play(t.animate.set_value(x_space[minimum_index]))
+        self.wait()""",
+    ),
+    ManimExample(
+        name="GraphAreaPlot",
+        description="Area under curves and Riemann rectangles",
+        tags=("integral", "area", "curve", "riemann", "rectangles", "calculus", "integration", "sum", "accumulation"),
+        code=r"""from manim import *
+
+class GraphAreaPlot(Scene):
+    def construct(self):
+        ax = Axes(
+            x_range=[0, 5],
+            y_range=[0, 6],
+            x_axis_config={"numbers_to_include": [2, 3]},
+            tips=False,
+        )
+
+        labels = ax.get_axis_labels()
+
+        curve_1 = ax.plot(lambda x: 4 * x - x ** 2, x_range=[0, 4], color=BLUE_C)
+        curve_2 = ax.plot(
+            lambda x: 0.8 * x ** 2 - 3 * x + 4,
+            x_range=[0, 4],
+            color=GREEN_B,
+        )
+
+        line_1 = ax.get_vertical_line(ax.input_to_graph_point(2, curve_1), color=YELLOW)
+        line_2 = ax.get_vertical_line(ax.i2gp(3, curve_1), color=YELLOW)
+
+        riemann_area = ax.get_riemann_rectangles(curve_1, x_range=[0.3, 0.6], dx=0.03, color=BLUE, fill_opacity=0.5)
+        area = ax.get_area(curve_2, [2, 3], bounded_graph=curve_1, color=GREY, opacity=0.5)
+
+        self.add(ax, labels, curve_1, curve_2, line_1, line_2, riemann_area, area)""",
+    ),
+    ManimExample(
+        name="PolygonOnAxes",
+        description="Dynamic polygon areas with value tracking",
+        tags=("area", "rectangle", "hyperbola", "tracker", "axes", "polygon", "geometry", "dynamic"),
+        code=r"""from manim import *
+
+class PolygonOnAxes(Scene):
+    def get_rectangle_corners(self, bottom_left, top_right):
+        return [
+            (top_right[0], top_right[1]),
+            (bottom_left[0], top_right[1]),
+            (bottom_left[0], bottom_left[1]),
+            (top_right[0], bottom_left[1]),
+        ]
+
+    def construct(self):
+        ax = Axes(
+            x_range=[0, 10],
+            y_range=[0, 10],
+            x_length=6,
+            y_length=6,
+            axis_config={"include_tip": False},
+        )
+
+        t = ValueTracker(5)
+        k = 25
+
+        graph = ax.plot(
+            lambda x: k / x,
+            color=YELLOW_D,
+            x_range=[k / 10, 10.0, 0.01],
+            use_smoothing=False,
+        )
+
+        def get_rectangle():
+            polygon = Polygon(
+                *[
+                    ax.c2p(*i)
+                    for i in self.get_rectangle_corners(
+                        (0, 0), (t.get_value(), k / t.get_value())
+                    )
+                ]
+            )
+            polygon.stroke_width = 1
+            polygon.set_fill(BLUE, opacity=0.5)
+            polygon.set_stroke(YELLOW_B)
+            return polygon
+
+        polygon = always_redraw(get_rectangle)
+
+        dot = Dot()
+        dot.add_updater(lambda x: x.move_to(ax.c2p(t.get_value(), k / t.get_value())))
+        dot.set_z_index(10)
+
+        self.add(ax, graph, dot)
+        self.play(Create(polygon))
+        self.play(t.animate.set_value(10))
+        self.play(t.animate.set_value(k / 10))
+        self.play(t.animate.set_value(5))""",
+    ),
+    ManimExample(
+        name="HeatDiagramPlot",
+        description="Scientific data visualization",
+        tags=("data", "temperature", "heat", "thermodynamics", "chemistry", "physics", "line", "graph", "experiment", "phase", "change", "energy"),
+        code=r"""from manim import *
+
+class HeatDiagramPlot(Scene):
+    def construct(self):
+        ax = Axes(
+            x_range=[0, 40, 5],
+            y_range=[-8, 32, 5],
+            x_length=9,
+            y_length=6,
+            x_axis_config={"numbers_to_include": np.arange(0, 40, 5)},
+            y_axis_config={"numbers_to_include": np.arange(-5, 34, 5)},
+            tips=False,
+        )
+        labels = ax.get_axis_labels(
+            x_label=Tex(r"$\Delta Q$"), y_label=Tex(r"T[$^\circ C$]")
+        )
+
+        x_vals = [0, 8, 38, 39]
+        y_vals = [20, 0, 0, -5]
+        graph = ax.plot_line_graph(x_values=x_vals, y_values=y_vals)
+
+        self.add(ax, labels, graph)""",
+    ),
+    ManimExample(
+        name="FollowingGraphCamera",
+        description="Advanced camera movements",
+        tags=("camera", "zoom", "graph", "follow", "motion", "curve", "tracking"),
+        code=r"""from manim import *
+
+class FollowingGraphCamera(MovingCameraScene):
+    def construct(self):
+        self.camera.frame.save_state()
+
+        # create the axes and the curve
+        ax = Axes(x_range=[-1, 10], y_range=[-1, 10])
+        graph = ax.plot(lambda x: np.sin(x), color=BLUE, x_range=[0, 3 * PI])
+
+        # create dots based on the graph
+        moving_dot = Dot(ax.i2gp(graph.t_min, graph), color=ORANGE)
+        dot_1 = Dot(ax.i2gp(graph.t_min, graph))
+        dot_2 = Dot(ax.i2gp(graph.t_max, graph))
+
+        self.add(ax, graph, dot_1, dot_2, moving_dot)
+        self.play(self.camera.frame.animate.scale(0.5).move_to(moving_dot))
+
+        def update_curve(mob):
+            mob.move_to(moving_dot.get_center())
+
+        self.camera.frame.add_updater(update_curve)
+        self.play(MoveAlongPath(moving_dot, graph, rate_func=linear))
+        self.camera.frame.remove_updater(update_curve)
+
+        self.play(Restore(self.camera.frame))""",
+    ),
+    ManimExample(
+        name="ThreeDSurfacePlot",
+        description="3D mathematical surfaces",
+        tags=("3d", "surface", "gaussian", "distribution", "probability", "statistics", "three", "dimensional"),
+        code=r"""from manim import *
+
+class ThreeDSurfacePlot(ThreeDScene):
+    def construct(self):
+        resolution_fa = 24
+        self.set_camera_orientation(phi=75 * DEGREES, theta=-30 * DEGREES)
+
+        def param_gauss(u, v):
+            x = u
+            y = v
+            sigma, mu = 0.4, [0.0, 0.0]
+            d = np.linalg.norm(np.array([x - mu[0], y - mu[1]]))
+            z = np.exp(-(d ** 2 / (2.0 * sigma ** 2)))
+            return np.array([x, y, z])
+
+        gauss_plane = Surface(
+            param_gauss,
+            resolution=(resolution_fa, resolution_fa),
+            v_range=[-2, +2],
+            u_range=[-2, +2]
+        )
+
+        gauss_plane.scale(2, about_point=ORIGIN)
+        gauss_plane.set_style(fill_opacity=1,stroke_color=GREEN)
+        gauss_plane.set_fill_by_checkerboard(ORANGE, BLUE, opacity=0.5)
+        axes = ThreeDAxes()
+        self.add(axes,gauss_plane)""",
+    ),
+]
+
+# General animation guidance that followed the gallery; included when the token budget allows
+INSPIRATION_GUIDANCE = """🎓 REAL MANIM ANIMATION INSPIRATION GUIDANCE:
+
+Study these examples to understand how REAL Manim animations are constructed:
+
+🔥 PROFESSIONAL ANIMATION PATTERNS:
+1. **Unit Circle to Sine Wave Connection (Example 16)**: Shows how mathematical concepts are visually connected through animated relationships. The moving dot creates the sine curve in real-time, demonstrating the fundamental connection between circular motion and trigonometric functions.
+
+2. **LaTeX Integration and Grid Transformations (Example 17)**: Demonstrates sophisticated text handling with LaTeX, smooth transitions between concepts, and advanced grid manipulations. Shows how to create engaging mathematical content with proper staging.
+
+3. **3D Scene Management (Example 18)**: Illustrates how to handle 3D scenes with camera controls, rotation effects, and depth perception. Essential for advanced mathematical visualizations.
+
+🎯 KEY PROFESSIONAL TECHNIQUES TO EMULATE:
+
+**Dynamic Curve Generation**: Like SineCurveUnitCircle, create curves that build over time using updaters and always_redraw(). This technique is perfect for showing how mathematical relationships develop.
+
+**Multi-Stage Scene Flow**: Like OpeningManim, structure animations in distinct phases with clear transitions. Use Transform() to evolve concepts and FadeOut() to clear space for new ideas.
+
+**Custom Updater Functions**: Implement sophisticated updater patterns that respond to changing values. Use lambda functions and class methods to create responsive animations.
+
+**Mathematical Storytelling**: Connect abstract concepts to visual representations. Show the "why" and "how" behind mathematical relationships through animated demonstrations.
+
+**Progressive Complexity Building**: Start with simple elements and gradually add complexity. Transform basic shapes into complex mathematical objects through smooth animations.
+
+**Real-Time Curve Drawing**: Use VGroup() and line additions to create curves that draw themselves. Perfect for showing function behavior and mathematical relationships.
+
+**Advanced Positioning Systems**: Use custom coordinate systems and relative positioning. Create your own reference points and build layouts around them.
+
+**Smooth Transition Management**: Master the art of clearing scenes and introducing new content without jarring jumps. Use fadeouts, transformations, and staged reveals.
+
+🎨 VISUAL STORYTELLING PRINCIPLES FROM EXAMPLES:
+
+**Cause and Effect Demonstration**: Show how one mathematical element affects another through connected animations. The unit circle example perfectly demonstrates this.
+
+**Progressive Disclosure**: Reveal mathematical complexity gradually. Don't overwhelm with too much information at once.
+
+**Visual Metaphor Integration**: Use familiar geometric shapes to represent abstract concepts, then transform them to show mathematical relationships.
+
+**Interactive-Style Responsiveness**: Create animations that feel like they're responding to an instructor's explanation. Use pauses, emphasis, and callbacks effectively.
+
+**Mathematical Proof Through Animation**: Use visual demonstrations to prove mathematical statements. Show rather than just tell.
+
+🎓 KEY PATTERNS FROM ALL EXAMPLES:
+- Use ValueTracker() for dynamic values that change over time
+- Implement .add_updater() for objects that need to update automatically  
+- Use always_redraw() for objects that need constant redrawing
+- Combine VGroup() to manage multiple related objects
+- Apply .animate for smooth transformations
+- Use proper positioning with .next_to(), .move_to(), .shift()
+- Create custom functions for complex mathematical visualizations
+- Use axes.plot() for mathematical functions and axes.get_area() for regions
+- Implement SurroundingRectangle() for highlighting elements
+- Use Text() for ALL text elements including mathematical expressions
+- Convert formulas to readable text (e.g., "x^2 + y^2 = r^2")
+- NO LaTeX, MathTex, or Tex objects allowed
+- Apply proper color schemes and opacity for visual clarity
+- Use .set_z_index() to control layering of objects
+- Master custom updater functions for real-time curve generation
+- Use multi-stage scene management with clear transitions
+- Implement progressive complexity building through transformations
+- Create mathematical storytelling through connected visual elements
+- Use 3D scene management for advanced visualizations
+- Apply non-linear transformations to demonstrate mathematical concepts
+- Implement real-time drawing techniques for dynamic mathematical relationships
+- Use LaTeX integration for professional mathematical notation
+- Create custom coordinate systems and positioning frameworks
+- Master smooth transition management between complex scenes
+
+💡 INSPIRATION FOR YOUR ANIMATIONS:
+Draw inspiration from these professional examples to create animations that:
+- Build mathematical intuition through visual connections
+- Use sophisticated animation techniques like real-time curve generation
+- Create smooth, professional transitions between concepts
+- Integrate multiple mathematical elements into cohesive visual stories
+- Use advanced positioning and layout systems for optimal presentation
+- Implement progressive complexity that guides understanding
+- Create memorable visual metaphors that reinforce learning
+- Use interactive-style pacing that feels responsive and engaging"""
+
+
+EXAMPLES_GALLERY_HEADER = """📚 PROFESSIONAL MANIM EXAMPLES GALLERY:
+Study these high-quality examples for code patterns and techniques:"""
+
+
+def format_example(example: ManimExample, number: int) -> str:
+    """Render one example as it appears in the prompt's example gallery."""
+    return f"""Example {number}: {example.name} - {example.description}
+```python
+{example.code}
+```"""
@@ -0,0 +1,314 @@
+import ast
+import difflib
+import inspect
+import logging
+import threading
+from functools import lru_cache
+
+from .code_validation import ValidationIssue, validate_manim_code
+
+logger = logging.getLogger(__name__)
+
+# Scene helpers LLMs invent, rewritten to the real API (argument is the color)
+BACKGROUND_METHODS = {"set_background", "set_background_color", "background_color"}
+
+# LaTeX text mobjects that can be rewritten as Text without losing the content
+LATEX_TEXT_MOBJECTS = {"MathTex", "Tex", "SingleStringMathTex", "Title"}
+
+# Color names LLMs commonly use that manim does not export
+COLOR_ALIASES = {
+    "LIGHT_BLUE": "BLUE_B",
+    "LIGHT_GREEN": "GREEN_B",
+    "DARK_GREEN": "GREEN_E",
+    "LIGHT_RED": "RED_B",
+    "DARK_RED": "RED_E",
+    "LIGHT_PURPLE": "PURPLE_B",
+    "DARK_PURPLE": "PURPLE_E",
+    "LIGHT_YELLOW": "YELLOW_B",
+    "DARK_YELLOW": "YELLOW_E",
+    "LIGHT_ORANGE": "ORANGE",
+    "DARK_ORANGE": "ORANGE",
+    "CYAN": "TEAL",
+    "MAGENTA": "PINK",
+    "VIOLET": "PURPLE",
+    "LIME": "GREEN_A",
+    "NAVY": "DARK_BLUE",
+    "SILVER": "LIGHT_GRAY",
+    "GREY": "GRAY",
+    "LIGHT_GREY": "LIGHT_GRAY",
+    "DARK_GREY": "DARK_GRAY",
+}
+
+# Upper bound on fix/re-parse iterations for one piece of code
+MAX_FIXES = 50
+
+
+class ManimAPI:
+    """Names, scene methods and constructor keywords introspected from the installed manim package"""
+
+    def __init__(self, module):
+        self.module = module
+        self.names = set(dir(module))
+        self.classes = {name: obj for name, obj in vars(module).items() if inspect.isclass(obj)}
+        color_type = getattr(module, "ManimColor", None)
+        self.colors = {
+            name for name in self.names
+            if name.isupper() and (isinstance(getattr(module, name), str)
+                                   or (color_type is not None and isinstance(getattr(module, name), color_type)))
+        }
+
+    def scene_attributes(self, base_name):
+        scene_class = self.classes.get(base_name) or self.classes.get("Scene")
+        return set(dir(scene_class)) if scene_class else set()
+
+    @lru_cache(maxsize=None)
+    def accepted_kwargs(self, class_name):
+        """
+        Keyword arguments a manim class constructor accepts, following **kwargs up the MRO.
+
+        Returns:
+            set: Accepted keyword names, or None if the constructor accepts anything
+        """
+        cls = self.classes.get(class_name)
+        if cls is None:
+            return None
+
+        accepted = set()
+        for klass in cls.__mro__:
+            if "__init__" not in vars(klass) or klass is object:
+                continue
+            try:
+                parameters = inspect.signature(klass.__init__).parameters.values()
+            except (TypeError, ValueError):
+                return None
+            accepted.update(p.name for p in parameters if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY))
+            if not any(p.kind == p.VAR_KEYWORD for p in parameters):
+                return accepted
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_manim_api():
+    """Introspect the installed manim package once; None if manim is not importable."""
+    try:
+        import manim
+    except ImportError:
+        logger.warning("manim is not importable; Manim API lint is disabled")
+        return None
+    return ManimAPI(manim)
+
+
+class _Lint:
+    """One lint pass over parsed code: issues plus the first applicable fix"""
+
+    def __init__(self, api, tree):
+        self.api = api
+        self.tree = tree
+        self.issues = []
+        # (node, replacement source, issue) for every auto-fixable problem
+        self.fixes = []
+
+    def run(self):
+        defined = _bound_names(self.tree)
+        for scene in _scene_classes(self.tree):
+            self._check_scene_calls(scene, defined)
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+                self._check_constructor(node)
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                self._check_constant(node, defined)
+        return self
+
+    def _issue(self, node, message, fixable):
+        issue = ValidationIssue(node.lineno, node.col_offset, message, kind="lint",
+                                severity="fixed" if fixable else "error")
+        self.issues.append(issue)
+        return issue
+
+    def _check_scene_calls(self, scene, defined):
+        base_name = next((b.id for b in scene.bases if isinstance(b, ast.Name)), "Scene")
+        # Functions defined anywhere in the module cover helper mixin classes
+        known = self.api.scene_attributes(base_name) | _scene_defined_attributes(scene) | defined
+
+        for statement in ast.walk(scene):
+            if not isinstance(statement, ast.Expr):
+                continue
+            call = statement.value
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                    and isinstance(call.func.value, ast.Name) and call.func.value.id == "self"):
+                continue
+            method = call.func.attr
+            if method in known:
+                continue
+            if method in BACKGROUND_METHODS and len(call.args) == 1:
+                issue = self._issue(call, f"Scene has no method '{method}'; use self.camera.background_color", True)
+                self.fixes.append((statement, f"self.camera.background_color = {ast.unparse(call.args[0])}", issue))
+            else:
+                self._issue(call, f"Scene has no method '{method}'", False)
+
+    def _check_constructor(self, call):
+        name = call.func.id
+        if name in LATEX_TEXT_MOBJECTS:
+            issue = self._issue(call, f"{name} requires LaTeX; replaced with Text", True)
+            self.fixes.append((call, ast.unparse(self._latex_to_text(call)), issue))
+            return
+
+        accepted = self.api.accepted_kwargs(name)
+        if accepted is None:
+            return
+        invalid = [kw for kw in call.keywords if kw.arg is not None and kw.arg not in accepted]
+        if invalid:
+            names = ", ".join(kw.arg for kw in invalid)
+            issue = self._issue(call, f"{name}() does not accept keyword(s): {names}", True)
+            fixed = ast.Call(func=call.func, args=call.args, keywords=[kw for kw in call.keywords if kw not in invalid])
+            self.fixes.append((call, ast.unparse(fixed), issue))
+
+    def _latex_to_text(self, call):
+        strings = [arg.value for arg in call.args if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+        if strings:
+            text = " ".join(strings).replace("\\", "").replace("{", "").replace("}", "")
+            args = [ast.Constant(text)]
+        else:
+            args = call.args[:1]
+        accepted = self.api.accepted_kwargs("Text")
+        keywords = [kw for kw in call.keywords if accepted is None or kw.arg is None or kw.arg in accepted]
+        return ast.Call(func=ast.Name("Text", ast.Load()), args=args, keywords=keywords)
+
+    def _check_constant(self, node, defined):
+        name = node.id
+        if not name.isupper() or name in self.api.names or name in defined:
+            return
+        replacement = COLOR_ALIASES.get(name)
+        if replacement not in self.api.names:
+            matches = difflib.get_close_matches(name, self.api.colors, n=1, cutoff=0.8)
+            replacement = matches[0] if matches else None
+        if replacement:
+            issue = self._issue(node, f"Undefined constant '{name}'; replaced with {replacement}", True)
+            self.fixes.append((node, replacement, issue))
+        else:
+            self._issue(node, f"Undefined constant '{name}'", False)
+
+
+def _scene_classes(tree):
+    return [
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and any("Scene" in ast.unparse(base) for base in node.bases)
+    ]
+
+
+def _scene_defined_attributes(scene):
+    """Methods defined on the scene class plus attributes assigned through self."""
+    attributes = {item.name for item in scene.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    for node in ast.walk(scene):
+        if (isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name) and node.value.id == "self"):
+            attributes.add(node.attr)
+    return attributes
+
+
+def _bound_names(tree):
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+    return names
+
+
+def _replace_node(code, node, replacement):
+    """Replace a node's exact source span (AST columns are UTF-8 byte offsets)."""
+    lines = code.splitlines(keepends=True)
+    start_line = lines[node.lineno - 1].encode("utf-8")
+    end_line = lines[node.end_lineno - 1].encode("utf-8")
+    before = start_line[:node.col_offset].decode("utf-8")
+    after = end_line[node.end_col_offset:].decode("utf-8")
+    return "".join(lines[:node.lineno - 1]) + before + replacement + after + "".join(lines[node.end_lineno:])
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "fixes_applied": 0,
+    "codes_auto_fixed": 0,
+    "llm_fix_calls_avoided": 0,
+}
+
+
+def lint_manim_code(manim_code):
+    """
+    Lint Manim code against the installed manim API without changing it.
+
+    Returns:
+        list: ValidationIssue objects (severity 'fixed' marks auto-fixable issues)
+    """
+    api = get_manim_api()
+    if api is None:
+        return []
+    try:
+        tree = ast.parse(manim_code)
+    except SyntaxError:
+        return []
+    return _Lint(api, tree).run().issues
+
+
+def lint_and_fix_manim_code(manim_code):
+    """
+    Lint Manim code and apply every available auto-fix.
+
+    Fixes are applied one at a time with a re-parse in between, so nested
+    fixes never overlap. Code that had lint errors and comes out with no lint
+    or validation issues counts as one avoided LLM repair round.
+
+    Args:
+        manim_code (str): Manim Python code
+
+    Returns:
+        tuple: (fixed_code, report) where report has 'fixed' and 'remaining' issue lists
+    """
+    report = {"fixed": [], "remaining": []}
+    api = get_manim_api()
+    if api is None:
+        return manim_code, report
+
+    current_code = manim_code
+    remaining = None
+    for _ in range(MAX_FIXES):
+        try:
+            tree = ast.parse(current_code)
+        except SyntaxError:
+            # Syntax errors are left to the validator and the LLM fixer
+            break
+        lint = _Lint(api, tree).run()
+        if not lint.fixes:
+            remaining = lint.issues
+            break
+        node, replacement, issue = lint.fixes[0]
+        current_code = _replace_node(current_code, node, replacement)
+        report["fixed"].append(issue)
+
+    # Stopped early (MAX_FIXES or a syntax error): whatever a final pass still flags remains
+    report["remaining"] = remaining if remaining is not None else lint_manim_code(current_code)
+    # The LLM round is only avoided if the fixed code also passes validation
+    avoided = bool(report["fixed"]) and not report["remaining"] and not validate_manim_code(current_code)
+
+    with _stats_lock:
+        _stats["runs"] += 1
+        _stats["fixes_applied"] += len(report["fixed"])
+        if report["fixed"]:
+            _stats["codes_auto_fixed"] += 1
+            _stats["llm_fix_calls_avoided"] += avoided
+
+    if report["fixed"]:
+        logger.info(f"Manim lint applied {len(report['fixed'])} fix(es), {len(report['remaining'])} issue(s) remain")
+    return current_code, report
+
+
+def lint_stats():
+    """Return lint counters, including the LLM repair rounds avoided by auto-fixes."""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,152 @@
+import os
+import re
+import math
+import logging
+from collections import Counter
+from dotenv import load_dotenv
+from .conversation import estimate_tokens
+from .manim_examples import MANIM_EXAMPLES
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Estimated-token budget for the Manim code generation request prompt
+MANIM_PROMPT_TOKEN_BUDGET = int(os.getenv("MANIM_PROMPT_TOKEN_BUDGET") or 18000)
+# Most gallery examples included in one prompt
+MANIM_PROMPT_MAX_EXAMPLES = int(os.getenv("MANIM_PROMPT_MAX_EXAMPLES") or 3)
+
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+[a-z]*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "into", "is", "it", "its",
+    "of", "on", "or", "show", "shows", "that", "the", "then", "this", "to", "use", "using", "with", "we",
+    "step", "steps", "scene", "animation", "animate", "text", "display", "visual", "concept", "concepts",
+}
+
+
+def _terms(text):
+    """Lowercase word terms of `text`, splitting CamelCase names (SinAndCosFunctionPlot -> sin, cos, ...)."""
+    return [word.lower() for word in _WORD_RE.findall(text) if word.lower() not in _STOPWORDS and len(word) > 1]
+
+
+class ExampleIndex:
+    """TF-IDF retrieval over the example gallery by name, description, tags and code identifiers"""
+
+    def __init__(self, examples):
+        self.examples = list(examples)
+        self._documents = []
+        for example in self.examples:
+            terms = Counter(_terms(f"{example.name} {example.description}"))
+            # Tags are curated, so they weigh more than identifiers scraped from the code
+            terms.update({tag: 3 for tag in _terms(" ".join(example.tags))})
+            terms.update(set(_terms(example.code)))
+            self._documents.append(terms)
+        document_frequency = Counter(term for terms in self._documents for term in terms)
+        count = len(self._documents)
+        self._idf = {term: math.log((count + 1) / (frequency + 0.5)) for term, frequency in document_frequency.items()}
+
+    def search(self, query, limit):
+        """Return up to `limit` examples ranked by relevance to `query`; non-matching examples are never returned."""
+        query_terms = Counter(_terms(query))
+        scored = []
+        for example, terms in zip(self.examples, self._documents):
+            score = sum(
+                math.log1p(frequency) * math.log1p(terms[term]) * self._idf.get(term, 0)
+                for term, frequency in query_terms.items() if term in terms
+            )
+            if score > 0:
+                scored.append((score, example))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [example for _, example in scored[:limit]]
+
+
+example_index = ExampleIndex(MANIM_EXAMPLES)
+
+
+def plan_query(video_plan):
+    """Text describing a video plan's domain, concepts and visuals, used to retrieve examples."""
+    breakdown = video_plan.get("educational_breakdown", {}) or {}
+    parts = [
+        breakdown.get("title", ""),
+        str(breakdown.get("topic_analysis", {}).get("domain", "")),
+        " ".join(map(str, breakdown.get("topic_analysis", {}).get("core_concepts", []))),
+    ]
+    for step in breakdown.get("educational_steps", []):
+        parts.append(step.get("step_title", ""))
+        parts.append(" ".join(map(str, step.get("key_concepts", []))))
+        parts.append(" ".join(map(str, step.get("equations", []))))
+        parts.append(str(step.get("visual_elements", "")))
+        parts.append(step.get("animation_plan", ""))
+    manim_structure = video_plan.get("manim_structure") or {}
+    for step in manim_structure.get("animation_steps", []):
+        parts.append(" ".join(map(str, step.get("manim_objects", []))))
+        parts.append(" ".join(map(str, step.get("animations", []))))
+    return " ".join(part for part in parts if part)
+
+
+class PromptAssembler:
+    """
+    Assemble a prompt from sections under an estimated-token budget.
+
+    Required sections are always kept (swapped for their compact form if the
+    required text alone is over budget). Optional sections are added in
+    priority order while they fit. Sections keep their insertion order in the
+    final prompt.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self._sections = []
+
+    def add(self, name, text, priority=None, compact=None):
+        """
+        Add a section.
+
+        Args:
+            name: Section name used in the size log
+            text: Section text
+            priority: None for required sections; lower numbers are kept first
+            compact: Shorter replacement for a required section when over budget
+        """
+        self._sections.append({"name": name, "text": text, "priority": priority, "compact": compact})
+
+    def build(self):
+        """
+        Returns:
+            tuple: (prompt, report) where report has tokens before and after budgeting plus dropped sections
+        """
+        full_tokens = sum(estimate_tokens(section["text"]) for section in self._sections)
+        required = [section for section in self._sections if section["priority"] is None]
+        used = sum(estimate_tokens(section["text"]) for section in required)
+
+        compacted = []
+        if used > self.budget:
+            for section in required:
+                if section["compact"] is not None:
+                    section["text"] = section["compact"]
+                    compacted.append(section["name"])
+            used = sum(estimate_tokens(section["text"]) for section in required)
+
+        kept = {id(section) for section in required}
+        dropped = []
+        optional = sorted((s for s in self._sections if s["priority"] is not None), key=lambda s: s["priority"])
+        for section in optional:
+            tokens = estimate_tokens(section["text"])
+            if used + tokens <= self.budget:
+                kept.add(id(section))
+                used += tokens
+            else:
+                dropped.append(section["name"])
+
+        prompt = "".join(section["text"] for section in self._sections if id(section) in kept)
+        report = {
+            "full_tokens": full_tokens,
+            "tokens": estimate_tokens(prompt),
+            "budget": self.budget,
+            "compacted": compacted,
+            "dropped": dropped,
+        }
+        if report["tokens"] > self.budget:
+            logger.warning(f"Prompt is over budget even after compaction: ≈{report['tokens']} > {self.budget} tokens")
+        return prompt, report
@@ -0,0 +1,180 @@
+import os
+import ast
+import shutil
+import hashlib
+import logging
+import threading
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv('.env')
+
+# Suffix of the empty marker files recording that code passed a render at some quality
+PASSED_MARKER_SUFFIX = ".passed"
+
+
+def normalize_manim_code(manim_code):
+    """
+    Normalize Manim source so formatting-only differences hash identically.
+
+    The AST dump ignores comments, blank lines and indentation style; code that
+    does not parse falls back to whitespace-normalized text.
+
+    Args:
+        manim_code (str): Manim Python code
+
+    Returns:
+        str: Canonical representation of the code
+    """
+    try:
+        return ast.dump(ast.parse(manim_code))
+    except SyntaxError:
+        lines = (line.rstrip() for line in manim_code.strip().splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+class RenderCache:
+    """
+    Content-hash cache of finished Manim videos.
+
+    Maps normalized code + quality flag + scene class to an MP4 stored under
+    the media directory, evicting least recently used videos once the cache
+    grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir="media/videos/render_cache", max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, manim_code, quality, scene_class_name):
+        """Content hash identifying a render of this code at this quality"""
+        payload = "\0".join([normalize_manim_code(manim_code), quality, scene_class_name or ""])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _video_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def _marker_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{PASSED_MARKER_SUFFIX}")
+
+    def lookup(self, manim_code, quality, scene_class_name):
+        """
+        Return the cached video for this code, or None on a miss.
+
+        Args:
+            manim_code (str): Manim code to be rendered
+            quality (str): Manim quality flag, e.g. '-qm'
+            scene_class_name (str): Scene class that would be rendered
+
+        Returns:
+            str: Path of the cached MP4, or None
+        """
+        path = self._video_path(self.key(manim_code, quality, scene_class_name))
+        with self._lock:
+            if os.path.isfile(path):
+                self.hits += 1
+                # Refresh the access time used for LRU eviction
+                os.utime(path)
+                return path
+            self.misses += 1
+            return None
+
+    def store(self, manim_code, quality, scene_class_name, video_path):
+        """
+        Move a freshly rendered video into the cache.
+
+        Args:
+            manim_code (str): Manim code that produced the video
+            quality (str): Manim quality flag used for the render
+            scene_class_name (str): Rendered scene class
+            video_path (str): Path of the rendered MP4
+
+        Returns:
+            str: Path of the cached MP4 (or the original path if caching failed)
+        """
+        key = self.key(manim_code, quality, scene_class_name)
+        cached_path = self._video_path(key)
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                shutil.move(video_path, cached_path)
+                os.utime(cached_path)
+                self._evict(keep=cached_path)
+            return cached_path
+        except OSError as e:
+            logger.warning(f"Failed to cache rendered video {video_path}: {e}")
+            return video_path
+
+    def has_passed(self, manim_code, quality, scene_class_name):
+        """Check whether this code is known to render successfully at this quality"""
+        return os.path.isfile(self._marker_path(self.key(manim_code, quality, scene_class_name)))
+
+    def mark_passed(self, manim_code, quality, scene_class_name):
+        """Record that this code rendered successfully (used for discarded trial renders)"""
+        marker = self._marker_path(self.key(manim_code, quality, scene_class_name))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(marker, "w"):
+                pass
+        except OSError as e:
+            logger.warning(f"Failed to record render marker {marker}: {e}")
+
+    def _evict(self, keep=None):
+        """
+        Delete least recently used videos until the cache fits in max_bytes (lock must be held).
+
+        `keep` (the video just stored) is never evicted, even when it alone
+        exceeds max_bytes; trial-pass markers are not videos and stay as well.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp4"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                logger.info(f"Evicted cached render {path}")
+            except OSError:
+                continue
+
+    def stats(self):
+        """Return hit/miss counters and current cache size."""
+        videos = 0
+        total = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".mp4"):
+                    videos += 1
+                    total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "videos": videos,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+render_cache = RenderCache(
+    cache_dir=os.getenv("RENDER_CACHE_DIR") or "media/videos/render_cache",
+    max_bytes=int(os.getenv("RENDER_CACHE_MAX_MB") or 2048) * 1024 * 1024,
+)
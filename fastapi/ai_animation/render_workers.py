@@ -0,0 +1,196 @@
+import os
+import logging
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+from core.execution import render_slot, MANIM_RENDER_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+load_dotenv('.env')
+
+# Manim CLI quality flags mapped to their config names
+QUALITY_FLAGS = {
+    '-ql': 'low_quality',
+    '-qm': 'medium_quality',
+    '-qh': 'high_quality',
+    '-qp': 'production_quality',
+    '-qk': 'fourk_quality',
+}
+
+
+class RenderWorkerError(Exception):
+    """Raised when a render worker process dies instead of returning a result"""
+    pass
+
+
+def _warm_worker():
+    """Process initializer: pay the Manim/Cairo/Pango import cost once per worker."""
+    import manim
+
+    try:
+        # Building a Text mobject loads Pango and the font cache
+        manim.Text("warm-up")
+    except Exception as e:
+        logger.warning(f"Render worker warm-up text failed: {e}")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _render_scene(file_path, scene_class_name, quality, media_dir, dry_run=False):
+    """
+    Render a scene from a Manim source file inside a worker process.
+
+    Mirrors `manim <file> <scene> <quality> --disable_caching --media_dir=<dir>`,
+    so the video lands where the CLI would have written it. A dry run executes
+    construct() on a renderer that skips frame generation and writes nothing.
+
+    Returns:
+        tuple: (success_status, error_message, video_path)
+    """
+    import manim
+
+    try:
+        with open(file_path, "r") as f:
+            manim_code = f.read()
+
+        options = {
+            "quality": QUALITY_FLAGS[quality],
+            "media_dir": media_dir,
+            "input_file": file_path,
+            "disable_caching": True,
+            "write_to_movie": not dry_run,
+            "dry_run": dry_run,
+        }
+        with manim.tempconfig(options):
+            # Module-level config changes in the generated code stay scoped to this render
+            namespace = {"__name__": "__manim_render__"}
+            exec(compile(manim_code, file_path, "exec"), namespace)
+            scene_class = namespace.get(scene_class_name)
+            if scene_class is None:
+                return False, f"Scene class '{scene_class_name}' not found in {file_path}", None
+
+            if dry_run:
+                from manim.renderer.cairo_renderer import CairoRenderer
+                scene = scene_class(renderer=CairoRenderer(skip_animations=True))
+            else:
+                scene = scene_class()
+            scene.render()
+            if dry_run:
+                return True, None, None
+            video_path = scene.renderer.file_writer.movie_file_path
+            return True, None, str(video_path) if video_path else None
+    except Exception:
+        return False, traceback.format_exc(), None
+
+
+class RenderWorkerPool:
+    """
+    Pool of long-lived processes that import Manim once and render scenes
+    through the Python API. Each worker is replaced after max_renders_per_worker
+    renders to cap memory growth from Cairo/Pango caches.
+    """
+
+    def __init__(self, max_workers=2, max_renders_per_worker=20):
+        self.max_workers = max_workers
+        self.max_renders_per_worker = max_renders_per_worker
+        self.renders = 0
+        self.crashes = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn keeps workers free of the parent's threads and event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                    max_tasks_per_child=self.max_renders_per_worker,
+                )
+            return self._executor
+
+    def _discard_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        """Start every worker now so the first requests do not pay the Manim import cost."""
+        executor = self._get_executor()
+        try:
+            pids = {f.result() for f in [executor.submit(_ping) for _ in range(self.max_workers)]}
+            logger.info(f"Started {len(pids)} Manim render worker(s)")
+        except BrokenProcessPool as e:
+            logger.error(f"Manim render workers failed to start: {e}")
+            self._discard_executor(executor)
+
+    def render(self, file_path, scene_class_name, quality, media_dir, dry_run=False):
+        """
+        Render a scene on a warm worker once a render slot is available.
+
+        Args:
+            file_path (str): Path to the Python file with Manim code
+            scene_class_name (str): Name of the scene class to render
+            quality (str): Manim quality flag, e.g. '-qm'
+            media_dir (str): Manim media directory for the output
+            dry_run (bool): Execute construct() without rendering frames
+
+        Returns:
+            tuple: (success_status, error_message, video_path)
+
+        Raises:
+            RenderWorkerError: If the worker process died during the render
+        """
+        return self.run(_render_scene, file_path, scene_class_name, quality, media_dir, dry_run)
+
+    def run(self, func, *args):
+        """
+        Run a module-level render function on a warm worker once a render slot is available.
+
+        Raises:
+            RenderWorkerError: If the worker process died while running it
+        """
+        executor = self._get_executor()
+        with render_slot():
+            try:
+                result = executor.submit(func, *args).result()
+            except BrokenProcessPool as e:
+                self.crashes += 1
+                self._discard_executor(executor)
+                raise RenderWorkerError(f"Render worker crashed: {e}") from e
+
+        self.renders += 1
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "max_renders_per_worker": self.max_renders_per_worker,
+            "started": self._executor is not None,
+            "renders": self.renders,
+            "crashes": self.crashes,
+        }
+
+
+# "workers" renders on the warm process pool, "cli" spawns the manim CLI per render,
+# "fake" simulates renders without Manim (see fake_render.py)
+MANIM_RENDER_BACKEND = (os.getenv("MANIM_RENDER_BACKEND") or "workers").lower()
+
+render_worker_pool = RenderWorkerPool(
+    max_workers=int(os.getenv("MANIM_RENDER_WORKERS") or MANIM_RENDER_CONCURRENCY),
+    max_renders_per_worker=int(os.getenv("MANIM_WORKER_MAX_RENDERS") or 20),
+)
@@ -3,17 +3,20 @@ import asyncio
 import tempfile
 import json
 import logging
-import shutil
 from typing import Optional
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from pathlib import Path
 
 # Import your existing modules
 from .script_generator import script_generator
 from .main_code_generator import manim_generator
-from .animation_creator import create_animation_from_code
+from .jobs import job_manager, JobQueueFullError
+from core.execution import run_llm, execution_stats
+from core.context_cache import context_cache
+from .render_cache import render_cache
+from .render_workers import render_worker_pool
+from .manim_lint import lint_stats
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -21,8 +24,13 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai-animation", tags=["AI Animation"])
 
+# How often the streaming endpoint checks job progress (seconds)
+JOB_POLL_INTERVAL = 0.5
+
 class AnimationRequest(BaseModel):
     prompt: str
+    # Carry conversation history across requests of one client; omit for stateless requests
+    session_id: Optional[str] = None
 
 class AnimationResponse(BaseModel):
     status: str
@@ -31,6 +39,70 @@ class AnimationResponse(BaseModel):
     analysis: Optional[dict] = None
     code: Optional[str] = None
     error: Optional[str] = None
+    job_id: Optional[str] = None
+
+class AnimationJobResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    progress: int
+    stage_description: str
+    status_url: str
+    video_url: Optional[str] = None
+    analysis: Optional[dict] = None
+    code: Optional[str] = None
+    error: Optional[str] = None
+
+def _ensure_generators_initialized():
+    if script_generator is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Script generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY in environment variables."
+        )
+    
+    if manim_generator is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Manim generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY in environment variables."
+        )
+
+def _job_response(job):
+    return AnimationJobResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        stage=job["stage"],
+        progress=job["progress"],
+        stage_description=job["stage_description"],
+        status_url=f"{router.prefix}/jobs/{job['job_id']}",
+        video_url=job["video_url"],
+        analysis=job["analysis"],
+        code=job["code"],
+        error=job["error"]
+    )
+
+@router.post("/jobs", response_model=AnimationJobResponse, status_code=202)
+async def submit_animation_job(request: AnimationRequest):
+    """
+    Queue an animation job and return its ID immediately.
+    
+    Poll GET /ai-animation/jobs/{job_id} for stage, progress and the final video_url.
+    """
+    logger.info(f"Received animation job request: {request.prompt}")
+    _ensure_generators_initialized()
+    
+    try:
+        job = job_manager.submit(request.prompt, request.session_id)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=AnimationJobResponse)
+async def get_animation_job(job_id: str):
+    """Get the current stage, progress and result of an animation job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Animation job '{job_id}' not found")
+    return _job_response(job)
 
 @router.post("/generate", response_model=AnimationResponse)
 async def generate_animation(request: AnimationRequest):
@@ -43,89 +115,42 @@ async def generate_animation(request: AnimationRequest):
     3. Create Manim code using Gemini
     4. Render video using Manim
     5. Return video URL
+    
+    The pipeline runs on the animation job queue; this endpoint waits for the
+    job to finish. Use POST /ai-animation/jobs to get a job ID immediately.
     """
+    logger.info(f"Received animation request: {request.prompt}")
+    _ensure_generators_initialized()
+    
     try:
-        logger.info(f"Received animation request: {request.prompt}")
-        
-        # Check if generators are initialized
-        if script_generator is None:
-            raise HTTPException(
-                status_code=500,
-                detail="Script generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY in environment variables."
-            )
-        
-        if manim_generator is None:
-            raise HTTPException(
-                status_code=500,
-                detail="Manim generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY in environment variables."
-            )
-        
-        # Step 1: Generate educational breakdown and video plan
-        logger.info("Step 1: Generating educational breakdown...")
-        video_plan = script_generator.generate_complete_video_plan(request.prompt)
-        
-        if not video_plan:
-            raise HTTPException(
-                status_code=400, 
-                detail="Failed to generate educational breakdown from prompt"
-            )
-        
-        # Step 2: Generate Manim code
-        logger.info("Step 2: Generating Manim code...")
-        manim_code = manim_generator.generate_3b1b_manim_code(video_plan)
-        
-        if not manim_code:
-            raise HTTPException(
-                status_code=400, 
-                detail="Failed to generate Manim code"
-            )
-        
-        # Step 3: Create animation video
-        logger.info("Step 3: Rendering animation...")
-        video_path = create_animation_from_code(manim_code)
-        
-        if not video_path:
-            raise HTTPException(
-                status_code=500, 
-                detail="Failed to render animation video"
-            )
-        
-        # Convert absolute path to relative URL
-        media_dir = Path("media")
-        video_path_obj = Path(video_path)
-        
-        # Find relative path from media directory
-        try:
-            relative_path = video_path_obj.relative_to(media_dir.absolute())
-            video_url = f"/media/{relative_path}"
-        except ValueError:
-            # If video is not in media directory, copy it there
-            import shutil
-            filename = video_path_obj.name
-            new_path = media_dir / "videos" / filename
-            new_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(video_path, new_path)
-            video_url = f"/media/videos/{filename}"
-        
-        logger.info(f"Animation generated successfully: {video_url}")
-        
-        return AnimationResponse(
-            status="success",
-            message="Animation generated successfully",
-            video_url=video_url,
-            analysis=video_plan.get("educational_breakdown"),
-            code=manim_code
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating animation: {str(e)}")
+        job = job_manager.submit(request.prompt, request.session_id)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    job_id = job["job_id"]
+    job = await job_manager.wait(job_id)
+    if job is None:
+        # Pruned before the result could be read
+        raise HTTPException(status_code=404, detail=f"Animation job '{job_id}' not found")
+    
+    if job["status"] != "complete":
         return AnimationResponse(
             status="error",
             message="Failed to generate animation",
-            error=str(e)
+            job_id=job["job_id"],
+            error=job["error"]
         )
+    
+    logger.info(f"Animation generated successfully: {job['video_url']}")
+    
+    return AnimationResponse(
+        status="success",
+        message="Animation generated successfully",
+        video_url=job["video_url"],
+        analysis=job["analysis"],
+        code=job["code"],
+        job_id=job["job_id"]
+    )
 
 @router.post("/generate-stream")
 async def generate_animation_stream(request: AnimationRequest):
@@ -134,70 +159,46 @@ async def generate_animation_stream(request: AnimationRequest):
     """
     async def generate():
         try:
-            # Check if generators are initialized
-            if script_generator is None:
-                yield f"data: {json.dumps({'status': 'error', 'error': 'Script generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY.'})}\n\n"
-                return
-            
-            if manim_generator is None:
-                yield f"data: {json.dumps({'status': 'error', 'error': 'Manim generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY.'})}\n\n"
-                return
-            
-            # Initial response
-            yield f"data: {json.dumps({'status': 'in_progress', 'progress': 0, 'stage': 'starting', 'stage_description': 'Initializing animation generation...'})}\n\n"
-            
-            # Step 1: Educational breakdown
-            yield f"data: {json.dumps({'status': 'in_progress', 'progress': 20, 'stage': 'analysis', 'stage_description': 'Analyzing prompt and creating educational breakdown...'})}\n\n"
-            
-            video_plan = script_generator.generate_complete_video_plan(request.prompt)
-            if not video_plan:
-                yield f"data: {json.dumps({'status': 'error', 'error': 'Failed to generate educational breakdown'})}\n\n"
-                return
-            
-            # Step 2: Code generation
-            yield f"data: {json.dumps({'status': 'in_progress', 'progress': 50, 'stage': 'code_generation', 'stage_description': 'Generating Manim animation code...'})}\n\n"
-            
-            manim_code = manim_generator.generate_3b1b_manim_code(video_plan)
-            if not manim_code:
-                yield f"data: {json.dumps({'status': 'error', 'error': 'Failed to generate Manim code'})}\n\n"
-                return
-            
-            # Step 3: Video rendering
-            yield f"data: {json.dumps({'status': 'in_progress', 'progress': 80, 'stage': 'rendering', 'stage_description': 'Rendering video animation...'})}\n\n"
-            
-            video_path = create_animation_from_code(manim_code)
-            if not video_path:
-                yield f"data: {json.dumps({'status': 'error', 'error': 'Failed to render video'})}\n\n"
-                return
-            
-            # Process video URL
-            media_dir = Path("media")
-            video_path_obj = Path(video_path)
-            
-            try:
-                relative_path = video_path_obj.relative_to(media_dir.absolute())
-                video_url = f"/media/{relative_path}"
-            except ValueError:
-                import shutil
-                filename = video_path_obj.name
-                new_path = media_dir / "videos" / filename
-                new_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(video_path, new_path)
-                video_url = f"/media/videos/{filename}"
-            
-            # Final success response
-            final_response = {
-                'status': 'complete',
-                'progress': 100,
-                'stage': 'complete',
-                'stage_description': 'Animation generated successfully!',
-                'video_url': video_url,
-                'analysis': video_plan.get("educational_breakdown"),
-                'code': manim_code,
-                'explanation': f"Successfully generated animation for: {request.prompt}"
-            }
-            
-            yield f"data: {json.dumps(final_response)}\n\n"
+            job = job_manager.submit(request.prompt, request.session_id)
+        except JobQueueFullError as e:
+            yield f"data: {json.dumps({'status': 'error', 'error': str(e)})}\n\n"
+            return
+        
+        job_id = job["job_id"]
+        last_stage = None
+        
+        try:
+            while True:
+                job = job_manager.get(job_id)
+                if job is None:
+                    yield f"data: {json.dumps({'status': 'error', 'error': 'Animation job expired'})}\n\n"
+                    return
+                
+                if job["status"] == "error":
+                    yield f"data: {json.dumps({'status': 'error', 'error': job['error'], 'job_id': job_id})}\n\n"
+                    return
+                
+                if job["status"] == "complete":
+                    # Final success response
+                    final_response = {
+                        'status': 'complete',
+                        'progress': 100,
+                        'stage': 'complete',
+                        'stage_description': job['stage_description'],
+                        'job_id': job_id,
+                        'video_url': job['video_url'],
+                        'analysis': job['analysis'],
+                        'code': job['code'],
+                        'explanation': f"Successfully generated animation for: {request.prompt}"
+                    }
+                    yield f"data: {json.dumps(final_response)}\n\n"
+                    return
+                
+                if job["stage"] != last_stage:
+                    last_stage = job["stage"]
+                    yield f"data: {json.dumps({'status': 'in_progress', 'progress': job['progress'], 'stage': job['stage'], 'stage_description': job['stage_description'], 'job_id': job_id})}\n\n"
+                
+                await asyncio.sleep(JOB_POLL_INTERVAL)
             
         except Exception as e:
             logger.error(f"Streaming error: {str(e)}")
@@ -214,10 +215,18 @@ async def generate_animation_stream(request: AnimationRequest):
         }
     )
 
+def _conversation_stats():
+    stats = {}
+    if script_generator is not None:
+        stats["script"] = script_generator.conversation_stats()
+    if manim_generator is not None:
+        stats["manim_code"] = manim_generator.conversation_stats()
+    return stats
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "AI Animation Generator"}
+    return {"status": "healthy", "service": "AI Animation Generator", "jobs": job_manager.stats(), "execution": execution_stats(), "render_cache": render_cache.stats(), "render_workers": render_worker_pool.stats(), "lint": lint_stats(), "conversations": _conversation_stats(), "context_cache": context_cache.stats()}
 
 @router.post("/test-prompt")
 async def test_prompt_analysis(request: AnimationRequest):
@@ -229,7 +238,7 @@ async def test_prompt_analysis(request: AnimationRequest):
                 detail="Script generator not initialized. Please check GOOGLE_GENERATIVE_AI_API_KEY."
             )
             
-        video_plan = script_generator.generate_complete_video_plan(request.prompt)
+        video_plan = await run_llm(script_generator.generate_complete_video_plan, request.prompt, request.session_id)
         
         if not video_plan:
             raise HTTPException(status_code=400, detail="Failed to analyze prompt")
@@ -263,12 +272,12 @@ async def test_code_generation(request: AnimationRequest):
             )
         
         # Generate video plan
-        video_plan = script_generator.generate_complete_video_plan(request.prompt)
+        video_plan = await run_llm(script_generator.generate_complete_video_plan, request.prompt, request.session_id)
         if not video_plan:
             raise HTTPException(status_code=400, detail="Failed to generate video plan")
         
         # Generate Manim code
-        manim_code = manim_generator.generate_3b1b_manim_code(video_plan)
+        manim_code = await run_llm(manim_generator.generate_3b1b_manim_code, video_plan, request.session_id)
         if not manim_code:
             raise HTTPException(status_code=400, detail="Failed to generate Manim code")
         
@@ -0,0 +1,132 @@
+from typing import List
+from pydantic import BaseModel
+
+
+# Response schemas for the script generator's JSON stages, mirroring the stage prompts
+
+# Stage 1: educational breakdown
+
+class TopicAnalysis(BaseModel):
+    domain: str
+    complexity_level: str
+    core_concepts: List[str]
+    prerequisites: List[str]
+
+
+class VisualElements(BaseModel):
+    diagrams: List[str]
+    animations: List[str]
+    text_displays: List[str]
+    color_scheme: List[str]
+    highlighting: List[str]
+
+
+class EducationalStep(BaseModel):
+    step_number: int
+    step_title: str
+    description: str
+    key_concepts: List[str]
+    equations: List[str]
+    data_points: List[str]
+    real_world_examples: List[str]
+    common_misconceptions: List[str]
+    narration_script: str
+    visual_elements: VisualElements
+    animation_plan: str
+    duration_seconds: int
+    difficulty_level: str
+    transition_to_next: str
+
+
+class QuizQuestion(BaseModel):
+    question: str
+    type: str
+    difficulty: str
+    correct_answer: str = ""
+    explanation: str
+
+
+class Assessment(BaseModel):
+    quiz_questions: List[QuizQuestion]
+    thought_experiments: List[str]
+    interactive_elements: List[str]
+
+
+class BreakdownMetadata(BaseModel):
+    target_audience: str
+    estimated_total_duration: int
+    real_world_applications: List[str]
+    related_topics: List[str]
+    difficulty_progression: str
+
+
+class EducationalBreakdown(BaseModel):
+    topic_analysis: TopicAnalysis
+    title: str
+    abstract: str
+    learning_objectives: List[str]
+    educational_steps: List[EducationalStep]
+    summary: str
+    assessment: Assessment
+    metadata: BreakdownMetadata
+
+
+# Stage 2: Manim structure
+
+class Timing(BaseModel):
+    start: float
+    end: float
+
+
+class AnimationStep(BaseModel):
+    step_number: int
+    action_type: str
+    manim_objects: List[str]
+    animations: List[str]
+    description: str
+    narration: str
+    code_snippet: str
+    duration: float
+    positioning: str
+    colors: List[str]
+    transformations: List[str]
+    mathematical_content: str
+    visual_elements: List[str]
+    timing: Timing
+    layer_order: int
+
+
+class SceneConfig(BaseModel):
+    background_color: str
+    camera_config: str
+    total_duration: float
+    resolution: str
+    frame_rate: int
+
+
+class EducationalMetadata(BaseModel):
+    learning_objectives: List[str]
+    target_audience: str
+    difficulty_level: str
+
+
+class TechnicalRequirements(BaseModel):
+    required_imports: List[str]
+    custom_functions: List[str]
+    external_resources: List[str]
+
+
+class CodeStructure(BaseModel):
+    class_name: str
+    methods: List[str]
+    complexity_level: str
+
+
+class ManimStructure(BaseModel):
+    scene_title: str
+    scene_description: str
+    animation_steps: List[AnimationStep]
+    scene_config: SceneConfig
+    educational_metadata: EducationalMetadata
+    technical_requirements: TechnicalRequirements
+    code_structure: CodeStructure
@@ -6,8 +6,13 @@ import json
 from langchain.chains import ConversationChain
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, MessagesPlaceholder
 from langchain_core.messages import SystemMessage
-from langchain.chains.conversation.memory import ConversationBufferWindowMemory
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.tolerant_json import parse_tolerant_json, JSONParseError
+from core.structured_output import LLM_STRUCTURED_OUTPUT, with_response_schema, invoke_structured
+from core.context_cache import context_cache, with_cached_content
+from core.llm_clients import get_chat_model
+from .schemas import EducationalBreakdown, ManimStructure
+from .conversation import create_sessions
+from .script_instructions import STAGE1_SYSTEM_INSTRUCTION, STAGE2_SYSTEM_INSTRUCTION
 
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -16,32 +21,22 @@ logging.getLogger('comtypes').setLevel(logging.WARNING)
 load_dotenv('.env')
 
 class ScienceVideoGenerator:
+    MODEL_NAME = "gemini-2.0-flash"
+
     def __init__(self, google_api_key):
         self.google_api_key = google_api_key
-        self.memory = ConversationBufferWindowMemory(k=5, memory_key="chat_history", return_messages=True)
-        self.google_chat = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=self.google_api_key,
-            temperature=0.7,
-            max_tokens=None,
-            timeout=None,
-            max_retries=2
-        )
-        
-        # Enhanced Stage 1 prompt with detailed step-by-step instructions
-        self.stage1_prompt = self._create_enhanced_stage1_prompt()
-        self.stage2_prompt = self._create_stage2_prompt()
-        
-        # Stage 1 conversation chain
-        self.stage1_conversation = ConversationChain(
-            llm=self.google_chat,
-            prompt=self.stage1_prompt,
-            verbose=True,
-            memory=self.memory,
-            input_key="human_input",
-        )
+        # Stage 1 history is per request unless the client supplies a session ID
+        self.stage1_sessions = create_sessions("Stage 1", window=5)
+        # Stage 2 always starts from an empty memory
+        self.stage2_sessions = create_sessions("Stage 2", window=3)
+        self.google_chat = get_chat_model("script", self.google_api_key, self.MODEL_NAME, temperature=0.7)
+        
+        # Schema-constrained variants for the JSON stages (None: parse JSON from free text)
+        self.stage1_llm = with_response_schema(self.google_chat, EducationalBreakdown) if LLM_STRUCTURED_OUTPUT else None
+        self.stage2_llm = with_response_schema(self.google_chat, ManimStructure) if LLM_STRUCTURED_OUTPUT else None
+
 
-    def generate_educational_breakdown(self, topic):
+    def generate_educational_breakdown(self, topic, session_id=None):
         """
         Enhanced Stage 1: Generate a comprehensive educational breakdown with detailed step-by-step analysis.
         
@@ -55,6 +50,7 @@ class ScienceVideoGenerator:
         
         Args:
             topic (str): User's science/math topic request.
+            session_id (str): Optional client session whose Stage 1 history is carried over.
             
         Returns:
             dict: Structured educational content with detailed breakdown.
@@ -75,10 +71,28 @@ class ScienceVideoGenerator:
             print("   Step 5: Narration Script Development")
             print("   Step 6: Assessment & Engagement Planning")
             
-            response = self.stage1_conversation.predict(human_input=stage1_prompt)
+            memory = self.stage1_sessions.memory_for(session_id)
+            self.stage1_sessions.log_prompt(memory, stage1_prompt, session_id)
+            
+            instruction = context_cache.instruction("stage1_breakdown", self.MODEL_NAME, STAGE1_SYSTEM_INSTRUCTION)
+            llm, structured_llm = self._stage_llms(instruction, self.stage1_llm, EducationalBreakdown)
+            prompt = self._create_stage_prompt(instruction.inline_text)
+            
+            educational_content = None
+            if structured_llm is not None:
+                educational_content = self._predict_structured(prompt, structured_llm, memory, stage1_prompt)
             
-            # Enhanced JSON parsing with multiple fallback strategies
-            educational_content = self._parse_stage1_response(response, topic)
+            if educational_content is None:
+                # Stage 1 conversation chain
+                stage1_conversation = ConversationChain(
+                    llm=llm,
+                    prompt=prompt,
+                    verbose=True,
+                    memory=memory,
+                    input_key="human_input",
+                )
+                response = stage1_conversation.predict(human_input=stage1_prompt)
+                educational_content = self._parse_stage1_response(response, topic)
             
             if educational_content:
                 print("✅ Stage 1 Educational Breakdown Complete!")
@@ -223,108 +237,59 @@ CRITICAL REMINDERS:
 Begin your comprehensive 6-step analysis now:
 """
 
-    def _parse_stage1_response(self, response, topic):
+    def _stage_llms(self, instruction, structured_llm, schema):
         """
-        Enhanced parsing of Stage 1 response with multiple fallback strategies.
+        Chat model and schema-constrained variant for one stage call.
         
         Args:
-            response (str): LLM response from Stage 1
-            topic (str): Original topic for context
+            instruction (CachedInstruction): The stage's static instructions
+            structured_llm: The stage's schema-constrained LLM, or None when structured output is off
+            schema: Pydantic response schema of the stage
             
         Returns:
-            dict: Parsed educational content or None if all parsing fails
+            tuple: (llm, structured_llm) bound to the instruction's cached content when the provider holds it
         """
-        # Strategy 1: Direct JSON parsing
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-        
-        # Strategy 2: Extract JSON from code blocks
-        try:
-            import re
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except Exception:
-            pass
-        
-        # Strategy 3: Find JSON object in text
-        try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                # Clean up common JSON issues
-                json_str = self._clean_json_string(json_str)
-                return json.loads(json_str)
-        except Exception:
-            pass
-        
-        # Strategy 4: Attempt to fix common JSON errors
-        try:
-            fixed_json = self._fix_common_json_errors(response)
-            if fixed_json:
-                return json.loads(fixed_json)
-        except Exception:
-            pass
-        
-        print("⚠️ All JSON parsing strategies failed")
-        return None
+        if instruction.cached_content is None:
+            return self.google_chat, structured_llm
+        llm = with_cached_content(self.google_chat, instruction)
+        return llm, with_response_schema(llm, schema) if structured_llm is not None else None
 
-    def _clean_json_string(self, json_str):
+    def _predict_structured(self, prompt, structured_llm, memory, human_input):
         """
-        Clean common JSON formatting issues.
+        Run a stage prompt through a schema-constrained LLM, keeping the conversation memory in sync.
         
         Args:
-            json_str (str): Raw JSON string
+            prompt (ChatPromptTemplate): Stage prompt template
+            structured_llm: LLM bound to the stage's response schema
+            memory (ConversationBufferWindowMemory): Memory the stage's ConversationChain uses
+            human_input (str): Stage request
             
         Returns:
-            str: Cleaned JSON string
+            dict: Schema-validated response or None to fall back to free-text parsing
         """
-        import re
-        
-        # Remove trailing commas before closing brackets/braces
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # Fix unescaped quotes in strings
-        json_str = re.sub(r'(?<!\\)"(?=.*")', r'\\"', json_str)
-        
-        # Remove comments
-        json_str = re.sub(r'//.*?\n', '\n', json_str)
-        json_str = re.sub(r'/\*.*?\*/', '', json_str, flags=re.DOTALL)
-        
-        return json_str
+        chat_history = memory.load_memory_variables({})["chat_history"]
+        result = invoke_structured(prompt | structured_llm, {"human_input": human_input, "chat_history": chat_history})
+        if result is not None:
+            memory.save_context({"human_input": human_input}, {"response": json.dumps(result)})
+        return result
 
-    def _fix_common_json_errors(self, response):
+    def _parse_stage1_response(self, response, topic):
         """
-        Attempt to fix common JSON formatting errors in LLM responses.
+        Parse the Stage 1 response with the shared tolerant JSON parser.
         
         Args:
-            response (str): LLM response
+            response (str): LLM response from Stage 1
+            topic (str): Original topic for context
             
         Returns:
-            str: Fixed JSON string or None
+            dict: Parsed educational content or None if parsing fails
         """
-        import re
-        
-        # Look for JSON-like structure
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        matches = re.findall(json_pattern, response, re.DOTALL)
-        
-        for match in matches:
-            try:
-                # Try various fixes
-                fixed = match
-                fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)  # Remove trailing commas
-                fixed = re.sub(r'(\w+):', r'"\1":', fixed)    # Quote unquoted keys
-                
-                # Test if it parses
-                json.loads(fixed)
-                return fixed
-            except:
-                continue
-        
-        return None
+        try:
+            content = parse_tolerant_json(response)
+        except JSONParseError as e:
+            print(f"⚠️ JSON parsing failed: {e}")
+            return None
+        return content if isinstance(content, dict) else None
 
     def _validate_educational_content(self, content):
         """
@@ -600,154 +565,30 @@ Begin your comprehensive 6-step analysis now:
             f"Experimental methods in {topic}"
         ]
 
-    def _create_enhanced_stage1_prompt(self):
+    def _create_stage_prompt(self, instructions):
         """
-        Create the enhanced Stage 1 prompt template with detailed step-by-step instructions.
+        Create a stage prompt template carrying the stage's static instructions.
         
-        Returns:
-            ChatPromptTemplate: The enhanced educational breakdown prompt template.
-        """
-        # Instead of using SystemMessage (not supported by Gemini), 
-        # we'll include the system instructions in the human message template
-        human_message_template = """You are an expert educational content designer, science communication specialist, and instructional design expert.
-
-Your role is Stage 1 of a comprehensive educational video generation system: **Science Breakdown Generator**.
-
-You excel at breaking down complex scientific and mathematical concepts into clear, engaging, step-by-step educational sequences that can be effectively animated and visualized.
-
-## YOUR EXPERTISE INCLUDES:
-- Pedagogical best practices and learning theory
-- Scientific accuracy across multiple domains  
-- Visual storytelling and animation planning
-- Audience-appropriate content development
-- Assessment and engagement strategies
-
-## YOUR MISSION:
-When given any science or math topic, you must execute a comprehensive 6-step analysis process to create educational content that:
-1. Builds understanding progressively
-2. Engages multiple learning styles
-3. Connects abstract concepts to concrete examples
-4. Plans specific visual elements for animation
-5. Provides clear narration scripts
-6. Includes assessment opportunities
-
-## OUTPUT REQUIREMENTS:
-You must ALWAYS respond with a complete, valid JSON object that follows the exact structure provided in the user's prompt. Pay special attention to:
-- Proper JSON syntax and formatting
-- Complete data for all required fields
-- Realistic timing estimates
-- Specific visual planning details
-- Engaging, conversational narration scripts
-- Progressive difficulty levels
-- Clear connections between steps
-
-## EDUCATIONAL PRINCIPLES TO FOLLOW:
-- Start with familiar concepts before introducing new ones
-- Use analogies and metaphors to explain complex ideas
-- Include real-world applications and examples
-- Address common misconceptions explicitly
-- Plan for visual, auditory, and kinesthetic learning styles
-- Ensure logical flow and smooth transitions between concepts
-- Write in an engaging, accessible tone appropriate for the target audience
-
-Your educational breakdown will serve as the foundation for Stage 2 (Manim Animation Planning), so be specific about visual elements and animation possibilities.
-
-Human Request: {human_input}"""
-
-        human_message_prompt = HumanMessagePromptTemplate.from_template(human_message_template)
-
-        prompt = ChatPromptTemplate.from_messages([
-            MessagesPlaceholder(variable_name="chat_history"),
-            human_message_prompt,
-        ])
-        return prompt
-
-    def _create_stage2_prompt(self):
-        """
-        Create the Stage 2 prompt template for Manim code generation.
+        Args:
+            instructions (str): Stage instructions sent ahead of the request
+                ("" when the model holds them as cached content)
         
         Returns:
-            ChatPromptTemplate: The Manim code generation prompt template.
+            ChatPromptTemplate: The stage prompt template.
         """
         # Instead of using SystemMessage (not supported by Gemini), 
         # we'll include the system instructions in the human message template
-        human_message_template = """You are an expert Manim animation developer and mathematical visualization specialist.
-
-Your role is Stage 2 of a two-stage educational video generation system: Manim Code Generator.
-
-You receive structured educational content from Stage 1 and must convert it into detailed Manim scene specifications ready for Python code generation.
-
-Your output must be a JSON object with the following structure:
-
-{{
-    "scene_title": "Title for the Manim scene class",
-    "scene_description": "Brief overview of the animation sequence",
-    "animation_steps": [
-        {{
-            "step_number": 1,
-            "action_type": "intro|content|transition|conclusion",
-            "manim_objects": ["Text", "MathTex", "Circle", "Rectangle", "etc"],
-            "animations": ["Write", "FadeIn", "Transform", "Create", "etc"],
-            "description": "What happens in this animation step",
-            "narration": "Corresponding narration from Stage 1",
-            "code_snippet": "Key Manim code lines for this step",
-            "duration": 30,
-            "positioning": "center|left|right|UP*2|DOWN*1.5|etc",
-            "colors": ["BLUE", "WHITE", "RED"],
-            "transformations": ["scale", "shift", "rotate"],
-            "mathematical_content": "LaTeX equations to display",
-            "visual_elements": ["derived from Stage 1 animation_plan"],
-            "timing": {{"start": 0, "end": 30}},
-            "layer_order": 1
-        }}
-    ],
-    "scene_config": {{
-        "background_color": "BLACK|WHITE|custom_hex",
-        "camera_config": "default|MovingCamera|etc",
-        "total_duration": 180,
-        "resolution": "1080p|720p|4K",
-        "frame_rate": 30
-    }},
-    "educational_metadata": {{
-        "learning_objectives": ["from Stage 1"],
-        "target_audience": "from Stage 1",
-        "difficulty_level": "beginner|intermediate|advanced"
-    }},
-    "technical_requirements": {{
-        "required_imports": ["Text", "MathTex", "Circle", "Write", "FadeIn"],
-        "custom_functions": ["helper function names if needed"],
-        "external_resources": ["image files, data files if needed"]
-    }},
-    "code_structure": {{
-        "class_name": "SceneClassName",
-        "methods": ["construct", "custom_method_1"],
-        "complexity_level": "beginner|intermediate|advanced"
-    }}
-}}
-
-Guidelines for Manim Code Planning:
-1. Translate educational steps into specific Manim animations
-2. Maintain the pedagogical flow from Stage 1
-3. Use appropriate Manim objects for each visual element
-4. Provide realistic timing and smooth transitions
-5. Follow 3Blue1Brown animation aesthetics and practices
-6. Include proper mathematical notation rendering
-7. Plan for visual clarity and readability
-8. Consider camera movements and scene composition
-9. Ensure code modularity and reusability
-10. Optimize for educational effectiveness
-
-Your Manim structure will be used to generate complete, executable Python animation code.
-
-Human Request: {human_input}"""
-
-        human_message_prompt = HumanMessagePromptTemplate.from_template(human_message_template)
+        human_message_prompt = HumanMessagePromptTemplate.from_template("{instructions}Human Request: {human_input}")
 
         prompt = ChatPromptTemplate.from_messages([
             MessagesPlaceholder(variable_name="chat_history"),
             human_message_prompt,
         ])
-        return prompt
+        return prompt.partial(instructions=instructions + "\n\n" if instructions else "")
+
+    def conversation_stats(self):
+        """Return per-stage session counts and estimated input tokens."""
+        return {"stage1": self.stage1_sessions.stats(), "stage2": self.stage2_sessions.stats()}
 
     def generate_scene_structure(self, prompt):
         """
@@ -820,7 +661,7 @@ Human Request: {human_input}"""
         """
         return self.generate_scene_script(prompt)
 
-    def generate_complete_video_plan(self, topic):
+    def generate_complete_video_plan(self, topic, session_id=None):
         """
         Complete two-stage pipeline: Educational Breakdown + Manim Structure Generation.
         
@@ -830,6 +671,7 @@ Human Request: {human_input}"""
         
         Args:
             topic (str): User's science/math topic request.
+            session_id (str): Optional client session whose Stage 1 history is carried over.
             
         Returns:
             dict: Complete video plan with both educational breakdown and Manim structure.
@@ -843,7 +685,7 @@ Human Request: {human_input}"""
         
         # Stage 1: Educational Breakdown
         print("🔄 STAGE 1: Educational Content Analysis")
-        educational_breakdown = self.generate_educational_breakdown(topic)
+        educational_breakdown = self.generate_educational_breakdown(topic, session_id)
         
         if not educational_breakdown:
             return {
@@ -910,23 +752,34 @@ Human Request: {human_input}"""
             return None
         
         try:
-            # Create Stage 2 conversation chain
-            stage2_conversation = ConversationChain(
-                llm=self.google_chat,
-                prompt=self.stage2_prompt,
-                verbose=True,
-                memory=ConversationBufferWindowMemory(k=3, memory_key="chat_history", return_messages=True),
-                input_key="human_input",
-            )
+            stage2_memory = self.stage2_sessions.memory_for()
             
             # Build Stage 2 prompt
             stage2_prompt = self._build_stage2_prompt(educational_breakdown)
+            self.stage2_sessions.log_prompt(stage2_memory, stage2_prompt)
+            
+            instruction = context_cache.instruction("stage2_manim_structure", self.MODEL_NAME, STAGE2_SYSTEM_INSTRUCTION)
+            llm, structured_llm = self._stage_llms(instruction, self.stage2_llm, ManimStructure)
+            prompt = self._create_stage_prompt(instruction.inline_text)
             
             print("🎨 Converting educational content to Manim animations...")
-            response = stage2_conversation.predict(human_input=stage2_prompt)
+            manim_structure = None
+            if structured_llm is not None:
+                manim_structure = self._predict_structured(prompt, structured_llm, stage2_memory, stage2_prompt)
             
-            # Parse Stage 2 response
-            manim_structure = self._parse_stage2_response(response, educational_breakdown)
+            if manim_structure is None:
+                # Create Stage 2 conversation chain
+                stage2_conversation = ConversationChain(
+                    llm=llm,
+                    prompt=prompt,
+                    verbose=True,
+                    memory=stage2_memory,
+                    input_key="human_input",
+                )
+                response = stage2_conversation.predict(human_input=stage2_prompt)
+                
+                # Parse Stage 2 response
+                manim_structure = self._parse_stage2_response(response, educational_breakdown)
             
             if manim_structure:
                 print("✅ Manim structure generation successful!")
@@ -1039,32 +892,12 @@ Begin the Manim structure generation now:
         Returns:
             dict: Parsed Manim structure or None
         """
-        # Try the same parsing strategies as Stage 1
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-        
-        # Extract JSON from code blocks
-        try:
-            import re
-            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-        except Exception:
-            pass
-        
-        # Find JSON object in text
-        try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = self._clean_json_string(json_match.group(0))
-                return json.loads(json_str)
-        except Exception:
-            pass
-        
-        print("⚠️ Stage 2 JSON parsing failed")
-        return None
+            manim_structure = parse_tolerant_json(response)
+        except JSONParseError as e:
+            print(f"⚠️ Stage 2 JSON parsing failed: {e}")
+            return None
+        return manim_structure if isinstance(manim_structure, dict) else None
 
     def _validate_manim_structure(self, manim_structure):
         """
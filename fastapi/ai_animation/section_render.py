@@ -0,0 +1,221 @@
+import os
+import ast
+import shutil
+import logging
+import tempfile
+import traceback
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from .render_workers import render_worker_pool, QUALITY_FLAGS
+
+logger = logging.getLogger(__name__)
+
+load_dotenv('.env')
+
+# Render the top-level steps of construct() as separate sections on parallel workers
+MANIM_SECTION_RENDERING = (os.getenv("MANIM_SECTION_RENDERING") or "false").lower() in ("1", "true", "yes")
+MANIM_MAX_SECTIONS = int(os.getenv("MANIM_MAX_SECTIONS") or render_worker_pool.max_workers)
+
+
+def find_construct_steps(manim_code, scene_class_name):
+    """
+    List the scene methods construct() calls as top-level statements, in order.
+
+    Generated scenes orchestrate construct() as a sequence of calls such as
+    self.intro_sequence(), self.step_1_introduction(), self.clear_and_transition().
+
+    Args:
+        manim_code (str): Manim Python code
+        scene_class_name (str): Scene class to inspect
+
+    Returns:
+        list: Method names in call order (repeats included), empty if the code cannot be split
+    """
+    try:
+        tree = ast.parse(manim_code)
+    except SyntaxError:
+        return []
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_class_name:
+            methods = {item.name for item in node.body if isinstance(item, ast.FunctionDef)}
+            construct = next(
+                (item for item in node.body if isinstance(item, ast.FunctionDef) and item.name == "construct"),
+                None,
+            )
+            if construct is None:
+                return []
+
+            steps = []
+            for statement in construct.body:
+                call = statement.value if isinstance(statement, ast.Expr) else None
+                if (
+                    isinstance(call, ast.Call)
+                    and isinstance(call.func, ast.Attribute)
+                    and isinstance(call.func.value, ast.Name)
+                    and call.func.value.id == "self"
+                    and call.func.attr in methods
+                ):
+                    steps.append(call.func.attr)
+            return steps
+    return []
+
+
+def plan_sections(step_count, max_sections):
+    """Split step_count consecutive steps into at most max_sections contiguous (start, end) ranges."""
+    section_count = max(1, min(step_count, max_sections))
+    bounds = [round(i * step_count / section_count) for i in range(section_count + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(section_count)]
+
+
+def _render_section(file_path, scene_class_name, quality, media_dir, steps, start, end, section_name, is_last):
+    """
+    Render one section of a scene inside a render worker.
+
+    Steps before `start` are executed with animations skipped so every mobject
+    the section depends on exists, then steps [start, end) are rendered and the
+    scene ends early. The last section renders through the end of construct().
+
+    Returns:
+        tuple: (success_status, error_message, video_path); video_path is None for empty sections
+    """
+    import manim
+    from manim.utils.exceptions import EndSceneEarlyException
+
+    try:
+        with open(file_path, "r") as f:
+            manim_code = f.read()
+
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        options = {
+            "quality": QUALITY_FLAGS[quality],
+            "media_dir": media_dir,
+            "input_file": file_path,
+            "output_file": section_name,
+            # Sections of one scene run concurrently, so keep their partial movies apart
+            "partial_movie_dir": os.path.join(media_dir, "videos", stem, "partial_movie_files", section_name),
+            "disable_caching": True,
+            "write_to_movie": True,
+        }
+        with manim.tempconfig(options):
+            namespace = {"__name__": "__manim_render__"}
+            exec(compile(manim_code, file_path, "exec"), namespace)
+            scene_class = namespace.get(scene_class_name)
+            if scene_class is None:
+                return False, f"Scene class '{scene_class_name}' not found in {file_path}", None
+
+            scene = scene_class()
+            state = {"completed": 0, "depth": 0}
+
+            def set_skipping():
+                skip = state["completed"] < start
+                scene.renderer._original_skipping_status = skip
+                scene.renderer.skip_animations = skip
+
+            def wrap(method):
+                def wrapped(*args, **kwargs):
+                    state["depth"] += 1
+                    try:
+                        result = method(*args, **kwargs)
+                    finally:
+                        state["depth"] -= 1
+                    # Only construct()'s own calls are section boundaries
+                    if state["depth"] == 0:
+                        state["completed"] += 1
+                        if not is_last and state["completed"] >= end:
+                            raise EndSceneEarlyException()
+                        set_skipping()
+                    return result
+                return wrapped
+
+            for name in set(steps):
+                setattr(scene, name, wrap(getattr(scene, name)))
+            set_skipping()
+
+            scene.render()
+            video_path = scene.renderer.file_writer.movie_file_path
+            if video_path and os.path.exists(video_path):
+                return True, None, str(video_path)
+            return True, None, None
+    except Exception:
+        return False, traceback.format_exc(), None
+
+
+def concat_videos(video_paths, output_path):
+    """
+    Losslessly join videos with ffmpeg's concat demuxer (stream copy, no re-encode).
+
+    Returns:
+        bool: True if the concatenated video was written
+    """
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as list_file:
+        for path in video_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+        list_path = list_file.name
+
+    try:
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            logger.error(f"ffmpeg concat failed: {result.stderr}")
+            return False
+        return True
+    finally:
+        os.unlink(list_path)
+
+
+def render_sections(file_path, scene_class_name, quality, media_dir, max_sections=None):
+    """
+    Render a scene as parallel sections and stitch them into one video.
+
+    Args:
+        file_path (str): Path to the Python file with Manim code
+        scene_class_name (str): Name of the scene class to render
+        quality (str): Manim quality flag, e.g. '-qm'
+        media_dir (str): Manim media directory for the output
+        max_sections (int, optional): Upper bound on parallel sections
+
+    Returns:
+        tuple: (success_status, error_message, video_path), or None if the
+        scene cannot be split and should be rendered in one piece
+    """
+    if shutil.which("ffmpeg") is None:
+        logger.warning("ffmpeg not found; rendering scene in one piece")
+        return None
+
+    with open(file_path, "r") as f:
+        steps = find_construct_steps(f.read(), scene_class_name)
+
+    sections = plan_sections(len(steps), max_sections or MANIM_MAX_SECTIONS)
+    if len(sections) < 2:
+        return None
+
+    logger.info(f"Rendering {scene_class_name} as {len(sections)} parallel sections over {len(steps)} steps")
+
+    def render(index):
+        start, end = sections[index]
+        return render_worker_pool.run(
+            _render_section, file_path, scene_class_name, quality, media_dir,
+            steps, start, end, f"{scene_class_name}_section_{index:02d}", index == len(sections) - 1,
+        )
+
+    with ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix="manim-section") as executor:
+        results = list(executor.map(render, range(len(sections))))
+
+    for index, (success, error_message, _) in enumerate(results):
+        if not success:
+            return False, f"Section {index + 1}/{len(sections)} failed:\n{error_message}", None
+
+    section_videos = [video_path for _, _, video_path in results if video_path]
+    if not section_videos:
+        return True, None, None
+
+    output_path = os.path.join(os.path.dirname(section_videos[0]), f"{scene_class_name}.mp4")
+    if not concat_videos(section_videos, output_path):
+        return False, "Failed to concatenate rendered sections", None
+
+    for path in section_videos:
+        os.unlink(path)
+    return True, None, output_path
@@ -3,12 +3,12 @@ import re
 import json
 import logging
 from dotenv import load_dotenv
-import textwrap  # Added to normalize indentation
 from langchain.chains import ConversationChain
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, MessagesPlaceholder
 from langchain_core.messages import SystemMessage
 from langchain.chains.conversation.memory import ConversationBufferWindowMemory
 from langchain_google_genai import ChatGoogleGenerativeAI
+from .code_repair import repair_manim_code, repair_syntax, fix_syntax_error
 
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -1802,129 +1802,12 @@ Generate the complete Manim code now. Ensure it's production-ready and follows a
         Returns:
             str: Fixed and validated Manim code
         """
-        # Normalize indentation to avoid unexpected indent errors
-        code = textwrap.dedent(code)
         print("🔧 Starting code validation and fixing...")
-        
-        # CRITICAL: Fix syntax errors FIRST before anything else
-        code = self._fix_syntax_errors(code)
-        print("✅ Syntax errors fixed")
-        
-        lines = code.split('\n')
-        fixed_lines = []
-        text_positions_used = set()
-        
-        for line in lines:
-            # Fix set_background method which doesn't exist in Manim
-            if 'self.set_background' in line:
-                # Comment out the problematic line and add explanation
-                fixed_lines.append("        # REMOVED: {} (set_background method doesn't exist in Manim)".format(line.strip()))
-                fixed_lines.append("        # Background color is set in Manim config or using Camera background_color")
-                fixed_lines.append("        # Scene backgrounds are handled automatically by Manim")
-                continue
-            
-            # Fix overlapping text positions - detect Text objects without positioning
-            if 'Text(' in line and '=' in line and 'shift(' not in line and 'move_to(' not in line:
-                # This is a Text object without explicit positioning - add positioning
-                if 'title' in line.lower():
-                    line = line.rstrip() + '.shift(UP*3)'
-                elif 'subtitle' in line.lower():
-                    line = line.rstrip() + '.shift(UP*1.5)'
-                elif 'step' in line.lower() and 'title' in line.lower():
-                    line = line.rstrip() + '.shift(UP*2)'
-                else:
-                    # Add random positioning to avoid overlap
-                    positions = ['UP*1', 'DOWN*1', 'LEFT*2', 'RIGHT*2', 'UP*2', 'DOWN*2']
-                    for pos in positions:
-                        if pos not in text_positions_used:
-                            line = line.rstrip() + '.shift({})'.format(pos)
-                            text_positions_used.add(pos)
-                            break
-            
-            # Check for missing scene clearing between methods
-            if 'def ' in line and 'construct' not in line and '__init__' not in line:
-                # This is a new method - ensure it starts with clearing if it's not the first method
-                method_name = line.strip()
-                fixed_lines.append(line)
-                # Add clearing instruction as comment
-                fixed_lines.append("        # Clear previous content to avoid overlap")
-                fixed_lines.append("        # self.play(FadeOut(*self.mobjects)) # Uncomment if needed")
-                continue
-            
-            # Skip lines with ImageMobject references
-            if 'ImageMobject' in line or 'Image.open' in line:
-                # Replace with a comment explaining what was removed
-                comment_line = line.strip()
-                fixed_lines.append("        # REMOVED: {} (ImageMobject not supported)".format(comment_line))
-                fixed_lines.append("        # Using text description instead:")
-                
-                # Extract variable name if possible
-                if '=' in line and 'ImageMobject' in line:
-                    var_name = line.split('=')[0].strip()
-                    # Replace with a text description with positioning
-                    fixed_lines.append("        {} = Text('Visual representation of concept', font_size=24).shift(DOWN*1)".format(var_name))
-                continue
-            
-            # Skip lines that reference image files
-            if any(ext in line.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.ico']):
-                # Comment out the problematic line
-                fixed_lines.append("        # REMOVED: {} (Image file reference not supported)".format(line.strip()))
-                continue
-            
-            # Fix other common Manim method errors
-            if any(method in line for method in ['self.set_color_scheme', 'self.set_theme', 'self.configure_camera']):
-                # Comment out invalid methods
-                fixed_lines.append("        # REMOVED: {} (Invalid Manim method)".format(line.strip()))
-                continue
-                
-            # Fix common import issues
-            if line.strip() == 'from manim import *':
-                fixed_lines.append(line)
-            elif 'import' in line and any(img_ref in line for img_ref in ['PIL', 'Image', 'cv2', 'opencv']):
-                # Comment out image-related imports
-                fixed_lines.append("        # REMOVED: {} (Image library import not needed)".format(line.strip()))
-                continue
-            else:
-                fixed_lines.append(line)
-        
-        # Join the fixed lines
-        fixed_code = '\n'.join(fixed_lines)
-        
-        # Apply syntax fixes AGAIN after other modifications
-        fixed_code = self._fix_syntax_errors(fixed_code)
-        print("✅ Applied syntax fixes again after other modifications")
-        
-        # Handle empty method bodies after removing invalid lines
-        # If a method becomes empty (only has pass or comments), add a pass statement
-        import re
-        
-        # Find method definitions and check if they're empty
-        method_pattern = r'(def\s+\w+\([^)]*\):\s*)((?:\s*#.*\n)*)\s*$'
-        def fix_empty_method(match):
-            method_def = match.group(1)
-            comments = match.group(2) if match.group(2) else ""
-            # If there are only comments or nothing after the method definition, add pass
-            if not comments.strip() or all(line.strip().startswith('#') or not line.strip() for line in comments.split('\n')):
-                return method_def + '\n' + comments + '        pass\n'
-            return match.group(0)
-        
-        fixed_code = re.sub(method_pattern, fix_empty_method, fixed_code, flags=re.MULTILINE)
-        
-        # Ensure we have proper imports
-        if 'from manim import *' not in fixed_code:
-            fixed_code = 'from manim import *\n\n' + fixed_code
-        
-        # Final syntax validation
-        try:
-            import ast
-            ast.parse(fixed_code)
-            print("✅ Final syntax validation passed")
-        except SyntaxError as e:
-            print("❌ Final syntax error detected: {}".format(e.msg))
-            print("   Problem line {}: {}".format(e.lineno, e.text))
-            # Try one more aggressive fix
-            fixed_code = self._emergency_syntax_fix(fixed_code, e)
-        
+        fixes = []
+        fixed_code = repair_manim_code(code, fixes)
+        for fix in fixes:
+            print("🔧 {}".format(fix))
+        print("✅ Code validation complete")
         return fixed_code
 
     def _fix_syntax_errors(self, code):
@@ -1937,170 +1820,7 @@ Generate the complete Manim code now. Ensure it's production-ready and follows a
         Returns:
             str: Code with syntax errors fixed
         """
-        if not code:
-            return code
-        
-        import re
-        import ast
-        
-        print("🔧 Starting comprehensive syntax error fixing...")
-        
-        # Step 1: Fix orphaned lines and incomplete Text declarations
-        lines = code.split('\n')
-        fixed_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith('#'):
-                fixed_lines.append(line)
-                i += 1
-                continue
-            
-            # Detect orphaned method calls (lines that start with parameters or method calls)
-            if stripped.startswith(('font_size=', 'color=', '.shift(', '.scale(', '.rotate(')):
-                print("🔧 Removing orphaned line {}: {}".format(i+1, stripped))
-                # Skip this line entirely as it's a broken continuation
-                i += 1
-                continue
-            
-            # Fix the main problematic pattern: Text("text",.shift(
-            if 'Text(' in line and '",' in line and any(method in line for method in ['.shift(', '.scale(', '.rotate(']):
-                # Pattern: Text("some text",.shift(UP*1) -> Text("some text").shift(UP*1)
-                original_line = line
-                # Fix comma before method calls
-                line = re.sub(r'Text\("([^"]*)",\s*\.(shift|scale|rotate|set_color)\(', r'Text("\1").\2(', line)
-                if line != original_line:
-                    print("🔧 Fixed Text+comma+method pattern: {}".format(line.strip()))
-            
-            # Fix pattern: Text("text"), .method( -> Text("text").method(
-            if 'Text(' in line and '"), .' in line:
-                original_line = line
-                line = re.sub(r'Text\("([^"]*)"\),\s*\.(shift|scale|rotate|set_color)\(', r'Text("\1").\2(', line)
-                if line != original_line:
-                    print("🔧 Fixed Text+closing+comma+method pattern: {}".format(line.strip()))
-            
-            # Fix incomplete Text declarations that may span multiple lines
-            if 'Text(' in line and not ')' in line and not line.strip().endswith(','):
-                # This might be an incomplete Text declaration - look ahead
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line.startswith(('font_size=', 'color=')) and ')' in next_line:
-                        # Combine the lines properly
-                        combined = line.rstrip() + ', ' + next_line
-                        # Ensure proper syntax
-                        if combined.count('(') == combined.count(')'):
-                            fixed_lines.append(combined)
-                            print("🔧 Combined incomplete Text declaration: {}".format(combined.strip()))
-                            i += 2  # Skip both lines
-                            continue
-            
-            # Handle missing closing parentheses
-            if 'Text(' in line and line.count('(') > line.count(')'):
-                missing_parens = line.count('(') - line.count(')')
-                original_line = line
-                line = line.rstrip() + ')' * missing_parens
-                if line != original_line:
-                    print("🔧 Added {} missing closing parenthesis(es): {}".format(missing_parens, line.strip()))
-            
-            fixed_lines.append(line)
-            i += 1
-        
-        # Rebuild the code
-        code = '\n'.join(fixed_lines)
-        
-        # Step 2: Apply regex-based fixes
-        print("🔧 Applying regex-based syntax fixes...")
-        
-        # Fix patterns in order of complexity
-        patterns_and_fixes = [
-            # Fix Text("text",.shift() patterns
-            (r'Text\("([^"]*)",\s*\.shift\(', r'Text("\1").shift('),
-            (r'Text\("([^"]*)",\s*\.scale\(', r'Text("\1").scale('),
-            (r'Text\("([^"]*)",\s*\.rotate\(', r'Text("\1").rotate('),
-            
-            # Fix trailing commas before method calls
-            (r'",\s*\.(shift|scale|rotate|set_color)\(', r'").\1('),
-            
-            # Fix double commas
-            (r',,+', ','),
-            
-            # Fix spaces around operators
-            (r'\s+\.', '.'),
-            
-            # Fix missing closing parentheses at end of lines
-            (r'Text\([^)]*$', lambda m: m.group(0) + ')'),
-        ]
-        
-        for pattern, replacement in patterns_and_fixes:
-            if callable(replacement):
-                code = re.sub(pattern, replacement, code)
-            else:
-                code = re.sub(pattern, replacement, code)
-        
-        # Step 3: Final syntax validation and targeted fixes
-        try:
-            ast.parse(code)
-            print("✅ Syntax validation passed")
-        except SyntaxError as e:
-            print("⚠️ Syntax error detected at line {}: {}".format(e.lineno, e.msg))
-            
-            if e.lineno and e.text:
-                lines = code.split('\n')
-                if 0 < e.lineno <= len(lines):
-                    problem_line_index = e.lineno - 1
-                    problem_line = lines[problem_line_index]
-                    
-                    print("   Problem line: {}".format(problem_line.strip()))
-                    
-                    # Apply targeted fixes based on error type
-                    if isinstance(e, IndentationError):
-                        if "unexpected indent" in e.msg.lower():
-                            # Remove unexpected indentation
-                            fixed_line = problem_line.lstrip()
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Removed unexpected indentation: {}".format(fixed_line.strip()))
-                        elif "expected an indented block" in e.msg.lower():
-                            # Add proper indentation
-                            fixed_line = "    " + problem_line
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Added expected indentation: {}".format(fixed_line.strip()))
-                    
-                    elif 'invalid syntax' in e.msg.lower():
-                        # Handle specific syntax issues
-                        if problem_line.count('(') > problem_line.count(')'):
-                            # Missing closing parentheses
-                            missing = problem_line.count('(') - problem_line.count(')')
-                            fixed_line = problem_line + ')' * missing
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Added {} missing closing parentheses".format(missing))
-                        
-                        elif ',.' in problem_line:
-                            # Fix comma-dot patterns
-                            fixed_line = problem_line.replace(',.', '.')
-                            lines[problem_line_index] = fixed_line
-                            print("🔧 Fixed comma-dot pattern: {}".format(fixed_line.strip()))
-                    
-                    # Rebuild and try again
-                    code = '\n'.join(lines)
-                    
-                    try:
-                        ast.parse(code)
-                        print("✅ Syntax error fixed successfully")
-                    except SyntaxError as e2:
-                        print("❌ Could not fix syntax error: {}".format(e2.msg))
-                        # Add error comment but keep the code
-                        error_comment = "# SYNTAX ERROR: {} at line {}\n".format(e.msg, e.lineno)
-                        code = error_comment + code
-            else:
-                print("❌ Syntax error without line information: {}".format(e.msg))
-                error_comment = "# SYNTAX ERROR: {}\n".format(e.msg)
-                code = error_comment + code
-        
-        return code
+        return repair_syntax(code)
 
     def _emergency_syntax_fix(self, code, syntax_error):
         """
@@ -2113,71 +1833,7 @@ Generate the complete Manim code now. Ensure it's production-ready and follows a
         Returns:
             str: Code with emergency fixes applied
         """
-        if not syntax_error.lineno or not syntax_error.text:
-            return code
-        
-        lines = code.split('\n')
-        if syntax_error.lineno > len(lines):
-            return code
-        
-        problem_line = lines[syntax_error.lineno - 1]
-        print("🚨 Emergency syntax fix for line {}: {}".format(syntax_error.lineno, problem_line.strip()))
-        
-        # Common emergency fixes
-        fixed_line = problem_line
-        
-        # Fix the specific pattern we keep seeing
-        if 'Text(' in problem_line and '",' in problem_line and '.shift(' in problem_line:
-            # Pattern: Text("text",.shift(UP*1) -> Text("text").shift(UP*1)
-            fixed_line = re.sub(r'Text\("([^"]*)",\s*\.shift\(([^)]*)\)', r'Text("\1").shift(\2)', problem_line)
-            print("🔧 Emergency fix applied: {}".format(fixed_line.strip()))
-        
-        # Fix missing closing parentheses
-        elif problem_line.count('(') > problem_line.count(')'):
-            missing = problem_line.count('(') - problem_line.count(')')
-            fixed_line = problem_line.rstrip() + ')' * missing
-            print("🔧 Emergency fix: added {} closing parentheses".format(missing))
-        
-        # Fix missing opening parentheses (rare)
-        elif problem_line.count(')') > problem_line.count('('):
-            # Find where to add opening parentheses (usually after =)
-            if '=' in problem_line and 'Text(' in problem_line:
-                parts = problem_line.split('=', 1)
-                if len(parts) == 2:
-                    fixed_line = parts[0] + '= Text(' + parts[1].lstrip().lstrip('Text(')
-                    print("🔧 Emergency fix: added opening parenthesis")
-        
-        # Fix malformed quotes
-        elif problem_line.count('"') % 2 == 1:
-            # Odd number of quotes - add one at the end of the string content
-            if 'Text(' in problem_line:
-                # Find the last quote and add a closing one
-                last_quote_pos = problem_line.rfind('"')
-                if last_quote_pos > 0 and last_quote_pos < len(problem_line) - 1:
-                    # Check if we need to add quote before comma or other punctuation
-                    next_char_pos = last_quote_pos + 1
-                    if next_char_pos < len(problem_line) and problem_line[next_char_pos] in ',.):':
-                        fixed_line = problem_line[:last_quote_pos + 1] + '"' + problem_line[next_char_pos:]
-                        print("🔧 Emergency fix: added missing quote")
-        
-        # Apply the fix if we made one
-        if fixed_line != problem_line:
-            lines[syntax_error.lineno - 1] = fixed_line
-            fixed_code = '\n'.join(lines)
-            
-            # Test if the fix worked
-            try:
-                import ast
-                ast.parse(fixed_code)
-                print("✅ Emergency fix successful!")
-                return fixed_code
-            except SyntaxError as e2:
-                print("❌ Emergency fix failed: {}".format(e2.msg))
-                # Return original code with a comment about the error
-                return "# SYNTAX ERROR DETECTED: {}\n# LINE {}: {}\n\n".format(syntax_error.msg, syntax_error.lineno, syntax_error.text) + code
-        
-        # If no fix was applied, return original with error comment
-        return "# SYNTAX ERROR DETECTED: {}\n# LINE {}: {}\n\n".format(syntax_error.msg, syntax_error.lineno, syntax_error.text) + code
+        return fix_syntax_error(code, syntax_error)
 
 # Initialize the Manim code generator
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
@@ -1,5 +1,6 @@
 import os
-from fastapi import FastAPI, HTTPException
+import asyncio
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
@@ -7,10 +8,20 @@ from dotenv import load_dotenv
 
 # Import the AI animation router
 from ai_animation.route import router as ai_animation_router
+from ai_animation.render_workers import render_worker_pool, MANIM_RENDER_BACKEND
 from system_design.route import router as system_design_router
 
 # Import the roadmap generation router
 from roadmap_gen.route import router as roadmap_router
+from core.llm_clients import llm_client_stats
+from core.tracing import tracer, TracingMiddleware, REQUEST_ID_HEADER
+from core import metrics
+from core.execution import execution_stats
+from core.context_cache import context_cache
+from ai_animation.jobs import job_manager
+from ai_animation.render_cache import render_cache
+from system_design.agent import system_design_cache
+from roadmap_gen.agent import roadmap_stage_cache
 
 # Load environment variables
 load_dotenv()
@@ -40,8 +51,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
 
+# Added last so it wraps everything else, CORS included
+app.add_middleware(TracingMiddleware)
+
 # Mount static files directory
 app.mount("/media", StaticFiles(directory=str(MEDIA_DIR.absolute())), name="media")
 
@@ -51,6 +66,18 @@ app.include_router(system_design_router)
 app.include_router(roadmap_router)
 
 
+@app.on_event("startup")
+async def start_render_workers():
+    """Pre-warm the Manim render workers so the first animation skips the import cost"""
+    if MANIM_RENDER_BACKEND == "workers":
+        await asyncio.to_thread(render_worker_pool.warm_up)
+
+
+@app.on_event("shutdown")
+def stop_render_workers():
+    render_worker_pool.shutdown()
+
+
 @app.get("/")
 def read_root():
     """Root endpoint with welcome message"""
@@ -77,6 +104,7 @@ def health_check():
             "roadmap_gen": "active",
         },
         "media_directory": str(MEDIA_DIR.absolute()),
+        "llm_clients": llm_client_stats(),
     }
 
 
@@ -89,11 +117,17 @@ def get_api_info():
         "services": {
             "ai_animation": {
                 "description": "Generate AI-powered animations and avatars",
-                "endpoints": ["/ai-animation/generate", "/ai-animation/health"],
+                "endpoints": [
+                    "/ai-animation/generate",
+                    "/ai-animation/jobs",
+                    "/ai-animation/jobs/{job_id}",
+                    "/ai-animation/health",
+                ],
                 "features": [
                     "Avatar generation",
                     "Animation creation",
                     "Media management",
+                    "Background render jobs",
                 ],
             },
             "system_design": {
@@ -180,21 +214,20 @@ async def get_service_status():
 
     # Check System Design service
     try:
-        from system_design.agent import SystemDesignGenerationSystem
+        from system_design.route import system_design_system
 
-        system_design_system = SystemDesignGenerationSystem()
         status["services"]["system_design"] = {
             "status": "healthy",
             "features": ["LangGraph workflow", "PlantUML generation", "Streaming"],
+            "result_cache": system_design_system.result_cache.stats(),
         }
     except Exception as e:
         status["services"]["system_design"] = {"status": "error", "error": str(e)}
 
     # Check Roadmap Generation service
     try:
-        from roadmap_gen.agent import RoadmapGenerationSystem
+        from roadmap_gen.route import roadmap_system
 
-        roadmap_system = RoadmapGenerationSystem()
         status["services"]["roadmap_generation"] = {
             "status": "healthy",
             "features": [
@@ -203,6 +236,7 @@ async def get_service_status():
                 "React Flow",
                 "Streaming",
             ],
+            "stage_cache": roadmap_system.stage_cache.stats(),
         }
     except Exception as e:
         status["services"]["roadmap_generation"] = {"status": "error", "error": str(e)}
@@ -214,6 +248,70 @@ async def get_service_status():
     return status
 
 
+@app.get("/traces")
+def list_traces():
+    """Recent requests with span counts, most recent first"""
+    if tracer.memory is None:
+        raise HTTPException(status_code=404, detail="In-memory traces are disabled; add 'memory' to TRACE_EXPORTERS")
+    return {"traces": tracer.memory.recent()}
+
+
+@app.get("/traces/{request_id}")
+def get_trace(request_id: str):
+    """Spans of one request (from its X-Request-ID response header) and time spent per span name"""
+    if tracer.memory is None:
+        raise HTTPException(status_code=404, detail="In-memory traces are disabled; add 'memory' to TRACE_EXPORTERS")
+    spans = tracer.memory.spans_for(request_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail=f"No trace recorded for request {request_id}")
+
+    summary = {}
+    for span in spans:
+        entry = summary.setdefault(span["name"], {"count": 0, "total_ms": 0.0, "errors": 0})
+        entry["count"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + span["duration_ms"], 3)
+        entry["errors"] += span["status"] == "error"
+    return {"request_id": request_id, "summary": summary, "spans": spans}
+
+
+def collect_runtime_metrics():
+    """Copy queue depths, in-flight work and cache counters from component stats into the metrics."""
+    for status, count in job_manager.stats().items():
+        if status in ("queued", "in_progress", "complete", "error"):
+            metrics.animation_jobs.set(count, status=status)
+
+    render_stats = execution_stats()
+    metrics.render_queue_depth.set(render_stats["waiting_renders"])
+    metrics.active_renders.set(render_stats["active_renders"])
+    metrics.render_worker_crashes.set_total(render_worker_pool.stats()["crashes"])
+
+    llm_stats = llm_client_stats()
+    for service, stats in llm_stats["services"].items():
+        metrics.llm_in_flight.set(stats["in_flight"], service=service)
+        metrics.llm_waiting.set(stats["waiting"], service=service)
+    metrics.llm_rate_limit_queue_depth.set(llm_stats["rate_limiter"]["queue_depth"])
+    metrics.llm_rate_factor.set(llm_stats["rate_limiter"]["rate_factor"])
+
+    for cache in (system_design_cache, roadmap_stage_cache):
+        stats = cache.stats()
+        metrics.set_cache_stats(stats["namespace"], stats["hits"], stats["misses"])
+    stats = render_cache.stats()
+    metrics.set_cache_stats("render", stats["hits"], stats["misses"])
+    stats = context_cache.stats()
+    metrics.set_cache_stats("llm_context", stats["cached_calls"], stats["inline_calls"])
+
+
+metrics.registry.add_collector(collect_runtime_metrics)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of request, stage, LLM, cache and queue metrics"""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; set METRICS_ENABLED=true")
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
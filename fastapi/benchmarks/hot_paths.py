@@ -0,0 +1,343 @@
+"""
+Micro-benchmarks for the non-LLM work done on every request.
+
+Times the response parsing and post-processing each pipeline runs on LLM
+output and reports ops/sec, milliseconds per call and peak memory allocated
+per call (measured in a separate tracemalloc pass so it does not skew timings):
+
+    system design   encode_plantuml, _extract_d3_components, _extract_json
+    roadmap         _extract_json, _validate_roadmap_structure
+    animation       _parse_stage1_response, _extract_manim_code,
+                    extract_scene_class_name, _fix_syntax_errors
+
+The synthesized corpus renders realistic responses at each --scales factor
+(1 is a typical response; 100 is far larger than Gemini returns today, to
+expose superlinear behaviour). Point --corpus at an LLM_RECORDINGS_DIR written
+with LLM_BACKEND=record to benchmark recorded traffic instead; each recording
+is routed to the functions that process its service's responses.
+
+Save a run with --save and compare later runs against it with --compare; the
+exit status is 1 when any case is slower than the baseline by more than
+--tolerance, so the suite can gate changes.
+
+Run from the fastapi/ directory:
+    python -m benchmarks.hot_paths --scales 1,10,100 --min-time 0.5
+    python -m benchmarks.hot_paths --save hot_paths_baseline.json
+    python -m benchmarks.hot_paths --compare hot_paths_baseline.json
+"""
+import os
+import io
+import sys
+import glob
+import json
+import time
+import copy
+import random
+import argparse
+import logging
+import tracemalloc
+from contextlib import redirect_stdout
+
+# No LLM calls are made; the fake backend avoids building Gemini clients
+os.environ.setdefault("GOOGLE_GENERATIVE_AI_API_KEY", "benchmark-placeholder-key")
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from system_design.agent import SystemDesignGenerationSystem, encode_plantuml
+from roadmap_gen.agent import RoadmapGenerationSystem
+from ai_animation.script_generator import ScienceVideoGenerator
+from ai_animation.main_code_generator import ManIMCodeGenerator
+from ai_animation.animation_creator import extract_scene_class_name
+from benchmarks.json_parsing import dump
+from benchmarks.syntax_repair import SCENE_TEMPLATE, STEP_TEMPLATE, MUTATIONS
+
+NODE_TYPES = ["foundation", "core", "advanced", "project", "milestone"]
+
+
+def plantuml_response(scale, rng):
+    """A component diagram with about 20 * scale elements and twice as many arrows."""
+    lines = ["```plantuml", "@startuml", "title Generated Architecture", 'actor "User" as user', 'actor "Admin" as admin']
+    services = [f"svc{n}" for n in range(12 * scale)]
+    lines += [f"[Service {n}] as {alias}" for n, alias in enumerate(services)]
+    lines += [f'database "Store {n}" as db{n}' for n in range(4 * scale)]
+    lines += [f'cloud "Provider {n}" as cloud{n}' for n in range(2 * scale)]
+    lines += [f'interface "API {n}" as api{n}' for n in range(2 * scale)]
+    lines += ["user --> svc0 : HTTPS", "admin --> svc0 : HTTPS"]
+    for alias in services:
+        lines.append(f"svc0 --> {alias} : routes")
+        lines.append(f"{alias} --> db{rng.randrange(4 * scale)} : reads/writes")
+        if rng.random() < 0.3:
+            lines.append(f"{alias} ..> cloud{rng.randrange(2 * scale)} : events")
+    lines += ["@enduml", "```"]
+    return "Here is the component diagram:\n\n" + "\n".join(lines) + "\n\nThe gateway routes every request."
+
+
+def analysis_response(scale, rng):
+    analysis = {
+        "system_type": "microservices",
+        "scale": "large",
+        "key_components": [f"Service {n}" for n in range(8 * scale)],
+        "data_flow": [f"Step {n}: request passes to the next service" for n in range(6 * scale)],
+        "technologies": ["Kubernetes", "PostgreSQL", "Redis", "Kafka"] * scale,
+        "patterns": ["API Gateway", "CQRS", "Circuit Breaker"],
+        "non_functional_requirements": ["scalability", "reliability", "security"],
+        "estimated_complexity": "high",
+        "recommended_architecture": "microservices",
+    }
+    return dump(analysis, rng, ("trailing_commas",))
+
+
+def roadmap_object(scale, rng, with_edges=True):
+    """A React Flow roadmap with about 18 * scale nodes in five phases."""
+    nodes, edges, phases, previous = [], [], [], []
+    for phase, node_type in enumerate(NODE_TYPES):
+        current = []
+        for n in range((6 if node_type == "core" else 3) * scale):
+            node_id = f"node_{len(nodes) + 1}"
+            nodes.append({
+                "id": node_id,
+                "title": f"{node_type.title()} topic {n + 1}",
+                "description": f"Learn {node_type} topic {n + 1}, then apply it in a small exercise before moving on.",
+                "type": node_type,
+                "duration": "2-3 weeks",
+                "prerequisites": previous[:1],
+                "resources": [{"type": "course", "title": f"Course {n + 1}", "url": "https://example.com", "estimated_time": "20 hours"}],
+                "skills_gained": [f"{node_type} skill {n + 1}", "problem solving"],
+                "projects": [f"Project {n + 1}"],
+                "assessment": "Complete exercises and build practice project",
+                "position": {"x": rng.randint(-8, 8) * 300, "y": 100 + phase * 400},
+            })
+            if with_edges and previous:
+                source = previous[rng.randrange(len(previous))]
+                edges.append({"id": f"edge_{source}_to_{node_id}", "source": source, "target": node_id, "type": "smoothstep"})
+            current.append(node_id)
+        phases.append({"name": f"{node_type.title()} Phase", "nodes": current, "color": "#e3f2fd", "description": f"{node_type} phase"})
+        previous = current
+    return {"roadmap_id": "benchmark", "nodes": nodes, "edges": edges, "phases": phases}
+
+
+def roadmap_response(scale, rng):
+    return "```json\n" + dump(roadmap_object(scale, rng), rng, ("arithmetic", "trailing_commas")) + "\n```"
+
+
+def stage1_response(scale, rng):
+    steps = [{
+        "step_number": n,
+        "step_title": f"Part {n}",
+        "description": f"Part {n} builds on the previous idea with a worked example. " * 4,
+        "key_concepts": [f"concept {n}a", f"concept {n}b"],
+        "equations": [f"y = {n}x + c"],
+        "data_points": [],
+        "real_world_examples": [f"Example {n}"],
+        "common_misconceptions": [f"Misconception {n}"],
+        "narration_script": f"Now let's look at part {n}. " * 6,
+        "visual_elements": {"diagrams": ["diagram"], "animations": ["fade in"], "text_displays": [f"Part {n}"], "color_scheme": ["BLUE"], "highlighting": []},
+        "animation_plan": f"Draw the shapes for part {n} and transform them. " * 4,
+        "duration_seconds": 45,
+        "difficulty_level": "intermediate",
+        "transition_to_next": "Next we build on this.",
+    } for n in range(1, 5 * scale + 1)]
+    breakdown = {
+        "topic_analysis": {"domain": "Mathematics", "complexity_level": "High School", "core_concepts": ["a", "b"], "prerequisites": []},
+        "title": "Benchmark Topic",
+        "abstract": "An animated walk through the topic.",
+        "learning_objectives": ["Understand the topic"],
+        "educational_steps": steps,
+        "summary": "Summary.",
+        "assessment": {"quiz_questions": [], "thought_experiments": [], "interactive_elements": []},
+        "metadata": {"target_audience": "Students", "estimated_total_duration": 45 * len(steps), "real_world_applications": [], "related_topics": [], "difficulty_progression": "Gradual"},
+    }
+    return "Here is the breakdown:\n\n```json\n" + dump(breakdown, rng, ("trailing_commas",)) + "\n```"
+
+
+def scene_code(scale, rng, broken):
+    step_count = 4 * scale
+    code = SCENE_TEMPLATE.format(
+        step_calls="\n".join(f"        self.step_{n}_concept()\n        self.clear_and_transition()" for n in range(1, step_count + 1)),
+        steps="".join(STEP_TEMPLATE.format(n=n) for n in range(1, step_count + 1)),
+    )
+    if not broken:
+        return code
+    lines = code.split("\n")
+    for mutation in MUTATIONS:
+        lines = mutation(lines, rng)
+    return "\n".join(lines)
+
+
+def manim_response(scale, rng):
+    return "Here is the complete animation:\n\n```python\n" + scene_code(scale, rng, False) + "\n```\n\nRender it with manim -qm."
+
+
+class Case:
+    """One function applied to one input; `make` returns a fresh argument for each call."""
+
+    def __init__(self, function, input_name, text, call, make=None):
+        self.function = function
+        self.input_name = input_name
+        self.size = len(text.encode("utf-8"))
+        self.call = call
+        self.make = make or (lambda: text)
+
+    @property
+    def key(self):
+        return f"{self.function}[{self.input_name}]"
+
+
+class Targets:
+    """The pipeline objects whose methods are benchmarked."""
+
+    def __init__(self):
+        self.system_design = SystemDesignGenerationSystem()
+        self.roadmap = RoadmapGenerationSystem()
+        self.script = ScienceVideoGenerator(os.environ["GOOGLE_GENERATIVE_AI_API_KEY"])
+        self.code = ManIMCodeGenerator(os.environ["GOOGLE_GENERATIVE_AI_API_KEY"])
+
+    def plantuml_cases(self, name, response):
+        plantuml = self.system_design._extract_plantuml_code(response)
+        return [
+            Case("encode_plantuml", name, plantuml, encode_plantuml),
+            Case("system_design._extract_d3_components", name, plantuml, self.system_design._extract_d3_components),
+        ]
+
+    def analysis_cases(self, name, response):
+        return [Case("system_design._extract_json", name, response, self.system_design._extract_json)]
+
+    def roadmap_cases(self, name, response):
+        cases = [Case("roadmap._extract_json", name, response, self.roadmap._extract_json)]
+        parsed = self.roadmap._extract_json(response)
+        if parsed.get("nodes"):
+            # The validator rewrites positions in place, so every call gets its own copy
+            cases.append(Case("roadmap._validate_roadmap_structure", name, response,
+                              self.roadmap._validate_roadmap_structure, lambda: copy.deepcopy(parsed)))
+        return cases
+
+    def stage1_cases(self, name, response):
+        return [Case("script._parse_stage1_response", name, response, lambda text: self.script._parse_stage1_response(text, "topic"))]
+
+    def manim_cases(self, name, response):
+        code = self.code._extract_manim_code(response) or response
+        return [
+            Case("code._extract_manim_code", name, response, self.code._extract_manim_code),
+            Case("extract_scene_class_name", name, code, extract_scene_class_name),
+            Case("code._fix_syntax_errors", name, code, self.code._fix_syntax_errors),
+        ]
+
+
+def synthesize_cases(targets, scales, seed=0):
+    rng = random.Random(seed)
+    cases = []
+    for scale in scales:
+        suffix = f"x{scale}"
+        cases += targets.plantuml_cases(f"diagram_{suffix}", plantuml_response(scale, rng))
+        cases += targets.analysis_cases(f"analysis_{suffix}", analysis_response(scale, rng))
+        cases += targets.roadmap_cases(f"roadmap_{suffix}", roadmap_response(scale, rng))
+        # Without edges the validator also has to build them
+        unlinked = roadmap_object(scale, rng, with_edges=False)
+        cases.append(Case("roadmap._validate_roadmap_structure", f"roadmap_no_edges_{suffix}", json.dumps(unlinked),
+                          targets.roadmap._validate_roadmap_structure, lambda unlinked=unlinked: copy.deepcopy(unlinked)))
+        cases += targets.stage1_cases(f"stage1_{suffix}", stage1_response(scale, rng))
+        cases += targets.manim_cases(f"scene_{suffix}", manim_response(scale, rng))
+        broken = scene_code(scale, rng, True)
+        cases.append(Case("code._fix_syntax_errors", f"broken_scene_{suffix}", broken, targets.code._fix_syntax_errors))
+    return cases
+
+
+def load_recorded_cases(targets, directory):
+    """Route recorded responses (LLM_BACKEND=record output) to the functions that process them."""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        for index, record in enumerate(records):
+            service, response = record.get("service"), record.get("response") or ""
+            name = f"{os.path.basename(path)}:{index + 1}"
+            if service == "system_design":
+                cases += targets.plantuml_cases(name, response) if "@startuml" in response else targets.analysis_cases(name, response)
+            elif service == "roadmap" and "{" in response:
+                cases += targets.roadmap_cases(name, response)
+            elif service == "script" and "educational_steps" in response:
+                cases += targets.stage1_cases(name, response)
+            elif service in ("manim_code", "code_repair"):
+                cases += targets.manim_cases(name, response)
+    return cases
+
+
+def measure(case, min_time, max_calls):
+    """Return (calls, seconds per call, peak bytes allocated by one call)."""
+    calls = elapsed = 0
+    with redirect_stdout(io.StringIO()):
+        case.call(case.make())  # warm-up: regex compilation, lazy imports
+        while calls < max_calls and (calls == 0 or elapsed < min_time):
+            argument = case.make()
+            started = time.perf_counter()
+            case.call(argument)
+            elapsed += time.perf_counter() - started
+            calls += 1
+
+        argument = case.make()
+        tracemalloc.start()
+        try:
+            case.call(argument)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return calls, elapsed / calls, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="LLM_RECORDINGS_DIR with recorded responses (default: synthesized corpus)")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated input size factors for the synthesized corpus")
+    parser.add_argument("--min-time", type=float, default=0.3, help="Seconds to spend timing each case")
+    parser.add_argument("--max-calls", type=int, default=10000, help="Upper bound on timed calls per case")
+    parser.add_argument("--filter", default="", help="Only run cases whose function name contains this text")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against --compare (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # The pipelines log every parse; keep the output readable
+    logging.disable(logging.CRITICAL)
+
+    targets = Targets()
+    if args.corpus:
+        cases = load_recorded_cases(targets, args.corpus)
+        if not cases:
+            raise SystemExit(f"No usable recordings found in {args.corpus}")
+    else:
+        cases = synthesize_cases(targets, [int(scale) for scale in args.scales.split(",")])
+    cases = [case for case in cases if args.filter in case.function]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'function':<38} {'input':<24} {'size KB':>9} {'ops/sec':>10} {'ms/op':>9} {'peak KB':>9} {'vs base':>8}")
+    results, regressions = {}, []
+    for case in cases:
+        calls, seconds, peak = measure(case, args.min_time, args.max_calls)
+        results[case.key] = {"size_bytes": case.size, "calls": calls, "seconds_per_op": seconds, "peak_bytes": peak}
+
+        change = ""
+        previous = baseline.get(case.key)
+        if previous:
+            ratio = seconds / previous["seconds_per_op"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > args.tolerance:
+                regressions.append(case.key)
+        print(f"{case.function:<38} {case.input_name[:24]:<24} {case.size / 1024:>9.1f} {1 / seconds:>10.1f} "
+              f"{seconds * 1000:>9.3f} {peak / 1024:>9.1f} {change:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.tolerance:.0%}:")
+        for key in regressions:
+            print(f"  {key}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
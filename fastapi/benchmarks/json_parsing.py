@@ -0,0 +1,556 @@
+"""
+Benchmark the shared tolerant JSON parser against the cascades it replaced.
+
+Baselines are the roadmap generator's regex cleaning cascade (_extract_json,
+_clean_json_string, _aggressive_json_clean, _final_json_rescue) and the script
+generator's four-strategy Stage 1 parser, copied here verbatim. Each parser is
+scored on how many responses it recovers and how many it recovers exactly, and
+timed per response.
+
+Point --corpus at a directory of recorded LLM responses (*.txt or *.json, one
+response per file) to measure real traffic; accuracy then counts recoveries
+only. Without it, roadmap-style responses are synthesized with the defects
+Gemini produces: prose and code fences, trailing commas, arithmetic in
+positions, unquoted keys, comments, Python literals and truncated output.
+
+Run from the fastapi/ directory:
+    python -m benchmarks.json_parsing --corpus recorded_responses/ --repeat 50
+"""
+import os
+import re
+import json
+import glob
+import time
+import random
+import argparse
+import logging
+from typing import Dict, Any
+
+from core.tolerant_json import parse_tolerant_json, JSONParseError
+
+logger = logging.getLogger(__name__)
+
+
+def build_roadmap(rng):
+    """A roadmap-shaped object with positioned nodes, edges and phases."""
+    node_count = rng.randint(4, 30)
+    nodes = [
+        {
+            "id": f"node_{n}",
+            "type": "skill" if n % 3 else "milestone",
+            "data": {"label": f"Skill {n}", "description": f"Learn topic {n} and apply it", "difficulty": rng.choice(["beginner", "intermediate", "advanced"]), "optional": n % 4 == 0},
+            "position": {"x": rng.randint(-8, 8) * 150, "y": n * 120},
+        }
+        for n in range(node_count)
+    ]
+    edges = [{"id": f"edge_{n}", "source": f"node_{n}", "target": f"node_{n + 1}"} for n in range(node_count - 1)]
+    phases = [{"phase": f"Phase {p}", "duration": f"{p + 1} months", "nodes": [f"node_{n}" for n in range(p, node_count, 3)]} for p in range(3)]
+    return {"title": "Backend Developer", "nodes": nodes, "edges": edges, "learning_phases": phases}
+
+
+def dump(value, rng, style, indent=0):
+    """Serialize like an LLM would: optionally with the defects named in `style`."""
+    pad = "  " * (indent + 1)
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            name = key if "unquoted_keys" in style and rng.random() < 0.5 else json.dumps(key)
+            comment = f"{pad}// {key}\n" if "comments" in style and rng.random() < 0.1 else ""
+            items.append(f"{comment}{pad}{name}: {dump(item, rng, style, indent + 1)}")
+        trailing = "," if "trailing_commas" in style else ""
+        return "{\n" + ",\n".join(items) + trailing + "\n" + "  " * indent + "}"
+    if isinstance(value, list):
+        trailing = "," if "trailing_commas" in style and value else ""
+        return "[" + ", ".join(dump(item, rng, style, indent + 1) for item in value) + trailing + "]"
+    if isinstance(value, bool) or value is None:
+        return {True: "True", False: "False", None: "None"}[value] if "python_literals" in style else json.dumps(value)
+    if isinstance(value, int) and "arithmetic" in style and value:
+        offset = rng.choice([50, 100, 650])
+        return f"{value - offset} + {offset}"
+    return json.dumps(value)
+
+
+STYLES = [
+    (),
+    ("fenced",),
+    ("trailing_commas",),
+    ("arithmetic",),
+    ("unquoted_keys",),
+    ("comments",),
+    ("python_literals",),
+    ("fenced", "arithmetic", "trailing_commas"),
+    ("truncated",),
+]
+
+
+def synthesize_corpus(count, seed=0):
+    """Return (name, response, expected) triples; expected is None when unknowable (truncation)."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        style = STYLES[index % len(STYLES)]
+        roadmap = build_roadmap(rng)
+        text = dump(roadmap, rng, style)
+        expected = roadmap
+        if "fenced" in style:
+            text = f"Here is the roadmap you asked for:\n\n```json\n{text}\n```\n\nLet me know if you need changes."
+        if "truncated" in style:
+            text = text[:int(len(text) * rng.uniform(0.6, 0.95))]
+            expected = None
+        corpus.append((f"synthetic_{index:03d}_{'_'.join(style) or 'valid'}", text, expected))
+    return corpus
+
+
+def load_corpus(directory):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt")) + glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            corpus.append((os.path.basename(path), f.read(), None))
+    return corpus
+
+
+class LegacyRoadmapCascade:
+    """The roadmap generator's parsing cascade before the tolerant parser"""
+
+    def _extract_json(self, text: str) -> Dict[str, Any]:
+        """Extract JSON from LLM response text"""
+        try:
+            logger.info(f"Raw LLM response text: {text[:500]}...")  # Log first 500 chars
+            
+            json_str = ""
+            
+            # Try finding ```json blocks first
+            if "```json" in text:
+                match = text.split("```json", 1)
+                if len(match) > 1 and "```" in match[1]:
+                    json_str = match[1].split("```", 1)[0].strip()
+                    logger.info(f"Found JSON in ```json block: {json_str[:200]}...")
+            # Fallback to finding plain ``` blocks
+            elif "```" in text:
+                match = text.split("```", 1)
+                if len(match) > 1 and "```" in match[1]:
+                    json_str = match[1].split("```", 1)[0].strip()
+                    logger.info(f"Found JSON in ``` block: {json_str[:200]}...")
+            else:
+                # Try to find JSON-like structure
+                start = text.find('{')
+                if start != -1:
+                    # Find the matching closing brace
+                    brace_count = 0
+                    end = start
+                    for i, char in enumerate(text[start:], start):
+                        if char == '{':
+                            brace_count += 1
+                        elif char == '}':
+                            brace_count -= 1
+                            if brace_count == 0:
+                                end = i + 1
+                                break
+                    json_str = text[start:end].strip()
+                    logger.info(f"Found JSON structure: {json_str[:200]}...")
+                else:
+                    json_str = text
+                    logger.info(f"No JSON structure found, using full text: {json_str[:200]}...")
+            
+            # Clean up common issues with JSON
+            json_str = self._clean_json_string(json_str)
+            logger.info(f"Cleaned JSON string: {json_str[:200]}...")
+            
+            # Try parsing the cleaned JSON
+            try:
+                parsed_json = json.loads(json_str)
+                logger.info("Successfully parsed JSON")
+                return parsed_json
+            except json.JSONDecodeError as e:
+                logger.warning(f"First JSON parse attempt failed: {str(e)}")
+                # Try a more aggressive cleaning approach
+                aggressively_cleaned = self._aggressive_json_clean(json_str)
+                logger.info(f"Aggressively cleaned JSON: {aggressively_cleaned[:200]}...")
+                
+                try:
+                    parsed_json = json.loads(aggressively_cleaned)
+                    logger.info("JSON parsing successful after aggressive cleaning")
+                    return parsed_json
+                except json.JSONDecodeError as e2:
+                    logger.error(f"JSON parsing failed even after aggressive cleaning: {str(e2)}")
+                    # Try one more time with final rescue
+                    final_attempt = self._final_json_rescue(aggressively_cleaned)
+                    try:
+                        parsed_json = json.loads(final_attempt)
+                        logger.info("JSON parsing successful after final rescue attempt")
+                        return parsed_json
+                    except json.JSONDecodeError as e3:
+                        logger.error(f"Final JSON rescue attempt failed: {str(e3)}")
+                        logger.error(f"Problematic JSON string: {final_attempt}")
+                        raise e3
+                logger.info(f"Aggressively cleaned JSON: {json_str[:200]}...")
+                parsed_json = json.loads(json_str)
+                logger.info("Successfully parsed JSON after aggressive cleaning")
+                return parsed_json
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON parsing failed: {str(e)}")
+            logger.error(f"Problematic JSON string: {json_str}")
+            logger.warning("Failed to parse JSON, returning default structure")
+            return self._get_default_structure()
+        except Exception as e:
+            logger.error(f"Unexpected error in JSON extraction: {str(e)}")
+            logger.error(f"Original text: {text}")
+            return self._get_default_structure()
+    
+    def _clean_json_string(self, json_str: str) -> str:
+        """Clean JSON string to fix common formatting issues"""
+        if not json_str:
+            return json_str
+        
+        # Remove any leading/trailing whitespace
+        json_str = json_str.strip()
+        
+        # Remove any text before the first {
+        start_idx = json_str.find('{')
+        if start_idx > 0:
+            json_str = json_str[start_idx:]
+        
+        # Remove any text after the last }
+        end_idx = json_str.rfind('}')
+        if end_idx != -1 and end_idx < len(json_str) - 1:
+            json_str = json_str[:end_idx + 1]
+        
+        # Fix mathematical expressions in JSON values (e.g., "x": -650 + 650)
+        def evaluate_math_expression(match):
+            try:
+                expression = match.group(1)
+                # Only evaluate simple arithmetic expressions with numbers and basic operators
+                if re.match(r'^[-+*/\s\d.()]+$', expression):
+                    result = eval(expression)
+                    return f'"{match.group(0).split(":")[0]}": {result}'
+                else:
+                    return match.group(0)
+            except:
+                return match.group(0)
+        
+        # Fix arithmetic expressions like "x": -650 + 650
+        json_str = re.sub(r'"([^"]+)":\s*([-+*/\s\d.()]+(?:[+\-*/]\s*[-+*/\s\d.()]+)+)', evaluate_math_expression, json_str)
+        
+        # Fix trailing commas before closing brackets/braces
+        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        
+        # Fix missing commas between array/object elements
+        json_str = re.sub(r'}\s*{', r'},{', json_str)
+        json_str = re.sub(r']\s*\[', r'],[', json_str)
+        
+        # Fix problematic escape sequences and apostrophes
+        # Fix invalid escape sequences like \' that should be just '
+        json_str = re.sub(r'\\\'', "'", json_str)
+        
+        # Fix quotes in strings - handle contractions and apostrophes properly
+        # Replace unescaped single quotes within double-quoted strings
+        def fix_quotes_in_string(match):
+            content = match.group(1)
+            # Replace single quotes with escaped single quotes only if they're not already escaped
+            content = re.sub(r"(?<!\\)'", "\\'", content)
+            return '"' + content + '"'
+        
+        json_str = re.sub(r'"([^"]*)"', fix_quotes_in_string, json_str)
+        
+        # Fix unquoted property names (simple case)
+        json_str = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_str)
+        
+        # Fix common number formatting issues
+        # Fix numbers that might have spaces around operators
+        json_str = re.sub(r'(\d+)\s*\+\s*(\d+)', r'\1+\2', json_str)
+        json_str = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1-\2', json_str)
+        json_str = re.sub(r'(\d+)\s*\*\s*(\d+)', r'\1*\2', json_str)
+        json_str = re.sub(r'(\d+)\s*/\s*(\d+)', r'\1/\2', json_str)
+        
+        # Remove any non-JSON characters at the beginning or end
+        json_str = re.sub(r'^[^{]*', '', json_str)
+        json_str = re.sub(r'[^}]*$', '', json_str)
+        
+        return json_str
+    
+    def _aggressive_json_clean(self, json_str: str) -> str:
+        """More aggressive JSON cleaning for problematic responses"""
+        if not json_str:
+            return json_str
+        
+        # Try to extract only the core JSON structure
+        # Find the outermost braces
+        first_brace = json_str.find('{')
+        if first_brace == -1:
+            return json_str
+        
+        # Count braces to find the matching closing brace
+        brace_count = 0
+        last_brace = first_brace
+        
+        for i in range(first_brace, len(json_str)):
+            if json_str[i] == '{':
+                brace_count += 1
+            elif json_str[i] == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    last_brace = i
+                    break
+        
+        json_str = json_str[first_brace:last_brace + 1]
+        
+        # Replace problematic characters
+        json_str = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+        
+        # Fix multiple spaces
+        json_str = re.sub(r'\s+', ' ', json_str)
+        
+        # Fix arithmetic expressions in values (most critical fix)
+        def fix_arithmetic(match):
+            try:
+                key = match.group(1)
+                expression = match.group(2).strip()
+                
+                # Evaluate simple arithmetic expressions
+                if re.match(r'^[-+]?\d+(?:\s*[+\-*\/]\s*[-+]?\d+)*$', expression):
+                    result = eval(expression)
+                    return f'"{key}": {result}'
+                else:
+                    return match.group(0)
+            except:
+                return match.group(0)
+        
+        # Fix expressions like "x": -650 + 650, "y": 500 + 100
+        json_str = re.sub(r'"([^"]+)":\s*([-+]?\d+(?:\s*[+\-*\/]\s*[-+]?\d+)+)', fix_arithmetic, json_str)
+        
+        # Fix common escape sequence issues
+        # Remove invalid escape sequences like \' and replace with '
+        json_str = re.sub(r'\\\'', "'", json_str)
+        
+        # Fix other common invalid escapes (but preserve valid ones)
+        json_str = re.sub(r'\\(?!["\\/bfnrtu])', '', json_str)
+        
+        # Try to fix common LLM JSON issues
+        # Fix boolean values
+        json_str = re.sub(r'\b(true|false|null)\b', lambda m: m.group(1).lower(), json_str, flags=re.IGNORECASE)
+        
+        # Fix numbers that might have been quoted unnecessarily
+        json_str = re.sub(r'"\s*(\d+(?:\.\d+)?)\s*"(?=\s*[,}\]])', r'\1', json_str)
+        
+        # Fix trailing commas more aggressively
+        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        
+        # Fix missing quotes around string values
+        json_str = re.sub(r':\s*([a-zA-Z][a-zA-Z0-9_\s]*[a-zA-Z0-9])\s*([,}\]])', r': "\1"\2', json_str)
+        
+        # Fix object/array separation issues
+        json_str = re.sub(r'}\s*{', r'},{', json_str)
+        json_str = re.sub(r']\s*\[', r'],[', json_str)
+        
+        return json_str
+    
+    def _final_json_rescue(self, json_str: str) -> str:
+        """Final attempt to rescue malformed JSON"""
+        if not json_str:
+            return json_str
+        
+        # Remove all non-essential whitespace
+        json_str = re.sub(r'\s+', ' ', json_str).strip()
+        
+        # Fix arithmetic expressions more aggressively
+        def fix_all_arithmetic(match):
+            try:
+                full_match = match.group(0)
+                key_part = match.group(1)
+                value_part = match.group(2)
+                
+                # Try to evaluate any arithmetic in the value
+                if re.search(r'[-+*/]', value_part):
+                    # Replace common arithmetic patterns
+                    value_part = re.sub(r'(-?\d+)\s*\+\s*(-?\d+)', lambda m: str(int(m.group(1)) + int(m.group(2))), value_part)
+                    value_part = re.sub(r'(-?\d+)\s*-\s*(-?\d+)', lambda m: str(int(m.group(1)) - int(m.group(2))), value_part)
+                    value_part = re.sub(r'(-?\d+)\s*\*\s*(-?\d+)', lambda m: str(int(m.group(1)) * int(m.group(2))), value_part)
+                    
+                    # If still has arithmetic, try eval as last resort
+                    if re.search(r'[-+*/]', value_part):
+                        try:
+                            value_part = str(eval(value_part))
+                        except:
+                            pass
+                
+                return f'"{key_part}": {value_part}'
+            except:
+                return match.group(0)
+        
+        # More comprehensive arithmetic fix
+        json_str = re.sub(r'"([^"]+)":\s*([-+]?\d+(?:\s*[+\-*/]\s*[-+]?\d+)*)', fix_all_arithmetic, json_str)
+        
+        # Fix common delimiter issues
+        json_str = re.sub(r',\s*}', '}', json_str)
+        json_str = re.sub(r',\s*]', ']', json_str)
+        
+        # Ensure all string values are quoted
+        json_str = re.sub(r':\s*([^",\[\]{}\s]+)(?=\s*[,}\]])', r': "\1"', json_str)
+        
+        # Fix boolean and null values that got quoted
+        json_str = re.sub(r':\s*"(true|false|null)"', r': \1', json_str)
+        
+        # Fix number values that got quoted
+        json_str = re.sub(r':\s*"(-?\d+(?:\.\d+)?)"(?=\s*[,}\]])', r': \1', json_str)
+        
+        return json_str
+
+    def _get_default_structure(self):
+        # The old code returned a canned roadmap; None marks the failure here
+        return None
+
+
+class LegacyStage1Parser:
+    """The script generator's Stage 1 parsing strategies before the tolerant parser"""
+
+    def _parse_stage1_response(self, response, topic):
+        """
+        Enhanced parsing of Stage 1 response with multiple fallback strategies.
+        
+        Args:
+            response (str): LLM response from Stage 1
+            topic (str): Original topic for context
+            
+        Returns:
+            dict: Parsed educational content or None if all parsing fails
+        """
+        # Strategy 1: Direct JSON parsing
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            pass
+        
+        # Strategy 2: Extract JSON from code blocks
+        try:
+            import re
+            json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group(1))
+        except Exception:
+            pass
+        
+        # Strategy 3: Find JSON object in text
+        try:
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                json_str = json_match.group(0)
+                # Clean up common JSON issues
+                json_str = self._clean_json_string(json_str)
+                return json.loads(json_str)
+        except Exception:
+            pass
+        
+        # Strategy 4: Attempt to fix common JSON errors
+        try:
+            fixed_json = self._fix_common_json_errors(response)
+            if fixed_json:
+                return json.loads(fixed_json)
+        except Exception:
+            pass
+        
+        return None
+
+    def _clean_json_string(self, json_str):
+        """
+        Clean common JSON formatting issues.
+        
+        Args:
+            json_str (str): Raw JSON string
+            
+        Returns:
+            str: Cleaned JSON string
+        """
+        import re
+        
+        # Remove trailing commas before closing brackets/braces
+        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        
+        # Fix unescaped quotes in strings
+        json_str = re.sub(r'(?<!\\)"(?=.*")', r'\\"', json_str)
+        
+        # Remove comments
+        json_str = re.sub(r'//.*?\n', '\n', json_str)
+        json_str = re.sub(r'/\*.*?\*/', '', json_str, flags=re.DOTALL)
+        
+        return json_str
+
+    def _fix_common_json_errors(self, response):
+        """
+        Attempt to fix common JSON formatting errors in LLM responses.
+        
+        Args:
+            response (str): LLM response
+            
+        Returns:
+            str: Fixed JSON string or None
+        """
+        import re
+        
+        # Look for JSON-like structure
+        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
+        matches = re.findall(json_pattern, response, re.DOTALL)
+        
+        for match in matches:
+            try:
+                # Try various fixes
+                fixed = match
+                fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)  # Remove trailing commas
+                fixed = re.sub(r'(\w+):', r'"\1":', fixed)    # Quote unquoted keys
+                
+                # Test if it parses
+                json.loads(fixed)
+                return fixed
+            except:
+                continue
+        
+        return None
+
+
+def parse_tolerant(text):
+    try:
+        return parse_tolerant_json(text)
+    except JSONParseError:
+        return None
+
+
+PARSERS = {
+    "tolerant_json": parse_tolerant,
+    "legacy_roadmap_cascade": LegacyRoadmapCascade()._extract_json,
+    "legacy_stage1_strategies": lambda text: LegacyStage1Parser()._parse_stage1_response(text, ""),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of recorded LLM responses (default: synthesized corpus)")
+    parser.add_argument("--count", type=int, default=180, help="Size of the synthesized corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="Parse runs per response")
+    args = parser.parse_args()
+
+    # The legacy cascade logs every step; keep the output readable
+    logging.disable(logging.CRITICAL)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthesize_corpus(args.count)
+    if not corpus:
+        raise SystemExit(f"No *.txt or *.json files found in {args.corpus}")
+    total_kb = sum(len(text.encode("utf-8")) for _, text, _ in corpus) / 1024
+    comparable = sum(expected is not None for _, _, expected in corpus)
+    print(f"responses: {len(corpus)} ({total_kb:.1f} KB, {comparable} with a known expected value)\n")
+
+    print(f"{'parser':<26} {'recovered':>10} {'exact':>8} {'ms/response':>12} {'ms/KB':>8}")
+    for name, parse in PARSERS.items():
+        recovered = exact = 0
+        started = time.perf_counter()
+        for _, text, expected in corpus:
+            for _ in range(args.repeat):
+                result = parse(text)
+            recovered += isinstance(result, dict) and bool(result)
+            exact += expected is not None and result == expected
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"{name:<26} {recovered:>6}/{len(corpus):<3} {exact:>4}/{comparable:<3} "
+              f"{elapsed / len(corpus) * 1000:>12.3f} {elapsed / total_kb * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Load test for the streaming system design and roadmap endpoints and the
+animation endpoint.
+
+Virtual users send requests back to back from --concurrency threads, picking
+an endpoint per request by the --mix weights, for --duration seconds (or
+until --requests have been sent). The report gives per-endpoint and overall
+p50/p95/p99 latency, time to the first SSE event, throughput and error rate.
+A request counts as an error on a non-2xx status, a transport failure or
+timeout, or an error status in any event or in the JSON body.
+
+Without --url the app is started in-process on a local port with the offline
+chat backend and the simulated renderer (LLM_BACKEND=fake,
+MANIM_RENDER_BACKEND=fake; see core/chat_backends.py and
+ai_animation/fake_render.py), so the numbers measure the service itself:
+queueing, thread pools, rate limiting, parsing and rendering slots. Tune the
+simulated latencies with LLM_FAKE_LATENCY and MANIM_FAKE_RENDER_LATENCY, or
+replay recorded traffic with LLM_BACKEND=replay. With --url the same load is
+sent to a running deployment.
+
+Prompts get a per-request suffix so result caches do not answer them; pass
+--repeat-prompts to measure a warm cache instead.
+
+Run from the fastapi/ directory:
+    python -m benchmarks.load_test --concurrency 16 --duration 120 --mix system_design=2,roadmap=2,animation=1
+    python -m benchmarks.load_test --url https://staging.example.com --concurrency 4 --requests 40
+"""
+import os
+import math
+import json
+import time
+import random
+import argparse
+import threading
+
+import requests
+
+SCENARIOS = {
+    "system_design": {
+        "path": "/system-design/generate-stream",
+        "field": "prompt",
+        "stream": True,
+        "prompts": [
+            "Design a URL shortener handling 10k writes per second",
+            "Design a real-time chat application for 50 million users",
+            "Design a video streaming platform with adaptive bitrate",
+            "Design a ride-sharing backend with live driver locations",
+            "Design an e-commerce checkout with inventory reservation",
+        ],
+    },
+    "roadmap": {
+        "path": "/roadmap/generate-stream",
+        "field": "career_path",
+        "stream": True,
+        "prompts": ["Backend Developer", "Data Scientist", "DevOps Engineer", "Mobile Developer", "Machine Learning Engineer"],
+    },
+    "animation": {
+        "path": "/ai-animation/generate",
+        "field": "prompt",
+        "stream": False,
+        "prompts": ["Pythagorean theorem", "Photosynthesis", "Newton's second law", "Binary search", "The water cycle"],
+    },
+    "animation_stream": {
+        "path": "/ai-animation/generate-stream",
+        "field": "prompt",
+        "stream": True,
+        "prompts": ["Pythagorean theorem", "Photosynthesis", "Newton's second law", "Binary search", "The water cycle"],
+    },
+}
+
+
+class Sample:
+    """Outcome of one request"""
+
+    __slots__ = ("scenario", "started", "latency", "first_event", "error")
+
+    def __init__(self, scenario, started):
+        self.scenario = scenario
+        self.started = started
+        self.latency = None
+        self.first_event = None
+        self.error = None
+
+
+def parse_mix(text):
+    """Parse "system_design=2,roadmap=1" into {scenario: weight}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}' (expected one of {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _event_error(event):
+    if event.get("status") == "error" or event.get("stage") == "error":
+        return str(event.get("error") or "error event")
+    return None
+
+
+def send(session, base_url, scenario, prompt, timeout, stream_tokens):
+    """Send one request and return its Sample."""
+    config = SCENARIOS[scenario]
+    body = {config["field"]: prompt}
+    if stream_tokens and scenario in ("system_design", "roadmap"):
+        body["stream_tokens"] = True
+
+    started = time.perf_counter()
+    sample = Sample(scenario, started)
+    try:
+        with session.post(base_url + config["path"], json=body, stream=config["stream"], timeout=timeout) as response:
+            if response.status_code >= 400:
+                sample.error = f"HTTP {response.status_code}"
+            elif config["stream"]:
+                # chunk_size=None hands over each chunk as it arrives, so the first event is timed when it is sent
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    if sample.first_event is None:
+                        sample.first_event = time.perf_counter() - started
+                    try:
+                        error = _event_error(json.loads(line[5:]))
+                    except ValueError:
+                        error = "unparseable event"
+                    sample.error = sample.error or error
+                if sample.first_event is None and sample.error is None:
+                    sample.error = "no events"
+            else:
+                try:
+                    sample.error = _event_error(response.json())
+                except ValueError:
+                    sample.error = "unparseable response"
+    except requests.RequestException as e:
+        sample.error = type(e).__name__
+    sample.latency = time.perf_counter() - started
+    return sample
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples, elapsed):
+    """Return {name: stats} for each scenario and "overall"."""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample.scenario, []).append(sample)
+    groups["overall"] = samples
+
+    summary = {}
+    for name, group in groups.items():
+        if not group:
+            continue
+        latencies = [sample.latency for sample in group]
+        first_events = [sample.first_event for sample in group if sample.first_event is not None]
+        errors = [sample for sample in group if sample.error]
+        stats = {
+            "requests": len(group),
+            "errors": len(errors),
+            "error_rate": len(errors) / len(group),
+            "throughput_per_minute": (len(group) - len(errors)) / elapsed * 60 if elapsed else 0.0,
+            "latency": {f"p{p}": percentile(latencies, p / 100) for p in (50, 95, 99)},
+        }
+        stats["latency"]["max"] = max(latencies)
+        if first_events:
+            stats["first_event"] = {f"p{p}": percentile(first_events, p / 100) for p in (50, 95, 99)}
+        kinds = {}
+        for sample in errors:
+            kinds[sample.error[:80]] = kinds.get(sample.error[:80], 0) + 1
+        stats["error_kinds"] = kinds
+        summary[name] = stats
+    return summary
+
+
+def print_summary(summary, elapsed, concurrency):
+    print(f"\n{concurrency} virtual users, {elapsed:.1f}s\n")
+    print(f"{'endpoint':<18} {'reqs':>6} {'err %':>6} {'ok/min':>8} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} "
+          f"{'max s':>8} {'ttfe p50':>9} {'ttfe p95':>9} {'ttfe p99':>9}")
+    for name, stats in summary.items():
+        latency, first = stats["latency"], stats.get("first_event")
+        ttfe = [f"{first[p]:>9.2f}" for p in ("p50", "p95", "p99")] if first else [f"{'-':>9}"] * 3
+        print(f"{name:<18} {stats['requests']:>6} {stats['error_rate'] * 100:>6.1f} {stats['throughput_per_minute']:>8.1f} "
+              f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} {latency['max']:>8.2f} {' '.join(ttfe)}")
+    errors = summary.get("overall", {}).get("error_kinds")
+    if errors:
+        print("\nerrors:")
+        for kind, count in sorted(errors.items(), key=lambda item: -item[1]):
+            print(f"  {count:>5}  {kind}")
+
+
+def start_local_server(port):
+    """Serve the app in-process with the offline backends; returns (base_url, stop)."""
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    os.environ.setdefault("MANIM_RENDER_BACKEND", "fake")
+    os.environ.setdefault("GOOGLE_GENERATIVE_AI_API_KEY", "load-test-placeholder-key")
+
+    import uvicorn
+    from app import app
+
+    class Server(uvicorn.Server):
+        def install_signal_handlers(self):
+            # Runs off the main thread; Ctrl+C stops the load test instead
+            pass
+
+    server = Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="load-test-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("The in-process server failed to start")
+        time.sleep(0.05)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    return f"http://127.0.0.1:{bound_port}", stop
+
+
+def run(base_url, mix, concurrency, duration, total_requests, timeout, ramp_up, repeat_prompts, stream_tokens, seed):
+    samples = []
+    lock = threading.Lock()
+    sent = [0]
+    stopping = threading.Event()
+    deadline = time.perf_counter() + duration if duration else None
+    names, weights = list(mix), list(mix.values())
+
+    def next_request():
+        """Reserve the next request number, or None when the run is over."""
+        with lock:
+            if stopping.is_set():
+                return None
+            if total_requests and sent[0] >= total_requests:
+                return None
+            if deadline and time.perf_counter() >= deadline:
+                return None
+            sent[0] += 1
+            return sent[0]
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        # Stagger start-up so the first wave does not arrive at once
+        time.sleep(ramp_up * index / concurrency)
+        with requests.Session() as session:
+            while True:
+                number = next_request()
+                if number is None:
+                    return
+                scenario = rng.choices(names, weights)[0]
+                prompt = rng.choice(SCENARIOS[scenario]["prompts"])
+                if not repeat_prompts:
+                    prompt = f"{prompt} (load test {seed}-{number})"
+                sample = send(session, base_url, scenario, prompt, timeout, stream_tokens)
+                with lock:
+                    samples.append(sample)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+            with lock:
+                done, failed = len(samples), sum(1 for sample in samples if sample.error)
+            print(f"\r{time.perf_counter() - started:7.1f}s  {done} done, {failed} errors", end="", flush=True)
+    except KeyboardInterrupt:
+        # Requests in flight are abandoned; the report covers the finished ones
+        print("\nInterrupted; reporting requests finished so far")
+        stopping.set()
+    elapsed = time.perf_counter() - started
+    with lock:
+        return list(samples), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running deployment (default: start the app in-process with fake backends)")
+    parser.add_argument("--port", type=int, default=0, help="Port for the in-process server (default: any free port)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Virtual users sending requests back to back")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to keep sending requests (0: until --requests are sent)")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0: no limit)")
+    parser.add_argument("--mix", default="system_design=2,roadmap=2,animation=1",
+                        help=f"Comma-separated scenario=weight pairs; scenarios: {', '.join(SCENARIOS)}")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a request counts as failed")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds over which the virtual users start")
+    parser.add_argument("--repeat-prompts", action="store_true", help="Reuse prompts verbatim so result caches can answer them")
+    parser.add_argument("--stream-tokens", action="store_true", help="Ask the streaming endpoints to forward LLM tokens")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the scenario and prompt choices")
+    parser.add_argument("--output", help="Write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.duration and not args.requests:
+        raise SystemExit("Set --duration, --requests or both")
+    mix = parse_mix(args.mix)
+
+    stop = None
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        base_url, stop = start_local_server(args.port)
+        print(f"Started the app at {base_url} (LLM_BACKEND={os.environ['LLM_BACKEND']}, "
+              f"MANIM_RENDER_BACKEND={os.environ['MANIM_RENDER_BACKEND']})")
+
+    try:
+        samples, elapsed = run(base_url, mix, args.concurrency, args.duration, args.requests, args.timeout,
+                               args.ramp_up, args.repeat_prompts, args.stream_tokens, args.seed)
+    finally:
+        if stop is not None:
+            stop()
+
+    if not samples:
+        raise SystemExit("\nNo requests completed")
+    summary = summarize(samples, elapsed)
+    print_summary(summary, elapsed, args.concurrency)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": base_url, "concurrency": args.concurrency, "elapsed_seconds": elapsed, "mix": mix, "results": summary}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
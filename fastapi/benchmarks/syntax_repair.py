@@ -0,0 +1,192 @@
+"""
+Benchmark the Manim code repair engine in time per KB of generated code.
+
+Point --corpus at a directory of saved LLM outputs (*.py or *.txt, one
+generation per file) to measure real traffic. Without it, a corpus is
+synthesized from a generator-style scene by injecting the syntax mistakes
+the repair engine targets (comma before method calls, unclosed calls,
+orphaned keyword lines, dangling method chains, removed block bodies).
+
+Run from the fastapi/ directory:
+    python -m benchmarks.syntax_repair --corpus saved_generations/ --repeat 20
+"""
+import os
+import ast
+import glob
+import time
+import random
+import argparse
+import logging
+
+from ai_animation.code_repair import repair_manim_code
+
+SCENE_TEMPLATE = '''from manim import *
+
+class GeneratedScene(Scene):
+    def construct(self):
+        self.intro_sequence()
+        self.clear_and_transition()
+{step_calls}
+        self.conclusion_summary()
+
+    def clear_and_transition(self):
+        self.play(FadeOut(*self.mobjects))
+        self.wait(0.5)
+
+    def intro_sequence(self):
+        title = Text("Understanding the concept", font_size=48, color=BLUE).shift(UP*3)
+        subtitle = Text("Educational Animation", font_size=32, color=WHITE).shift(UP*1.5)
+        self.play(Write(title))
+        self.play(Write(subtitle))
+        self.wait(1)
+{steps}
+    def conclusion_summary(self):
+        summary = Text("Summary", font_size=40, color=YELLOW).shift(UP*2)
+        self.play(Write(summary))
+        self.wait(2)
+'''
+
+STEP_TEMPLATE = '''
+    def step_{n}_concept(self):
+        heading = Text("Step {n}: key idea", font_size=36, color=GREEN).shift(UP*3)
+        circle = Circle(radius=1.5, color=BLUE).shift(LEFT*3)
+        square = Square(side_length=2, color=RED).shift(RIGHT*3)
+        label = Text("Relationship {n}", font_size=24).next_to(circle, DOWN)
+        self.play(Write(heading))
+        self.play(Create(circle), Create(square))
+        self.play(
+            circle.animate.shift(RIGHT*2),
+            square.animate.rotate(PI/4),
+            run_time=2,
+        )
+        self.play(FadeIn(label))
+        self.wait(1)
+'''
+
+# Mutations mimicking LLM output mistakes: function(lines, rng) -> lines
+def _comma_before_method(lines, rng):
+    candidates = [i for i, l in enumerate(lines) if 'Text("' in l and ".shift(" in l]
+    i = rng.choice(candidates)
+    prefix, rest = lines[i].split('Text("', 1)
+    lines[i] = prefix + 'Text("' + rest.split('"', 1)[0] + '",.shift(UP*3)'
+    return lines
+
+
+def _unclosed_call(lines, rng):
+    candidates = [i for i, l in enumerate(lines) if l.strip().startswith("self.play(Write(") and l.rstrip().endswith("))")]
+    i = rng.choice(candidates)
+    lines[i] = lines[i].rstrip()[:-1]
+    return lines
+
+
+def _orphaned_keyword(lines, rng):
+    candidates = [i for i, l in enumerate(lines) if "label = Text(" in l]
+    i = rng.choice(candidates)
+    lines.insert(i + 1, "        font_size=24)")
+    return lines
+
+
+def _dangling_chain(lines, rng):
+    candidates = [i for i, l in enumerate(lines) if "circle = Circle(" in l]
+    i = rng.choice(candidates)
+    code, chain = lines[i].split(").shift(", 1)
+    lines[i:i + 1] = [code + ")", "        .shift(" + chain]
+    return lines
+
+
+def _removed_body(lines, rng):
+    index = lines.index("    def clear_and_transition(self):")
+    lines[index + 1] = "        # REMOVED: invalid call"
+    lines[index + 2] = ""
+    return lines
+
+
+MUTATIONS = [_comma_before_method, _unclosed_call, _orphaned_keyword, _dangling_chain, _removed_body]
+
+
+def synthesize_corpus(count, seed=0):
+    """Generate `count` scenes of varying length, most with injected mistakes."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        step_count = rng.randint(2, 12)
+        code = SCENE_TEMPLATE.format(
+            step_calls="\n".join(
+                f"        self.step_{n}_concept()\n        self.clear_and_transition()" for n in range(1, step_count + 1)
+            ),
+            steps="".join(STEP_TEMPLATE.format(n=n) for n in range(1, step_count + 1)),
+        )
+        lines = code.split("\n")
+        # Roughly one in five generations is already valid
+        if index % 5:
+            for mutation in rng.sample(MUTATIONS, rng.randint(1, len(MUTATIONS))):
+                lines = mutation(lines, rng)
+        corpus.append((f"synthetic_{index:03d}", "\n".join(lines)))
+    return corpus
+
+
+def load_corpus(directory):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.py")) + glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            corpus.append((os.path.basename(path), f.read()))
+    return corpus
+
+
+def parses(code):
+    try:
+        ast.parse(code)
+        return True
+    except SyntaxError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of saved LLM outputs (default: synthesized corpus)")
+    parser.add_argument("--count", type=int, default=100, help="Size of the synthesized corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="Repair runs per file")
+    args = parser.parse_args()
+
+    # The repair engine logs every fix; keep the output readable
+    logging.disable(logging.INFO)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthesize_corpus(args.count)
+    if not corpus:
+        raise SystemExit(f"No *.py or *.txt files found in {args.corpus}")
+
+    total_bytes = 0
+    total_seconds = 0.0
+    broken = repaired = 0
+    valid_seconds = valid_bytes = 0.0
+
+    for _, code in corpus:
+        size = len(code.encode("utf-8"))
+        was_valid = parses(code)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = repair_manim_code(code)
+        elapsed = (time.perf_counter() - started) / args.repeat
+
+        total_bytes += size
+        total_seconds += elapsed
+        if was_valid:
+            valid_seconds += elapsed
+            valid_bytes += size
+        else:
+            broken += 1
+            repaired += parses(result)
+
+    kb = total_bytes / 1024
+    print(f"files:            {len(corpus)} ({kb:.1f} KB, {broken} with syntax errors)")
+    print(f"repaired:         {repaired}/{broken} broken files now parse")
+    print(f"time per KB:      {total_seconds / kb * 1000:.3f} ms (all files)")
+    if valid_bytes:
+        print(f"time per KB:      {valid_seconds / (valid_bytes / 1024) * 1000:.3f} ms (already valid files)")
+    if total_bytes > valid_bytes:
+        broken_kb = (total_bytes - valid_bytes) / 1024
+        print(f"time per KB:      {(total_seconds - valid_seconds) / broken_kb * 1000:.3f} ms (files needing repair)")
+
+
+if __name__ == "__main__":
+    main()
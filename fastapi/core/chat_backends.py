@@ -0,0 +1,334 @@
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from dotenv import load_dotenv
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from .fake_responses import fake_response
+from .llm_clients import LimitedCallsMixin, PooledChatGoogleGenerativeAI
+from .tolerant_json import parse_tolerant_json
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# One <service>.jsonl file of prompts and responses per service, written by "record" and read by "replay"
+LLM_RECORDINGS_DIR = os.getenv("LLM_RECORDINGS_DIR") or "llm_recordings"
+# Latency of fake responses: "fixed:S", "uniform:MIN,MAX", "normal:MEAN,STDDEV" or "lognormal:MEDIAN,SIGMA" (seconds)
+LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY") or "lognormal:2.0,0.5"
+# Seed for the fake latency samples; empty draws a different sequence every run
+LLM_FAKE_SEED = os.getenv("LLM_FAKE_SEED")
+# Replayed calls sleep for the recorded latency times this factor (0 replays instantly)
+LLM_REPLAY_LATENCY_SCALE = float(os.getenv("LLM_REPLAY_LATENCY_SCALE") or 1.0)
+# What replay does with a prompt that was never recorded: "fake" (canned response) or "error"
+LLM_REPLAY_MISS = (os.getenv("LLM_REPLAY_MISS") or "fake").lower()
+
+# Streams send the first chunk after this share of the latency and spread the rest over the remainder
+FIRST_CHUNK_SHARE = 0.2
+STREAM_CHUNKS = 8
+# Rough characters-per-token ratio for usage metadata of fake responses
+CHARS_PER_TOKEN = 4
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode for a prompt with no recording when LLM_REPLAY_MISS is "error"."""
+
+
+class LatencyModel:
+    """Distribution of simulated response times, parsed from an LLM_FAKE_LATENCY spec."""
+
+    DISTRIBUTIONS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+    def __init__(self, distribution: str, params: tuple):
+        self.distribution = distribution
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        name, _, values = spec.strip().partition(":")
+        name = name.lower()
+        if name not in cls.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{name}' (expected one of {', '.join(cls.DISTRIBUTIONS)})")
+        params = tuple(float(value) for value in values.split(",") if value.strip())
+        if len(params) != cls.DISTRIBUTIONS[name]:
+            raise ValueError(f"Latency distribution '{name}' takes {cls.DISTRIBUTIONS[name]} parameter(s), got '{spec}'")
+        return cls(name, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "fixed":
+            seconds = self.params[0]
+        elif self.distribution == "uniform":
+            seconds = rng.uniform(*self.params)
+        elif self.distribution == "normal":
+            seconds = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            seconds = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(0.0, seconds)
+
+    def __str__(self):
+        return f"{self.distribution}:{','.join(str(param) for param in self.params)}"
+
+
+def _serialize_messages(messages) -> list:
+    return [{"role": message.type, "content": message.content} for message in messages]
+
+
+def _prompt_text(messages) -> str:
+    return "\n\n".join(message.content if isinstance(message.content, str) else json.dumps(message.content) for message in messages)
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def recording_key(model: str, messages) -> str:
+    """Key identifying a call by model and exact prompt messages."""
+    payload = json.dumps({"model": model, "messages": _serialize_messages(messages)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    """
+    Recorded LLM calls on disk, one JSON line per call.
+
+    Replay loads every file in the directory once and answers a prompt with
+    the responses recorded for it in order, cycling when the same prompt is
+    replayed more often than it was recorded.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._recordings = None
+        self._cursors = {}
+
+    def append(self, service: str, record: dict):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / f"{service}.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _load(self):
+        recordings = {}
+        for path in sorted(self.directory.glob("*.jsonl")):
+            with open(path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable recording {path.name}:{line_number}")
+                        continue
+                    recordings.setdefault(record["key"], []).append(record)
+        logger.info(f"Loaded {sum(len(records) for records in recordings.values())} LLM recordings from {self.directory}")
+        return recordings
+
+    def lookup(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if self._recordings is None:
+                self._recordings = self._load()
+            records = self._recordings.get(key)
+            if not records:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return records[cursor % len(records)]
+
+
+class OfflineBackend:
+    """Shared state of the offline backends: latency model, recordings and call counters."""
+
+    def __init__(self, latency: LatencyModel, store: RecordingStore, seed: Optional[str] = None):
+        self.latency = latency
+        self.store = store
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "replay_hits": 0, "replay_misses": 0, "recorded": 0, "simulated_seconds": 0.0}
+
+    def count(self, stat: str, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def sample_latency(self) -> float:
+        with self._lock:
+            return self.latency.sample(self._rng)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "simulated_seconds": round(self._stats["simulated_seconds"], 3),
+                "latency": str(self.latency),
+                "recordings_dir": str(self.store.directory),
+            }
+
+
+def _create_offline_backend() -> OfflineBackend:
+    try:
+        latency = LatencyModel.parse(LLM_FAKE_LATENCY)
+    except ValueError as e:
+        logger.warning(f"Invalid LLM_FAKE_LATENCY, using the default: {str(e)}")
+        latency = LatencyModel("lognormal", (2.0, 0.5))
+    return OfflineBackend(latency, RecordingStore(LLM_RECORDINGS_DIR), LLM_FAKE_SEED)
+
+
+offline_backend = _create_offline_backend()
+
+
+class OfflineChatModel(BaseChatModel):
+    """
+    Chat model answering from recordings ("replay") or canned responses ("fake").
+
+    Accepts the ChatGoogleGenerativeAI settings the services pass (model,
+    temperature, timeout, max_retries, cached_content) and sleeps for a
+    sampled or recorded latency, so pipelines run with realistic timing and
+    without network access or API quota.
+    """
+
+    model: str = "gemini-2.0-flash"
+    temperature: Optional[float] = None
+    timeout: Optional[float] = None
+    max_retries: int = 1
+    cached_content: Optional[str] = None
+    mode: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _respond(self, messages):
+        """Return (text, usage, latency) for one call."""
+        offline_backend.count("calls")
+        prompt = _prompt_text(messages)
+        if self.mode == "replay":
+            record = offline_backend.store.lookup(recording_key(self.model, messages))
+            if record is not None:
+                offline_backend.count("replay_hits")
+                return record["response"], record.get("usage"), record.get("latency", 0.0) * LLM_REPLAY_LATENCY_SCALE
+            offline_backend.count("replay_misses")
+            if LLM_REPLAY_MISS == "error":
+                raise ReplayMissError(f"No recording for this prompt in {offline_backend.store.directory}")
+
+        text = fake_response(prompt)
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+        usage = {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+        return text, usage, offline_backend.sample_latency()
+
+    def _check_timeout(self, latency: float) -> float:
+        if self.timeout and latency > self.timeout:
+            raise TimeoutError(f"Simulated LLM call exceeded its {self.timeout}s timeout")
+        offline_backend.count("simulated_seconds", latency)
+        return latency
+
+    @staticmethod
+    def _result(text: str, usage) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    @staticmethod
+    def _pieces(text: str) -> list:
+        size = max(1, math.ceil(len(text) / STREAM_CHUNKS))
+        return [text[start:start + size] for start in range(0, len(text), size)] or [""]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, latency = self._respond(messages)
+        time.sleep(self._check_timeout(latency))
+        return self._result(text, usage)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, latency = self._respond(messages)
+        await asyncio.sleep(self._check_timeout(latency))
+        return self._result(text, usage)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, latency = self._respond(messages)
+        latency = self._check_timeout(latency)
+        pieces = self._pieces(text)
+        delays = [latency * FIRST_CHUNK_SHARE] + [latency * (1 - FIRST_CHUNK_SHARE) / len(pieces)] * (len(pieces) - 1)
+        for piece, delay in zip(pieces, delays):
+            time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, usage, latency = self._respond(messages)
+        latency = self._check_timeout(latency)
+        pieces = self._pieces(text)
+        delays = [latency * FIRST_CHUNK_SHARE] + [latency * (1 - FIRST_CHUNK_SHARE) / len(pieces)] * (len(pieces) - 1)
+        for piece, delay in zip(pieces, delays):
+            await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema, method: str = None, **kwargs):
+        """Parse the (canned or recorded) JSON response into `schema`, as Gemini's JSON mode would."""
+        return self | RunnableLambda(lambda message: schema.model_validate(parse_tolerant_json(message.content)))
+
+
+class FakeChatModel(LimitedCallsMixin, OfflineChatModel):
+    """OfflineChatModel whose calls go through the same limits as the Gemini clients."""
+
+    _limiter: Any = PrivateAttr(default=None)
+
+
+class RecordingChatGoogleGenerativeAI(PooledChatGoogleGenerativeAI):
+    """Gemini chat model that appends every successful call to the recordings for later replay."""
+
+    def _on_response(self, messages, text: str, usage, latency: float):
+        service = self._limiter.service if self._limiter is not None else "default"
+        try:
+            offline_backend.store.append(service, {
+                "key": recording_key(self.model, messages),
+                "service": service,
+                "model": self.model,
+                "messages": _serialize_messages(messages),
+                "response": text,
+                "usage": dict(usage) if usage else None,
+                "latency": round(latency, 3),
+                "recorded_at": time.time(),
+            })
+            offline_backend.count("recorded")
+        except Exception as e:
+            # Recording must never fail the call it records
+            logger.warning(f"Could not record LLM call for {service}: {str(e)}")
+
+
+def create_backend_model(backend: str, model: str, api_key: Optional[str]):
+    """
+    Build the base chat model for an LLM_BACKEND other than "gemini".
+
+    Args:
+        backend: "record", "replay" or "fake"
+        model: Gemini model name (part of the recording key)
+        api_key: API key, only used when recording
+
+    Returns:
+        Chat model usable wherever the services expect ChatGoogleGenerativeAI
+    """
+    if backend == "record":
+        return RecordingChatGoogleGenerativeAI(model=model, google_api_key=api_key)
+    if backend in ("replay", "fake"):
+        return FakeChatModel(model=model, mode=backend)
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}' (expected gemini, record, replay or fake)")
+
+
+def offline_backend_stats() -> dict:
+    """Return call, replay and recording counters of the non-Gemini backends."""
+    return offline_backend.stats()
@@ -0,0 +1,286 @@
+import os
+import time
+import hashlib
+import logging
+import datetime
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# "off", "gemini" (provider-side cached content) or "local" (in-process stand-in for tests)
+LLM_CONTEXT_CACHE = (os.getenv("LLM_CONTEXT_CACHE") or "off").lower()
+LLM_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS") or 3600)
+# Gemini rejects cached contents below a model-specific size; smaller instructions stay inline
+LLM_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS") or 4096)
+
+# Seconds before retrying an instruction whose cache creation failed
+FAILURE_BACKOFF_SECONDS = 300
+# Longest a call waits for another call's registration of the same instruction before going inline
+REGISTRATION_WAIT_SECONDS = 30
+# Rough characters-per-token ratio, the same estimate the prompt logs use
+CHARS_PER_TOKEN = 4
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+@dataclass(frozen=True)
+class CachedInstruction:
+    """
+    A static instruction resolved for one LLM call.
+
+    Attributes:
+        name: Instruction name used in logs and stats
+        handle: Cache handle, or None when the instruction is sent inline
+        cached_content: Handle to pass to the model; None unless the provider holds the text
+        inline_text: Text the prompt still has to carry ("" when the provider holds it)
+    """
+    name: str
+    handle: Optional[str]
+    cached_content: Optional[str]
+    inline_text: str
+
+
+class LocalContextBackend:
+    """
+    In-process stand-in for provider cached content.
+
+    Instructions are registered and referenced by handle exactly as with the
+    provider, but the text is resolved from the handle and inlined at call
+    time, so the caching path can be exercised without an API key.
+    """
+
+    name = "local"
+    remote = False
+    min_tokens = 0
+
+    def __init__(self):
+        self._contents = {}
+
+    def create(self, name: str, model: str, text: str, ttl_seconds: int) -> str:
+        handle = "local/" + hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()[:16]
+        self._contents[handle] = text
+        return handle
+
+    def refresh(self, handle: str, ttl_seconds: int):
+        if handle not in self._contents:
+            raise KeyError(handle)
+
+    def resolve(self, handle: str) -> str:
+        return self._contents[handle]
+
+    def delete(self, handle: str):
+        self._contents.pop(handle, None)
+
+
+class GeminiContextBackend:
+    """Gemini cached content created through google-generativeai's caching API."""
+
+    name = "gemini"
+    remote = True
+
+    def __init__(self, api_key: str, min_tokens: int = LLM_CONTEXT_CACHE_MIN_TOKENS):
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        genai.configure(api_key=api_key)
+        self._caching = caching
+        self.min_tokens = min_tokens
+
+    def create(self, name: str, model: str, text: str, ttl_seconds: int) -> str:
+        cached = self._caching.CachedContent.create(
+            model=model if model.startswith("models/") else f"models/{model}",
+            display_name=name,
+            system_instruction=text,
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+        return cached.name
+
+    def refresh(self, handle: str, ttl_seconds: int):
+        self._caching.CachedContent.get(handle).update(ttl=datetime.timedelta(seconds=ttl_seconds))
+
+    def resolve(self, handle: str) -> str:
+        # The provider holds the text; prompts only carry the handle
+        return ""
+
+    def delete(self, handle: str):
+        self._caching.CachedContent.get(handle).delete()
+
+
+class ContextCache:
+    """
+    Registry of static instructions held as cached content.
+
+    Each (model, instruction text) pair is registered once and its handle
+    reused until shortly before the TTL runs out, when it is extended (or
+    re-created if the provider lost it). Changing an instruction's text
+    registers a new entry. Any failure falls back to sending the text inline.
+    """
+
+    def __init__(self, backend=None, ttl_seconds: int = 3600):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        # Extend entries once they are within this many seconds of expiring
+        self.refresh_margin = min(300, ttl_seconds / 10)
+
+        self._entries = {}
+        self._failed_until = {}
+        # Keys being registered or extended, so one call talks to the provider per key
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "registered": 0,
+            "refreshed": 0,
+            "failures": 0,
+            "cached_calls": 0,
+            "inline_calls": 0,
+            "skipped_small": 0,
+            "cached_tokens": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def instruction(self, name: str, model: str, text: str) -> CachedInstruction:
+        """
+        Resolve a static instruction for one call, registering it on first use.
+
+        Args:
+            name: Instruction name used in logs and as the cache display name
+            model: Model the cached content is created for (calls must use the same model)
+            text: Instruction text
+
+        Returns:
+            CachedInstruction telling the caller what to pass to the model and what to inline
+        """
+        handle, tokens = self._handle_for(name, model, text)
+        with self._lock:
+            if handle is None:
+                self._stats["inline_calls"] += 1
+            else:
+                self._stats["cached_calls"] += 1
+                self._stats["cached_tokens"] += tokens
+
+        if handle is None:
+            return CachedInstruction(name, None, None, text)
+        if self.backend.remote:
+            return CachedInstruction(name, handle, handle, "")
+        return CachedInstruction(name, handle, None, self.backend.resolve(handle))
+
+    def _handle_for(self, name: str, model: str, text: str):
+        if self.backend is None:
+            return None, 0
+
+        tokens = _estimate_tokens(text)
+        if tokens < self.backend.min_tokens:
+            with self._lock:
+                self._stats["skipped_small"] += 1
+            return None, 0
+
+        key = (model, hashlib.sha256(text.encode("utf-8")).hexdigest())
+        while True:
+            now = time.time()
+            with self._lock:
+                if self._failed_until.get(key, 0) > now:
+                    return None, 0
+                entry = self._entries.get(key)
+                if entry is not None and now < entry["expires_at"] - self.refresh_margin:
+                    return entry["handle"], tokens
+                registering = self._in_flight.get(key)
+                if registering is None:
+                    registering = self._in_flight[key] = threading.Event()
+                    break
+
+            # Another call is registering or extending this instruction; an entry
+            # that has not expired yet stays usable in the meantime
+            if entry is not None and now < entry["expires_at"]:
+                return entry["handle"], tokens
+            if not registering.wait(REGISTRATION_WAIT_SECONDS):
+                return None, 0
+
+        # Provider calls run outside the lock so instruction() and stats() never wait on them
+        try:
+            handle = None
+            if entry is not None:
+                try:
+                    self.backend.refresh(entry["handle"], self.ttl_seconds)
+                    handle = entry["handle"]
+                except Exception as e:
+                    logger.info(f"Could not extend cached instruction '{name}', re-creating it: {str(e)}")
+            created = handle is None
+            if created:
+                handle = self.backend.create(name, model, text, self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._failed_until[key] = now + FAILURE_BACKOFF_SECONDS
+                self._stats["failures"] += 1
+            logger.warning(f"Context caching failed for '{name}', sending it inline: {str(e)}")
+            return None, 0
+        else:
+            with self._lock:
+                self._entries[key] = {"name": name, "handle": handle, "tokens": tokens, "expires_at": now + self.ttl_seconds}
+                self._stats["registered" if created else "refreshed"] += 1
+            if created:
+                logger.info(f"Registered cached instruction '{name}' (≈{tokens} tokens) as {handle}")
+            return handle, tokens
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def invalidate(self, instruction: CachedInstruction):
+        """Forget a handle the model rejected (e.g. expired early) so the next call re-registers it."""
+        if instruction.handle is None:
+            return
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry["handle"] == instruction.handle:
+                    del self._entries[key]
+        logger.info(f"Invalidated cached instruction '{instruction.name}' ({instruction.handle})")
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "backend": self.backend.name if self.backend is not None else "off",
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+def with_cached_content(llm, instruction: CachedInstruction):
+    """
+    Return `llm` bound to the instruction's provider handle, or `llm` itself when it is sent inline.
+
+    The copy shares the original client; only the cached_content field differs.
+    """
+    if instruction.cached_content is None:
+        return llm
+    return llm.model_copy(update={"cached_content": instruction.cached_content})
+
+
+def create_context_cache() -> ContextCache:
+    """Build a ContextCache from the LLM_CONTEXT_CACHE environment settings."""
+    backend = None
+    if LLM_CONTEXT_CACHE == "local":
+        backend = LocalContextBackend()
+    elif LLM_CONTEXT_CACHE == "gemini":
+        try:
+            backend = GeminiContextBackend(os.getenv("GOOGLE_GENERATIVE_AI_API_KEY"))
+        except Exception as e:
+            logger.warning(f"Gemini context caching unavailable, sending instructions inline: {str(e)}")
+    elif LLM_CONTEXT_CACHE not in ("", "off", "none", "false"):
+        logger.warning(f"Unknown LLM_CONTEXT_CACHE '{LLM_CONTEXT_CACHE}', context caching disabled")
+    return ContextCache(backend, ttl_seconds=LLM_CONTEXT_CACHE_TTL_SECONDS)
+
+
+# Shared by every generator in the process so each instruction is registered once
+context_cache = create_context_cache()
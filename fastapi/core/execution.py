@@ -0,0 +1,97 @@
+import os
+import asyncio
+import logging
+import contextvars
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Pool sizes are configurable per dyno through environment variables
+LLM_THREAD_POOL_SIZE = int(os.getenv("LLM_THREAD_POOL_SIZE") or 32)
+MANIM_RENDER_CONCURRENCY = int(os.getenv("MANIM_RENDER_CONCURRENCY") or os.cpu_count() or 1)
+
+# LLM calls are network-bound, so a generous thread pool keeps the event loop
+# free while LangChain blocks on Gemini responses.
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_THREAD_POOL_SIZE, thread_name_prefix="llm")
+
+# Manim renders are CPU-bound subprocesses; cap how many run at once so a burst
+# of animation requests cannot oversubscribe the CPU.
+_render_slots = threading.BoundedSemaphore(MANIM_RENDER_CONCURRENCY)
+_active_renders = 0
+_waiting_renders = 0
+_active_renders_lock = threading.Lock()
+
+async def run_llm(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking LLM call (ConversationChain.predict, chain.invoke, ...) on the LLM thread pool.
+
+    The call runs in a copy of the caller's context, so settings such as
+    core.rate_limit.llm_priority carry over to the worker thread.
+
+    Args:
+        func: Blocking callable to execute
+        *args, **kwargs: Arguments forwarded to the callable
+
+    Returns:
+        The callable's return value
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_llm_executor, partial(context.run, func, *args, **kwargs))
+
+
+@contextmanager
+def render_slot():
+    """Hold one of the MANIM_RENDER_CONCURRENCY render slots for the duration of a render."""
+    global _active_renders, _waiting_renders
+
+    with _active_renders_lock:
+        _waiting_renders += 1
+    try:
+        _render_slots.acquire()
+    finally:
+        with _active_renders_lock:
+            _waiting_renders -= 1
+
+    with _active_renders_lock:
+        _active_renders += 1
+    try:
+        yield
+    finally:
+        with _active_renders_lock:
+            _active_renders -= 1
+        _render_slots.release()
+
+
+def run_render(cmd, timeout=None) -> subprocess.CompletedProcess:
+    """
+    Run a Manim render command once a render slot is available.
+
+    Args:
+        cmd (list): Command line to execute
+        timeout (float, optional): Seconds before the render is killed
+
+    Returns:
+        subprocess.CompletedProcess: Result with captured stdout/stderr
+    """
+    with render_slot():
+        return subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=timeout)
+
+
+def execution_stats() -> dict:
+    """Return pool configuration and current render load."""
+    return {
+        "llm_thread_pool_size": LLM_THREAD_POOL_SIZE,
+        "manim_render_concurrency": MANIM_RENDER_CONCURRENCY,
+        "active_renders": _active_renders,
+        "waiting_renders": _waiting_renders,
+    }
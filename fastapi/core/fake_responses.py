@@ -0,0 +1,285 @@
+"""
+Canned responses for the offline chat backend.
+
+Each builder answers one pipeline prompt with a response shaped like
+Gemini's (fenced JSON, PlantUML, Markdown or Manim code) and of a realistic
+size, so the parsing, validation and rendering code downstream does the same
+work it does with real responses. Prompts are recognised by markers in the
+request text, which stays in the prompt even when the static instructions are
+sent as cached content.
+"""
+import re
+import json
+
+_SYSTEM_COMPONENTS = [
+    ("API Gateway", "gateway"), ("Auth Service", "auth"), ("User Service", "users"), ("Order Service", "orders"),
+    ("Payment Service", "payments"), ("Notification Service", "notify"), ("Search Service", "search"),
+]
+
+_ROADMAP_PHASES = [
+    ("Foundation Phase", "foundation", 100, [-600, 0, 600], "#e3f2fd"),
+    ("Core Skills Phase", "core", 500, [-650, 0, 650, 1300, 1950, 2600], "#e8f5e9"),
+    ("Advanced Phase", "advanced", 900, [-300, 300, 900, 1500], "#fff3e0"),
+    ("Practical Phase", "project", 1300, [-300, 300, 900], "#f3e5f5"),
+    ("Career Phase", "milestone", 1700, [0, 600], "#fce4ec"),
+]
+
+
+def _first(pattern, text, default):
+    match = re.search(pattern, text)
+    return match.group(1).strip() if match else default
+
+
+def _fenced(language, body):
+    return f"```{language}\n{body}\n```"
+
+
+def system_design_analysis(prompt):
+    return _fenced("json", json.dumps({
+        "system_type": "microservices",
+        "scale": "large",
+        "key_components": [name for name, _ in _SYSTEM_COMPONENTS],
+        "data_flow": ["Client request", "API Gateway routing", "Service processing", "Database persistence", "Event publication"],
+        "technologies": ["Kubernetes", "PostgreSQL", "Redis", "Kafka", "Elasticsearch"],
+        "patterns": ["API Gateway", "CQRS", "Event Sourcing", "Circuit Breaker"],
+        "non_functional_requirements": ["scalability", "reliability", "security", "observability"],
+        "estimated_complexity": "high",
+        "recommended_architecture": "microservices",
+    }, indent=2))
+
+
+def plantuml_diagram(prompt):
+    lines = ["@startuml", "title Fake Microservices Architecture", "", 'actor "User" as user',
+             "[Web App] as webapp", "[Mobile App] as mobile", 'interface "Public API" as api']
+    lines += [f"[{name}] as {alias}" for name, alias in _SYSTEM_COMPONENTS]
+    lines += ['database "Primary DB" as db', 'database "Cache" as cache', 'queue "Event Bus" as bus',
+              'cloud "Email Provider" as email', "",
+              "user --> webapp", "user --> mobile", "webapp --> api", "mobile --> api", "api --> gateway"]
+    for _, alias in _SYSTEM_COMPONENTS[1:]:
+        lines += [f"gateway --> {alias}", f"{alias} --> db", f"{alias} ..> bus : events"]
+    lines += ["users --> cache", "search --> cache", "notify --> email", "@enduml"]
+    return _fenced("plantuml", "\n".join(lines))
+
+
+def _markdown_guide(title, sections, paragraphs=3):
+    sentence = ("This part of the design balances throughput, latency and operational cost, and each choice is "
+                "explained with the trade-offs that matter when the system grows. ")
+    parts = [f"# {title}"]
+    for section in sections:
+        parts.append(f"## {section}")
+        parts.extend(sentence * 4 for _ in range(paragraphs))
+        parts.append("\n".join(f"- {section} consideration {i}" for i in range(1, 5)))
+    return "\n\n".join(parts)
+
+
+def system_design_explanation(prompt):
+    return _markdown_guide("Architecture Explanation", [
+        "Architecture Overview", "Component Responsibilities", "Data Flow", "Scalability",
+        "Reliability", "Security", "Technology Choices", "Trade-offs",
+    ])
+
+
+def career_analysis(prompt):
+    career_path = _first(r"Career Path:\s*(.+)", prompt, "Software Engineer")
+    return _fenced("json", json.dumps({
+        "title": f"{career_path} Career Path",
+        "category": "software_development",
+        "difficulty_level": "intermediate",
+        "estimated_duration": "1 year",
+        "prerequisites": ["Basic programming", "Problem solving"],
+        "core_skills": ["Programming fundamentals", "Version control", "Testing", "System design"],
+        "tools_technologies": ["Git", "Docker", "VS Code", "Linux"],
+        "job_market": {"demand": "high", "average_salary": "$90,000 - $140,000", "growth_prospects": "excellent"},
+        "learning_phases": [
+            {"phase": "Foundation", "duration": "2-3 months", "focus": "Basic concepts and fundamentals"},
+            {"phase": "Intermediate", "duration": "3-4 months", "focus": "Practical application and projects"},
+            {"phase": "Advanced", "duration": "4-6 months", "focus": "Advanced concepts and specialization"},
+        ],
+        "career_progression": ["Junior -> Mid-level -> Senior -> Lead/Architect"],
+    }, indent=2))
+
+
+def roadmap_structure(prompt):
+    career_path = _first(r"Career Path:\s*(.+)", prompt, "Software Engineer")
+    nodes, edges, phases = [], [], []
+    previous_phase = []
+    for phase_name, node_type, y, xs, color in _ROADMAP_PHASES:
+        phase_nodes = []
+        for x in xs:
+            node_id = f"node_{len(nodes) + 1}"
+            nodes.append({
+                "id": node_id,
+                "title": f"{career_path} {node_type.title()} Topic {len(phase_nodes) + 1}",
+                "description": f"Learn the {node_type} skills a {career_path} relies on and practise them on small exercises.",
+                "type": node_type,
+                "duration": "2-3 weeks",
+                "prerequisites": previous_phase[:1],
+                "resources": [
+                    {"type": "course", "title": f"{node_type.title()} course", "url": "https://example.com/course", "estimated_time": "20 hours"},
+                    {"type": "documentation", "title": "Official documentation", "url": "https://docs.example.com", "estimated_time": "5 hours"},
+                ],
+                "skills_gained": [f"{node_type} skill A", f"{node_type} skill B"],
+                "projects": [f"Build a small {node_type} project"],
+                "assessment": "Complete exercises and build practice project",
+                "position": {"x": x, "y": y},
+            })
+            for source in previous_phase[:2]:
+                edges.append({"id": f"edge_{source}_to_{node_id}", "source": source, "target": node_id,
+                              "type": "smoothstep", "animated": False, "label": ""})
+            phase_nodes.append(node_id)
+        phases.append({"name": phase_name, "nodes": phase_nodes, "color": color, "description": f"{phase_name} of the roadmap"})
+        previous_phase = phase_nodes
+    return _fenced("json", json.dumps({"roadmap_id": "fake_roadmap", "nodes": nodes, "edges": edges, "phases": phases}, indent=2))
+
+
+def career_guide(prompt):
+    career_path = _first(r"Career Path:\s*(.+)", prompt, "Software Engineer")
+    return _markdown_guide(f"{career_path} Career Guide", [
+        "Career Overview", "Learning Path", "Skills Development", "Portfolio Projects",
+        "Job Search Strategy", "Career Growth", "Resources",
+    ])
+
+
+def educational_breakdown(prompt):
+    topic = _first(r'TOPIC TO ANALYZE:\s*"(.+?)"', prompt, "Science Topic")
+    steps = []
+    for number in range(1, 6):
+        steps.append({
+            "step_number": number,
+            "step_title": f"{topic}: Part {number}",
+            "description": f"This step explains part {number} of {topic}, building on the previous idea with a concrete example. " * 4,
+            "key_concepts": [f"concept {number}a", f"concept {number}b"],
+            "equations": [f"y = {number}x + c"],
+            "data_points": [f"Fact {number}"],
+            "real_world_examples": [f"Everyday example {number}"],
+            "common_misconceptions": [f"Misconception {number} and its correction"],
+            "narration_script": f"Let's look at part {number} of {topic} and see why it matters. " * 3,
+            "visual_elements": {
+                "diagrams": ["labelled diagram"],
+                "animations": ["fade in labels", "transform shapes"],
+                "text_displays": [f"Part {number}"],
+                "color_scheme": ["BLUE", "YELLOW"],
+                "highlighting": ["key term"],
+            },
+            "animation_plan": f"Show a title, draw a circle and a square, then transform one into the other to illustrate part {number}. " * 4,
+            "duration_seconds": 45,
+            "difficulty_level": "intermediate",
+            "transition_to_next": "This leads naturally into the next part.",
+        })
+    return _fenced("json", json.dumps({
+        "topic_analysis": {"domain": "Mathematics", "complexity_level": "High School",
+                           "core_concepts": [f"concept {n}a" for n in range(1, 4)], "prerequisites": ["algebra"]},
+        "title": topic.title(),
+        "abstract": f"An animated introduction to {topic}. It builds intuition step by step.",
+        "learning_objectives": [f"Understand part {n} of {topic}" for n in range(1, 4)],
+        "educational_steps": steps,
+        "summary": f"A summary of {topic}.",
+        "assessment": {
+            "quiz_questions": [{"question": f"What is part {n}?", "type": "short_answer", "difficulty": "beginner",
+                                "correct_answer": f"Part {n}", "explanation": "See the step."} for n in range(1, 3)],
+            "thought_experiments": ["Imagine the shapes swapping places."],
+            "interactive_elements": ["Pause and predict the next frame."],
+        },
+        "metadata": {"target_audience": "High school students", "estimated_total_duration": 225,
+                     "real_world_applications": ["Engineering", "Physics"], "related_topics": ["Geometry"],
+                     "difficulty_progression": "Gradual"},
+    }, indent=2))
+
+
+def manim_structure(prompt):
+    title = _first(r'"title":\s*"(.+?)"', prompt, "Science Animation")
+    class_name = re.sub(r"\W", "", title) or "Science"
+    steps = [{
+        "step_number": number,
+        "action_type": "intro" if number == 1 else "content",
+        "manim_objects": ["Text", "Circle", "Square"],
+        "animations": ["Write", "FadeIn", "Transform"],
+        "description": f"Animate part {number}",
+        "narration": f"Narration for part {number}",
+        "code_snippet": "self.play(Write(Text('Part')))",
+        "duration": 45,
+        "positioning": "center",
+        "colors": ["BLUE", "WHITE"],
+        "transformations": ["scale", "shift"],
+        "mathematical_content": f"y = {number}x + c",
+        "visual_elements": ["circle", "square"],
+        "timing": {"start": (number - 1) * 45, "end": number * 45},
+        "layer_order": number,
+    } for number in range(1, 6)]
+    return _fenced("json", json.dumps({
+        "scene_title": f"{class_name}Scene",
+        "scene_description": f"Animated explanation of {title}",
+        "animation_steps": steps,
+        "scene_config": {"background_color": "BLACK", "camera_config": "default", "total_duration": 225,
+                         "resolution": "720p", "frame_rate": 30},
+        "educational_metadata": {"learning_objectives": ["Understand the topic"], "target_audience": "High school",
+                                 "difficulty_level": "intermediate"},
+        "technical_requirements": {"required_imports": ["Text", "Circle", "Square"], "custom_functions": [],
+                                   "external_resources": []},
+        "code_structure": {"class_name": f"{class_name}Scene", "methods": ["construct"], "complexity_level": "intermediate"},
+    }, indent=2))
+
+
+def manim_code(prompt):
+    class_name = _first(r"SCENE CLASS:\s*(\w+)", prompt, None)
+    if class_name is None:
+        # The inline output template comes before the gallery examples
+        class_name = _first(r"class (\w+)\(Scene\):\n    def construct\(self\):", prompt, "EducationalScene")
+    methods = []
+    calls = ["        self.intro_sequence()"]
+    for number in range(1, 5):
+        calls += ["        self.clear_and_transition()", f"        self.step_{number}()"]
+        methods.append(f'''
+    def step_{number}(self):
+        heading = Text("Part {number}", font_size=40).to_edge(UP)
+        circle = Circle(radius=1).set_color(BLUE).shift(LEFT * 2)
+        square = Square(side_length=2).set_color(YELLOW).shift(RIGHT * 2)
+        self.play(Write(heading))
+        self.play(FadeIn(circle), FadeIn(square))
+        self.play(Transform(circle, square.copy()))
+        self.wait(1)''')
+    code = "\n".join([
+        "from manim import *",
+        "",
+        f"class {class_name}(Scene):",
+        "    def construct(self):",
+        *calls,
+        "",
+        "    def clear_and_transition(self):",
+        "        self.play(FadeOut(*self.mobjects))",
+        "        self.wait(0.5)",
+        "",
+        "    def intro_sequence(self):",
+        '        title = Text("Offline Animation", font_size=48).set_color(BLUE)',
+        "        self.play(Write(title))",
+        "        self.wait(1)",
+    ]) + "\n" + "\n".join(methods)
+    return _fenced("python", code)
+
+
+def fixed_manim_code(prompt):
+    code = _first(r"(?s)MANIM CODE(?: TO FIX)?:\n(.*?)\n\nCRITICAL REQUIREMENTS", prompt.replace("\r", ""), None)
+    return code if code else manim_code(prompt)
+
+
+# (marker in the request, builder); the first matching marker wins
+RESPONSE_BUILDERS = [
+    ("Analyze the following system design request", system_design_analysis),
+    ("generate a comprehensive PlantUML component diagram", plantuml_diagram),
+    ("Based on the system analysis and PlantUML diagram", system_design_explanation),
+    ("Analyze the following career path", career_analysis),
+    ("React Flow tree-structured learning roadmap", roadmap_structure),
+    ("Create a comprehensive career guide", career_guide),
+    ("TOPIC TO ANALYZE:", educational_breakdown),
+    ("EDUCATIONAL BREAKDOWN TO CONVERT:", manim_structure),
+    ("ADVANCED MANIM CODE GENERATION REQUEST", manim_code),
+    ("You are an expert Manim code fixer", fixed_manim_code),
+]
+
+
+def fake_response(prompt: str) -> str:
+    """Return a canned response for `prompt`, or a short generic reply if no builder matches."""
+    for marker, builder in RESPONSE_BUILDERS:
+        if marker in prompt:
+            return builder(prompt)
+    return "This is an offline response from the fake chat backend."
@@ -0,0 +1,615 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Dict
+from dotenv import load_dotenv
+from pydantic import PrivateAttr
+from google.api_core.exceptions import InvalidArgument
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError, _response_to_result
+from .tracing import Span, start_span
+from .rate_limit import rate_limiter, current_priority, priority_value, PRIORITY_DEFAULT, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# "gemini", "record" (Gemini, saving prompts and responses), "replay" or "fake" (offline; see core.chat_backends)
+LLM_BACKEND = (os.getenv("LLM_BACKEND") or "gemini").lower()
+
+# Shared settings for services without their own LLM_<SERVICE>_* settings;
+# an empty LLM_TIMEOUT_SECONDS keeps the per-service defaults below
+LLM_TIMEOUT_SECONDS = os.getenv("LLM_TIMEOUT_SECONDS")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES") or 2)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY") or 8)
+
+DEFAULT_TIMEOUT_SECONDS = 60
+# Per-service timeouts; code generation returns long responses, so it gets more time
+SERVICE_TIMEOUTS = {
+    "script": 120,
+    "manim_code": 180,
+    "code_repair": 120,
+    "system_design": 90,
+    "roadmap": 90,
+}
+
+# Interactive services are served before animation jobs and batch warm-ups when calls queue for quota
+SERVICE_PRIORITIES = {
+    "system_design": PRIORITY_INTERACTIVE,
+    "roadmap": PRIORITY_INTERACTIVE,
+}
+
+# Exponential backoff between retries: base * 2^(attempt - 1), capped, with jitter
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS") or 1)
+MAX_RETRY_BACKOFF_SECONDS = 30
+
+# google.api_core errors worth retrying, matched by name so no API client import is needed
+RETRYABLE_ERRORS = ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError")
+RATE_LIMIT_ERRORS = ("ResourceExhausted", "TooManyRequests")
+
+# Seconds between attempts to take a slot for an async call
+_ASYNC_POLL_SECONDS = 0.05
+# Rough characters-per-token ratio for reserving quota before a call
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class ServicePolicy:
+    """Timeout, retry, concurrency and queueing priority of one service's LLM calls"""
+    timeout: float
+    max_retries: int
+    max_concurrency: int
+    priority: int = PRIORITY_DEFAULT
+
+
+def policy_for(service: str) -> ServicePolicy:
+    """
+    Build a service's policy from LLM_<SERVICE>_TIMEOUT_SECONDS, LLM_<SERVICE>_MAX_RETRIES,
+    LLM_<SERVICE>_MAX_CONCURRENCY and LLM_<SERVICE>_PRIORITY, falling back to the shared
+    LLM_* settings.
+    """
+    prefix = f"LLM_{service.upper()}_"
+    return ServicePolicy(
+        timeout=float(
+            os.getenv(prefix + "TIMEOUT_SECONDS") or LLM_TIMEOUT_SECONDS or SERVICE_TIMEOUTS.get(service, DEFAULT_TIMEOUT_SECONDS)
+        ),
+        max_retries=int(os.getenv(prefix + "MAX_RETRIES") or LLM_MAX_RETRIES),
+        max_concurrency=int(os.getenv(prefix + "MAX_CONCURRENCY") or LLM_MAX_CONCURRENCY),
+        priority=priority_value(os.getenv(prefix + "PRIORITY") or SERVICE_PRIORITIES.get(service, PRIORITY_DEFAULT)),
+    )
+
+
+class ServiceLimiter:
+    """Caps how many LLM calls of one service are in flight and records how long calls waited."""
+
+    def __init__(self, service: str, policy: ServicePolicy):
+        self.service = service
+        self.policy = policy
+        self._slots = threading.BoundedSemaphore(policy.max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "in_flight": 0, "waiting": 0, "wait_seconds": 0.0, "errors": 0}
+
+    def _acquired(self, waited: float):
+        with self._lock:
+            self._stats["waiting"] -= 1
+            self._stats["in_flight"] += 1
+            self._stats["calls"] += 1
+            self._stats["wait_seconds"] += waited
+
+    def _released(self, failed: bool):
+        self._slots.release()
+        with self._lock:
+            self._stats["in_flight"] -= 1
+            self._stats["errors"] += failed
+
+    @contextmanager
+    def slot(self):
+        """Hold a concurrency slot for a blocking call."""
+        with self._lock:
+            self._stats["waiting"] += 1
+        started = time.monotonic()
+        self._slots.acquire()
+        self._acquired(time.monotonic() - started)
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._released(failed)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Hold a concurrency slot for an async call without blocking the event loop."""
+        with self._lock:
+            self._stats["waiting"] += 1
+        started = time.monotonic()
+        try:
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(_ASYNC_POLL_SECONDS)
+        except BaseException:
+            with self._lock:
+                self._stats["waiting"] -= 1
+            raise
+        self._acquired(time.monotonic() - started)
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._released(failed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+                "max_concurrency": self.policy.max_concurrency,
+                "timeout": self.policy.timeout,
+                "max_retries": self.policy.max_retries,
+                "priority": self.policy.priority,
+            }
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def _prompt_tokens(messages) -> int:
+    return sum(_estimate_tokens(str(message.content)) for message in messages)
+
+
+def _result_tokens(result, reserved: int) -> int:
+    """Measured input + output tokens of a ChatResult, estimated from the text when usage is missing."""
+    total = 0
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens") or usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        else:
+            total += reserved + _estimate_tokens(generation.text)
+    return total or reserved
+
+
+def _add_queue_wait(call_span, seconds: float):
+    """Add time spent waiting for a concurrency slot and rate-limit quota to an llm.call span."""
+    if isinstance(call_span, Span):
+        call_span.attributes["llm.queue_wait_ms"] = round(call_span.attributes["llm.queue_wait_ms"] + seconds * 1000, 3)
+
+
+def _set_usage(call_span, result):
+    """Record a ChatResult's token usage on an llm.call span."""
+    generation = result.generations[0] if result.generations else None
+    if generation is None:
+        return
+    usage = getattr(generation.message, "usage_metadata", None)
+    if usage:
+        call_span.set_attributes(**{"llm.input_tokens": usage.get("input_tokens"), "llm.output_tokens": usage.get("output_tokens")})
+    else:
+        call_span.set_attribute("llm.output_tokens", _estimate_tokens(generation.text))
+
+
+def _retry_delay(error: Exception, attempt: int, max_retries: int):
+    """
+    Seconds to wait before retrying after `error`, or None if the call should not be retried.
+
+    Rate-limit errors also slow the shared rate limiter down, so every service backs off together.
+    """
+    name = type(error).__name__
+    if name not in RETRYABLE_ERRORS:
+        return None
+    if name in RATE_LIMIT_ERRORS:
+        rate_limiter.record_rate_limited()
+    if attempt > max_retries:
+        return None
+    delay = min(MAX_RETRY_BACKOFF_SECONDS, LLM_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class LimitedCallsMixin:
+    """
+    Routes a chat model's calls through the shared limits.
+
+    Each attempt holds its service's concurrency slot and waits in the
+    process-wide rate limiter queue at the service's priority (or the one set
+    with core.rate_limit.llm_priority). Retries happen here rather than inside
+    the model, so they queue for quota like any other call. Mix it in before
+    the chat model class; the concrete class declares the `_limiter` private
+    attribute.
+    """
+
+    def _slot(self):
+        return self._limiter.slot() if self._limiter is not None else nullcontext()
+
+    def _aslot(self):
+        return self._limiter.aslot() if self._limiter is not None else nullcontext()
+
+    def _priority(self) -> int:
+        return current_priority(self._limiter.policy.priority if self._limiter is not None else PRIORITY_DEFAULT)
+
+    def _max_retries(self) -> int:
+        return self._limiter.policy.max_retries if self._limiter is not None else 0
+
+    def _on_response(self, messages, text: str, usage, latency: float):
+        """Called after every successful attempt; recording backends override it."""
+
+    def _call_kwargs(self) -> dict:
+        """Extra keyword arguments for each attempt's underlying model call."""
+        return {}
+
+    def _start_call_span(self, reserved: int):
+        # Detached from the context: streams yield between the span's start and end
+        return start_span(
+            "llm.call",
+            **{
+                "llm.service": self._limiter.service if self._limiter is not None else "default",
+                "llm.model": self.model,
+                "llm.priority": self._priority(),
+                "llm.input_tokens": reserved,
+                "llm.queue_wait_ms": 0.0,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reserved = _prompt_tokens(messages)
+        call_span = self._start_call_span(reserved)
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                queued = time.monotonic()
+                with self._slot():
+                    reservation = rate_limiter.acquire(reserved, self._priority())
+                    started = time.monotonic()
+                    _add_queue_wait(call_span, started - queued)
+                    try:
+                        result = super()._generate(messages, stop=stop, run_manager=run_manager, **{**self._call_kwargs(), **kwargs})
+                    except Exception as e:
+                        delay = _retry_delay(e, attempt, self._max_retries())
+                        if delay is None:
+                            raise
+                        failure = type(e).__name__
+                    else:
+                        rate_limiter.settle(reservation, _result_tokens(result, reserved))
+                        _set_usage(call_span, result)
+                        self._on_result(messages, result, time.monotonic() - started)
+                        return result
+                logger.warning(f"Retrying LLM call in {delay:.1f}s after {failure} (attempt {attempt})")
+                call_span.add_event("retry", attempt=attempt, error=failure, delay_seconds=round(delay, 3))
+                time.sleep(delay)
+        except Exception as e:
+            call_span.record_error(e)
+            raise
+        finally:
+            call_span.set_attribute("llm.attempts", attempt)
+            call_span.end()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        reserved = _prompt_tokens(messages)
+        call_span = self._start_call_span(reserved)
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                queued = time.monotonic()
+                async with self._aslot():
+                    reservation = await rate_limiter.aacquire(reserved, self._priority())
+                    started = time.monotonic()
+                    _add_queue_wait(call_span, started - queued)
+                    try:
+                        result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **{**self._call_kwargs(), **kwargs})
+                    except Exception as e:
+                        delay = _retry_delay(e, attempt, self._max_retries())
+                        if delay is None:
+                            raise
+                        failure = type(e).__name__
+                    else:
+                        rate_limiter.settle(reservation, _result_tokens(result, reserved))
+                        _set_usage(call_span, result)
+                        self._on_result(messages, result, time.monotonic() - started)
+                        return result
+                logger.warning(f"Retrying LLM call in {delay:.1f}s after {failure} (attempt {attempt})")
+                call_span.add_event("retry", attempt=attempt, error=failure, delay_seconds=round(delay, 3))
+                await asyncio.sleep(delay)
+        except Exception as e:
+            call_span.record_error(e)
+            raise
+        finally:
+            call_span.set_attribute("llm.attempts", attempt)
+            call_span.end()
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Streams are only retried before the first chunk; after that the caller has seen output
+        reserved = _prompt_tokens(messages)
+        call_span = self._start_call_span(reserved)
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                pieces = []
+                queued = time.monotonic()
+                with self._slot():
+                    reservation = rate_limiter.acquire(reserved, self._priority())
+                    started = time.monotonic()
+                    _add_queue_wait(call_span, started - queued)
+                    try:
+                        for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **{**self._call_kwargs(), **kwargs}):
+                            if not pieces:
+                                call_span.add_event("first_chunk")
+                            pieces.append(chunk.text)
+                            yield chunk
+                    except Exception as e:
+                        delay = _retry_delay(e, attempt, self._max_retries()) if not pieces else None
+                        if delay is None:
+                            raise
+                        failure = type(e).__name__
+                    else:
+                        text = "".join(pieces)
+                        rate_limiter.settle(reservation, reserved + _estimate_tokens(text))
+                        call_span.set_attribute("llm.output_tokens", _estimate_tokens(text))
+                        self._on_response(messages, text, None, time.monotonic() - started)
+                        return
+                logger.warning(f"Retrying LLM stream in {delay:.1f}s after {failure} (attempt {attempt})")
+                call_span.add_event("retry", attempt=attempt, error=failure, delay_seconds=round(delay, 3))
+                time.sleep(delay)
+        except Exception as e:
+            call_span.record_error(e)
+            raise
+        finally:
+            call_span.set_attribute("llm.attempts", attempt)
+            call_span.end()
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        reserved = _prompt_tokens(messages)
+        call_span = self._start_call_span(reserved)
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                pieces = []
+                queued = time.monotonic()
+                async with self._aslot():
+                    reservation = await rate_limiter.aacquire(reserved, self._priority())
+                    started = time.monotonic()
+                    _add_queue_wait(call_span, started - queued)
+                    try:
+                        async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **{**self._call_kwargs(), **kwargs}):
+                            if not pieces:
+                                call_span.add_event("first_chunk")
+                            pieces.append(chunk.text)
+                            yield chunk
+                    except Exception as e:
+                        delay = _retry_delay(e, attempt, self._max_retries()) if not pieces else None
+                        if delay is None:
+                            raise
+                        failure = type(e).__name__
+                    else:
+                        text = "".join(pieces)
+                        rate_limiter.settle(reservation, reserved + _estimate_tokens(text))
+                        call_span.set_attribute("llm.output_tokens", _estimate_tokens(text))
+                        self._on_response(messages, text, None, time.monotonic() - started)
+                        return
+                logger.warning(f"Retrying LLM stream in {delay:.1f}s after {failure} (attempt {attempt})")
+                call_span.add_event("retry", attempt=attempt, error=failure, delay_seconds=round(delay, 3))
+                await asyncio.sleep(delay)
+        except Exception as e:
+            call_span.record_error(e)
+            raise
+        finally:
+            call_span.set_attribute("llm.attempts", attempt)
+            call_span.end()
+
+    def _on_result(self, messages, result, latency: float):
+        generation = result.generations[0] if result.generations else None
+        if generation is not None:
+            self._on_response(messages, generation.text, getattr(generation.message, "usage_metadata", None), latency)
+
+
+# ChatGoogleGenerativeAI call options that shape the request rather than the client call
+_REQUEST_FIELDS = ("tools", "functions", "safety_settings", "tool_config", "generation_config", "cached_content", "tool_choice")
+
+
+def _stream_usage(usage, prev_usage):
+    """Running token usage of a stream after a chunk reporting `usage`."""
+    if prev_usage is None:
+        return usage
+    usage = usage or {}
+    return {
+        key: prev_usage.get(key, 0) + usage.get(key, 0)
+        for key in ("input_tokens", "output_tokens", "total_tokens")
+    }
+
+
+class SingleAttemptChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """
+    ChatGoogleGenerativeAI making exactly one request per call.
+
+    langchain-google-genai wraps every request in its own tenacity retry (two
+    attempts, up to 60 s apart) and the generative service client adds another
+    for ServiceUnavailable. Those retries sleep while the caller holds its
+    concurrency slot and never go back through the rate limiter, so this
+    model sends the request itself with both disabled and leaves retrying to
+    LimitedCallsMixin.
+
+    Built on langchain-google-genai 2.0.x internals (_prepare_request,
+    _response_to_result and the google-generativeai service clients);
+    requirements.txt pins that version.
+    """
+
+    def _request(self, messages, stop, kwargs):
+        """Split call options into the prepared request and the client call's own arguments."""
+        fields = {name: kwargs.pop(name) for name in _REQUEST_FIELDS if name in kwargs}
+        fields["cached_content"] = fields.get("cached_content") or self.cached_content
+        return self._prepare_request(messages, stop=stop, **fields), kwargs
+
+    def _send(self, method, request, kwargs):
+        try:
+            return method(request=request, metadata=self.default_metadata, retry=None, **kwargs)
+        except InvalidArgument as e:
+            raise ChatGoogleGenerativeAIError(f"Invalid argument provided to Gemini: {e}") from e
+
+    async def _asend(self, method, request, kwargs):
+        try:
+            return await method(request=request, metadata=self.default_metadata, retry=None, **kwargs)
+        except InvalidArgument as e:
+            raise ChatGoogleGenerativeAIError(f"Invalid argument provided to Gemini: {e}") from e
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        request, kwargs = self._request(messages, stop, kwargs)
+        return _response_to_result(self._send(self.client.generate_content, request, kwargs))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        request, kwargs = self._request(messages, stop, kwargs)
+        return _response_to_result(await self._asend(self.async_client.generate_content, request, kwargs))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        request, kwargs = self._request(messages, stop, kwargs)
+        usage = None
+        for response in self._send(self.client.stream_generate_content, request, kwargs):
+            generation = _response_to_result(response, stream=True, prev_usage=usage).generations[0]
+            usage = _stream_usage(generation.message.usage_metadata, usage)
+            if run_manager:
+                run_manager.on_llm_new_token(generation.text)
+            yield generation
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        request, kwargs = self._request(messages, stop, kwargs)
+        usage = None
+        async for response in await self._asend(self.async_client.stream_generate_content, request, kwargs):
+            generation = _response_to_result(response, stream=True, prev_usage=usage).generations[0]
+            usage = _stream_usage(generation.message.usage_metadata, usage)
+            if run_manager:
+                await run_manager.on_llm_new_token(generation.text)
+            yield generation
+
+
+class PooledChatGoogleGenerativeAI(LimitedCallsMixin, SingleAttemptChatGoogleGenerativeAI):
+    """
+    ChatGoogleGenerativeAI whose calls go through the shared limits.
+
+    Instances come from LLMClientRegistry as copies of one base model per
+    (model, API key), so every service shares that base model's client and
+    its connection instead of opening its own.
+    """
+
+    _limiter: Any = PrivateAttr(default=None)
+    _base: Any = PrivateAttr(default=None)
+
+    def _call_kwargs(self) -> dict:
+        # langchain-google-genai 2.0.x never reads its timeout field, so hand the
+        # deadline to the generative service call itself
+        return {"timeout": self.timeout} if self.timeout else {}
+
+    @property
+    def async_client(self):
+        # The async client is built lazily and left out of copies; build it once
+        # on the base model so every service shares it
+        if self._base is not None:
+            return self._base.async_client
+        return super().async_client
+
+
+class LLMClientRegistry:
+    """
+    Hands out chat models that share one client per (model, API key).
+
+    Building a ChatGoogleGenerativeAI creates a new generative service client,
+    so each service used to open and keep its own connection. The registry
+    builds one base model per (model, API key) and gives each service a copy
+    that reuses the base model's client with the service's timeout, retries
+    and concurrency limit.
+    """
+
+    def __init__(self):
+        self._base_models: Dict[tuple, PooledChatGoogleGenerativeAI] = {}
+        self._limiters: Dict[str, ServiceLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, service: str) -> ServiceLimiter:
+        with self._lock:
+            if service not in self._limiters:
+                self._limiters[service] = ServiceLimiter(service, policy_for(service))
+            return self._limiters[service]
+
+    def chat_model(self, service: str, google_api_key: str = None, model: str = DEFAULT_MODEL, **settings) -> ChatGoogleGenerativeAI:
+        """
+        Return a chat model for `service`.
+
+        Args:
+            service: Service name selecting the timeout, retry and concurrency policy
+            google_api_key: API key (defaults to GOOGLE_GENERATIVE_AI_API_KEY)
+            model: Gemini model name
+            **settings: Other ChatGoogleGenerativeAI fields, e.g. temperature
+
+        Returns:
+            Chat model sharing the registry's client for this model and key (an
+            offline stand-in when LLM_BACKEND is "replay" or "fake")
+        """
+        api_key = google_api_key or os.getenv("GOOGLE_GENERATIVE_AI_API_KEY")
+        if not api_key and LLM_BACKEND in ("gemini", "record"):
+            raise ValueError("GOOGLE_GENERATIVE_AI_API_KEY environment variable is not set")
+
+        limiter = self.limiter(service)
+        key = (model, api_key)
+        with self._lock:
+            base = self._base_models.get(key)
+            if base is None:
+                base = self._create_base_model(model, api_key)
+                self._base_models[key] = base
+                logger.info(f"Created shared LLM client for {model} ({LLM_BACKEND} backend)")
+
+        # Each model call is a single attempt; LimitedCallsMixin retries through the rate limiter
+        chat = base.model_copy(update={
+            **settings,
+            "timeout": limiter.policy.timeout,
+        })
+        chat._limiter = limiter
+        if isinstance(chat, PooledChatGoogleGenerativeAI):
+            chat._base = base
+        return chat
+
+    def _create_base_model(self, model: str, api_key: str):
+        if LLM_BACKEND == "gemini":
+            return PooledChatGoogleGenerativeAI(model=model, google_api_key=api_key)
+        # Imported here because the backends build on LimitedCallsMixin from this module
+        from .chat_backends import create_backend_model
+        return create_backend_model(LLM_BACKEND, model, api_key)
+
+    def stats(self):
+        with self._lock:
+            limiters = list(self._limiters.values())
+            clients = len(self._base_models)
+        stats = {
+            "backend": LLM_BACKEND,
+            "clients": clients,
+            "services": {limiter.service: limiter.stats() for limiter in limiters},
+            "rate_limiter": rate_limiter.stats(),
+        }
+        if LLM_BACKEND != "gemini":
+            from .chat_backends import offline_backend_stats
+            stats["offline"] = offline_backend_stats()
+        return stats
+
+
+llm_clients = LLMClientRegistry()
+
+
+def get_chat_model(service: str, google_api_key: str = None, model: str = DEFAULT_MODEL, **settings) -> ChatGoogleGenerativeAI:
+    """Return a chat model for `service` from the shared registry."""
+    return llm_clients.chat_model(service, google_api_key, model, **settings)
+
+
+def llm_client_stats() -> dict:
+    """Return shared client count, per-service call and concurrency stats and rate limiter queue metrics."""
+    return llm_clients.stats()
@@ -0,0 +1,248 @@
+import os
+import math
+import logging
+import threading
+from dotenv import load_dotenv
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Serve GET /metrics and feed finished spans into the metrics below
+METRICS_ENABLED = (os.getenv("METRICS_ENABLED") or "true").lower() in ("1", "true", "yes", "on")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds in seconds; whole pipelines take minutes, single LLM calls seconds
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(labelnames, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A metric family in the Prometheus text exposition format."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for every series."""
+        with self._lock:
+            return [("", key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing total, per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Report a total kept elsewhere (a component's own stats counter)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    """Value that goes up and down, read at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(key, dict(values, counts=list(values["counts"]))) for key, values in sorted(self._values.items())]
+        samples = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values["counts"]):
+                cumulative += count
+                samples.append(("_bucket", key, (("le", _format_value(float(bound))),), cumulative))
+            samples.append(("_sum", key, (), round(values["sum"], 6)))
+            samples.append(("_count", key, (), values["count"]))
+        return samples
+
+
+class MetricsRegistry:
+    """Metric families served together, plus collectors that refresh gauges before each scrape."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=REQUEST_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Call `collector()` before every scrape; it sets gauges from live component stats."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {str(e)}")
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streamed bodies",
+    ("method", "route", "status"), REQUEST_BUCKETS,
+)
+stage_duration = registry.histogram(
+    "stage_duration_seconds", "Duration of pipeline stages (graph nodes, animation steps, Manim checks and renders)",
+    ("stage", "status"), STAGE_BUCKETS,
+)
+llm_call_duration = registry.histogram(
+    "llm_call_duration_seconds", "LLM call latency including retries and queueing",
+    ("service",), STAGE_BUCKETS,
+)
+llm_queue_wait = registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited for a concurrency slot and rate-limit quota",
+    ("service",), WAIT_BUCKETS,
+)
+llm_calls = registry.counter("llm_calls_total", "LLM calls by outcome", ("service", "status"))
+llm_tokens = registry.counter("llm_tokens_total", "LLM tokens (measured, or estimated when usage is missing)", ("service", "direction"))
+llm_retries = registry.counter("llm_retries_total", "LLM call attempts retried after transient or rate-limit errors", ("service",))
+json_fallbacks = registry.counter(
+    "json_fallbacks_total", "Unparseable LLM responses replaced by a default structure", ("service",),
+)
+manim_repairs = registry.counter("manim_repairs_total", "LLM repairs of Manim code, by the check that failed", ("reason",))
+manim_render_failures = registry.counter("manim_render_failures_total", "Failed Manim renders", ("kind",))
+
+# Read from component stats before each scrape (see app.collect_runtime_metrics)
+cache_hits = registry.counter("cache_hits_total", "Cache lookups answered from the cache", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Cache lookups that missed", ("cache",))
+cache_hit_ratio = registry.gauge("cache_hit_ratio", "Share of cache lookups answered from the cache since startup", ("cache",))
+animation_jobs = registry.gauge("animation_jobs", "Animation jobs held by the job manager, by status", ("status",))
+render_queue_depth = registry.gauge("manim_render_queue_depth", "Renders waiting for a render slot")
+active_renders = registry.gauge("manim_active_renders", "Renders holding a render slot")
+render_worker_crashes = registry.counter("manim_render_worker_crashes_total", "Render worker processes that crashed mid-render")
+llm_in_flight = registry.gauge("llm_in_flight", "LLM calls holding a concurrency slot", ("service",))
+llm_waiting = registry.gauge("llm_waiting", "LLM calls waiting for a concurrency slot", ("service",))
+llm_rate_limit_queue_depth = registry.gauge("llm_rate_limit_queue_depth", "LLM calls queued for rate-limit quota")
+llm_rate_factor = registry.gauge("llm_rate_factor", "Share of the configured LLM rate in use after rate-limit backoff")
+
+
+def set_cache_stats(cache: str, hits: int, misses: int):
+    cache_hits.set_total(hits, cache=cache)
+    cache_misses.set_total(misses, cache=cache)
+    lookups = hits + misses
+    cache_hit_ratio.set(round(hits / lookups, 4) if lookups else 0.0, cache=cache)
+
+
+class MetricsExporter:
+    """Span exporter that turns finished spans into request, stage and LLM metrics."""
+
+    def export(self, span):
+        attributes = span.attributes
+        seconds = span.duration_ms / 1000
+        if span.parent_id is None and "http.method" in attributes:
+            http_request_duration.observe(
+                seconds,
+                method=attributes["http.method"],
+                route=attributes.get("http.route") or "unmatched",
+                status=attributes.get("http.status_code") or 0,
+            )
+        elif span.name == "llm.call":
+            service = attributes.get("llm.service", "default")
+            llm_calls.inc(service=service, status=span.status)
+            llm_call_duration.observe(seconds, service=service)
+            llm_queue_wait.observe(attributes.get("llm.queue_wait_ms", 0) / 1000, service=service)
+            if span.status == "ok":
+                llm_tokens.inc(attributes.get("llm.input_tokens") or 0, service=service, direction="input")
+                llm_tokens.inc(attributes.get("llm.output_tokens") or 0, service=service, direction="output")
+            if attributes.get("llm.attempts", 1) > 1:
+                llm_retries.inc(attributes["llm.attempts"] - 1, service=service)
+        else:
+            stage_duration.observe(seconds, stage=span.name, status=span.status)
+            if span.name == "manim.repair":
+                manim_repairs.inc(reason=attributes.get("manim.repair_reason", "unknown"))
+            elif span.name in ("manim.trial_render", "manim.final_render") and span.status == "error":
+                manim_render_failures.inc(kind=span.name.split(".", 1)[1])
+
+
+if METRICS_ENABLED:
+    tracer.add_exporter(MetricsExporter())
@@ -0,0 +1,256 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Gemini quota shared by every LLM call in the process (0 disables a bucket);
+# the defaults are the gemini-2.0-flash Tier 1 limits. Buckets are per process:
+# workers or CLIs sharing one API key each need a share of the provider quota
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE") or 2000)
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE") or 4000000)
+
+# Lower numbers are served first when calls queue for quota
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {"interactive": PRIORITY_INTERACTIVE, "default": PRIORITY_DEFAULT, "batch": PRIORITY_BATCH}
+
+# Rate-limit responses halve the effective rate (down to this fraction) and pause
+# new calls for an exponentially growing cooldown; each success recovers some rate
+MIN_RATE_FACTOR = 0.1
+RATE_RECOVERY_STEP = 0.05
+MAX_COOLDOWN_SECONDS = 60
+# Longest a queued call sleeps before re-checking the buckets
+_POLL_SECONDS = 0.05
+
+_priority = contextvars.ContextVar("llm_priority", default=None)
+
+
+def priority_value(priority) -> int:
+    """Accept a priority number or one of "interactive", "default", "batch"."""
+    if isinstance(priority, str):
+        return PRIORITY_NAMES[priority.lower()]
+    return int(priority)
+
+
+@contextmanager
+def llm_priority(priority):
+    """Run the LLM calls made inside the block (in this context) at `priority`."""
+    token = _priority.set(priority_value(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: int = PRIORITY_DEFAULT) -> int:
+    """The priority set by an enclosing llm_priority block, else `default`."""
+    priority = _priority.get()
+    return default if priority is None else priority
+
+
+class TokenBucket:
+    """Bucket refilled continuously at `per_minute` units per minute, holding at most a minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float, factor: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60 * factor)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float, factor: float) -> float:
+        """Seconds until `amount` can be taken (a request larger than the bucket waits for a full bucket)."""
+        self._refill(now, factor)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / (self.per_minute * factor)
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def charge(self, amount: float):
+        """Adjust for usage measured after the call; the level may go negative and is repaid by waiting."""
+        self.level -= amount
+
+
+class Reservation:
+    """Quota taken for one call; settled with the measured token count afterwards"""
+
+    __slots__ = ("priority", "tokens", "sequence", "queued_at")
+
+    def __init__(self, priority: int, tokens: int, sequence: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.sequence = sequence
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class LLMRateLimiter:
+    """
+    Process-wide requests/min and tokens/min limiter for LLM calls.
+
+    Calls queue instead of failing: a call proceeds once it is the
+    highest-priority (then oldest) waiter and both buckets have room. Token
+    reservations use the estimated prompt size and are settled with the
+    measured usage afterwards. Rate-limit errors from the provider reduce the
+    effective rate and pause new calls briefly, so callers back off together
+    instead of retrying independently.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        self._rate_factor = 1.0
+        self._cooldown_until = 0.0
+        self._consecutive_rate_limits = 0
+
+        self._max_queue_depth = 0
+        self._rate_limited = 0
+        self._by_priority = {}
+
+    def _priority_stats(self, priority: int):
+        if priority not in self._by_priority:
+            self._by_priority[priority] = {"granted": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        return self._by_priority[priority]
+
+    def _enqueue(self, tokens: int, priority: int) -> Reservation:
+        reservation = Reservation(priority, tokens, next(self._sequence))
+        heapq.heappush(self._queue, reservation)
+        self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+        self._condition.notify_all()
+        return reservation
+
+    def _try_grant(self, reservation: Reservation):
+        """Grant the reservation if it is next and the buckets allow it; otherwise return seconds to wait (lock held)."""
+        if self._queue[0] is not reservation:
+            return None
+        now = time.monotonic()
+        wait = max(0.0, self._cooldown_until - now)
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_time(1, now, self._rate_factor))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.wait_time(reservation.tokens, now, self._rate_factor))
+        if wait > 0:
+            return wait
+
+        heapq.heappop(self._queue)
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(reservation.tokens)
+
+        waited = now - reservation.queued_at
+        stats = self._priority_stats(reservation.priority)
+        stats["granted"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        self._condition.notify_all()
+        return 0.0
+
+    def _abandon(self, reservation: Reservation):
+        if reservation in self._queue:
+            self._queue.remove(reservation)
+            heapq.heapify(self._queue)
+        self._condition.notify_all()
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_DEFAULT) -> Reservation:
+        """Block until the call may proceed."""
+        with self._condition:
+            reservation = self._enqueue(tokens, priority)
+            try:
+                while True:
+                    wait = self._try_grant(reservation)
+                    if wait == 0.0:
+                        return reservation
+                    # Non-head waiters are woken when the queue changes
+                    self._condition.wait(timeout=wait)
+            except BaseException:
+                self._abandon(reservation)
+                raise
+
+    async def aacquire(self, tokens: int, priority: int = PRIORITY_DEFAULT) -> Reservation:
+        """Wait without blocking the event loop until the call may proceed."""
+        with self._condition:
+            reservation = self._enqueue(tokens, priority)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_grant(reservation)
+                if wait == 0.0:
+                    return reservation
+                await asyncio.sleep(min(wait or _POLL_SECONDS, _POLL_SECONDS))
+        except BaseException:
+            with self._condition:
+                self._abandon(reservation)
+            raise
+
+    def settle(self, reservation: Reservation, tokens: int):
+        """Charge the difference between measured and reserved tokens and recover rate after a success."""
+        with self._condition:
+            if self._tokens is not None:
+                self._tokens.charge(tokens - reservation.tokens)
+            self._consecutive_rate_limits = 0
+            self._rate_factor = min(1.0, self._rate_factor + RATE_RECOVERY_STEP)
+
+    def record_rate_limited(self):
+        """Back off after the provider rejected a call for exceeding its quota."""
+        with self._condition:
+            self._rate_limited += 1
+            self._consecutive_rate_limits += 1
+            self._rate_factor = max(MIN_RATE_FACTOR, self._rate_factor / 2)
+            cooldown = min(MAX_COOLDOWN_SECONDS, 2 ** (self._consecutive_rate_limits - 1))
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + cooldown)
+        logger.warning(f"LLM rate limited; pausing new calls for {cooldown}s at {self._rate_factor:.0%} of the configured rate")
+
+    def stats(self):
+        with self._condition:
+            names = {value: name for name, value in PRIORITY_NAMES.items()}
+            waiting = {}
+            for reservation in self._queue:
+                name = names.get(reservation.priority, str(reservation.priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            return {
+                "requests_per_minute": self._requests.per_minute if self._requests else None,
+                "tokens_per_minute": self._tokens.per_minute if self._tokens else None,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "waiting": waiting,
+                "rate_factor": round(self._rate_factor, 3),
+                "cooldown_seconds": round(max(0.0, self._cooldown_until - time.monotonic()), 3),
+                "rate_limited": self._rate_limited,
+                "priorities": {
+                    names.get(priority, str(priority)): {
+                        "granted": stats["granted"],
+                        "wait_seconds": round(stats["wait_seconds"], 3),
+                        "avg_wait_seconds": round(stats["wait_seconds"] / stats["granted"], 3) if stats["granted"] else 0.0,
+                        "max_wait_seconds": round(stats["max_wait_seconds"], 3),
+                    }
+                    for priority, stats in sorted(self._by_priority.items())
+                },
+            }
+
+
+rate_limiter = LLMRateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
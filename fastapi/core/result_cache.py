@@ -0,0 +1,216 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a user prompt so trivially different requests share a cache entry"""
+    return " ".join(prompt.lower().split())
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a content-addressed key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InMemoryCacheBackend:
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # Hand out copies so callers cannot mutate cached results
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU cache shared by every worker process on the dyno"""
+
+    def __init__(self, path: str, max_entries: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries (last_access)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time())
+            )
+            # Evict least recently used entries beyond the size limit
+            self._conn.execute(
+                """DELETE FROM cache_entries WHERE key IN (
+                    SELECT key FROM cache_entries ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class ResultCache:
+    """
+    Content-addressed cache for generation results with TTL expiry and
+    hit/miss counters. Storage is delegated to a pluggable backend.
+    """
+
+    def __init__(self, backend, ttl_seconds: Optional[float] = 86400, namespace: str = "default"):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _namespaced(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            value = self.backend.get(self._namespaced(key))
+        except Exception as e:
+            logger.warning(f"Result cache read failed ({self.namespace}): {e}")
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        try:
+            self.backend.set(self._namespaced(key), value, expires_at)
+        except Exception as e:
+            logger.warning(f"Result cache write failed ({self.namespace}): {e}")
+
+    def delete(self, key: str):
+        self.backend.delete(self._namespaced(key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "namespace": self.namespace,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_sqlite_backends: Dict[str, SQLiteCacheBackend] = {}
+
+
+def create_result_cache(namespace: str) -> ResultCache:
+    """
+    Create a ResultCache configured from environment variables.
+
+    RESULT_CACHE_BACKEND selects "memory" (default) or "sqlite";
+    RESULT_CACHE_PATH, RESULT_CACHE_TTL_SECONDS and RESULT_CACHE_MAX_ENTRIES
+    tune the storage. Namespaces share a single SQLite file.
+    """
+    backend_name = (os.getenv("RESULT_CACHE_BACKEND") or "memory").lower()
+    max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES") or 512)
+    ttl_seconds = float(os.getenv("RESULT_CACHE_TTL_SECONDS") or 86400)
+
+    if backend_name == "sqlite":
+        path = os.getenv("RESULT_CACHE_PATH") or "result_cache.sqlite3"
+        if path not in _sqlite_backends:
+            _sqlite_backends[path] = SQLiteCacheBackend(path, max_entries=max_entries)
+        backend = _sqlite_backends[path]
+    else:
+        if backend_name != "memory":
+            logger.warning(f"Unknown RESULT_CACHE_BACKEND '{backend_name}', using in-memory cache")
+        backend = InMemoryCacheBackend(max_entries=max_entries)
+
+    return ResultCache(backend, ttl_seconds=ttl_seconds, namespace=namespace)
@@ -0,0 +1,59 @@
+import os
+import logging
+from typing import Any, Optional, Type
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Ask Gemini for schema-constrained JSON instead of salvaging JSON from free text
+LLM_STRUCTURED_OUTPUT = (os.getenv("LLM_STRUCTURED_OUTPUT") or "false").lower() in ("1", "true", "yes")
+
+
+def with_response_schema(llm, schema: Type[BaseModel]):
+    """
+    Bind `schema` as the response format of `llm`.
+
+    Uses Gemini's native JSON schema mode where the installed
+    langchain-google-genai supports it (method="json_schema"). The pinned
+    2.0.x release rejects any `method` argument, so fall back to the default
+    function-calling binding, which still returns validated `schema` instances.
+
+    Args:
+        llm: ChatGoogleGenerativeAI instance
+        schema: Pydantic model describing the response
+
+    Returns:
+        Runnable producing `schema` instances, or None if the model cannot be
+        bound so the caller keeps its free-text prompt path
+    """
+    try:
+        return llm.with_structured_output(schema, method="json_schema")
+    except Exception:
+        pass
+    try:
+        return llm.with_structured_output(schema)
+    except Exception as e:
+        logger.warning(f"Structured output unavailable for {schema.__name__}, using free-text JSON: {str(e)}")
+        return None
+
+
+def invoke_structured(runnable, inputs: Any, config=None) -> Optional[dict]:
+    """
+    Invoke a chain ending in `with_response_schema` and return the response as a dict.
+
+    Returns:
+        The validated response as a dict, or None if the call or validation
+        failed so the caller can fall back to its free-text prompt path
+    """
+    try:
+        result = runnable.invoke(inputs, config=config)
+    except Exception as e:
+        logger.warning(f"Structured output call failed, falling back to free-text JSON: {str(e)}")
+        return None
+    if isinstance(result, BaseModel):
+        return result.model_dump()
+    return result if isinstance(result, dict) else None
@@ -0,0 +1,272 @@
+import re
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class JSONParseError(ValueError):
+    """Raised when no JSON value can be recovered from a response"""
+    pass
+
+
+_FENCED_JSON_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+# Whitespace plus // and /* */ comments, which LLMs add to "JSON" freely
+_SKIP_RE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?(?:\*/|$)|#[^\n]*)+", re.DOTALL)
+_NUMBER_RE = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$\-]*")
+_BARE_VALUE_RE = re.compile(r"[^,}\]\n]*")
+_STRING_CHUNK_RE = {'"': re.compile(r'[^"\\]+'), "'": re.compile(r"[^'\\]+")}
+_DELIMITERS = ",}]:"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "'": "'"}
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+_MISSING = object()
+
+
+class _TolerantParser:
+    """
+    Recursive-descent JSON parser that accepts what LLMs actually emit:
+    trailing or missing commas, comments, unquoted keys and values,
+    single-quoted strings, stray quotes inside strings, arithmetic such as
+    `-650 + 650`, Python literals and output truncated mid-value.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.length = len(text)
+
+    def skip(self):
+        match = _SKIP_RE.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < self.length else ""
+
+    def value(self):
+        self.skip()
+        char = self.peek()
+        if not char:
+            return _MISSING
+        if char == "{":
+            return self.object()
+        if char == "[":
+            return self.array()
+        if char in "\"'":
+            return self.string(char)
+        if char.isdigit() or char in "+-.(":
+            return self.number()
+        return self.word()
+
+    def object(self):
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip()
+            char = self.peek()
+            if not char:
+                return result
+            if char == "}":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                continue
+            if char in "]":
+                # Mismatched closer: treat it as the end of this object
+                self.pos += 1
+                return result
+
+            if char in "\"'":
+                key = self.string(char)
+            else:
+                match = _IDENTIFIER_RE.match(self.text, self.pos)
+                if not match:
+                    # Skip a character we cannot interpret
+                    self.pos += 1
+                    continue
+                key = match.group(0)
+                self.pos = match.end()
+
+            self.skip()
+            if self.peek() == ":":
+                self.pos += 1
+            elif not self.peek():
+                return result
+            value = self.value()
+            if value is _MISSING:
+                return result
+            result[key] = value
+
+    def array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip()
+            char = self.peek()
+            if not char:
+                return result
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                continue
+            if char == "}":
+                self.pos += 1
+                return result
+            value = self.value()
+            if value is _MISSING:
+                return result
+            result.append(value)
+
+    def string(self, quote):
+        self.pos += 1
+        chunk_re = _STRING_CHUNK_RE[quote]
+        parts = []
+        while self.pos < self.length:
+            match = chunk_re.match(self.text, self.pos)
+            if match:
+                parts.append(match.group(0))
+                self.pos = match.end()
+                continue
+
+            char = self.text[self.pos]
+            if char == "\\":
+                escape = self.text[self.pos + 1:self.pos + 2]
+                if escape == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", self.text[self.pos + 2:self.pos + 6]):
+                    parts.append(chr(int(self.text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                else:
+                    parts.append(_ESCAPES.get(escape, escape))
+                    self.pos += 2
+                continue
+
+            # A quote only closes the string if what follows can follow a string
+            self.pos += 1
+            rest = _SKIP_RE.match(self.text, self.pos)
+            following = self.text[rest.end() if rest else self.pos:][:1]
+            if not following or following in _DELIMITERS or following in "\"'":
+                return "".join(parts)
+            parts.append(char)
+        # Truncated inside a string
+        return "".join(parts)
+
+    def number(self):
+        start = self.pos
+        try:
+            result = self.expression()
+        except (ValueError, ZeroDivisionError, IndexError):
+            result = _MISSING
+
+        self.skip()
+        following = self.peek()
+        literal = self.text[start:self.pos]
+        # Leading zeros (dates, codes) or trailing junk (10px) mean this was really text
+        if result is _MISSING or (following and following not in _DELIMITERS) or re.search(r"(?<![\d.])0\d", literal):
+            self.pos = start
+            return self.word()
+        return result
+
+    def expression(self):
+        result = self.term()
+        while True:
+            self.skip()
+            operator = self.peek()
+            if operator not in ("+", "-") or not operator:
+                return result
+            self.pos += 1
+            right = self.term()
+            result = result + right if operator == "+" else result - right
+
+    def term(self):
+        result = self.factor()
+        while True:
+            self.skip()
+            operator = self.peek()
+            if operator not in ("*", "/") or not operator:
+                return result
+            self.pos += 1
+            right = self.factor()
+            result = result * right if operator == "*" else result / right
+
+    def factor(self):
+        self.skip()
+        char = self.peek()
+        if char in ("+", "-") and char:
+            self.pos += 1
+            value = self.factor()
+            return -value if char == "-" else value
+        if char == "(":
+            self.pos += 1
+            value = self.expression()
+            self.skip()
+            if self.peek() == ")":
+                self.pos += 1
+            return value
+        match = _NUMBER_RE.match(self.text, self.pos)
+        if not match:
+            raise ValueError("expected a number")
+        self.pos = match.end()
+        literal = match.group(0)
+        return float(literal) if any(c in literal for c in ".eE") else int(literal)
+
+    def word(self):
+        match = _BARE_VALUE_RE.match(self.text, self.pos)
+        raw = match.group(0)
+        self.pos = match.end()
+        word = raw.strip()
+        if word in _LITERALS:
+            return _LITERALS[word]
+        if not word and self.peek() in "}]":
+            return _MISSING
+        return word
+
+
+def extract_json_text(text: str) -> str:
+    """Locate the JSON payload in an LLM response: a fenced block, else the first { or [ onward."""
+    if "```" in text:
+        for match in _FENCED_JSON_RE.finditer(text):
+            candidate = match.group(1).strip()
+            if candidate[:1] in ("{", "["):
+                return candidate
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    return text[min(starts):] if starts else text
+
+
+def parse_tolerant_json(text: str) -> Any:
+    """
+    Parse the JSON object or array in an LLM response.
+
+    Valid JSON goes through json.loads; anything else is recovered by the
+    tolerant parser in a single pass, without regex rewrites of the payload.
+
+    Args:
+        text: Raw model response, optionally with prose and ``` fences
+
+    Returns:
+        The parsed dict or list
+
+    Raises:
+        JSONParseError: If the response contains no JSON object or array
+    """
+    if not text:
+        raise JSONParseError("Empty response")
+
+    payload = extract_json_text(text)
+    if payload[:1] not in ("{", "["):
+        raise JSONParseError("No JSON object or array found in response")
+
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        pass
+
+    result = _TolerantParser(payload).value()
+    if not isinstance(result, (dict, list)):
+        raise JSONParseError("Response JSON could not be recovered")
+    logger.info("Recovered malformed JSON with the tolerant parser")
+    return result
@@ -0,0 +1,367 @@
+import os
+import json
+import time
+import uuid
+import logging
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Comma-separated span exporters: "memory" (recent spans for GET /traces), "jsonl" (one line per
+# span in TRACE_EXPORT_PATH) and "log" (one log line per span); empty or "off" disables tracing
+TRACE_EXPORTERS = os.getenv("TRACE_EXPORTERS")
+TRACE_EXPORTERS = [name.strip().lower() for name in (TRACE_EXPORTERS if TRACE_EXPORTERS is not None else "memory").split(",") if name.strip()]
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH") or "traces.jsonl"
+# Requests whose spans the memory exporter keeps
+TRACE_MEMORY_REQUESTS = int(os.getenv("TRACE_MEMORY_REQUESTS") or 200)
+
+REQUEST_ID_HEADER = "x-request-id"
+# Scrape endpoints polled every few seconds and not worth a request ID or latency metric
+# (other childless requests are traced but not kept in memory, see MemoryExporter)
+UNTRACED_PATHS = ("/metrics",)
+
+_current_span = contextvars.ContextVar("trace_span", default=None)
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def _new_id(length: int) -> str:
+    return uuid.uuid4().hex[:length]
+
+
+def current_request_id():
+    """ID of the request being handled in this context, or None outside a request."""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: str):
+    """Tie the spans started inside the block (in this context) to `request_id`."""
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+class Span:
+    """
+    One timed operation, shaped like an OpenTelemetry span.
+
+    Spans opened while another is current in the same context become its
+    children; contextvars carry the current span into run_llm threads,
+    LangGraph node executors and animation jobs.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "request_id", "start_time", "end_time",
+                 "attributes", "events", "status", "error", "_tracer", "_started", "_duration_ms")
+
+    def __init__(self, tracer, name: str, parent, attributes: dict):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(32)
+        self.span_id = _new_id(16)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.request_id = _request_id.get()
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.end_time = None
+        self._duration_ms = None
+        self.attributes = attributes
+        self.events = []
+        self.status = "ok"
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "offset_ms": round((time.perf_counter() - self._started) * 1000, 3), "attributes": attributes})
+
+    def record_error(self, error):
+        """Mark the span failed; `error` is an exception or a message."""
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    @property
+    def duration_ms(self) -> float:
+        if self._duration_ms is None:
+            return round((time.perf_counter() - self._started) * 1000, 3)
+        return self._duration_ms
+
+    def end(self):
+        if self._duration_ms is not None:
+            return
+        self._duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        self.end_time = self.start_time + self._duration_ms / 1000
+        self._tracer.export(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "request_id": self.request_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class NoopSpan:
+    """Stand-in returned while tracing is disabled"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class MemoryExporter:
+    """
+    Keeps the spans of the most recent requests for GET /traces.
+
+    Children finish before their root, so a GET whose root span arrives first
+    did no traced work (job polling, health checks, /traces itself); those are
+    dropped unless they failed, so polling cannot push real requests out of
+    the buffer. Other methods are kept: a job submission's spans finish after
+    its response.
+    """
+
+    def __init__(self, max_requests: int):
+        self.max_requests = max_requests
+        self._requests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        key = span.request_id or span.trace_id
+        with self._lock:
+            spans = self._requests.get(key)
+            if spans is None:
+                if span.parent_id is None and span.attributes.get("http.method") == "GET" and span.status != "error":
+                    return
+                spans = self._requests[key] = []
+                while len(self._requests) > self.max_requests:
+                    self._requests.popitem(last=False)
+            spans.append(span.to_dict())
+
+    def spans_for(self, request_id: str):
+        with self._lock:
+            return sorted(self._requests.get(request_id, []), key=lambda span: span["start_time"])
+
+    def recent(self):
+        with self._lock:
+            requests = list(self._requests.items())
+        summaries = []
+        for request_id, spans in reversed(requests):
+            root = min(spans, key=lambda span: span["start_time"])
+            end = max(span["end_time"] for span in spans)
+            summaries.append({
+                "request_id": request_id,
+                "root": root["name"],
+                "start_time": root["start_time"],
+                "duration_ms": round((end - root["start_time"]) * 1000, 3),
+                "spans": len(spans),
+                "errors": sum(span["status"] == "error" for span in spans),
+            })
+        return summaries
+
+
+class JsonlExporter:
+    """Appends each finished span to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class LogExporter:
+    """Logs each finished span on one line."""
+
+    def export(self, span: Span):
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        logger.info(f"span {span.name} {span.duration_ms:.1f}ms {span.status} request={span.request_id} {attributes}")
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporters."""
+
+    def __init__(self, exporters):
+        self.exporters = exporters
+        self.memory = next((exporter for exporter in exporters if isinstance(exporter, MemoryExporter)), None)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def start_span(self, name: str, **attributes):
+        """
+        Start a span under the current one without making it current.
+
+        For work that yields (streams, generators), where the span cannot be
+        entered and exited in the same context; call end() when done.
+        """
+        if not self.exporters:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Run the block in a span that is current (the parent of new spans) until it exits."""
+        if not self.exporters:
+            yield NOOP_SPAN
+            return
+        span = Span(self, name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def add_exporter(self, exporter):
+        """Also send finished spans to `exporter`; enables tracing if it was off."""
+        self.exporters.append(exporter)
+
+    def export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Span export failed in {type(exporter).__name__}: {str(e)}")
+
+
+def create_tracer() -> Tracer:
+    """Build the Tracer from the TRACE_* environment settings."""
+    exporters = []
+    for name in TRACE_EXPORTERS:
+        if name == "memory":
+            exporters.append(MemoryExporter(TRACE_MEMORY_REQUESTS))
+        elif name == "jsonl":
+            exporters.append(JsonlExporter(TRACE_EXPORT_PATH))
+        elif name == "log":
+            exporters.append(LogExporter())
+        elif name not in ("off", "none", "false"):
+            logger.warning(f"Unknown trace exporter '{name}' ignored")
+    return Tracer(exporters)
+
+
+tracer = create_tracer()
+
+
+def span(name: str, **attributes):
+    """Context manager running the block in a span on the shared tracer."""
+    return tracer.span(name, **attributes)
+
+
+def start_span(name: str, **attributes):
+    """Start a span on the shared tracer that the caller ends explicitly."""
+    return tracer.start_span(name, **attributes)
+
+
+def current_span():
+    """The span current in this context, for adding events; NOOP_SPAN outside any span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced_node(name: str, func):
+    """
+    Wrap a LangGraph node function in a span named after the node.
+
+    The wrapper keeps the node's signature, so LangGraph still passes the
+    RunnableConfig to nodes that take one. A node that reports failure by
+    returning stage "error" marks its span failed.
+    """
+    @functools.wraps(func)
+    def node(*args, **kwargs):
+        with span(f"node.{name}", **{"graph.node": name}) as node_span:
+            result = func(*args, **kwargs)
+            if isinstance(result, dict):
+                node_span.set_attribute("graph.next_stage", result.get("stage"))
+                if result.get("stage") == "error":
+                    node_span.record_error(result.get("error") or "node failed")
+            return result
+    return node
+
+
+def _route_template(scope):
+    """
+    The matched route's path template (e.g. /ai-animation/jobs/{job_id}), set by
+    the router on the scope; mounted apps such as /media report their mount path.
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    return scope.get("root_path") or None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware giving every HTTP request an ID and a root span.
+
+    The ID comes from the X-Request-ID header when the client sends one and is
+    echoed back in the response. The span covers the whole response, including
+    streamed bodies, so a streaming request's span ends with its last event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")[:64] or _new_id(16)
+        status = {}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))]}
+            await send(message)
+
+        with request_context(request_id):
+            with span(f"{scope['method']} {scope['path']}", **{"http.method": scope["method"], "http.target": scope["path"]}) as request_span:
+                await self.app(scope, receive, send_with_request_id)
+                request_span.set_attributes(**{"http.route": _route_template(scope), "http.status_code": status.get("code")})
+                if status.get("code", 500) >= 500:
+                    request_span.record_error(f"HTTP {status.get('code')}")
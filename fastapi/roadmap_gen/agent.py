@@ -1,13 +1,19 @@
 import os
-import re
 import json
 import logging
 import uuid
-from typing import Dict, Any, Generator
+from typing import Dict, Any, AsyncGenerator, Generator
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import RunnableConfig
+from core.result_cache import create_result_cache, make_cache_key, normalize_prompt
+from core.tolerant_json import parse_tolerant_json, JSONParseError
+from core.llm_clients import get_chat_model
+from core.tracing import traced_node
+from core.metrics import json_fallbacks
+from core.structured_output import LLM_STRUCTURED_OUTPUT, with_response_schema, invoke_structured
+from .schemas import CareerAnalysis, RoadmapStructure
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,8 +22,31 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Per-stage memoization shared across instances (and processes with the SQLite backend)
+roadmap_stage_cache = create_result_cache("roadmap_stages")
+
 class RoadmapGenerationSystem:
-    def __init__(self):
+    # Workflow nodes, in execution order
+    NODE_NAMES = ("analyze_career", "generate_roadmap", "generate_description", "finalize_roadmap")
+    
+    # Nodes producing free text whose tokens are forwarded in async token streaming
+    TOKEN_STREAM_NODES = ("generate_description",)
+    
+    PROGRESS_MAPPING = {
+        "starting": 0,
+        "career_analyzed": 25,
+        "roadmap_generated": 50,
+        "description_generated": 75,
+        "roadmap_complete": 100,
+        "error": -1
+    }
+    
+    MODEL_NAME = "gemini-2.0-flash"
+    
+    # Bump whenever a stage prompt changes so stale memoized stages are not served
+    PROMPT_TEMPLATE_VERSION = "1"
+    
+    def __init__(self, stage_cache=None):
         """Initialize the Roadmap Generation System with LangGraph"""
         
         # Set up the API key
@@ -26,18 +55,34 @@ class RoadmapGenerationSystem:
             raise ValueError("GOOGLE_GENERATIVE_AI_API_KEY environment variable is not set")
         
         # Initialize LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=api_key,
-            temperature=0.3 
-        )
+        self.llm = get_chat_model("roadmap", api_key, self.MODEL_NAME, temperature=0.3)
+        
+        # Schema-constrained variants for the JSON stages (None: parse JSON from free text)
+        self.analysis_llm = with_response_schema(self.llm, CareerAnalysis) if LLM_STRUCTURED_OUTPUT else None
+        self.roadmap_llm = with_response_schema(self.llm, RoadmapStructure) if LLM_STRUCTURED_OUTPUT else None
+        
+        self.stage_cache = stage_cache if stage_cache is not None else roadmap_stage_cache
 
+        # Compile the workflow once; requests reuse the compiled graph
+        self.workflow = self.build_graph()
+        
         logger.info("Roadmap Generation System initialized")
     
-    def _analyze_career_path(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_career_path(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """First stage: Analyze the career path requirements"""
         try:
             career_path = state["career_path"]
+            
+            cache_key = self._stage_cache_key("analyze_career", career_path)
+            cached_analysis = self.stage_cache.get(cache_key)
+            if cached_analysis is not None:
+                logger.info(f"Using memoized career analysis for: {career_path}")
+                return {
+                    **state,
+                    "analysis": cached_analysis,
+                    "stage": "career_analyzed"
+                }
+            
             logger.info(f"Analyzing career path: {career_path}")
             
             analysis_prompt = ChatPromptTemplate.from_template(
@@ -95,11 +140,20 @@ class RoadmapGenerationSystem:
                 """
             )
             
-            chain = analysis_prompt | self.llm
-            response = chain.invoke({"career_path": career_path})
+            analysis = None
+            if self.analysis_llm is not None:
+                analysis = invoke_structured(analysis_prompt | self.analysis_llm, {"career_path": career_path}, config)
             
-            # Extract JSON from response
-            analysis = self._extract_json(response.content)
+            if analysis is None:
+                chain = analysis_prompt | self.llm
+                response = chain.invoke({"career_path": career_path}, config=config)
+                
+                # Extract JSON from response
+                analysis = self._extract_json(response.content)
+            
+            # Never memoize the fallback structure returned for unparseable responses
+            if analysis != self._get_default_structure():
+                self.stage_cache.set(cache_key, analysis)
             
             return {
                 **state,
@@ -115,12 +169,22 @@ class RoadmapGenerationSystem:
                 "stage": "error"
             }
     
-    def _generate_roadmap_structure(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_roadmap_structure(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """Second stage: Generate detailed roadmap structure"""
         try:
             analysis = state["analysis"]
             career_path = state["career_path"]
             
+            cache_key = self._stage_cache_key("generate_roadmap", career_path, analysis)
+            cached_structure = self.stage_cache.get(cache_key)
+            if cached_structure is not None:
+                logger.info(f"Using memoized roadmap structure for: {career_path}")
+                return {
+                    **state,
+                    "roadmap_structure": cached_structure,
+                    "stage": "roadmap_generated"
+                }
+            
             logger.info("Generating roadmap structure")
             
             roadmap_prompt = ChatPromptTemplate.from_template(
@@ -249,16 +313,25 @@ class RoadmapGenerationSystem:
                 """
             )
             
-            chain = roadmap_prompt | self.llm
-            response = chain.invoke({
+            inputs = {
                 "career_path": career_path,
                 "analysis": json.dumps(analysis, indent=2)
-            })
+            }
+            roadmap_structure = None
+            if self.roadmap_llm is not None:
+                roadmap_structure = invoke_structured(roadmap_prompt | self.roadmap_llm, inputs, config)
+            
+            if roadmap_structure is None:
+                chain = roadmap_prompt | self.llm
+                response = chain.invoke(inputs, config=config)
+                roadmap_structure = self._extract_json(response.content)
             
-            # Extract and validate roadmap structure
-            roadmap_structure = self._extract_json(response.content)
+            # Validate roadmap structure
             roadmap_structure = self._validate_roadmap_structure(roadmap_structure)
             
+            if roadmap_structure["nodes"]:
+                self.stage_cache.set(cache_key, roadmap_structure)
+            
             return {
                 **state,
                 "roadmap_structure": roadmap_structure,
@@ -273,12 +346,23 @@ class RoadmapGenerationSystem:
                 "stage": "error"
             }
     
-    def _generate_detailed_description(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_detailed_description(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """Third stage: Generate detailed career description and guidance"""
         try:
             analysis = state["analysis"]
             roadmap_structure = state["roadmap_structure"]
             career_path = state["career_path"]
+            roadmap_summary = self._create_roadmap_summary(roadmap_structure)
+            
+            cache_key = self._stage_cache_key("generate_description", career_path, analysis, roadmap_summary)
+            cached_description = self.stage_cache.get(cache_key)
+            if cached_description is not None:
+                logger.info(f"Using memoized career description for: {career_path}")
+                return {
+                    **state,
+                    "detailed_description": cached_description,
+                    "stage": "description_generated"
+                }
             
             logger.info("Generating detailed description")
             
@@ -336,11 +420,14 @@ class RoadmapGenerationSystem:
             response = chain.invoke({
                 "career_path": career_path,
                 "analysis": json.dumps(analysis, indent=2),
-                "roadmap_summary": self._create_roadmap_summary(roadmap_structure)
-            })
+                "roadmap_summary": roadmap_summary
+            }, config=config)
             
             detailed_description = response.content.strip()
             
+            if detailed_description:
+                self.stage_cache.set(cache_key, detailed_description)
+            
             return {
                 **state,
                 "detailed_description": detailed_description,
@@ -388,6 +475,16 @@ class RoadmapGenerationSystem:
                 "stage": "error"
             }
     
+    def _stage_cache_key(self, stage: str, career_path: str, *inputs: Any) -> str:
+        """Memoization key for a single workflow stage and the inputs it depends on"""
+        return make_cache_key(
+            stage,
+            normalize_prompt(career_path),
+            self.MODEL_NAME,
+            self.PROMPT_TEMPLATE_VERSION,
+            *inputs
+        )
+    
     def _should_continue_or_end(self, state: Dict[str, Any]) -> str:
         """Decision node: determine next step based on current stage"""
         stage = state.get("stage", "")
@@ -407,287 +504,21 @@ class RoadmapGenerationSystem:
     
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """Extract JSON from LLM response text"""
+        logger.info(f"Raw LLM response text: {text[:500]}...")  # Log first 500 chars
         try:
-            logger.info(f"Raw LLM response text: {text[:500]}...")  # Log first 500 chars
-            
-            json_str = ""
-            
-            # Try finding ```json blocks first
-            if "```json" in text:
-                match = text.split("```json", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_str = match[1].split("```", 1)[0].strip()
-                    logger.info(f"Found JSON in ```json block: {json_str[:200]}...")
-            # Fallback to finding plain ``` blocks
-            elif "```" in text:
-                match = text.split("```", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_str = match[1].split("```", 1)[0].strip()
-                    logger.info(f"Found JSON in ``` block: {json_str[:200]}...")
-            else:
-                # Try to find JSON-like structure
-                start = text.find('{')
-                if start != -1:
-                    # Find the matching closing brace
-                    brace_count = 0
-                    end = start
-                    for i, char in enumerate(text[start:], start):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end = i + 1
-                                break
-                    json_str = text[start:end].strip()
-                    logger.info(f"Found JSON structure: {json_str[:200]}...")
-                else:
-                    json_str = text
-                    logger.info(f"No JSON structure found, using full text: {json_str[:200]}...")
-            
-            # Clean up common issues with JSON
-            json_str = self._clean_json_string(json_str)
-            logger.info(f"Cleaned JSON string: {json_str[:200]}...")
-            
-            # Try parsing the cleaned JSON
-            try:
-                parsed_json = json.loads(json_str)
-                logger.info("Successfully parsed JSON")
-                return parsed_json
-            except json.JSONDecodeError as e:
-                logger.warning(f"First JSON parse attempt failed: {str(e)}")
-                # Try a more aggressive cleaning approach
-                aggressively_cleaned = self._aggressive_json_clean(json_str)
-                logger.info(f"Aggressively cleaned JSON: {aggressively_cleaned[:200]}...")
-                
-                try:
-                    parsed_json = json.loads(aggressively_cleaned)
-                    logger.info("JSON parsing successful after aggressive cleaning")
-                    return parsed_json
-                except json.JSONDecodeError as e2:
-                    logger.error(f"JSON parsing failed even after aggressive cleaning: {str(e2)}")
-                    # Try one more time with final rescue
-                    final_attempt = self._final_json_rescue(aggressively_cleaned)
-                    try:
-                        parsed_json = json.loads(final_attempt)
-                        logger.info("JSON parsing successful after final rescue attempt")
-                        return parsed_json
-                    except json.JSONDecodeError as e3:
-                        logger.error(f"Final JSON rescue attempt failed: {str(e3)}")
-                        logger.error(f"Problematic JSON string: {final_attempt}")
-                        raise e3
-                logger.info(f"Aggressively cleaned JSON: {json_str[:200]}...")
-                parsed_json = json.loads(json_str)
-                logger.info("Successfully parsed JSON after aggressive cleaning")
-                return parsed_json
-            
-        except json.JSONDecodeError as e:
+            parsed_json = parse_tolerant_json(text)
+        except JSONParseError as e:
             logger.error(f"JSON parsing failed: {str(e)}")
-            logger.error(f"Problematic JSON string: {json_str}")
-            logger.warning("Failed to parse JSON, returning default structure")
-            return self._get_default_structure()
-        except Exception as e:
-            logger.error(f"Unexpected error in JSON extraction: {str(e)}")
             logger.error(f"Original text: {text}")
+            json_fallbacks.inc(service="roadmap")
             return self._get_default_structure()
-    
-    def _clean_json_string(self, json_str: str) -> str:
-        """Clean JSON string to fix common formatting issues"""
-        if not json_str:
-            return json_str
-        
-        # Remove any leading/trailing whitespace
-        json_str = json_str.strip()
-        
-        # Remove any text before the first {
-        start_idx = json_str.find('{')
-        if start_idx > 0:
-            json_str = json_str[start_idx:]
-        
-        # Remove any text after the last }
-        end_idx = json_str.rfind('}')
-        if end_idx != -1 and end_idx < len(json_str) - 1:
-            json_str = json_str[:end_idx + 1]
-        
-        # Fix mathematical expressions in JSON values (e.g., "x": -650 + 650)
-        def evaluate_math_expression(match):
-            try:
-                expression = match.group(1)
-                # Only evaluate simple arithmetic expressions with numbers and basic operators
-                if re.match(r'^[-+*/\s\d.()]+$', expression):
-                    result = eval(expression)
-                    return f'"{match.group(0).split(":")[0]}": {result}'
-                else:
-                    return match.group(0)
-            except:
-                return match.group(0)
-        
-        # Fix arithmetic expressions like "x": -650 + 650
-        json_str = re.sub(r'"([^"]+)":\s*([-+*/\s\d.()]+(?:[+\-*/]\s*[-+*/\s\d.()]+)+)', evaluate_math_expression, json_str)
-        
-        # Fix trailing commas before closing brackets/braces
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # Fix missing commas between array/object elements
-        json_str = re.sub(r'}\s*{', r'},{', json_str)
-        json_str = re.sub(r']\s*\[', r'],[', json_str)
-        
-        # Fix problematic escape sequences and apostrophes
-        # Fix invalid escape sequences like \' that should be just '
-        json_str = re.sub(r'\\\'', "'", json_str)
-        
-        # Fix quotes in strings - handle contractions and apostrophes properly
-        # Replace unescaped single quotes within double-quoted strings
-        def fix_quotes_in_string(match):
-            content = match.group(1)
-            # Replace single quotes with escaped single quotes only if they're not already escaped
-            content = re.sub(r"(?<!\\)'", "\\'", content)
-            return '"' + content + '"'
-        
-        json_str = re.sub(r'"([^"]*)"', fix_quotes_in_string, json_str)
-        
-        # Fix unquoted property names (simple case)
-        json_str = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_str)
-        
-        # Fix common number formatting issues
-        # Fix numbers that might have spaces around operators
-        json_str = re.sub(r'(\d+)\s*\+\s*(\d+)', r'\1+\2', json_str)
-        json_str = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1-\2', json_str)
-        json_str = re.sub(r'(\d+)\s*\*\s*(\d+)', r'\1*\2', json_str)
-        json_str = re.sub(r'(\d+)\s*/\s*(\d+)', r'\1/\2', json_str)
-        
-        # Remove any non-JSON characters at the beginning or end
-        json_str = re.sub(r'^[^{]*', '', json_str)
-        json_str = re.sub(r'[^}]*$', '', json_str)
-        
-        return json_str
-    
-    def _aggressive_json_clean(self, json_str: str) -> str:
-        """More aggressive JSON cleaning for problematic responses"""
-        if not json_str:
-            return json_str
-        
-        # Try to extract only the core JSON structure
-        # Find the outermost braces
-        first_brace = json_str.find('{')
-        if first_brace == -1:
-            return json_str
-        
-        # Count braces to find the matching closing brace
-        brace_count = 0
-        last_brace = first_brace
-        
-        for i in range(first_brace, len(json_str)):
-            if json_str[i] == '{':
-                brace_count += 1
-            elif json_str[i] == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    last_brace = i
-                    break
-        
-        json_str = json_str[first_brace:last_brace + 1]
-        
-        # Replace problematic characters
-        json_str = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        
-        # Fix multiple spaces
-        json_str = re.sub(r'\s+', ' ', json_str)
-        
-        # Fix arithmetic expressions in values (most critical fix)
-        def fix_arithmetic(match):
-            try:
-                key = match.group(1)
-                expression = match.group(2).strip()
-                
-                # Evaluate simple arithmetic expressions
-                if re.match(r'^[-+]?\d+(?:\s*[+\-*\/]\s*[-+]?\d+)*$', expression):
-                    result = eval(expression)
-                    return f'"{key}": {result}'
-                else:
-                    return match.group(0)
-            except:
-                return match.group(0)
-        
-        # Fix expressions like "x": -650 + 650, "y": 500 + 100
-        json_str = re.sub(r'"([^"]+)":\s*([-+]?\d+(?:\s*[+\-*\/]\s*[-+]?\d+)+)', fix_arithmetic, json_str)
-        
-        # Fix common escape sequence issues
-        # Remove invalid escape sequences like \' and replace with '
-        json_str = re.sub(r'\\\'', "'", json_str)
-        
-        # Fix other common invalid escapes (but preserve valid ones)
-        json_str = re.sub(r'\\(?!["\\/bfnrtu])', '', json_str)
-        
-        # Try to fix common LLM JSON issues
-        # Fix boolean values
-        json_str = re.sub(r'\b(true|false|null)\b', lambda m: m.group(1).lower(), json_str, flags=re.IGNORECASE)
-        
-        # Fix numbers that might have been quoted unnecessarily
-        json_str = re.sub(r'"\s*(\d+(?:\.\d+)?)\s*"(?=\s*[,}\]])', r'\1', json_str)
-        
-        # Fix trailing commas more aggressively
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # Fix missing quotes around string values
-        json_str = re.sub(r':\s*([a-zA-Z][a-zA-Z0-9_\s]*[a-zA-Z0-9])\s*([,}\]])', r': "\1"\2', json_str)
-        
-        # Fix object/array separation issues
-        json_str = re.sub(r'}\s*{', r'},{', json_str)
-        json_str = re.sub(r']\s*\[', r'],[', json_str)
-        
-        return json_str
-    
-    def _final_json_rescue(self, json_str: str) -> str:
-        """Final attempt to rescue malformed JSON"""
-        if not json_str:
-            return json_str
-        
-        # Remove all non-essential whitespace
-        json_str = re.sub(r'\s+', ' ', json_str).strip()
-        
-        # Fix arithmetic expressions more aggressively
-        def fix_all_arithmetic(match):
-            try:
-                full_match = match.group(0)
-                key_part = match.group(1)
-                value_part = match.group(2)
-                
-                # Try to evaluate any arithmetic in the value
-                if re.search(r'[-+*/]', value_part):
-                    # Replace common arithmetic patterns
-                    value_part = re.sub(r'(-?\d+)\s*\+\s*(-?\d+)', lambda m: str(int(m.group(1)) + int(m.group(2))), value_part)
-                    value_part = re.sub(r'(-?\d+)\s*-\s*(-?\d+)', lambda m: str(int(m.group(1)) - int(m.group(2))), value_part)
-                    value_part = re.sub(r'(-?\d+)\s*\*\s*(-?\d+)', lambda m: str(int(m.group(1)) * int(m.group(2))), value_part)
-                    
-                    # If still has arithmetic, try eval as last resort
-                    if re.search(r'[-+*/]', value_part):
-                        try:
-                            value_part = str(eval(value_part))
-                        except:
-                            pass
-                
-                return f'"{key_part}": {value_part}'
-            except:
-                return match.group(0)
-        
-        # More comprehensive arithmetic fix
-        json_str = re.sub(r'"([^"]+)":\s*([-+]?\d+(?:\s*[+\-*/]\s*[-+]?\d+)*)', fix_all_arithmetic, json_str)
-        
-        # Fix common delimiter issues
-        json_str = re.sub(r',\s*}', '}', json_str)
-        json_str = re.sub(r',\s*]', ']', json_str)
-        
-        # Ensure all string values are quoted
-        json_str = re.sub(r':\s*([^",\[\]{}\s]+)(?=\s*[,}\]])', r': "\1"', json_str)
-        
-        # Fix boolean and null values that got quoted
-        json_str = re.sub(r':\s*"(true|false|null)"', r': \1', json_str)
-        
-        # Fix number values that got quoted
-        json_str = re.sub(r':\s*"(-?\d+(?:\.\d+)?)"(?=\s*[,}\]])', r': \1', json_str)
-        
-        return json_str
+
+        if not isinstance(parsed_json, dict):
+            logger.warning("LLM response JSON is not an object, returning default structure")
+            json_fallbacks.inc(service="roadmap")
+            return self._get_default_structure()
+        logger.info("Successfully parsed JSON")
+        return parsed_json
     
     def _get_default_structure(self) -> Dict[str, Any]:
         """Return default structure when JSON parsing fails"""
@@ -952,10 +783,10 @@ class RoadmapGenerationSystem:
         workflow = StateGraph(dict)
         
         # Add nodes for the workflow
-        workflow.add_node("analyze_career", self._analyze_career_path)
-        workflow.add_node("generate_roadmap", self._generate_roadmap_structure)
-        workflow.add_node("generate_description", self._generate_detailed_description)
-        workflow.add_node("finalize_roadmap", self._finalize_roadmap)
+        workflow.add_node("analyze_career", traced_node("analyze_career", self._analyze_career_path))
+        workflow.add_node("generate_roadmap", traced_node("generate_roadmap", self._generate_roadmap_structure))
+        workflow.add_node("generate_description", traced_node("generate_description", self._generate_detailed_description))
+        workflow.add_node("finalize_roadmap", traced_node("finalize_roadmap", self._finalize_roadmap))
         
         # Set entry point
         workflow.set_entry_point("analyze_career")
@@ -1001,11 +832,45 @@ class RoadmapGenerationSystem:
         compiled_graph = workflow.compile()
         return compiled_graph
     
+    def reload_graph(self, graph=None):
+        """
+        Hot-swap the compiled workflow used by new requests.
+        
+        Args:
+            graph: A compiled graph to install, or None to rebuild from build_graph()
+        
+        Returns:
+            The previously installed compiled graph
+        """
+        previous = self.workflow
+        self.workflow = graph if graph is not None else self.build_graph()
+        logger.info("Reloaded roadmap generation workflow graph")
+        return previous
+    
+    def _build_progress_update(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a workflow state into a streaming progress update"""
+        # Determine progress based on stage
+        stage = current_state.get("stage", "starting")
+        progress = self.PROGRESS_MAPPING.get(stage, 0)
+        
+        return {
+            "status": "error" if stage == "error" else "in_progress" if progress < 100 else "complete",
+            "progress": progress,
+            "stage": stage,
+            "stage_description": self._get_stage_description(stage),
+            "error": current_state.get("error"),
+            "analysis": current_state.get("analysis"),
+            "roadmap_structure": current_state.get("roadmap_structure"),
+            "detailed_description": current_state.get("detailed_description"),
+            "roadmap_id": current_state.get("roadmap_id"),
+            "metadata": current_state.get("metadata")
+        }
+    
     def create_roadmap_stream(self, career_path: str) -> Generator[Dict[str, Any], None, None]:
         """Generate roadmap with streaming progress updates"""
         logger.info(f"Starting roadmap generation for: {career_path}")
         
-        workflow = self.build_graph()
+        workflow = self.workflow
         
         initial_state = {
             "career_path": career_path,
@@ -1019,32 +884,8 @@ class RoadmapGenerationSystem:
                 last_node = list(state_update.keys())[-1]
                 current_state = state_update[last_node]
                 
-                # Determine progress based on stage
-                stage = current_state.get("stage", "starting")
-                progress_mapping = {
-                    "starting": 0,
-                    "career_analyzed": 25,
-                    "roadmap_generated": 50,
-                    "description_generated": 75,
-                    "roadmap_complete": 100,
-                    "error": -1
-                }
-                
-                progress = progress_mapping.get(stage, 0)
-                
                 # Yield progress update
-                yield {
-                    "status": "error" if stage == "error" else "in_progress" if progress < 100 else "complete",
-                    "progress": progress,
-                    "stage": stage,
-                    "stage_description": self._get_stage_description(stage),
-                    "error": current_state.get("error"),
-                    "analysis": current_state.get("analysis"),
-                    "roadmap_structure": current_state.get("roadmap_structure"),
-                    "detailed_description": current_state.get("detailed_description"),
-                    "roadmap_id": current_state.get("roadmap_id"),
-                    "metadata": current_state.get("metadata")
-                }
+                yield self._build_progress_update(current_state)
                 
         except Exception as e:
             logger.error(f"Workflow stream failed: {str(e)}")
@@ -1056,6 +897,61 @@ class RoadmapGenerationSystem:
                 "stage_description": "Error occurred during processing"
             }
     
+    async def acreate_roadmap_stream(self, career_path: str, stream_tokens: bool = False) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Generate roadmap asynchronously with streaming progress updates.
+        
+        Built on LangGraph's astream_events: a progress update is yielded as soon
+        as each node finishes and, when stream_tokens is set, LLM tokens from the
+        detailed description stage are forwarded as they arrive.
+        """
+        logger.info(f"Starting async roadmap generation for: {career_path}")
+        
+        workflow = self.workflow
+        
+        initial_state = {
+            "career_path": career_path,
+            "stage": "starting"
+        }
+        
+        # Send the first event immediately so clients get a byte before the first LLM call returns
+        last_update = self._build_progress_update(initial_state)
+        yield last_update
+        
+        try:
+            async for event in workflow.astream_events(initial_state, {"recursion_limit": 20}, version="v2"):
+                kind = event["event"]
+                node = event.get("metadata", {}).get("langgraph_node")
+                
+                if kind == "on_chat_model_stream":
+                    if not stream_tokens or node not in self.TOKEN_STREAM_NODES:
+                        continue
+                    token = event["data"]["chunk"].content
+                    if token:
+                        yield {
+                            "status": "in_progress",
+                            "progress": last_update["progress"],
+                            "stage": last_update["stage"],
+                            "stage_description": last_update["stage_description"],
+                            "node": node,
+                            "token": token
+                        }
+                
+                elif kind == "on_chain_end" and event["name"] == node and node in self.NODE_NAMES:
+                    # A workflow node finished; its output is the full updated state
+                    last_update = self._build_progress_update(event["data"]["output"])
+                    yield last_update
+                
+        except Exception as e:
+            logger.error(f"Async workflow stream failed: {str(e)}")
+            yield {
+                "status": "error",
+                "progress": -1,
+                "stage": "error",
+                "error": f"Workflow failed: {str(e)}",
+                "stage_description": "Error occurred during processing"
+            }
+    
     def create_roadmap(self, career_path: str) -> Dict[str, Any]:
         """Create roadmap and return final result (non-streaming)"""
         # Get the final state from the stream
@@ -3,8 +3,8 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import json
-import asyncio
 import logging
+from core.execution import run_llm
 from .agent import RoadmapGenerationSystem
 
 # Configure logging
@@ -16,6 +16,34 @@ router = APIRouter(prefix="/roadmap", tags=["Roadmap"])
 # Initialize the roadmap system
 roadmap_system = RoadmapGenerationSystem()
 
+# Career paths advertised by /roadmap/examples (and pre-generated by roadmap_gen.warmup)
+POPULAR_CAREER_PATHS = [
+    "Frontend Developer",
+    "Backend Developer",
+    "Full Stack Developer",
+    "Data Scientist",
+    "Machine Learning Engineer",
+    "DevOps Engineer",
+    "Blockchain Developer",
+    "Mobile App Developer",
+    "UI/UX Designer",
+    "Cybersecurity Specialist",
+    "Cloud Architect",
+    "SQA Engineer",
+    "Product Manager",
+    "AI Engineer",
+    "Game Developer"
+]
+
+CAREER_CATEGORIES = {
+    "Development": ["Frontend Developer", "Backend Developer", "Full Stack Developer"],
+    "Data & AI": ["Data Scientist", "Machine Learning Engineer", "AI Engineer"],
+    "Infrastructure": ["DevOps Engineer", "Cloud Architect", "Cybersecurity Specialist"],
+    "Design": ["UI/UX Designer", "Game Developer"],
+    "Quality": ["SQA Engineer", "Test Automation Engineer"],
+    "Management": ["Product Manager", "Technical Lead"]
+}
+
 class RoadmapRequest(BaseModel):
     career_path: str
 
@@ -28,6 +56,8 @@ class RoadmapResponse(BaseModel):
 
 class StreamingRoadmapRequest(BaseModel):
     career_path: str
+    # Forward LLM tokens from free-text stages as they are generated
+    stream_tokens: bool = False
 
 @router.post("/generate", response_model=RoadmapResponse)
 async def generate_roadmap(request: RoadmapRequest):
@@ -37,7 +67,7 @@ async def generate_roadmap(request: RoadmapRequest):
     
     try:
         logger.info(f"Generating roadmap for: {request.career_path[:100]}...")
-        result = roadmap_system.create_roadmap(request.career_path.strip())
+        result = await run_llm(roadmap_system.create_roadmap, request.career_path.strip())
         
         return RoadmapResponse(
             analysis=result["analysis"],
@@ -60,14 +90,11 @@ async def generate_roadmap_stream(request: StreamingRoadmapRequest):
     async def event_stream():
         try:
             logger.info(f"Starting streaming generation for: {request.career_path[:100]}...")
-            for update in roadmap_system.create_roadmap_stream(request.career_path.strip()):
+            async for update in roadmap_system.acreate_roadmap_stream(request.career_path.strip(), stream_tokens=request.stream_tokens):
                 # Format as Server-Sent Events
                 event_data = json.dumps(update)
                 yield f"data: {event_data}\n\n"
                 
-                # Small delay to prevent overwhelming the client
-                await asyncio.sleep(0.1)
-                
         except Exception as e:
             logger.error(f"Streaming error: {str(e)}")
             error_data = json.dumps({
@@ -148,29 +175,6 @@ async def get_workflow_info():
 async def get_career_examples():
     """Get example career paths that work well with the system"""
     return {
-        "popular_paths": [
-            "Frontend Developer",
-            "Backend Developer",
-            "Full Stack Developer",
-            "Data Scientist",
-            "Machine Learning Engineer",
-            "DevOps Engineer",
-            "Blockchain Developer",
-            "Mobile App Developer",
-            "UI/UX Designer",
-            "Cybersecurity Specialist",
-            "Cloud Architect",
-            "SQA Engineer",
-            "Product Manager",
-            "AI Engineer",
-            "Game Developer"
-        ],
-        "categories": {
-            "Development": ["Frontend Developer", "Backend Developer", "Full Stack Developer"],
-            "Data & AI": ["Data Scientist", "Machine Learning Engineer", "AI Engineer"],
-            "Infrastructure": ["DevOps Engineer", "Cloud Architect", "Cybersecurity Specialist"],
-            "Design": ["UI/UX Designer", "Game Developer"],
-            "Quality": ["SQA Engineer", "Test Automation Engineer"],
-            "Management": ["Product Manager", "Technical Lead"]
-        }
-    }
\ No newline at end of file
+        "popular_paths": POPULAR_CAREER_PATHS,
+        "categories": CAREER_CATEGORIES
+    }
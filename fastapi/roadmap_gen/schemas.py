@@ -0,0 +1,78 @@
+from typing import List
+from pydantic import BaseModel
+
+
+# Response schemas for the JSON stages, mirroring the formats in the stage prompts
+
+class JobMarket(BaseModel):
+    demand: str
+    average_salary: str
+    growth_prospects: str
+
+
+class LearningPhase(BaseModel):
+    phase: str
+    duration: str
+    focus: str
+
+
+class CareerAnalysis(BaseModel):
+    title: str
+    category: str
+    difficulty_level: str
+    estimated_duration: str
+    prerequisites: List[str]
+    core_skills: List[str]
+    tools_technologies: List[str]
+    job_market: JobMarket
+    learning_phases: List[LearningPhase]
+    career_progression: List[str]
+
+
+class Resource(BaseModel):
+    type: str
+    title: str
+    url: str
+    estimated_time: str
+
+
+class Position(BaseModel):
+    x: int
+    y: int
+
+
+class RoadmapNode(BaseModel):
+    id: str
+    title: str
+    description: str
+    type: str
+    duration: str
+    prerequisites: List[str]
+    resources: List[Resource]
+    skills_gained: List[str]
+    projects: List[str]
+    assessment: str
+    position: Position
+
+
+class RoadmapEdge(BaseModel):
+    id: str
+    source: str
+    target: str
+    type: str = "smoothstep"
+    animated: bool = False
+    label: str = ""
+
+
+class RoadmapPhase(BaseModel):
+    name: str
+    nodes: List[str]
+    color: str
+    description: str
+
+
+class RoadmapStructure(BaseModel):
+    roadmap_id: str
+    nodes: List[RoadmapNode]
+    edges: List[RoadmapEdge]
+    phases: List[RoadmapPhase]
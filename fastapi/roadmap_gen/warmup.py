@@ -0,0 +1,109 @@
+"""
+Pre-generate roadmaps for every career path advertised by /roadmap/examples.
+
+Each workflow stage is memoized in the roadmap stage cache, so running this at
+deploy time means the popular paths are served without any LLM calls. Use the
+SQLite result cache backend (RESULT_CACHE_BACKEND=sqlite) with a
+RESULT_CACHE_PATH the web process can read, otherwise the warmed entries are
+lost when this command exits.
+
+LLM rate limits are enforced per process, so this command does not share the
+web process's quota buckets. It runs at WARMUP_QUOTA_SHARE (default 0.25) of
+LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE to leave the rest of the
+provider quota for the running service, and its calls queue at batch priority.
+
+Run from the fastapi/ directory:
+    python -m roadmap_gen.warmup --concurrency 2
+"""
+import os
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# The rate limiter reads its quota at import, so scale it down before importing the services
+WARMUP_QUOTA_SHARE = float(os.getenv("WARMUP_QUOTA_SHARE") or 0.25)
+os.environ["LLM_REQUESTS_PER_MINUTE"] = str(float(os.getenv("LLM_REQUESTS_PER_MINUTE") or 2000) * WARMUP_QUOTA_SHARE)
+os.environ["LLM_TOKENS_PER_MINUTE"] = str(float(os.getenv("LLM_TOKENS_PER_MINUTE") or 4000000) * WARMUP_QUOTA_SHARE)
+
+from core.rate_limit import llm_priority
+from .route import roadmap_system, POPULAR_CAREER_PATHS, CAREER_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+
+def get_warmup_career_paths():
+    """All career paths from /roadmap/examples, de-duplicated in display order"""
+    career_paths = list(POPULAR_CAREER_PATHS)
+    for paths in CAREER_CATEGORIES.values():
+        career_paths.extend(paths)
+    return list(dict.fromkeys(career_paths))
+
+
+def warm_up_roadmaps(career_paths, concurrency=2):
+    """
+    Generate a roadmap for each career path so every stage lands in the cache.
+
+    Args:
+        career_paths (list): Career paths to pre-generate
+        concurrency (int): Number of roadmaps generated in parallel
+
+    Returns:
+        dict: Mapping of career path to True (complete) or False (failed)
+    """
+    results = {}
+
+    def warm(career_path):
+        started = time.perf_counter()
+        # Warm-up calls yield LLM quota to anything else this process serves
+        with llm_priority("batch"):
+            result = roadmap_system.create_roadmap(career_path)
+        elapsed = time.perf_counter() - started
+        succeeded = bool(result.get("roadmap_id"))
+        logger.info(f"{'Warmed' if succeeded else 'Failed to warm'} '{career_path}' in {elapsed:.1f}s")
+        return succeeded
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(warm, path): path for path in career_paths}
+        for future in as_completed(futures):
+            career_path = futures[future]
+            try:
+                results[career_path] = future.result()
+            except Exception as e:
+                logger.error(f"Error warming '{career_path}': {str(e)}")
+                results[career_path] = False
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=2, help="Roadmaps generated in parallel")
+    parser.add_argument("career_paths", nargs="*", help="Career paths to warm (defaults to /roadmap/examples)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if (os.getenv("RESULT_CACHE_BACKEND") or "memory").lower() == "memory":
+        logger.warning("RESULT_CACHE_BACKEND is 'memory'; warmed stages will not outlive this process")
+
+    career_paths = args.career_paths or get_warmup_career_paths()
+    logger.info(f"Warming roadmap stage cache for {len(career_paths)} career paths "
+                f"at {WARMUP_QUOTA_SHARE:.0%} of the LLM quota")
+
+    results = warm_up_roadmaps(career_paths, concurrency=args.concurrency)
+    failed = [path for path, succeeded in results.items() if not succeeded]
+
+    logger.info(f"Warm-up complete: {len(results) - len(failed)}/{len(results)} succeeded")
+    logger.info(f"Stage cache: {roadmap_system.stage_cache.stats()}")
+    if failed:
+        logger.warning(f"Failed career paths: {', '.join(failed)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,18 @@ import logging
 import uuid
 import base64
 import zlib
-from typing import Dict, Any, Generator
+from typing import Dict, Any, AsyncGenerator, Generator
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import RunnableConfig
+from core.result_cache import create_result_cache, make_cache_key, normalize_prompt
+from core.tolerant_json import parse_tolerant_json, JSONParseError
+from core.llm_clients import get_chat_model
+from core.tracing import traced_node
+from core.metrics import json_fallbacks
+from core.structured_output import LLM_STRUCTURED_OUTPUT, with_response_schema, invoke_structured
+from .schemas import RequirementsAnalysis
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +25,11 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Shared across instances so /service-status reports the router's hit/miss counters
+system_design_cache = create_result_cache("system_design")
+
+PLANTUML_SERVER_URL = "https://www.plantuml.com/plantuml/img/"
+
 
 def encode_plantuml(plantuml_text: str) -> str:
     """
@@ -56,7 +68,30 @@ def encode_plantuml(plantuml_text: str) -> str:
 
 
 class SystemDesignGenerationSystem:
-    def __init__(self):
+    # Workflow nodes, in execution order
+    NODE_NAMES = ("analyze_requirements", "generate_plantuml", "generate_explanation", "create_diagram_url")
+    
+    # Nodes producing free text whose tokens are forwarded in async token streaming
+    TOKEN_STREAM_NODES = ("generate_explanation",)
+    
+    PROGRESS_MAPPING = {
+        "starting": 0,
+        "requirements_analyzed": 25,
+        "plantuml_generated": 50,
+        "explanation_generated": 75,
+        "diagram_complete": 100,
+        "error": -1
+    }
+    
+    MODEL_NAME = "gemini-2.0-flash"
+    
+    # Bump whenever a stage prompt changes so stale cached results are not served
+    PROMPT_TEMPLATE_VERSION = "1"
+    
+    # Results stored in the cache; diagram_url and diagram_id are rebuilt on a hit
+    CACHED_FIELDS = ("analysis", "plantuml_code", "explanation", "d3_components")
+    
+    def __init__(self, result_cache=None):
         """Initialize the System Design Generation System with LangGraph"""
         
         # Set up the API key
@@ -65,15 +100,19 @@ class SystemDesignGenerationSystem:
             raise ValueError("GOOGLE_GENERATIVE_AI_API_KEY environment variable is not set")
         
         # Initialize LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=api_key,
-            temperature=0.7
-        )
+        self.llm = get_chat_model("system_design", api_key, self.MODEL_NAME, temperature=0.7)
+        
+        # Schema-constrained variant for the analysis stage (None: parse JSON from free text)
+        self.analysis_llm = with_response_schema(self.llm, RequirementsAnalysis) if LLM_STRUCTURED_OUTPUT else None
+        
+        self.result_cache = result_cache if result_cache is not None else system_design_cache
+        
+        # Compile the workflow once; requests reuse the compiled graph
+        self.workflow = self.build_graph()
         
         logger.info("System Design Generation System initialized")
     
-    def _analyze_requirements(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_requirements(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """First stage: Analyze the system design requirements"""
         try:
             prompt = state["user_prompt"]
@@ -101,15 +140,22 @@ class SystemDesignGenerationSystem:
                 """
             )
             
-            chain = analysis_prompt | self.llm
-            response = chain.invoke({"prompt": prompt})
+            analysis = None
+            if self.analysis_llm is not None:
+                analysis = invoke_structured(analysis_prompt | self.analysis_llm, {"prompt": prompt}, config)
             
-            # Extract JSON from response
-            analysis = self._extract_json(response.content)
+            if analysis is None:
+                chain = analysis_prompt | self.llm
+                response = chain.invoke({"prompt": prompt}, config=config)
+                
+                # Extract JSON from response
+                analysis = self._extract_json(response.content)
             
             return {
                 **state,
                 "analysis": analysis,
+                # A design built on the fallback analysis is served but never cached
+                "analysis_fallback": analysis == self._get_default_analysis(),
                 "stage": "requirements_analyzed"
             }
             
@@ -121,7 +167,7 @@ class SystemDesignGenerationSystem:
                 "stage": "error"
             }
     
-    def _generate_plantuml(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_plantuml(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """Second stage: Generate PlantUML code based on analysis"""
         try:
             analysis = state["analysis"]
@@ -227,7 +273,7 @@ class SystemDesignGenerationSystem:
                 "key_components": ", ".join(analysis.get("key_components", [])),
                 "patterns": ", ".join(analysis.get("patterns", [])),
                 "data_flow": " -> ".join(analysis.get("data_flow", []))
-            })
+            }, config=config)
             
             # Extract and clean PlantUML code
             plantuml_code = self._extract_plantuml_code(response.content)
@@ -246,7 +292,7 @@ class SystemDesignGenerationSystem:
                 "stage": "error"
             }
     
-    def _generate_explanation(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_explanation(self, state: Dict[str, Any], config: RunnableConfig = None) -> Dict[str, Any]:
         """Third stage: Generate detailed explanation of the architecture"""
         try:
             analysis = state["analysis"]
@@ -301,7 +347,7 @@ class SystemDesignGenerationSystem:
                 "prompt": prompt,
                 "analysis": json.dumps(analysis, indent=2),
                 "plantuml_code": plantuml_code
-            })
+            }, config=config)
             
             explanation = response.content.strip()
             
@@ -328,7 +374,7 @@ class SystemDesignGenerationSystem:
             
             # Generate PlantUML diagram URL using our custom encoder
             encoded = encode_plantuml(plantuml_code)
-            diagram_url = f"https://www.plantuml.com/plantuml/img/{encoded}"
+            diagram_url = f"{PLANTUML_SERVER_URL}{encoded}"
             
             # Extract components and relationships for D3 visualization
             components = self._extract_d3_components(plantuml_code)
@@ -372,39 +418,29 @@ class SystemDesignGenerationSystem:
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """Extract JSON from LLM response text"""
         try:
-            # Try finding ```json blocks first
-            if "```json" in text:
-                match = text.split("```json", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_str = match[1].split("```", 1)[0].strip()
-            # Fallback to finding plain ``` blocks
-            elif "```" in text:
-                match = text.split("```", 1)
-                if len(match) > 1 and "```" in match[1]:
-                    json_str = match[1].split("```", 1)[0].strip()
-            else:
-                # Try to find JSON-like structure
-                start = text.find('{')
-                if start != -1:
-                    json_str = text[start:]
-                else:
-                    json_str = text
+            parsed_json = parse_tolerant_json(text)
+            if isinstance(parsed_json, dict):
+                return parsed_json
+            raise JSONParseError("LLM response JSON is not an object")
             
-            return json.loads(json_str)
-            
-        except json.JSONDecodeError:
+        except JSONParseError:
             logger.warning("Failed to parse JSON, returning default structure")
-            return {
-                "system_type": "web_application",
-                "scale": "medium",
-                "key_components": ["frontend", "backend", "database"],
-                "data_flow": ["user_request", "processing", "response"],
-                "technologies": ["web_framework", "database", "cache"],
-                "patterns": ["layered_architecture", "MVC"],
-                "non_functional_requirements": ["scalability", "security"],
-                "estimated_complexity": "medium",
-                "recommended_architecture": "layered"
-            }
+            json_fallbacks.inc(service="system_design")
+            return self._get_default_analysis()
+    
+    def _get_default_analysis(self) -> Dict[str, Any]:
+        """Return default requirements analysis when JSON parsing fails"""
+        return {
+            "system_type": "web_application",
+            "scale": "medium",
+            "key_components": ["frontend", "backend", "database"],
+            "data_flow": ["user_request", "processing", "response"],
+            "technologies": ["web_framework", "database", "cache"],
+            "patterns": ["layered_architecture", "MVC"],
+            "non_functional_requirements": ["scalability", "security"],
+            "estimated_complexity": "medium",
+            "recommended_architecture": "layered"
+        }
     
     def _extract_plantuml_code(self, text: str) -> str:
         """Extract PlantUML code from response"""
@@ -496,10 +532,10 @@ class SystemDesignGenerationSystem:
         workflow = StateGraph(dict)
         
         # Add nodes for the workflow
-        workflow.add_node("analyze_requirements", self._analyze_requirements)
-        workflow.add_node("generate_plantuml", self._generate_plantuml)
-        workflow.add_node("generate_explanation", self._generate_explanation)
-        workflow.add_node("create_diagram_url", self._create_diagram_url)
+        workflow.add_node("analyze_requirements", traced_node("analyze_requirements", self._analyze_requirements))
+        workflow.add_node("generate_plantuml", traced_node("generate_plantuml", self._generate_plantuml))
+        workflow.add_node("generate_explanation", traced_node("generate_explanation", self._generate_explanation))
+        workflow.add_node("create_diagram_url", traced_node("create_diagram_url", self._create_diagram_url))
         
         # Set entry point
         workflow.set_entry_point("analyze_requirements")
@@ -545,11 +581,79 @@ class SystemDesignGenerationSystem:
         compiled_graph = workflow.compile()
         return compiled_graph
     
+    def reload_graph(self, graph=None):
+        """
+        Hot-swap the compiled workflow used by new requests.
+        
+        Args:
+            graph: A compiled graph to install, or None to rebuild from build_graph()
+        
+        Returns:
+            The previously installed compiled graph
+        """
+        previous = self.workflow
+        self.workflow = graph if graph is not None else self.build_graph()
+        logger.info("Reloaded system design generation workflow graph")
+        return previous
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Content-addressed key: normalized prompt + model + prompt template version"""
+        return make_cache_key(normalize_prompt(prompt), self.MODEL_NAME, self.PROMPT_TEMPLATE_VERSION)
+    
+    def _get_cached_state(self, prompt: str):
+        """Return a completed workflow state from the result cache, or None on a miss"""
+        cached = self.result_cache.get(self._cache_key(prompt))
+        if cached is None:
+            return None
+        
+        logger.info("Serving system design from result cache")
+        return {
+            **cached,
+            "user_prompt": prompt,
+            "diagram_url": f"{PLANTUML_SERVER_URL}{encode_plantuml(cached['plantuml_code'])}",
+            "diagram_id": str(uuid.uuid4())[:8],
+            "stage": "diagram_complete"
+        }
+    
+    def _store_cached_state(self, prompt: str, state: Dict[str, Any]):
+        """Cache the results of a successfully completed workflow"""
+        if state.get("stage") != "diagram_complete" or state.get("analysis_fallback"):
+            return
+        self.result_cache.set(
+            self._cache_key(prompt),
+            {field: state.get(field) for field in self.CACHED_FIELDS}
+        )
+    
+    def _build_progress_update(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a workflow state into a streaming progress update"""
+        # Determine progress based on stage
+        stage = current_state.get("stage", "starting")
+        progress = self.PROGRESS_MAPPING.get(stage, 0)
+        
+        return {
+            "status": "error" if stage == "error" else "in_progress" if progress < 100 else "complete",
+            "progress": progress,
+            "stage": stage,
+            "stage_description": self._get_stage_description(stage),
+            "error": current_state.get("error"),
+            "analysis": current_state.get("analysis"),
+            "plantuml_code": current_state.get("plantuml_code"),
+            "explanation": current_state.get("explanation"),
+            "diagram_url": current_state.get("diagram_url"),
+            "d3_components": current_state.get("d3_components"),
+            "diagram_id": current_state.get("diagram_id")
+        }
+    
     def create_system_design_stream(self, prompt: str) -> Generator[Dict[str, Any], None, None]:
         """Generate system design with streaming progress updates"""
         logger.info(f"Starting system design generation for prompt: {prompt}")
         
-        workflow = self.build_graph()
+        cached_state = self._get_cached_state(prompt)
+        if cached_state is not None:
+            yield self._build_progress_update(cached_state)
+            return
+        
+        workflow = self.workflow
         
         initial_state = {
             "user_prompt": prompt,
@@ -562,34 +666,10 @@ class SystemDesignGenerationSystem:
                 # Get the actual state dictionary
                 last_node = list(state_update.keys())[-1]
                 current_state = state_update[last_node]
-                
-                # Determine progress based on stage
-                stage = current_state.get("stage", "starting")
-                progress_mapping = {
-                    "starting": 0,
-                    "requirements_analyzed": 25,
-                    "plantuml_generated": 50,
-                    "explanation_generated": 75,
-                    "diagram_complete": 100,
-                    "error": -1
-                }
-                
-                progress = progress_mapping.get(stage, 0)
+                self._store_cached_state(prompt, current_state)
                 
                 # Yield progress update
-                yield {
-                    "status": "error" if stage == "error" else "in_progress" if progress < 100 else "complete",
-                    "progress": progress,
-                    "stage": stage,
-                    "stage_description": self._get_stage_description(stage),
-                    "error": current_state.get("error"),
-                    "analysis": current_state.get("analysis"),
-                    "plantuml_code": current_state.get("plantuml_code"),
-                    "explanation": current_state.get("explanation"),
-                    "diagram_url": current_state.get("diagram_url"),
-                    "d3_components": current_state.get("d3_components"),
-                    "diagram_id": current_state.get("diagram_id")
-                }
+                yield self._build_progress_update(current_state)
                 
         except Exception as e:
             logger.error(f"Workflow stream failed: {str(e)}")
@@ -601,6 +681,68 @@ class SystemDesignGenerationSystem:
                 "stage_description": "Error occurred during processing"
             }
     
+    async def acreate_system_design_stream(self, prompt: str, stream_tokens: bool = False) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Generate system design asynchronously with streaming progress updates.
+        
+        Built on LangGraph's astream_events: a progress update is yielded as soon
+        as each node finishes and, when stream_tokens is set, LLM tokens from the
+        free-text stages are forwarded as they arrive.
+        """
+        logger.info(f"Starting async system design generation for prompt: {prompt}")
+        
+        cached_state = self._get_cached_state(prompt)
+        if cached_state is not None:
+            yield self._build_progress_update(cached_state)
+            return
+        
+        workflow = self.workflow
+        
+        initial_state = {
+            "user_prompt": prompt,
+            "stage": "starting"
+        }
+        
+        # Send the first event immediately so clients get a byte before the first LLM call returns
+        last_update = self._build_progress_update(initial_state)
+        yield last_update
+        
+        try:
+            async for event in workflow.astream_events(initial_state, {"recursion_limit": 20}, version="v2"):
+                kind = event["event"]
+                node = event.get("metadata", {}).get("langgraph_node")
+                
+                if kind == "on_chat_model_stream":
+                    if not stream_tokens or node not in self.TOKEN_STREAM_NODES:
+                        continue
+                    token = event["data"]["chunk"].content
+                    if token:
+                        yield {
+                            "status": "in_progress",
+                            "progress": last_update["progress"],
+                            "stage": last_update["stage"],
+                            "stage_description": last_update["stage_description"],
+                            "node": node,
+                            "token": token
+                        }
+                
+                elif kind == "on_chain_end" and event["name"] == node and node in self.NODE_NAMES:
+                    # A workflow node finished; its output is the full updated state
+                    current_state = event["data"]["output"]
+                    self._store_cached_state(prompt, current_state)
+                    last_update = self._build_progress_update(current_state)
+                    yield last_update
+                
+        except Exception as e:
+            logger.error(f"Async workflow stream failed: {str(e)}")
+            yield {
+                "status": "error",
+                "progress": -1,
+                "stage": "error",
+                "error": f"Workflow failed: {str(e)}",
+                "stage_description": "Error occurred during processing"
+            }
+    
     def create_system_design(self, prompt: str) -> Dict[str, Any]:
         """Create system design and return final result (non-streaming)"""
         # Get the final state from the stream
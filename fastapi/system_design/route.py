@@ -3,8 +3,8 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import json
-import asyncio
 import logging
+from core.execution import run_llm
 from .agent import SystemDesignGenerationSystem
 
 # Configure logging
@@ -29,6 +29,8 @@ class SystemDesignResponse(BaseModel):
 
 class StreamingSystemDesignRequest(BaseModel):
     prompt: str
+    # Forward LLM tokens from free-text stages as they are generated
+    stream_tokens: bool = False
 
 @router.post("/generate", response_model=SystemDesignResponse)
 async def generate_system_design(request: SystemDesignRequest):
@@ -38,7 +40,7 @@ async def generate_system_design(request: SystemDesignRequest):
     
     try:
         logger.info(f"Generating system design for: {request.prompt[:100]}...")
-        result = system_design_system.create_system_design(request.prompt.strip())
+        result = await run_llm(system_design_system.create_system_design, request.prompt.strip())
         
         return SystemDesignResponse(
             analysis=result["analysis"],
@@ -62,14 +64,11 @@ async def generate_system_design_stream(request: StreamingSystemDesignRequest):
     async def event_stream():
         try:
             logger.info(f"Starting streaming generation for: {request.prompt[:100]}...")
-            for update in system_design_system.create_system_design_stream(request.prompt.strip()):
+            async for update in system_design_system.acreate_system_design_stream(request.prompt.strip(), stream_tokens=request.stream_tokens):
                 # Format as Server-Sent Events
                 event_data = json.dumps(update)
                 yield f"data: {event_data}\n\n"
                 
-                # Small delay to prevent overwhelming the client
-                await asyncio.sleep(0.1)
-                
         except Exception as e:
             logger.error(f"Streaming error: {str(e)}")
             error_data = json.dumps({
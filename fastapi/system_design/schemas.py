@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel
+
+
+# Response schema for the requirements analysis stage, mirroring its prompt format
+
+class RequirementsAnalysis(BaseModel):
+    system_type: str
+    scale: str
+    key_components: List[str]
+    data_flow: List[str]
+    technologies: List[str]
+    patterns: List[str]
+    non_functional_requirements: List[str]
+    estimated_complexity: str
+    recommended_architecture: str